@@ -0,0 +1,122 @@
+"""
+CryptoCompare Frame Replay Benchmark
+Pushes a recorded frame file through CryptoCompareWebSocketClient at maximum
+rate, comparing per-message dispatch with batched dispatch and the stdlib
+JSON decoder with orjson (when installed).
+
+Run from backend/:  python -m benchmarks.bench_cryptocompare_replay [--frames recording.jsonl]
+Without --frames a synthetic recording of ticker, trade and orderbook frames is generated
+(--record PATH saves it). A recording has one raw frame per line.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import List
+
+from services import cryptocompare_websocket
+from services.cryptocompare_websocket import CryptoCompareWebSocketClient
+
+SYMBOLS = ['USDT', 'USDC', 'DAI', 'TUSD', 'FRAX', 'USDP', 'PYUSD', 'BTC', 'ETH']
+
+def generate_frames(count: int, seed: int) -> List[str]:
+    """Synthetic recording shaped like CryptoCompare streamer frames"""
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(count):
+        symbol = rng.choice(SYMBOLS)
+        price = round(rng.gauss(1.0, 0.0008), 6)
+        kind = rng.random()
+        if kind < 0.4:
+            frame = {"TYPE": "24", "MARKET": "CCCAGG", "FROMSYMBOL": symbol, "TOSYMBOL": "USD", "FLAGS": 2,
+                     "PRICE": price, "LASTUPDATE": 1_700_000_000, "VOLUME24HOUR": rng.uniform(1e8, 1e10),
+                     "VOLUMEDAY": rng.uniform(1e7, 1e9), "LASTMARKET": "Binance"}
+        elif kind < 0.7:
+            frame = {"TYPE": "0", "M": "Coinbase", "FSYM": symbol, "TSYM": "USD", "F": "1", "ID": str(rng.getrandbits(40)),
+                     "TS": 1_700_000_000, "Q": rng.uniform(10, 1e5), "P": price, "TOTAL": rng.uniform(10, 1e5)}
+        else:
+            frame = {"TYPE": "8", "M": "CCCAGG", "FSYM": symbol, "TSYM": "USD", "BID": price - 0.0001,
+                     "BIDQ": rng.uniform(1e4, 1e6), "ASK": price + 0.0001, "ASKQ": rng.uniform(1e4, 1e6)}
+        frames.append(json.dumps(frame))
+    return frames
+
+class ReplayConnection:
+    """Async iterator over frames that returns to the event loop every `chunk` frames, like a socket read"""
+
+    def __init__(self, frames: List[str], chunk: int):
+        self.frames = frames
+        self.chunk = chunk
+
+    async def __aiter__(self):
+        for i, frame in enumerate(self.frames):
+            if i and i % self.chunk == 0:
+                await asyncio.sleep(0)
+            yield frame
+
+async def replay(frames: List[str], batched: bool, chunk: int) -> dict:
+    client = CryptoCompareWebSocketClient()
+    received = [0]
+    awaits = [0]
+
+    async def on_update(update):
+        received[0] += 1
+        awaits[0] += 1
+
+    async def on_batch(updates):
+        received[0] += len(updates)
+        awaits[0] += 1
+
+    if batched:
+        client.register_price_batch_callback(on_batch)
+        client.register_orderbook_batch_callback(on_batch)
+        client.connection = ReplayConnection(frames, chunk)
+        start = time.perf_counter()
+        await client._listen_for_messages()
+    else:
+        # Previous behaviour: each frame is decoded and its callbacks awaited before the next one
+        client.register_price_callback(on_update)
+        client.register_orderbook_callback(on_update)
+        start = time.perf_counter()
+        async for frame in ReplayConnection(frames, chunk):
+            await client._process_message(frame)
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "updates": received[0], "awaits": awaits[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", help="recording with one raw frame per line")
+    parser.add_argument("--generate", type=int, default=200_000, help="synthetic frames when no recording is given")
+    parser.add_argument("--record", help="save the synthetic recording to this path")
+    parser.add_argument("--chunk", type=int, default=64, help="frames per simulated socket read")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    if args.frames:
+        with open(args.frames) as f:
+            frames = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        frames = generate_frames(args.generate, args.seed)
+        if args.record:
+            with open(args.record, "w") as f:
+                f.write("\n".join(frames) + "\n")
+
+    decoders = [("json", json.loads)]
+    if cryptocompare_websocket.orjson is not None:
+        decoders.append(("orjson", cryptocompare_websocket.orjson.loads))
+
+    print(f"{len(frames)} frames, {args.chunk} frames per read")
+    print(f"{'dispatch':<14}{'decoder':<9}{'frames/s':>12}{'us/frame':>10}{'updates':>10}{'awaits':>10}")
+    for batched in (False, True):
+        for name, loads in decoders:
+            cryptocompare_websocket.json_loads = loads
+            result = asyncio.run(replay(frames, batched, args.chunk))
+            print(f"{'batched' if batched else 'per-message':<14}{name:<9}{len(frames) / result['elapsed']:>12,.0f}"
+                  f"{result['elapsed'] / len(frames) * 1e6:>10.2f}{result['updates']:>10}{result['awaits']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Order Book Matching Benchmark
+Order events per second through one OrderBook on a single core: a stream of
+limit orders around a drifting mid, cancels of resting orders and market
+orders, with prices and quantities as Decimal (as TradingEngineService uses)
+or as integer ticks.
+
+Run from backend/:  python -m benchmarks.bench_order_book [--events 500000]
+"""
+
+import argparse
+import logging
+import random
+import time
+from decimal import Decimal
+from typing import List, Tuple
+
+from services.order_book import OrderBook
+
+def generate_events(count: int, seed: int, cancel_ratio: float, market_ratio: float) -> List[Tuple]:
+    """(kind, order_id, side, quantity, price_ticks) events; cancels target earlier limit orders"""
+    rng = random.Random(seed)
+    events = []
+    live: List[str] = []
+    mid = 10_000
+    for i in range(count):
+        mid += rng.choice((-1, 0, 0, 1))
+        roll = rng.random()
+        if roll < cancel_ratio and live:
+            # Cancel a random earlier order; it may already have filled
+            events.append(("cancel", live.pop(rng.randrange(len(live))), None, 0, 0))
+            continue
+        side = "buy" if rng.random() < 0.5 else "sell"
+        quantity = rng.randint(1, 100) * 100
+        order_id = f"o{i}"
+        if roll < cancel_ratio + market_ratio:
+            events.append(("market", order_id, side, quantity, 0))
+        else:
+            offset = rng.randint(-5, 20)  # Mostly passive, some marketable
+            price = mid - offset if side == "buy" else mid + offset
+            events.append(("limit", order_id, side, quantity, price))
+            live.append(order_id)
+    return events
+
+def convert(events: List[Tuple], numeric: str) -> List[Tuple]:
+    if numeric == "int":
+        return events
+    tick = Decimal("0.0001")
+    return [(kind, order_id, side, Decimal(quantity), Decimal(price) * tick)
+            for kind, order_id, side, quantity, price in events]
+
+def run(events: List[Tuple]) -> Tuple[float, OrderBook]:
+    book = OrderBook("BENCH/USD")
+    submit, cancel = book.submit, book.cancel
+    start = time.perf_counter()
+    for kind, order_id, side, quantity, price in events:
+        if kind == "limit":
+            submit(order_id, "bench", side, quantity, price)
+        elif kind == "cancel":
+            cancel(order_id)
+        else:
+            submit(order_id, "bench", side, quantity)
+    return time.perf_counter() - start, book
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--cancel-ratio", type=float, default=0.3)
+    parser.add_argument("--market-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    events = generate_events(args.events, args.seed, args.cancel_ratio, args.market_ratio)
+    kinds = {kind: sum(1 for e in events if e[0] == kind) for kind in ("limit", "cancel", "market")}
+    print(f"{len(events)} events: {kinds['limit']} limit, {kinds['cancel']} cancel, {kinds['market']} market")
+    print(f"{'numeric':<10}{'events/s':>12}{'us/event':>10}{'fills':>10}{'resting':>10}{'levels':>8}")
+    for numeric in ("decimal", "int"):
+        elapsed, book = run(convert(events, numeric))
+        depth = book.depth(levels=10_000)
+        print(f"{numeric:<10}{len(events) / elapsed:>12,.0f}{elapsed / len(events) * 1e6:>10.2f}"
+              f"{book.stats['fills']:>10}{len(book):>10}{len(depth['bids']) + len(depth['asks']):>8}")
+
+if __name__ == "__main__":
+    main()
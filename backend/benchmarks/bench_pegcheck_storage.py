@@ -0,0 +1,136 @@
+"""
+PegCheck PostgreSQL Ingestion Benchmark
+Compares the per-report INSERT path with the COPY bulk path and the
+write-behind buffer in PostgreSQLStorage.
+
+Needs a scratch database:  POSTGRES_URL=postgresql://... python -m benchmarks.bench_pegcheck_storage
+Rows inserted by the benchmark are deleted when it finishes.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from typing import List
+
+app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if app_dir not in sys.path:
+    sys.path.append(app_dir)
+
+from pegcheck.core.compute import compute_peg_analysis
+from pegcheck.core.config import DEFAULT_SYMBOLS
+from pegcheck.core.models import PegCheckPayload
+from pegcheck.storage.postgres import PostgreSQLStorage
+
+def make_payloads(report_rows: int, seed: int = 42) -> List[PegCheckPayload]:
+    """Peg checks over DEFAULT_SYMBOLS totalling report_rows reports"""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(max(1, report_rows // len(DEFAULT_SYMBOLS))):
+        coingecko = {symbol: rng.gauss(1.0, 0.002) for symbol in DEFAULT_SYMBOLS}
+        cryptocompare = {symbol: price + rng.gauss(0, 0.0005) for symbol, price in coingecko.items()}
+        payloads.append(compute_peg_analysis(coingecko, cryptocompare, symbols=DEFAULT_SYMBOLS))
+    return payloads
+
+async def store_row_by_row(storage: PostgreSQLStorage, payload: PegCheckPayload):
+    """The previous write path: parent INSERT, then one INSERT per report"""
+    async with storage.pool.acquire() as conn:
+        async with conn.transaction():
+            record = storage._peg_check_record(0, payload)
+            peg_check_id = await conn.fetchval("""
+                INSERT INTO peg_checks (
+                    timestamp, as_of, symbols, coingecko_data,
+                    cryptocompare_data, chainlink_data, uniswap_data,
+                    cefi_consistency, config, errors
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                RETURNING id
+            """, *record[1:])
+            for report in payload.reports:
+                await conn.execute("""
+                    INSERT INTO peg_reports (
+                        peg_check_id, timestamp, symbol, avg_ref, abs_diff,
+                        pct_diff, bps_diff, is_depeg, status, confidence,
+                        sources_used, report_timestamp
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                """, *storage._peg_report_record(peg_check_id, report))
+
+async def time_row_by_row(storage, payloads, sample: int) -> float:
+    """Timed on a sample of peg checks and scaled to the batch"""
+    timed = payloads[:max(1, sample // len(DEFAULT_SYMBOLS))]
+    start = time.perf_counter()
+    for payload in timed:
+        await store_row_by_row(storage, payload)
+    return (time.perf_counter() - start) * len(payloads) / len(timed)
+
+async def time_bulk(storage, payloads) -> float:
+    """One COPY transaction per peg check"""
+    start = time.perf_counter()
+    for payload in payloads:
+        await storage.store_peg_check(payload)
+    return time.perf_counter() - start
+
+async def time_write_behind(storage, payloads) -> float:
+    """Peg checks grouped into flush_max_checks per transaction"""
+    start = time.perf_counter()
+    for payload in payloads:
+        await storage.store_peg_check(payload)
+    await storage.flush()
+    return time.perf_counter() - start
+
+async def run(args):
+    url = os.getenv("POSTGRES_URL")
+    if not url:
+        print("POSTGRES_URL is not set; point it at a scratch database to run this benchmark")
+        return
+
+    bulk = PostgreSQLStorage(url)
+    buffered = PostgreSQLStorage(url, write_behind=True, flush_max_checks=args.flush_max_checks,
+                                 flush_interval_seconds=3600)
+    await bulk.initialize()
+    await buffered.initialize()
+
+    async with bulk.pool.acquire() as conn:
+        first_new_id = await conn.fetchval("SELECT COALESCE(MAX(id), 0) + 1 FROM peg_checks")
+
+    try:
+        print(f"{'report rows':>12}{'row-by-row (s)':>17}{'bulk (s)':>10}{'write-behind (s)':>18}"
+              f"{'rows/s':>12}{'avg flush (ms)':>16}")
+        for rows in args.rows:
+            payloads = make_payloads(rows)
+            total_rows = sum(len(p.reports) for p in payloads)
+
+            reference = await time_row_by_row(bulk, payloads, args.reference_sample)
+            bulk_seconds = await time_bulk(bulk, payloads)
+
+            flushes_before = buffered.write_metrics["batches"]
+            buffered_seconds = await time_write_behind(buffered, payloads)
+            metrics = buffered.get_write_metrics()
+
+            marker = "*" if total_rows > args.reference_sample else " "
+            print(f"{total_rows:>12}{reference:>16.3f}{marker}{bulk_seconds:>10.3f}{buffered_seconds:>18.3f}"
+                  f"{total_rows / buffered_seconds:>12.0f}{metrics['avg_flush_ms']:>16.2f}"
+                  f"   ({metrics['batches'] - flushes_before} flushes)")
+        print("* extrapolated from a sample of --reference-sample rows")
+    finally:
+        async with bulk.pool.acquire() as conn:
+            await conn.execute("DELETE FROM peg_reports WHERE peg_check_id >= $1", first_new_id)
+            await conn.execute("DELETE FROM peg_checks WHERE id >= $1", first_new_id)
+        await buffered.close()
+        await bulk.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--flush-max-checks", type=int, default=500)
+    parser.add_argument("--reference-sample", type=int, default=5_000,
+                        help="max report rows written row-by-row before extrapolating")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
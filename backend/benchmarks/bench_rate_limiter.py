@@ -0,0 +1,59 @@
+"""
+Rate Limiter Benchmark
+GCRA decisions per second with a million live client/endpoint keys, for the
+in-process limiter and the shared-memory table used across workers.
+
+Run from backend/:  python -m benchmarks.bench_rate_limiter
+                    python -m benchmarks.bench_rate_limiter --keys 100000 --decisions 500000
+"""
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+
+from services.rate_limiter import GCRALimiter, SharedGCRALimiter
+
+def run(limiter, keys, order, now):
+    decide = limiter.decide
+    start = time.perf_counter()
+    allowed = 0
+    for i in order:
+        allowed += decide(keys[i], 100, 150, now).allowed
+    return time.perf_counter() - start, allowed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--decisions", type=int, default=2_000_000)
+    parser.add_argument("--backends", nargs="+", default=["local", "shared"], choices=["local", "shared"])
+    args = parser.parse_args()
+
+    keys = [f"client_{i}_/api/v1/yields" for i in range(args.keys)]
+    rng = np.random.default_rng(42)
+    # Zipf-skewed traffic so hot keys are actually limited
+    order = (rng.zipf(1.2, args.decisions) - 1) % args.keys
+    print(f"{args.keys} keys, {args.decisions} decisions (zipf 1.2), 100 rpm / burst 150")
+    print(f"{'backend':>8}{'fill/s':>12}{'decide/s':>12}{'limited %':>11}")
+
+    for backend in args.backends:
+        if backend == "local":
+            limiter = GCRALimiter()
+        else:
+            limiter = SharedGCRALimiter(f"bench_rate_limits_{uuid.uuid4().hex[:8]}",
+                                        buckets=max(1, args.keys // 4))
+        try:
+            fill_time, _ = run(limiter, keys, range(args.keys), 0.0)
+            decide_time, allowed = run(limiter, keys, order.tolist(), 1.0)
+        finally:
+            if backend == "shared":
+                limiter.close(unlink=True)
+            else:
+                limiter.close()
+
+        print(f"{backend:>8}{args.keys / fill_time:>12,.0f}{args.decisions / decide_time:>12,.0f}"
+              f"{100 * (1 - allowed / args.decisions):>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Delta Stream Protocol Benchmark
+Bytes on the wire and per-broadcast serialization time for a constituents
+stream, comparing full-state JSON broadcasts with snapshot + diff delivery
+(JSON and msgpack). A fraction of constituents changes on each tick.
+
+Run from backend/:  python -m benchmarks.bench_stream_protocol
+"""
+
+import argparse
+import copy
+import json
+import logging
+import random
+import time
+
+from services.stream_protocol import DeltaStream, MSGPACK_AVAILABLE, decode_message, DeltaStreamClient
+
+def make_state(rng: random.Random, constituents: int) -> dict:
+    return {
+        'index_value': 4.5,
+        'constituents': [
+            {
+                'symbol': f"SYM{i}",
+                'protocol': rng.choice(["aave_v3", "compound_v3", "curve", "morpho"]),
+                'weight': round(1 / constituents, 6),
+                'ray': round(rng.uniform(2, 9), 4),
+                'peg_score': round(rng.uniform(0.9, 1.0), 4),
+                'liquidity_score': round(rng.uniform(0.5, 1.0), 4)
+            }
+            for i in range(constituents)
+        ]
+    }
+
+def tick(rng: random.Random, state: dict, change_fraction: float) -> dict:
+    state = copy.deepcopy(state)
+    constituents = state['constituents']
+    for item in rng.sample(constituents, k=max(1, int(len(constituents) * change_fraction))):
+        item['ray'] = round(item['ray'] + rng.gauss(0, 0.05), 4)
+        item['peg_score'] = round(min(1.0, item['peg_score'] + rng.gauss(0, 0.001)), 4)
+    state['index_value'] = round(sum(c['weight'] * c['ray'] for c in constituents), 6)
+    return state
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--constituents", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--change-fraction", type=float, default=0.05)
+    parser.add_argument("--clients", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    states = [make_state(rng, args.constituents)]
+    for _ in range(args.ticks - 1):
+        states.append(tick(rng, states[-1], args.change_fraction))
+
+    encodings = ["json", "msgpack"] if MSGPACK_AVAILABLE else ["json"]
+    results = {}
+
+    # Previous behaviour: the full state re-encoded on every tick
+    start = time.perf_counter()
+    full_bytes = 0
+    for state in states:
+        full_bytes += len(json.dumps({'type': 'constituents', 'timestamp': '', 'data': state}).encode())
+    results["full json"] = (full_bytes, time.perf_counter() - start)
+
+    for encoding in encodings:
+        stream = DeltaStream('constituents')
+        client = DeltaStreamClient()
+        start = time.perf_counter()
+        total = 0
+        for i, state in enumerate(states):
+            stream.update(state)
+            message = stream.snapshot_message(encoding) if i == 0 else stream.diff_message(encoding)
+            total += len(message.encode() if isinstance(message, str) else message)
+        elapsed = time.perf_counter() - start
+
+        # Reference client check: diffs rebuild the final state
+        replay = DeltaStream('constituents')
+        for i, state in enumerate(states):
+            replay.update(state)
+            client.handle(decode_message(replay.snapshot_message(encoding) if i == 0 else replay.diff_message(encoding)))
+        assert client.state == states[-1]
+        results[f"delta {encoding}"] = (total, elapsed)
+
+    print(f"{args.constituents} constituents, {args.ticks} ticks, {args.change_fraction:.0%} changed per tick, "
+          f"{args.clients} clients")
+    print(f"{'protocol':<16}{'bytes/tick':>12}{'MB/tick (all clients)':>24}{'encode us/tick':>16}{'vs full':>9}")
+    for name, (total, elapsed) in results.items():
+        per_tick = total / args.ticks
+        print(f"{name:<16}{per_tick:>12.0f}{per_tick * args.clients / 1e6:>24.2f}"
+              f"{elapsed / args.ticks * 1e6:>16.1f}{full_bytes / total:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+WebSocket Fan-out Load Test
+Delivery latency for thousands of local clients on one stream, comparing the
+previous sequential broadcast loop with WebSocketConnectionManager's
+per-connection queues. A few clients never read, to show head-of-line blocking.
+
+Run from backend/:  python -m benchmarks.bench_websocket_fanout
+Needs a file descriptor limit above twice the client count (ulimit -n).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import time
+from typing import List, Set
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+
+from services.websocket_service import WebSocketConnectionManager
+
+STREAM = 'syi_live'
+
+class LatencyRecorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+
+    async def read(self, websocket):
+        async for message in websocket:
+            payload = json.loads(message)
+            if payload.get('type') == STREAM:
+                self.latencies.append(time.perf_counter() - payload['data']['sent_at'])
+
+def listening_socket(send_buffer: int) -> socket.socket:
+    """Accepted connections inherit the small send buffer, so stalled readers push back quickly"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(4096)
+    return sock
+
+async def open_clients(port: int, count: int, slow: int, recorder: LatencyRecorder, batch: int = 250):
+    clients, readers = [], []
+
+    async def open_client(is_slow: bool):
+        sock = None
+        if is_slow:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+        websocket = await connect(f"ws://127.0.0.1:{port}/", sock=sock, max_queue=1 if is_slow else 64,
+                                  ping_interval=None, compression=None)
+        clients.append(websocket)
+        if not is_slow:
+            readers.append(asyncio.create_task(recorder.read(websocket)))
+
+    # Slow clients are spread across the connection order
+    slow_positions = set(np.linspace(0, count - 1, slow, dtype=int).tolist()) if slow else set()
+    for start in range(0, count, batch):
+        await asyncio.gather(*(open_client(i in slow_positions) for i in range(start, min(start + batch, count))))
+    return clients, readers
+
+async def sequential_broadcast(connections: Set, data: dict):
+    """The previous broadcast_to_stream: one awaited send after another"""
+    message = json.dumps({'type': STREAM, 'timestamp': '', 'data': data})
+    for websocket in connections.copy():
+        await websocket.send(message)
+
+async def run_mode(mode: str, args) -> dict:
+    manager = WebSocketConnectionManager(queue_size=args.queue_size, slow_consumer_policy=args.policy)
+    connections: Set = set()
+
+    async def handler(websocket):
+        if mode == "fanout":
+            await manager.connect(websocket, STREAM)
+        else:
+            connections.add(websocket)
+        await websocket.wait_closed()
+        if mode == "fanout":
+            await manager.disconnect(websocket)
+        connections.discard(websocket)
+
+    recorder = LatencyRecorder()
+    sock = listening_socket(args.send_buffer)
+    async with serve(handler, sock=sock, ping_interval=None, compression=None, write_limit=args.send_buffer):
+        port = sock.getsockname()[1]
+        clients, readers = await open_clients(port, args.clients, args.slow, recorder)
+        await asyncio.sleep(0.5)
+
+        padding = "x" * args.payload_bytes
+        broadcast = manager.broadcast_to_stream if mode == "fanout" else (
+            lambda stream, data: sequential_broadcast(connections, data))
+
+        completed = [0]
+
+        async def broadcaster():
+            for n in range(args.broadcasts):
+                await broadcast(STREAM, {'n': n, 'sent_at': time.perf_counter(), 'padding': padding})
+                completed[0] += 1
+                await asyncio.sleep(args.interval)
+
+        start = time.perf_counter()
+        task = asyncio.create_task(broadcaster())
+        deadline = args.broadcasts * args.interval + args.drain_seconds
+        expected = (args.clients - args.slow) * args.broadcasts
+        while time.perf_counter() - start < deadline and len(recorder.latencies) < expected:
+            await asyncio.sleep(0.1)
+        stalled = completed[0] < args.broadcasts
+        task.cancel()
+
+        for websocket in clients:
+            websocket.transport.abort()
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(task, *readers, return_exceptions=True)
+        await manager.close_all()
+
+    latencies = np.array(recorder.latencies) * 1000
+    stats = manager.get_connection_stats()['fanout']
+    return {
+        "delivered": len(latencies),
+        "expected": expected,
+        "p50": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+        "p99": float(np.percentile(latencies, 99)) if len(latencies) else float("nan"),
+        "max": float(latencies.max()) if len(latencies) else float("nan"),
+        "stalled": stalled,
+        "dropped": stats["messages_dropped"] if mode == "fanout" else 0,
+        "disconnects": stats["slow_consumer_disconnects"] if mode == "fanout" else 0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=5_000)
+    parser.add_argument("--slow", type=int, default=10, help="clients that never read")
+    parser.add_argument("--broadcasts", type=int, default=15)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between broadcasts")
+    parser.add_argument("--payload-bytes", type=int, default=8_192)
+    parser.add_argument("--policy", default="drop_oldest", choices=["drop_oldest", "coalesce", "disconnect"])
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--send-buffer", type=int, default=16_384, help="server socket send buffer (bytes)")
+    parser.add_argument("--drain-seconds", type=float, default=10.0)
+    parser.add_argument("--modes", nargs="+", default=["sequential", "fanout"])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"{args.clients} clients ({args.slow} never read), {args.broadcasts} broadcasts every {args.interval:g}s, "
+          f"{args.payload_bytes} byte payload, policy={args.policy}")
+    print(f"{'mode':<12}{'delivered':>20}{'p50 (ms)':>11}{'p99 (ms)':>11}{'max (ms)':>11}{'dropped':>9}{'closed':>8}")
+    for mode in args.modes:
+        result = asyncio.run(run_mode(mode, args))
+        delivered = f"{result['delivered']}/{result['expected']}"
+        note = "  (broadcast loop stalled)" if result["stalled"] else ""
+        print(f"{mode:<12}{delivered:>20}{result['p50']:>11.1f}{result['p99']:>11.1f}{result['max']:>11.1f}"
+              f"{result['dropped']:>9}{result['disconnects']:>8}{note}")
+
+if __name__ == "__main__":
+    main()
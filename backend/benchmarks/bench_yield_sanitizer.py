@@ -0,0 +1,63 @@
+"""
+Yield Sanitizer Batch Benchmark
+Compares the leave-one-out kernel in sanitize_yield_batch with the per-yield
+context path (sanitize_yield against yields[:i] + yields[i+1:]).
+
+Run from backend/:  python -m benchmarks.bench_yield_sanitizer
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Any, Dict, List
+
+from services.yield_sanitizer import YieldSanitizer
+
+METHODS = ["MAD", "IQR", "Z_SCORE", "PERCENTILE"]
+
+def make_yields(size: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Synthetic DefiLlama-like pool set with a tail of outliers"""
+    rng = random.Random(seed)
+    yields = []
+    for i in range(size):
+        apy = rng.lognormvariate(1.3, 0.5) if rng.random() > 0.05 else rng.uniform(30, 250)
+        yields.append({'apy': apy, 'source': f'pool_{i}'})
+    return yields
+
+def time_reference(sanitizer: YieldSanitizer, yields: List[Dict[str, Any]], sample: int) -> float:
+    """Per-yield context path; timed on a sample of elements and scaled to the batch"""
+    indices = range(len(yields)) if len(yields) <= sample else random.Random(0).sample(range(len(yields)), sample)
+    start = time.perf_counter()
+    for i in indices:
+        sanitizer.sanitize_yield(yields[i], yields[:i] + yields[i+1:])
+    return (time.perf_counter() - start) * len(yields) / len(indices)
+
+def time_batch(sanitizer: YieldSanitizer, yields: List[Dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    sanitizer.sanitize_yield_batch(yields)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--reference-sample", type=int, default=1_000,
+                        help="max elements timed on the per-yield path before extrapolating")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    sanitizer = YieldSanitizer()
+
+    print(f"{'method':<11}{'pools':>8}{'per-yield (s)':>16}{'batch (s)':>12}{'speedup':>10}")
+    for method in METHODS:
+        sanitizer.config['outlier_detection']['method'] = method
+        for size in args.sizes:
+            yields = make_yields(size)
+            reference = time_reference(sanitizer, yields, args.reference_sample)
+            batch = time_batch(sanitizer, yields)
+            marker = "*" if size > args.reference_sample else " "
+            print(f"{method:<11}{size:>8}{reference:>15.3f}{marker}{batch:>12.4f}{reference / batch:>9.0f}x")
+    print("* extrapolated from a sample of --reference-sample elements")
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,13 @@ from models.crypto_compare_models import (
     PegMetrics, LiquidityMetrics
 )
 from services.crypto_compare_service import CryptoCompareService
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 
 router = APIRouter(prefix="/v1", tags=["Market Intelligence"])
 
 # Initialize services
 crypto_service = CryptoCompareService()
-yield_aggregator = YieldAggregator()
+yield_aggregator = get_yield_aggregator()
 
 @router.get("/stablecoins/metrics", response_model=StablecoinMetricsResponse)
 async def get_stablecoin_metrics(
@@ -308,7 +308,7 @@ async def list_webhooks() -> Dict[str, Any]:
             "total_webhooks": len(webhooks_info),
             "active_webhooks": len([w for w in webhooks_info if w["is_active"]]),
             "webhooks_by_client": by_client,
-            "webhook_queue_size": gateway_service.webhook_queue.qsize()
+            "webhook_queue_size": gateway_service.webhook_dispatcher.queue_size
         }
         
     except HTTPException:
@@ -562,8 +562,8 @@ async def get_enterprise_metrics() -> Dict[str, Any]:
                 "total_requests": total_requests
             },
             "service_health": {
-                "webhook_queue_size": gateway_service.webhook_queue.qsize(),
-                "active_rate_limit_buckets": len(gateway_service.rate_limit_buckets),
+                "webhook_queue_size": gateway_service.webhook_dispatcher.queue_size,
+                "active_rate_limit_buckets": len(gateway_service.rate_limiter),
                 "active_api_keys": len([k for k in gateway_service.api_keys.values() if k.is_active]),
                 "active_webhooks": len([w for w in gateway_service.webhooks.values() if w.is_active]),
                 "active_integrations": len([i for i in gateway_service.external_integrations.values() if i.is_active])
@@ -598,12 +598,12 @@ async def get_enterprise_health() -> Dict[str, Any]:
             },
             "webhook_system": {
                 "status": "healthy",
-                "queue_size": gateway_service.webhook_queue.qsize(),
+                "queue_size": gateway_service.webhook_dispatcher.queue_size,
                 "registered_webhooks": len(gateway_service.webhooks)
             },
             "rate_limiting": {
                 "status": "healthy",
-                "active_buckets": len(gateway_service.rate_limit_buckets),
+                "active_buckets": len(gateway_service.rate_limiter),
                 "configuration": "multi-tier"
             },
             "external_integrations": {
@@ -7,12 +7,12 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Dict, Any, List, Optional
 import logging
 from services.liquidity_filter_service import LiquidityFilterService
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 liquidity_service = LiquidityFilterService()
-yield_aggregator = YieldAggregator()
+yield_aggregator = get_yield_aggregator()
 
 @router.get("/liquidity/summary")
 async def get_liquidity_summary() -> Dict[str, Any]:
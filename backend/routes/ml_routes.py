@@ -9,7 +9,7 @@ import logging
 from datetime import datetime
 
 from services.ml_insights_service import get_ml_insights_service
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -92,7 +92,7 @@ async def get_yield_predictions() -> Dict[str, Any]:
             raise HTTPException(status_code=503, detail="ML Insights service not running")
         
         # Get current yield data
-        yield_aggregator = YieldAggregator()
+        yield_aggregator = get_yield_aggregator()
         current_yields = await yield_aggregator.get_all_yields()
         
         if not current_yields:
@@ -169,7 +169,7 @@ async def get_anomaly_detection() -> Dict[str, Any]:
             raise HTTPException(status_code=503, detail="ML Insights service not running")
         
         # Get current yield data
-        yield_aggregator = YieldAggregator()
+        yield_aggregator = get_yield_aggregator()
         current_yields = await yield_aggregator.get_all_yields()
         
         if not current_yields:
@@ -234,7 +234,7 @@ async def get_market_insights() -> Dict[str, Any]:
             raise HTTPException(status_code=503, detail="ML Insights service not running")
         
         # Get current yield data
-        yield_aggregator = YieldAggregator()
+        yield_aggregator = get_yield_aggregator()
         current_yields = await yield_aggregator.get_all_yields()
         
         if not current_yields:
@@ -352,17 +352,15 @@ async def retrain_models() -> Dict[str, Any]:
         if not ml_service:
             raise HTTPException(status_code=503, detail="ML Insights service not running")
         
-        # Reinitialize models (this will retrain with latest data)
-        await ml_service.initialize()
+        # Fits run in the training process; the event loop keeps serving meanwhile
+        published = await ml_service.retrain_models()
+        training = ml_service.get_ml_status()["training"]
         
         return {
-            "message": "ML models retrained successfully",
-            "models_updated": [
-                "yield_predictor",
-                "anomaly_detector",
-                "risk_predictor",
-                "market_segmentation"
-            ],
+            "message": "ML models retrained successfully" if published else "No models were retrained",
+            "models_updated": {name: version.version for name, version in published.items()},
+            "training_duration_seconds": training["last_duration_seconds"],
+            "training_error": training["last_error"],
             "retrain_timestamp": datetime.utcnow().isoformat()
         }
         
@@ -381,31 +379,14 @@ async def get_model_performance() -> Dict[str, Any]:
         if not ml_service:
             raise HTTPException(status_code=503, detail="ML Insights service not running")
         
-        # Get model performance from saved metrics
-        import joblib
-        from pathlib import Path
-        
-        models_dir = Path("/app/data/ml_models")
-        performance_metrics = {}
-        
-        # Try to load performance metrics for each model
-        model_files = {
-            "yield_predictor": "yield_predictor.pkl",
-            "risk_predictor": "risk_predictor.pkl"
-        }
-        
-        for model_name, filename in model_files.items():
-            model_path = models_dir / filename
-            if model_path.exists():
-                try:
-                    model_data = joblib.load(model_path)
-                    if 'metrics' in model_data:
-                        performance_metrics[model_name] = model_data['metrics']
-                except Exception as e:
-                    logger.warning(f"Could not load metrics for {model_name}: {e}")
+        # Get model performance from the published model manifests
+        models = ml_service.get_ml_status()["models"]
+        performance_metrics = {name: status["metrics"] for name, status in models.items()
+                               if status["version"] is not None}
         
         return {
             "model_performance": performance_metrics,
+            "model_versions": models,
             "model_status": {
                 "yield_predictor": ml_service.yield_predictor is not None,
                 "anomaly_detector": ml_service.anomaly_detector is not None,
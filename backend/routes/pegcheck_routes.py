@@ -18,7 +18,7 @@ if app_dir not in sys.path:
     sys.path.append(app_dir)
 
 try:
-    from pegcheck.core.compute import compute_peg_analysis
+    from pegcheck.core.compute import compute_peg_analysis_async, fetch_all_sources
     from pegcheck.core.config import DEFAULT_SYMBOLS
     from pegcheck.sources import coingecko, cryptocompare, chainlink, uniswap
     from pegcheck.storage.memory import MemoryStorage
@@ -90,8 +90,9 @@ async def peg_health_check():
         if PEGCHECK_AVAILABLE:
             # Test basic functionality
             test_symbols = ["USDT", "USDC"]
-            cg_prices = coingecko.fetch(test_symbols)
-            cc_prices = cryptocompare.fetch(test_symbols)
+            test_prices, _ = await fetch_all_sources(test_symbols)
+            cg_prices = test_prices["coingecko"]
+            cc_prices = test_prices["cryptocompare"]
             
             valid_cg = sum(1 for price in cg_prices.values() if price == price and price > 0)
             valid_cc = sum(1 for price in cc_prices.values() if price == price and price > 0)
@@ -163,38 +164,19 @@ async def check_peg_stability(
         
         logger.info(f"Checking peg stability for symbols: {symbol_list} (oracle: {with_oracle}, dex: {with_dex})")
         
-        # Fetch data from sources
-        cg_prices = coingecko.fetch(symbol_list)
-        cc_prices = cryptocompare.fetch(symbol_list)
-        
-        # Optional: Chainlink oracles
-        chainlink_prices = None
-        if with_oracle:
-            try:
-                chainlink_prices = chainlink.fetch(symbol_list)
-                logger.info(f"Chainlink data fetched: {chainlink_prices}")
-            except Exception as e:
-                logger.warning(f"Chainlink fetch error: {e}")
-                chainlink_prices = {symbol: float('nan') for symbol in symbol_list}
-        
-        # Optional: Uniswap v3 TWAP  
-        uniswap_prices = None
-        if with_dex:
-            try:
-                uniswap_prices = uniswap.fetch(symbol_list)
-                logger.info(f"Uniswap data fetched: {uniswap_prices}")
-            except Exception as e:
-                logger.warning(f"Uniswap fetch error: {e}")
-                uniswap_prices = {symbol: float('nan') for symbol in symbol_list}
-        
-        # Compute peg analysis
-        payload = compute_peg_analysis(
-            coingecko_prices=cg_prices,
-            cryptocompare_prices=cc_prices,
-            chainlink_prices=chainlink_prices,
-            uniswap_prices=uniswap_prices,
-            symbols=symbol_list
+        # Fetch all sources concurrently (each bounded by its deadline) and compute peg analysis
+        payload = await compute_peg_analysis_async(
+            symbols=symbol_list,
+            with_oracle=with_oracle,
+            with_dex=with_dex
         )
+        for error in payload.errors or []:
+            logger.warning(f"Peg source fetch error: {error}")
+        
+        cg_prices = payload.coingecko
+        cc_prices = payload.cryptocompare
+        chainlink_prices = payload.chainlink
+        uniswap_prices = payload.uniswap
         
         # Store result if requested and storage is available
         if store_result and storage_backend:
@@ -288,16 +270,10 @@ async def get_peg_summary(
         
         logger.info("Generating peg stability summary")
         
-        # Fetch data
-        cg_prices = coingecko.fetch(symbols)
-        cc_prices = cryptocompare.fetch(symbols)
-        
-        # Compute analysis
-        payload = compute_peg_analysis(
-            coingecko_prices=cg_prices,
-            cryptocompare_prices=cc_prices,
-            symbols=symbols
-        )
+        # Fetch data and compute analysis
+        payload = await compute_peg_analysis_async(symbols=symbols)
+        cg_prices = payload.coingecko
+        cc_prices = payload.cryptocompare
         
         # Count by status
         status_counts = {"normal": 0, "warning": 0, "depeg": 0}
@@ -424,7 +400,7 @@ async def get_data_sources(
         
         # CoinGecko health check
         try:
-            test_result = coingecko.fetch(["USDT"])
+            test_result = await coingecko.fetch_async(["USDT"])
             sources_info["coingecko"] = {
                 "name": "CoinGecko",
                 "type": "CeFi",
@@ -442,7 +418,7 @@ async def get_data_sources(
         
         # CryptoCompare health check
         try:
-            test_result = cryptocompare.fetch(["USDT"])
+            test_result = await cryptocompare.fetch_async(["USDT"])
             sources_info["cryptocompare"] = {
                 "name": "CryptoCompare",
                 "type": "CeFi", 
@@ -460,7 +436,7 @@ async def get_data_sources(
         
         # Chainlink health check
         try:
-            chainlink_health = chainlink.health_check()
+            chainlink_health = await chainlink.health_check_async()
             sources_info["chainlink"] = {
                 "name": "Chainlink Oracles",
                 "type": "Oracle",
@@ -482,7 +458,7 @@ async def get_data_sources(
         
         # Uniswap health check
         try:
-            uniswap_health = uniswap.health_check()
+            uniswap_health = await uniswap.health_check_async()
             sources_info["uniswap"] = {
                 "name": "Uniswap v3 TWAP",
                 "type": "DEX",
@@ -11,6 +11,7 @@ import asyncio
 
 from services.index_storage import IndexStorageService
 from services.data_ingestion_service import DataIngestionService
+from services.http_client_service import get_http_client
 from database import get_database
 
 logger = logging.getLogger(__name__)
@@ -146,6 +147,14 @@ async def get_production_status():
         logger.error(f"Error getting production status: {e}")
         raise HTTPException(status_code=500, detail="Failed to get production status")
 
+@router.get("/http-clients")
+async def get_http_client_metrics():
+    """Per-source upstream latency histograms from the shared HTTP client"""
+    return {
+        "http_clients": get_http_client().get_metrics(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @router.get("/readiness")
 async def check_production_readiness():
     """
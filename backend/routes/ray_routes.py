@@ -9,13 +9,13 @@ import logging
 import statistics
 from services.ray_calculator import RAYCalculator, RiskFactorType
 from services.syi_compositor import SYICompositor
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 ray_calculator = RAYCalculator()
 syi_compositor = SYICompositor()
-yield_aggregator = YieldAggregator()
+yield_aggregator = get_yield_aggregator()
 
 @router.get("/ray/methodology")
 async def get_ray_methodology() -> Dict[str, Any]:
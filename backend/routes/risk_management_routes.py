@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 import logging
 
 from services.risk_management_service import get_risk_management_service
+from services.ai_portfolio_service import get_ai_portfolio_service
 
 logger = logging.getLogger(__name__)
 
@@ -241,6 +242,36 @@ async def run_stress_test(portfolio_id: str, scenario_data: Dict[str, Any] = Bod
         logger.error(f"Error running stress test: {e}")
         raise HTTPException(status_code=500, detail=f"Error running stress test: {str(e)}")
 
+@router.post("/stress-test-grid")
+async def run_stress_test_grid(request_data: Dict[str, Any] = Body(default={})):
+    """Run every stress scenario against a set of portfolios (default: all AI-managed portfolios)"""
+    risk_service = get_risk_management_service()
+    
+    if not risk_service:
+        raise HTTPException(status_code=503, detail="Risk Management service not available")
+    
+    try:
+        portfolio_ids = request_data.get("portfolio_ids")
+        if not portfolio_ids:
+            ai_portfolio_service = get_ai_portfolio_service()
+            portfolio_ids = list(ai_portfolio_service.ai_portfolios.keys()) if ai_portfolio_service else []
+        
+        grid_results = await risk_service.run_stress_grid(portfolio_ids)
+        
+        return {
+            "stress_grid": grid_results,
+            "portfolios": len(grid_results),
+            "scenarios": [scenario.scenario_id for scenario in risk_service.stress_scenarios],
+            "worst_case": {
+                portfolio_id: min(results.items(), key=lambda item: item[1]["total_impact"])[0]
+                for portfolio_id, results in grid_results.items() if results
+            },
+            "grid_statistics": risk_service.stress_grid.stats
+        }
+    except Exception as e:
+        logger.error(f"Error running stress test grid: {e}")
+        raise HTTPException(status_code=500, detail=f"Error running stress test grid: {str(e)}")
+
 # === COMPLIANCE & REPORTING ===
 
 @router.get("/compliance/{portfolio_id}")
@@ -8,12 +8,12 @@ from typing import Dict, Any, List, Optional
 import logging
 import statistics
 from services.yield_sanitizer import YieldSanitizer, OutlierMethod, SanitizationAction
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 sanitizer = YieldSanitizer()
-yield_aggregator = YieldAggregator()
+yield_aggregator = get_yield_aggregator()
 
 @router.get("/sanitization/summary")
 async def get_sanitization_summary() -> Dict[str, Any]:
@@ -24,6 +24,7 @@ class CreateOrderRequest(BaseModel):
     quantity: float
     price: Optional[float] = None
     stop_price: Optional[float] = None
+    time_in_force: str = "GTC"  # "GTC", "IOC" or "FOK"
 
 class CreatePortfolioRequest(BaseModel):
     client_id: str
@@ -145,7 +146,8 @@ async def create_order(request: CreateOrderRequest) -> Dict[str, Any]:
             order_type=request.order_type,
             quantity=Decimal(str(request.quantity)),
             price=Decimal(str(request.price)) if request.price else None,
-            stop_price=Decimal(str(request.stop_price)) if request.stop_price else None
+            stop_price=Decimal(str(request.stop_price)) if request.stop_price else None,
+            time_in_force=request.time_in_force
         )
         
         return {
@@ -159,7 +161,10 @@ async def create_order(request: CreateOrderRequest) -> Dict[str, Any]:
                 "price": float(order.price) if order.price else None,
                 "status": order.status.value,
                 "created_at": order.created_at.isoformat(),
-                "remaining_quantity": float(order.remaining_quantity) if order.remaining_quantity else None
+                "filled_quantity": float(order.filled_quantity),
+                "remaining_quantity": float(order.remaining_quantity) if order.remaining_quantity else None,
+                "average_price": float(order.average_price) if order.average_price else None,
+                "time_in_force": order.time_in_force
             },
             "message": f"Order created successfully: {order.side.value} {order.quantity} {order.symbol}",
             "execution_strategy": order.execution_strategy
@@ -184,21 +189,12 @@ async def get_orders(
         if not trading_service:
             raise HTTPException(status_code=503, detail="Trading engine not running")
         
-        # Get all orders
-        all_orders = list(trading_service.orders.values())
-        
-        # Apply filters
-        filtered_orders = all_orders
-        
-        if client_id:
-            filtered_orders = [o for o in filtered_orders if o.client_id == client_id]
+        # Client and symbol filters are served from the engine's indexes
+        filtered_orders = trading_service.get_client_orders(client_id=client_id or None, symbol=symbol or None)
         
         if status:
             filtered_orders = [o for o in filtered_orders if o.status.value == status.lower()]
         
-        if symbol:
-            filtered_orders = [o for o in filtered_orders if o.symbol == symbol]
-        
         # Format orders for response
         formatted_orders = []
         for order in filtered_orders:
@@ -237,6 +233,36 @@ async def get_orders(
         logger.error(f"Error getting orders: {e}")
         raise HTTPException(status_code=500, detail="Failed to get orders")
 
+@router.delete("/orders/{order_id}")
+async def cancel_order(
+    order_id: str,
+    client_id: Optional[str] = Query(default=None, description="Only cancel if the order belongs to this client")
+) -> Dict[str, Any]:
+    """Cancel the unfilled quantity of a resting order"""
+    try:
+        trading_service = get_trading_engine_service()
+        
+        if not trading_service:
+            raise HTTPException(status_code=503, detail="Trading engine not running")
+        
+        order = await trading_service.cancel_order(order_id, client_id)
+        
+        return {
+            "order_id": order.order_id,
+            "status": order.status.value,
+            "filled_quantity": float(order.filled_quantity),
+            "cancelled_quantity": float(order.remaining_quantity) if order.remaining_quantity else 0.0,
+            "message": f"Order {order_id} cancelled"
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling order: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to cancel order: {str(e)}")
+
 @router.get("/trades")
 async def get_trades(
     client_id: Optional[str] = Query(default=None, description="Filter by client ID"),
@@ -250,21 +276,11 @@ async def get_trades(
         if not trading_service:
             raise HTTPException(status_code=503, detail="Trading engine not running")
         
-        # Get all trades
-        all_trades = list(trading_service.trades.values())
+        # Client and symbol filters are served from the engine's indexes (oldest first)
+        filtered_trades = trading_service.get_client_trades(client_id=client_id or None, symbol=symbol or None)
         
-        # Apply filters
-        filtered_trades = all_trades
-        
-        if client_id:
-            filtered_trades = [t for t in filtered_trades if t.client_id == client_id]
-        
-        if symbol:
-            filtered_trades = [t for t in filtered_trades if t.symbol == symbol]
-        
-        # Sort by execution time (newest first) and apply limit
-        filtered_trades.sort(key=lambda x: x.executed_at, reverse=True)
-        filtered_trades = filtered_trades[:limit]
+        # Newest first, limited
+        filtered_trades = filtered_trades[::-1][:limit]
         
         # Format trades for response
         formatted_trades = []
@@ -365,10 +381,10 @@ async def get_portfolios(
             raise HTTPException(status_code=503, detail="Trading engine not running")
         
         # Get portfolios
-        all_portfolios = list(trading_service.portfolios.values())
-        
         if client_id:
-            all_portfolios = [p for p in all_portfolios if p.client_id == client_id]
+            all_portfolios = trading_service.get_client_portfolios(client_id)
+        else:
+            all_portfolios = list(trading_service.portfolios.values())
         
         # Format portfolios for response
         formatted_portfolios = []
@@ -589,6 +605,39 @@ async def get_market_data() -> Dict[str, Any]:
         logger.error(f"Error getting market data: {e}")
         raise HTTPException(status_code=500, detail="Failed to get market data")
 
+@router.get("/order-book")
+async def get_order_book(
+    symbol: str = Query(..., description="Trading pair, e.g. USDT/USD"),
+    levels: int = Query(default=10, ge=1, le=100, description="Price levels per side")
+) -> Dict[str, Any]:
+    """Get aggregated order book depth for a trading pair"""
+    try:
+        trading_service = get_trading_engine_service()
+        
+        if not trading_service:
+            raise HTTPException(status_code=503, detail="Trading engine not running")
+        
+        book = trading_service.matching_books.get(symbol)
+        if book is None:
+            raise HTTPException(status_code=404, detail=f"Unsupported trading pair: {symbol}")
+        
+        depth = book.depth(levels)
+        
+        return {
+            "symbol": symbol,
+            "bids": [{"price": float(p), "quantity": float(q), "orders": n} for p, q, n in depth["bids"]],
+            "asks": [{"price": float(p), "quantity": float(q), "orders": n} for p, q, n in depth["asks"]],
+            "resting_orders": len(book),
+            "stats": book.stats,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting order book: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get order book")
+
 @router.get("/positions")
 async def get_positions(
     client_id: Optional[str] = Query(default=None, description="Filter by client ID")
@@ -601,10 +650,10 @@ async def get_positions(
             raise HTTPException(status_code=503, detail="Trading engine not running")
         
         # Get positions
-        all_positions = list(trading_service.positions.values())
-        
         if client_id:
-            all_positions = [p for p in all_positions if p.client_id == client_id]
+            all_positions = trading_service.get_client_positions(client_id)
+        else:
+            all_positions = list(trading_service.positions.values())
         
         # Filter out zero positions
         active_positions = [p for p in all_positions if p.quantity != 0]
@@ -19,6 +19,18 @@ router = APIRouter()
 # Global WebSocket connection manager
 websocket_manager = WebSocketConnectionManager()
 
+async def _handle_client_text(websocket: WebSocket, data: str):
+    """Plain "ping" keep-alives, or JSON protocol messages such as {"type": "resync"}"""
+    if data == "ping":
+        await websocket.send_text("pong")
+        return
+    try:
+        message = json.loads(data)
+    except json.JSONDecodeError:
+        return
+    if isinstance(message, dict):
+        await websocket_manager.handle_client_message(websocket, message)
+
 @router.get("/websocket/status")
 async def get_websocket_status() -> Dict[str, Any]:
     """Get WebSocket connection and streaming status"""
@@ -103,8 +115,8 @@ async def start_websocket_services() -> Dict[str, Any]:
         # Start CryptoCompare WebSocket client
         await start_cryptocompare_websocket()
         
-        # Start real-time data integrator
-        await start_realtime_integration()
+        # Start real-time data integrator (publishing to this router's stream subscribers)
+        await start_realtime_integration(websocket_manager)
         
         return {
             "message": "WebSocket services started successfully",
@@ -148,16 +160,15 @@ async def stop_websocket_services() -> Dict[str, Any]:
 async def websocket_syi_live(websocket: WebSocket):
     """WebSocket endpoint for live StableYield Index updates"""
     await websocket.accept()
-    await websocket_manager.connect(websocket, 'syi_live')
+    await websocket_manager.connect(websocket, 'syi_live', websocket.query_params.get('encoding', 'json'))
     
     try:
         while True:
             # Keep connection alive and handle incoming messages
             try:
                 data = await websocket.receive_text()
-                # Echo back for keep-alive (client can send ping)
-                if data == "ping":
-                    await websocket.send_text("pong")
+                # Keep-alive pings and protocol messages (resync after a sequence gap)
+                await _handle_client_text(websocket, data)
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected from SYI live stream")
                 break
@@ -170,14 +181,13 @@ async def websocket_syi_live(websocket: WebSocket):
 async def websocket_peg_metrics(websocket: WebSocket):
     """WebSocket endpoint for real-time peg stability metrics"""
     await websocket.accept()
-    await websocket_manager.connect(websocket, 'peg_metrics')
+    await websocket_manager.connect(websocket, 'peg_metrics', websocket.query_params.get('encoding', 'json'))
     
     try:
         while True:
             try:
                 data = await websocket.receive_text()
-                if data == "ping":
-                    await websocket.send_text("pong")
+                await _handle_client_text(websocket, data)
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected from peg metrics stream")
                 break
@@ -190,14 +200,13 @@ async def websocket_peg_metrics(websocket: WebSocket):
 async def websocket_liquidity_metrics(websocket: WebSocket):
     """WebSocket endpoint for real-time liquidity metrics"""
     await websocket.accept()
-    await websocket_manager.connect(websocket, 'liquidity_metrics')
+    await websocket_manager.connect(websocket, 'liquidity_metrics', websocket.query_params.get('encoding', 'json'))
     
     try:
         while True:
             try:
                 data = await websocket.receive_text()
-                if data == "ping":
-                    await websocket.send_text("pong")
+                await _handle_client_text(websocket, data)
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected from liquidity metrics stream")
                 break
@@ -210,14 +219,13 @@ async def websocket_liquidity_metrics(websocket: WebSocket):
 async def websocket_ray_all(websocket: WebSocket):
     """WebSocket endpoint for all RAY (Risk-Adjusted Yield) updates"""
     await websocket.accept()
-    await websocket_manager.connect(websocket, 'ray_all')
+    await websocket_manager.connect(websocket, 'ray_all', websocket.query_params.get('encoding', 'json'))
     
     try:
         while True:
             try:
                 data = await websocket.receive_text()
-                if data == "ping":
-                    await websocket.send_text("pong")
+                await _handle_client_text(websocket, data)
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected from RAY all stream")
                 break
@@ -230,14 +238,13 @@ async def websocket_ray_all(websocket: WebSocket):
 async def websocket_constituents(websocket: WebSocket):
     """WebSocket endpoint for SYI constituents updates"""
     await websocket.accept()
-    await websocket_manager.connect(websocket, 'constituents')
+    await websocket_manager.connect(websocket, 'constituents', websocket.query_params.get('encoding', 'json'))
     
     try:
         while True:
             try:
                 data = await websocket.receive_text()
-                if data == "ping":
-                    await websocket.send_text("pong")
+                await _handle_client_text(websocket, data)
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected from constituents stream")
                 break
@@ -311,25 +318,18 @@ async def get_websocket_test_data() -> Dict[str, Any]:
 
 @router.post("/websocket/broadcast-test")
 async def broadcast_test_data() -> Dict[str, Any]:
-    """Broadcast test data to all connected WebSocket clients (for testing)"""
+    """Publish test data to all connected WebSocket clients (for testing)"""
     try:
-        # Broadcast test SYI update
-        await websocket_manager.broadcast('syi_live', {
-            "type": "syi_live_update",
-            "data": {
+        # Published as stream state, so clients get a sequenced snapshot or diff like any other update
+        sequences = {
+            'syi_live': await websocket_manager.publish('syi_live', {
                 "index_value": 1.0456,
                 "constituent_count": 6,
                 "calculation_timestamp": datetime.utcnow().isoformat(),
                 "quality_metrics": {"overall_quality": 0.85},
                 "test_broadcast": True
-            },
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        
-        # Broadcast test peg metrics
-        await websocket_manager.broadcast('peg_metrics', {
-            "type": "peg_metrics_update",
-            "data": {
+            }),
+            'peg_metrics': await websocket_manager.publish('peg_metrics', {
                 "USDT": {
                     "symbol": "USDT",
                     "current_price": 1.0001,
@@ -337,17 +337,17 @@ async def broadcast_test_data() -> Dict[str, Any]:
                     "assessment": "Excellent",
                     "test_broadcast": True
                 }
-            },
-            "timestamp": datetime.utcnow().isoformat()
-        })
+            })
+        }
         
         # Get connection counts for response
-        connections_notified = sum(len(conns) for conns in websocket_manager.connections.values())
+        connections_notified = sum(len(websocket_manager.connections[stream]) for stream in sequences)
         
         return {
             "message": "Test data broadcasted successfully",
             "connections_notified": connections_notified,
-            "streams_updated": ["syi_live", "peg_metrics"],
+            "streams_updated": [stream for stream, seq in sequences.items() if seq],
+            "sequences": sequences,
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
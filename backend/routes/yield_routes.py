@@ -2,13 +2,13 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from models.yield_models import YieldData, HistoricalYield, User, WaitlistSignup, NewsletterSignup
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 from services.liquidity_filter_service import LiquidityFilterService
 
 router = APIRouter(prefix="/yields", tags=["Yields"])
 
 # Initialize services
-yield_aggregator = YieldAggregator()
+yield_aggregator = get_yield_aggregator()
 liquidity_filter = LiquidityFilterService()
 
 @router.get("/", response_model=List[YieldData])
@@ -120,6 +120,14 @@ async def get_stablecoin_history(stablecoin: str, days: int = 7):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch historical data: {str(e)}")
 
+@router.get("/cache/metrics")
+async def get_yield_cache_metrics():
+    """Shared yield cache metrics: hits, coalesced waits and refresh latency"""
+    return {
+        "metrics": yield_aggregator.get_cache_metrics(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @router.post("/refresh")
 async def refresh_yields(background_tasks: BackgroundTasks):
     """Manually refresh yield data (admin endpoint)"""
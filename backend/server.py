@@ -176,6 +176,14 @@ async def startup_event():
     # - WebSocket services (connection loops)
     # - Other background services
     
+    # Start the shared HTTP client before any service that calls upstream APIs
+    try:
+        from services.http_client_service import start_http_client
+        
+        await start_http_client()
+    except Exception as e:
+        logger.error(f"❌ Failed to start shared HTTP client: {e}")
+    
     # Start Trading Engine FIRST (needed for AI Portfolio integration)
     try:
         from services.trading_engine_service import start_trading_engine
@@ -321,5 +329,21 @@ async def shutdown_db_client():
     except Exception as e:
         logger.error(f"❌ Error stopping AI Portfolio service: {e}")
     
+    # Stop the shared HTTP client last, after every service that uses it
+    try:
+        from services.http_client_service import stop_http_client
+        
+        await stop_http_client()
+    except Exception as e:
+        logger.error(f"❌ Error stopping shared HTTP client: {e}")
+
+    # Close the PegCheck sources session
+    try:
+        from pegcheck.sources.http import close_session
+
+        await close_session()
+    except Exception as e:
+        logger.error(f"❌ Error closing PegCheck HTTP session: {e}")
+
     client.close()
     logger.info("StableYield Market Intelligence API shutting down...")
\ No newline at end of file
@@ -21,14 +21,15 @@ from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
-import joblib
 
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
 from .syi_compositor import SYICompositor
 from .trading_engine_service import get_trading_engine_service
 from .ml_insights_service import get_ml_insights_service
 from .dashboard_service import get_dashboard_service
+from .state_journal import StateJournal, decode_state
+from .model_registry import ModelVersion, get_model_registry, get_model_trainer
 
 logger = logging.getLogger(__name__)
 
@@ -365,12 +366,42 @@ def assert_weights_valid(targets: List[TargetWeight], tol: float = 1e-6):
     if abs(weight_sum - 1) > 0.05:
         logger.warning(f'Target weights sum ({weight_sum:.4f}) != 1; will renormalize.')
 
+def fit_portfolio_models(n_assets: int) -> Dict[str, Any]:
+    """Fit the portfolio optimizer and return predictor; runs in the training process"""
+    # Generate synthetic training data for demonstration
+    # In production, this would use historical performance data
+    training_features = np.random.normal(0, 1, (100, 14))  # 100 samples, 14 features as defined
+    
+    # Create target weights (equal weight as baseline)
+    training_targets = np.full((len(training_features), n_assets), 1.0 / n_assets)
+    
+    scaler = StandardScaler()
+    scaled_features = scaler.fit_transform(training_features)
+    
+    portfolio_optimizer = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+    portfolio_optimizer.fit(scaled_features, training_targets)
+    
+    # Create synthetic return targets
+    return_targets = np.random.normal(0.05, 0.02, len(training_features))
+    return_predictor = GradientBoostingRegressor(n_estimators=100, random_state=42)
+    return_predictor.fit(scaled_features, return_targets)
+    
+    return {
+        "artifact": {
+            "scaler": scaler,
+            "portfolio_optimizer": portfolio_optimizer,
+            "return_predictor": return_predictor
+        },
+        "samples": len(training_features),
+        "metrics": {"assets": n_assets}
+    }
+
 class AIPortfolioService:
     """AI-powered portfolio management with production-ready execution"""
     
     def __init__(self):
         # Core service integrations
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
         self.syi_compositor = SYICompositor()
         
@@ -382,6 +413,13 @@ class AIPortfolioService:
         self.risk_predictor_model = None
         self.scaler = StandardScaler()
         
+        # Versioned model artifacts, fitted in a separate training process
+        # Shared with the ML insights service, so one lease covers all training
+        self.model_registry = get_model_registry()
+        self.trainer = get_model_trainer()
+        self.model_version: Optional[ModelVersion] = None
+        self.last_training_duration: Optional[float] = None
+        
         # Configuration and cache
         self.ai_portfolios: Dict[str, AIPortfolioConfig] = {}
         self.rebalancing_signals: Dict[str, AIRebalancingSignal] = {}
@@ -390,7 +428,8 @@ class AIPortfolioService:
         
         # Service configuration
         self.config = {
-            "model_update_interval": 3600,  # 1 hour
+            "model_update_interval": 300,  # Check for a due model or a version published elsewhere
+            "model_max_age_seconds": 3600,  # Older models are retrained, and reported stale
             "sentiment_update_interval": 300,  # 5 minutes
             "rebalancing_check_interval": 900,  # 15 minutes
             "regime_detection_interval": 1800,  # 30 minutes
@@ -403,6 +442,7 @@ class AIPortfolioService:
         # Data storage
         self.ai_portfolio_dir = Path("/app/data/ai_portfolio")
         self.ai_portfolio_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = StateJournal(self.ai_portfolio_dir, "ai_portfolio")
         
         # Background tasks
         self.is_running = False
@@ -458,9 +498,11 @@ class AIPortfolioService:
             task.cancel()
         
         await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        self.model_registry.release_training_lease("ai_portfolio")
         
         # Save all data
         await self._save_ai_data()
+        self.journal.close()
         
         logger.info("🛑 AI-Powered Portfolio Management Service stopped")
     
@@ -486,6 +528,7 @@ class AIPortfolioService:
                 "optimization_strategies": [strategy.value for strategy in OptimizationStrategy],
                 "rebalancing_triggers": [trigger.value for trigger in RebalancingTrigger],
                 "optimization_metrics": self.optimization_metrics,
+                "models": self._model_status(),
                 "background_tasks": len([task for task in self.background_tasks if not task.done()]),
                 "last_updated": datetime.utcnow().isoformat()
             }
@@ -501,6 +544,7 @@ class AIPortfolioService:
                 "optimization_strategies": [],
                 "rebalancing_triggers": [],
                 "optimization_metrics": {},
+                "models": {},
                 "background_tasks": 0,
                 "last_updated": datetime.utcnow().isoformat()
             }
@@ -542,6 +586,7 @@ class AIPortfolioService:
             
             # Store configuration
             self.ai_portfolios[portfolio_id] = ai_config
+            self._journal("ai_portfolios", portfolio_id, ai_config)
             
             # Create portfolio in Trading Engine
             await self._create_portfolio_in_trading_engine(portfolio_id, client_id, portfolio_data)
@@ -694,6 +739,7 @@ class AIPortfolioService:
             
             # Store result
             self.optimization_results[portfolio_id] = result
+            self._journal("optimization_results", portfolio_id, result)
             
             # Update metrics
             self.optimization_metrics["total_optimizations"] += 1
@@ -945,7 +991,7 @@ class AIPortfolioService:
                 return []
             
             # Get positions from trading engine
-            positions = [p for p in trading_engine.positions.values() if p.client_id == portfolio_id]
+            positions = trading_engine.get_client_positions(portfolio_id)
             
             holdings = []
             for position in positions:
@@ -1303,16 +1349,29 @@ class AIPortfolioService:
     
     # Background Tasks
     async def _model_updater(self):
-        """Update AI models periodically"""
+        """
+        Retrain the models when due; otherwise pick up a version published elsewhere.
+        
+        Only the process holding the shared registry's training lease trains,
+        so serving workers do not each publish a version per interval.
+        """
         while self.is_running:
             try:
-                await self._retrain_models()
+                if self._model_due() and self.model_registry.acquire_training_lease("ai_portfolio"):
+                    await self._retrain_models()
+                else:
+                    self._load_published_models()
                 await asyncio.sleep(self.config["model_update_interval"])
                 
             except Exception as e:
                 logger.error(f"❌ Model updater error: {e}")
                 await asyncio.sleep(self.config["model_update_interval"])
     
+    def _model_due(self) -> bool:
+        """Whether the published models are missing or older than model_max_age_seconds"""
+        current = self.model_registry.current("ai_portfolio")
+        return current is None or current.age_seconds() > self.config["model_max_age_seconds"]
+    
     async def _sentiment_analyzer(self):
         """Analyze market sentiment periodically"""
         while self.is_running:
@@ -1398,35 +1457,60 @@ class AIPortfolioService:
                 random_state=42
             )
             
+            # Serve the latest published fit, if a previous run or another worker made one
+            self._load_published_models()
+            
             logger.info("✅ AI models initialized")
             
         except Exception as e:
             logger.error(f"❌ Error initializing AI models: {e}")
     
+    def _load_published_models(self) -> bool:
+        """Hot-swap to the current published models if they are newer than the ones being served"""
+        current = self.model_registry.current("ai_portfolio")
+        if current is None or (self.model_version is not None and self.model_version.version == current.version):
+            return False
+        version, artifact = self.model_registry.load("ai_portfolio")
+        # Scaler and models change together, between two awaits
+        self.scaler = artifact["scaler"]
+        self.portfolio_optimizer_model = artifact["portfolio_optimizer"]
+        self.return_predictor_model = artifact["return_predictor"]
+        self.model_version = version
+        return True
+    
+    def _model_status(self) -> Dict[str, Any]:
+        if self.model_version is None:
+            return {"version": None, "stale": True, "last_training_duration_seconds": self.last_training_duration,
+                    "owns_training": self.model_registry.owns_training}
+        age = self.model_version.age_seconds()
+        return {
+            "version": self.model_version.version,
+            "trained_at": self.model_version.trained_at,
+            "training_duration_seconds": self.model_version.training_duration_seconds,
+            "last_training_duration_seconds": self.last_training_duration,
+            "age_seconds": round(age, 1),
+            "stale": age > self.config["model_max_age_seconds"],
+            "owns_training": self.model_registry.owns_training
+        }
+    
+    def _journal(self, kind: str, key: str, value: Any):
+        """Append a changed record to the AI data journal (no-op until data is loaded)"""
+        if not self.journal.is_open:
+            return
+        try:
+            self.journal.record(kind, key, value)
+            self.journal.commit()
+        except OSError as e:
+            logger.error(f"❌ Error writing AI data journal: {e}")
+    
     async def _save_ai_data(self):
-        """Save AI data to persistent storage"""
+        """Compact AI data into a snapshot (models are persisted by the model registry)"""
         try:
-            # Save AI portfolios
-            portfolios_data = {
-                portfolio_id: asdict(config)
-                for portfolio_id, config in self.ai_portfolios.items()
-            }
-            
-            with open(self.ai_portfolio_dir / "ai_portfolios.json", 'w') as f:
-                json.dump(portfolios_data, f, indent=2, default=str)
-            
-            # Save optimization results
-            results_data = {
-                portfolio_id: asdict(result)
-                for portfolio_id, result in self.optimization_results.items()
-            }
-            
-            with open(self.ai_portfolio_dir / "optimization_results.json", 'w') as f:
-                json.dump(results_data, f, indent=2, default=str)
-            
-            # Save models
-            if self.portfolio_optimizer_model:
-                joblib.dump(self.portfolio_optimizer_model, self.ai_portfolio_dir / "portfolio_optimizer.joblib")
+            # Snapshot AI portfolios and optimization results, truncating the journal
+            self.journal.snapshot({
+                "ai_portfolios": self.ai_portfolios,
+                "optimization_results": self.optimization_results
+            })
             
             logger.debug("💾 AI data saved to storage")
             
@@ -1434,15 +1518,16 @@ class AIPortfolioService:
             logger.error(f"❌ Error saving AI data: {e}")
     
     async def _load_ai_portfolios(self):
-        """Load AI portfolios from storage"""
+        """Load AI portfolios and optimization results from the latest snapshot plus journal"""
         try:
-            portfolios_file = self.ai_portfolio_dir / "ai_portfolios.json"
-            if portfolios_file.exists():
-                with open(portfolios_file, 'r') as f:
-                    data = json.load(f)
-                # Would need to reconstruct AIPortfolioConfig objects
-                
-            logger.debug("📂 AI portfolios loaded from storage")
+            state = decode_state(self.journal.replay(), {
+                "ai_portfolios": AIPortfolioConfig,
+                "optimization_results": PortfolioOptimizationResult
+            })
+            self.ai_portfolios.update(state["ai_portfolios"])
+            self.optimization_results.update(state["optimization_results"])
+            
+            logger.debug(f"📂 Loaded {len(self.ai_portfolios)} AI portfolios from storage")
             
         except Exception as e:
             logger.error(f"❌ Error loading AI portfolios: {e}")
@@ -1742,46 +1827,20 @@ class AIPortfolioService:
             return base_weights
     
     async def _retrain_models(self):
-        """Retrain AI models with latest data"""
+        """Retrain AI models with latest data in the training process, then hot-swap to them"""
         try:
             # Get training data
             yields = await self.yield_aggregator.get_all_yields()
             if not yields:
                 return
             
-            # Generate synthetic training data for demonstration
-            # In production, this would use historical performance data
-            training_features = []
-            training_targets = []
+            started = time.perf_counter()
+            version = await self.trainer.train(self.model_registry, "ai_portfolio", fit_portfolio_models, len(yields))
+            self.last_training_duration = round(time.perf_counter() - started, 3)
             
-            for _ in range(100):  # Generate 100 training samples
-                # Create random feature vectors
-                features = np.random.normal(0, 1, 14)  # 14 features as defined
-                training_features.append(features)
-                
-                # Create target weights (equal weight as baseline)
-                target_weights = np.ones(len(yields)) / len(yields)
-                training_targets.append(target_weights)
-            
-            training_features = np.array(training_features)
-            training_targets = np.array(training_targets)
-            
-            # Fit scaler
-            self.scaler.fit(training_features)
-            
-            # Train portfolio optimizer model
-            if self.portfolio_optimizer_model and len(training_features) > 0:
-                scaled_features = self.scaler.transform(training_features)
-                self.portfolio_optimizer_model.fit(scaled_features, training_targets)
-                logger.info("✅ Portfolio optimizer model retrained")
-            
-            # Train other models
-            if self.return_predictor_model:
-                # Create synthetic return targets
-                return_targets = np.random.normal(0.05, 0.02, len(training_features))
-                scaled_features = self.scaler.transform(training_features)
-                self.return_predictor_model.fit(scaled_features, return_targets)
-                logger.info("✅ Return predictor model retrained")
+            if self._load_published_models():
+                logger.info(f"✅ Portfolio optimizer and return predictor retrained (v{version.version}, "
+                            f"{version.training_duration_seconds:.2f}s)")
             
         except Exception as e:
             logger.error(f"❌ Error retraining models: {e}")
@@ -13,12 +13,18 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
 import json
+import os
 from pathlib import Path
 from fastapi import HTTPException, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import aiohttp
 import uuid
 
+from .http_client_service import get_http_client
+from .rate_limiter import create_rate_limiter
+from .state_journal import StateJournal
+from .webhook_dispatcher import WebhookDelivery, WebhookDispatcher
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -33,14 +39,6 @@ class APIKey:
     last_used: Optional[datetime] = None
     is_active: bool = True
 
-@dataclass
-class RateLimitBucket:
-    client_id: str
-    endpoint: str
-    requests_count: int
-    window_start: datetime
-    tier: str
-
 @dataclass
 class WebhookConfig:
     webhook_id: str
@@ -70,12 +68,10 @@ class APIGatewayService:
         self.api_keys: Dict[str, APIKey] = {}
         
         # Rate limiting
-        self.rate_limit_buckets: Dict[str, RateLimitBucket] = {}
         self.request_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
         
         # Webhook management
         self.webhooks: Dict[str, WebhookConfig] = {}
-        self.webhook_queue = asyncio.Queue()
         
         # External integrations
         self.external_integrations: Dict[str, ExternalIntegration] = {}
@@ -92,10 +88,19 @@ class APIGatewayService:
                 "premium": {"requests_per_minute": 500, "burst_limit": 750},
                 "enterprise": {"requests_per_minute": 2000, "burst_limit": 3000}
             },
+            "rate_limiter": {
+                "backend": os.getenv("RATE_LIMIT_BACKEND", "local"),  # "shared" enforces limits across worker processes
+                "shared_name": "stableyield_rate_limits",
+                "shared_buckets": 65536
+            },
             "webhook": {
                 "retry_attempts": 3,
                 "timeout_seconds": 30,
-                "retry_delay_seconds": 5
+                "retry_delay_seconds": 5,
+                "workers": 8,
+                "circuit_failure_threshold": 5,
+                "circuit_reset_seconds": 60,
+                "max_pending_per_endpoint": 10000
             },
             "monitoring": {
                 "health_check_interval": 30,
@@ -113,10 +118,31 @@ class APIGatewayService:
             "external_api_calls": 0
         }
         
+        limiter_config = self.config["rate_limiter"]
+        self.rate_limiter = create_rate_limiter(
+            limiter_config["backend"],
+            **({"name": limiter_config["shared_name"], "buckets": limiter_config["shared_buckets"]}
+               if limiter_config["backend"] == "shared" else {})
+        )
+        
         # Data storage
         self.data_dir = Path("/app/data/enterprise")
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
+        webhook_config = self.config["webhook"]
+        self.webhook_dispatcher = WebhookDispatcher(
+            send=self._send_webhook,
+            sign=self._create_webhook_signature,
+            journal=StateJournal(self.data_dir, "webhook_deliveries"),
+            workers=webhook_config["workers"],
+            retry_attempts=webhook_config["retry_attempts"],
+            retry_delay_seconds=webhook_config["retry_delay_seconds"],
+            failure_threshold=webhook_config["circuit_failure_threshold"],
+            reset_seconds=webhook_config["circuit_reset_seconds"],
+            max_pending_per_endpoint=webhook_config["max_pending_per_endpoint"],
+            on_delivered=self._on_webhook_delivered
+        )
+        
         self.is_running = False
         self.background_tasks = []
     
@@ -133,12 +159,13 @@ class APIGatewayService:
         await self._load_webhooks()
         await self._load_external_integrations()
         
+        # Replays undelivered webhooks from the previous run
+        await self.webhook_dispatcher.start()
+        
         # Start background tasks
         self.background_tasks = [
-            asyncio.create_task(self._webhook_processor()),
             asyncio.create_task(self._health_monitor()),
-            asyncio.create_task(self._metrics_collector()),
-            asyncio.create_task(self._rate_limit_cleaner())
+            asyncio.create_task(self._metrics_collector())
         ]
         
         logger.info("✅ API Gateway Service started")
@@ -156,11 +183,16 @@ class APIGatewayService:
         
         await asyncio.gather(*self.background_tasks, return_exceptions=True)
         
+        # Undelivered webhooks stay in the journal for the next start
+        await self.webhook_dispatcher.stop()
+        
         # Save data
         await self._save_api_keys()
         await self._save_webhooks()
         await self._save_external_integrations()
         
+        self.rate_limiter.close()
+        
         logger.info("🛑 API Gateway Service stopped")
     
     # Authentication & Authorization
@@ -242,55 +274,33 @@ class APIGatewayService:
     
     # Rate Limiting
     async def check_rate_limit(self, client_id: str, endpoint: str, tier: str) -> Tuple[bool, Dict[str, Any]]:
-        """Check if request is within rate limits"""
-        bucket_key = f"{client_id}_{endpoint}"
-        current_time = datetime.utcnow()
-        
-        # Get or create rate limit bucket
-        if bucket_key not in self.rate_limit_buckets:
-            self.rate_limit_buckets[bucket_key] = RateLimitBucket(
-                client_id=client_id,
-                endpoint=endpoint,
-                requests_count=0,
-                window_start=current_time,
-                tier=tier
-            )
-        
-        bucket = self.rate_limit_buckets[bucket_key]
-        
-        # Check if we need to reset the window (1 minute windows)
-        if (current_time - bucket.window_start).total_seconds() >= 60:
-            bucket.requests_count = 0
-            bucket.window_start = current_time
-        
-        # Get rate limit for tier
+        """Check if request is within rate limits (GCRA: `burst_limit` at once, refilling at `requests_per_minute`)"""
         rate_config = self.config["rate_limiting"][tier]
         rate_limit = rate_config["requests_per_minute"]
         burst_limit = rate_config["burst_limit"]
         
-        # Check limits
-        if bucket.requests_count >= burst_limit:
-            # Hard limit exceeded
+        decision = self.rate_limiter.decide(f"{client_id}_{endpoint}", rate_limit, burst_limit)
+        reset_time = (datetime.utcnow() + timedelta(seconds=decision.reset_after)).isoformat()
+        
+        if not decision.allowed:
+            self.api_metrics["rate_limited_requests"] += 1
             return False, {
                 "allowed": False,
                 "rate_limit": rate_limit,
                 "requests_remaining": 0,
-                "reset_time": (bucket.window_start + timedelta(minutes=1)).isoformat(),
-                "retry_after": 60 - (current_time - bucket.window_start).total_seconds()
+                "reset_time": reset_time,
+                "retry_after": decision.retry_after
             }
         
-        # Increment counter
-        bucket.requests_count += 1
-        
         # Update metrics
         self.api_metrics["total_requests"] += 1
         
         return True, {
             "allowed": True,
             "rate_limit": rate_limit,
-            "requests_remaining": max(0, rate_limit - bucket.requests_count),
-            "reset_time": (bucket.window_start + timedelta(minutes=1)).isoformat(),
-            "burst_remaining": max(0, burst_limit - bucket.requests_count)
+            "requests_remaining": max(0, rate_limit - (burst_limit - decision.remaining)),
+            "reset_time": reset_time,
+            "burst_remaining": decision.remaining
         }
     
     # Webhook System
@@ -329,81 +339,25 @@ class APIGatewayService:
             if webhook.is_active and event in webhook.events
         ]
         
-        for webhook in relevant_webhooks:
-            # Add to webhook queue for processing
-            await self.webhook_queue.put({
-                "webhook": webhook,
-                "event": event,
-                "data": data,
-                "timestamp": datetime.utcnow().isoformat()
-            })
+        self.webhook_dispatcher.publish(event, data, relevant_webhooks)
     
-    async def _webhook_processor(self):
-        """Background task to process webhook deliveries"""
-        while self.is_running:
-            try:
-                # Get webhook from queue (wait up to 1 second)
-                try:
-                    webhook_delivery = await asyncio.wait_for(self.webhook_queue.get(), timeout=1.0)
-                except asyncio.TimeoutError:
-                    continue
-                
-                await self._deliver_webhook(webhook_delivery)
-                
-            except Exception as e:
-                logger.error(f"❌ Error in webhook processor: {e}")
+    async def _send_webhook(self, url: str, body: str, headers: Dict[str, str]) -> int:
+        """POST a serialized webhook payload; returns the HTTP status"""
+        response = await get_http_client().post(
+            "webhook",
+            url,
+            data=body,
+            headers=headers,
+            read=None,
+            timeout=aiohttp.ClientTimeout(total=self.config["webhook"]["timeout_seconds"])
+        )
+        return response.status
     
-    async def _deliver_webhook(self, delivery: Dict[str, Any]):
-        """Deliver a webhook with retries"""
-        webhook = delivery["webhook"]
-        event = delivery["event"]
-        data = delivery["data"]
-        timestamp = delivery["timestamp"]
-        
-        # Create webhook payload
-        payload = {
-            "event": event,
-            "timestamp": timestamp,
-            "data": data
-        }
-        
-        # Create signature
-        signature = self._create_webhook_signature(json.dumps(payload), webhook.secret)
-        
-        headers = {
-            "Content-Type": "application/json",
-            "X-StableYield-Event": event,
-            "X-StableYield-Signature": signature,
-            "X-StableYield-Timestamp": timestamp
-        }
-        
-        # Attempt delivery with retries
-        for attempt in range(self.config["webhook"]["retry_attempts"]):
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        webhook.url,
-                        json=payload,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=self.config["webhook"]["timeout_seconds"])
-                    ) as response:
-                        if response.status < 400:
-                            # Success
-                            webhook.last_triggered = datetime.utcnow()
-                            self.api_metrics["webhook_deliveries"] += 1
-                            logger.debug(f"✅ Webhook delivered to {webhook.url}")
-                            return
-                        else:
-                            logger.warning(f"⚠️ Webhook delivery failed (attempt {attempt + 1}): HTTP {response.status}")
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Webhook delivery error (attempt {attempt + 1}): {e}")
-            
-            # Wait before retry (except on last attempt)
-            if attempt < self.config["webhook"]["retry_attempts"] - 1:
-                await asyncio.sleep(self.config["webhook"]["retry_delay_seconds"])
-        
-        logger.error(f"❌ Failed to deliver webhook to {webhook.url} after {self.config['webhook']['retry_attempts']} attempts")
+    def _on_webhook_delivered(self, delivery: WebhookDelivery):
+        webhook = self.webhooks.get(delivery.webhook_id)
+        if webhook:
+            webhook.last_triggered = datetime.utcnow()
+        self.api_metrics["webhook_deliveries"] += 1
     
     def _create_webhook_signature(self, payload: str, secret: str) -> str:
         """Create webhook signature for verification"""
@@ -446,14 +400,13 @@ class APIGatewayService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        integration.last_sync = datetime.utcnow()
-                        self.api_metrics["external_api_calls"] += 1
-                        return await response.json()
-                    else:
-                        raise HTTPException(status_code=response.status, detail=f"External API error: {response.status}")
+            response = await get_http_client().get("external_api", url, headers=headers, params=params)
+            if response.status == 200:
+                integration.last_sync = datetime.utcnow()
+                self.api_metrics["external_api_calls"] += 1
+                return response.data
+            else:
+                raise HTTPException(status_code=response.status, detail=f"External API error: {response.status}")
         
         except Exception as e:
             logger.error(f"❌ External API call failed: {e}")
@@ -492,11 +445,11 @@ class APIGatewayService:
                 # Check various health metrics
                 health_status = {
                     "api_gateway": "healthy",
-                    "webhook_queue_size": self.webhook_queue.qsize(),
+                    "webhook_queue_size": self.webhook_dispatcher.queue_size,
                     "active_api_keys": len([k for k in self.api_keys.values() if k.is_active]),
                     "active_webhooks": len([w for w in self.webhooks.values() if w.is_active]),
                     "active_integrations": len([i for i in self.external_integrations.values() if i.is_active]),
-                    "rate_limit_buckets": len(self.rate_limit_buckets),
+                    "rate_limit_buckets": len(self.rate_limiter),
                     "last_check": datetime.utcnow().isoformat()
                 }
                 
@@ -537,29 +490,6 @@ class APIGatewayService:
                 logger.error(f"❌ Metrics collector error: {e}")
                 await asyncio.sleep(3600)
     
-    async def _rate_limit_cleaner(self):
-        """Clean expired rate limit buckets"""
-        while self.is_running:
-            try:
-                current_time = datetime.utcnow()
-                expired_buckets = []
-                
-                for bucket_key, bucket in self.rate_limit_buckets.items():
-                    if (current_time - bucket.window_start).total_seconds() > 300:  # 5 minutes old
-                        expired_buckets.append(bucket_key)
-                
-                for bucket_key in expired_buckets:
-                    del self.rate_limit_buckets[bucket_key]
-                
-                if expired_buckets:
-                    logger.debug(f"🧹 Cleaned {len(expired_buckets)} expired rate limit buckets")
-                
-                await asyncio.sleep(300)  # Every 5 minutes
-                
-            except Exception as e:
-                logger.error(f"❌ Rate limit cleaner error: {e}")
-                await asyncio.sleep(300)
-    
     async def _clean_old_metrics(self):
         """Clean old metrics files"""
         try:
@@ -700,14 +630,17 @@ class APIGatewayService:
             "webhooks": {
                 "total": len(self.webhooks),
                 "active": len([w for w in self.webhooks.values() if w.is_active]),
-                "queue_size": self.webhook_queue.qsize()
+                "queue_size": self.webhook_dispatcher.queue_size,
+                "delivery": self.webhook_dispatcher.get_stats()
             },
             "external_integrations": {
                 "total": len(self.external_integrations),
                 "active": len([i for i in self.external_integrations.values() if i.is_active])
             },
             "rate_limiting": {
-                "active_buckets": len(self.rate_limit_buckets),
+                "active_buckets": len(self.rate_limiter),
+                "backend": self.rate_limiter.backend,
+                "decisions": self.rate_limiter.stats,
                 "configuration": self.config["rate_limiting"]
             },
             "metrics": self.api_metrics,
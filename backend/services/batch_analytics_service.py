@@ -16,7 +16,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
 from .syi_compositor import SYICompositor
 from .realtime_data_integrator import get_realtime_integrator
@@ -63,7 +63,7 @@ class BatchAnalyticsService:
     
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
         self.syi_compositor = SYICompositor()
         
@@ -1,4 +1,3 @@
-import aiohttp
 import hmac
 import hashlib
 import time
@@ -6,6 +5,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 import os
+from .http_client_service import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,7 @@ class BinanceService:
         self.api_key = os.getenv('BINANCE_API_KEY', 'DEMO_KEY')
         self.api_secret = os.getenv('BINANCE_API_SECRET', 'DEMO_SECRET')
         self.stablecoins = ["USDT", "USDC", "DAI", "TUSD"]
+        self.http = get_http_client()
         
     def _generate_signature(self, query_string: str) -> str:
         """Generate signature for Binance API"""
@@ -39,15 +40,13 @@ class BinanceService:
                 'X-MBX-APIKEY': self.api_key
             }
             
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/sapi/v1/simple-earn/flexible/list?{query_string}&signature={signature}"
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('rows', [])
-                    else:
-                        logger.error(f"Binance API error: {response.status}")
-                        return self._get_demo_binance_data()
+            url = f"{self.base_url}/sapi/v1/simple-earn/flexible/list?{query_string}&signature={signature}"
+            response = await self.http.get("binance", url, headers=headers)
+            if response.status == 200:
+                return response.data.get('rows', [])
+            else:
+                logger.error(f"Binance API error: {response.status}")
+                return self._get_demo_binance_data()
         except Exception as e:
             logger.error(f"Binance service error: {str(e)}")
             return self._get_demo_binance_data()
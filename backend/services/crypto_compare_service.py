@@ -1,6 +1,5 @@
 import os
 import asyncio
-import aiohttp
 import websockets
 import json
 import logging
@@ -8,6 +7,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from collections import deque
 import math
+from .http_client_service import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,7 @@ class CryptoCompareService:
         self.base_url = "https://min-api.cryptocompare.com/data"
         self.ws_url = f"wss://streamer.cryptocompare.com/v2?api_key={self.api_key}"
         self.stablecoins = ["USDT", "USDC", "DAI", "TUSD", "FRAX", "USDP", "GUSD"]
+        self.http = get_http_client()
         
         # In-memory storage for real-time calculations
         self.price_cache = {}
@@ -28,20 +29,19 @@ class CryptoCompareService:
             if self.api_key == 'DEMO_KEY':
                 return self._get_demo_prices()
                 
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'fsyms': ','.join(self.stablecoins),
-                    'tsyms': 'USD',
-                    'api_key': self.api_key
-                }
-                
-                async with session.get(f"{self.base_url}/pricemulti", params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {symbol: data.get(symbol, {}).get('USD', 1.0) for symbol in self.stablecoins}
-                    else:
-                        logger.error(f"CryptoCompare API error: {response.status}")
-                        return self._get_demo_prices()
+            params = {
+                'fsyms': ','.join(self.stablecoins),
+                'tsyms': 'USD',
+                'api_key': self.api_key
+            }
+            
+            response = await self.http.get("cryptocompare", f"{self.base_url}/pricemulti", params=params)
+            if response.status == 200:
+                data = response.data
+                return {symbol: data.get(symbol, {}).get('USD', 1.0) for symbol in self.stablecoins}
+            else:
+                logger.error(f"CryptoCompare API error: {response.status}")
+                return self._get_demo_prices()
                         
         except Exception as e:
             logger.error(f"CryptoCompare service error: {str(e)}")
@@ -72,19 +72,17 @@ class CryptoCompareService:
             if self.api_key == 'DEMO_KEY':
                 return self._get_demo_exchanges(symbol)
                 
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'fsym': symbol,
-                    'tsym': 'USD',
-                    'api_key': self.api_key
-                }
-                
-                async with session.get(f"{self.base_url}/top/exchanges", params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('Data', [])
-                    else:
-                        return self._get_demo_exchanges(symbol)
+            params = {
+                'fsym': symbol,
+                'tsym': 'USD',
+                'api_key': self.api_key
+            }
+            
+            response = await self.http.get("cryptocompare", f"{self.base_url}/top/exchanges", params=params)
+            if response.status == 200:
+                return response.data.get('Data', [])
+            else:
+                return self._get_demo_exchanges(symbol)
                         
         except Exception as e:
             logger.error(f"Error fetching exchanges for {symbol}: {str(e)}")
@@ -5,16 +5,26 @@ Real-time streaming of price and market data from CryptoCompare WebSocket API
 
 import asyncio
 import json
+import time
 import websockets
 import logging
 from typing import Dict, Any, Callable, Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import orjson
+    json_loads = orjson.loads  # Several times faster than json.loads on ticker frames
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+EPOCH = datetime(1970, 1, 1)
+
 class CCMessageType(Enum):
     TRADE = "0"
     CURRENT_QUOTE = "2"
@@ -22,26 +32,41 @@ class CCMessageType(Enum):
     ORDERBOOK_L1 = "8"
     TICKER = "24"
 
-@dataclass
+@dataclass(slots=True)
 class CCPriceUpdate:
     symbol: str
     price: float
     volume_24h: float
-    timestamp: datetime
+    timestamp_ns: int  # Receive time, epoch nanoseconds (UTC)
     source: str = "cryptocompare_ws"
+    
+    @property
+    def timestamp(self) -> datetime:
+        return EPOCH + timedelta(microseconds=self.timestamp_ns // 1000)
 
-@dataclass
+@dataclass(slots=True)
 class CCOrderBookUpdate:
     symbol: str
     bid_price: float
     bid_quantity: float
     ask_price: float
     ask_quantity: float
-    timestamp: datetime
+    timestamp_ns: int  # Receive time, epoch nanoseconds (UTC)
     source: str = "cryptocompare_ws"
+    
+    @property
+    def timestamp(self) -> datetime:
+        return EPOCH + timedelta(microseconds=self.timestamp_ns // 1000)
 
 class CryptoCompareWebSocketClient:
-    """CryptoCompare WebSocket client for real-time data streaming"""
+    """
+    CryptoCompare WebSocket client for real-time data streaming.
+
+    Frames are decoded synchronously into slotted update records and
+    collected in pending lists. One dispatch task per event-loop tick hands
+    each batch callback the whole list, so a burst of frames costs one await
+    per callback instead of one per message.
+    """
     
     def __init__(self):
         self.api_key = os.getenv('CC_API_KEY_STABLEYIELD', 'DEMO_KEY')
@@ -51,12 +76,32 @@ class CryptoCompareWebSocketClient:
         self.subscriptions = set()
         self.price_callbacks = []
         self.orderbook_callbacks = []
+        self.price_batch_callbacks = []
+        self.orderbook_batch_callbacks = []
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 10
         self.reconnect_delay = 5
         
         # StableYield Index constituents we want to track
         self.tracked_symbols = ['USDT', 'USDC', 'DAI', 'TUSD', 'FRAX', 'USDP', 'PYUSD']
+        self._tracked = frozenset(self.tracked_symbols)
+        
+        # Decoded updates waiting for the next dispatch
+        self._pending_prices: List[CCPriceUpdate] = []
+        self._pending_orderbooks: List[CCOrderBookUpdate] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._decoders = {
+            "24": self._decode_ticker,  # Ticker data
+            "0": self._decode_trade,  # Trade data
+            "8": self._decode_orderbook  # Orderbook L1
+        }
+        self.ingest_stats = {
+            "frames": 0,
+            "price_updates": 0,
+            "orderbook_updates": 0,
+            "batches": 0,
+            "decode_errors": 0
+        }
         
     async def connect(self):
         """Establish WebSocket connection to CryptoCompare"""
@@ -135,10 +180,8 @@ class CryptoCompareWebSocketClient:
         """Listen for incoming WebSocket messages"""
         try:
             async for message in self.connection:
-                try:
-                    await self._process_message(message)
-                except Exception as e:
-                    logger.error(f"❌ Error processing message: {e}")
+                self.ingest_frame(message)
+            await self.flush()
                     
         except websockets.exceptions.ConnectionClosed:
             logger.warning("🔌 WebSocket connection closed")
@@ -148,133 +191,125 @@ class CryptoCompareWebSocketClient:
             logger.error(f"❌ Error in message listener: {e}")
             await self._handle_connection_error()
     
-    async def _process_message(self, raw_message: str):
-        """Process incoming WebSocket message"""
+    def ingest_frame(self, raw_message):
+        """Decode one frame (str or bytes) and queue its update for the next batch dispatch"""
+        self._decode_frame(raw_message)
+        if (self._pending_prices or self._pending_orderbooks) and self._dispatch_task is None:
+            self._dispatch_task = asyncio.create_task(self._dispatch_pending())
+    
+    def _decode_frame(self, raw_message):
+        """Decode one frame into the pending update lists"""
+        self.ingest_stats["frames"] += 1
         try:
-            # CryptoCompare sends messages in a specific format
-            data = json.loads(raw_message)
-            
-            # Handle different message types
-            if isinstance(data, dict):
-                message_type = data.get("TYPE")
-                
-                if message_type == "24":  # Ticker data
-                    await self._handle_ticker_message(data)
-                elif message_type == "0":  # Trade data
-                    await self._handle_trade_message(data)
-                elif message_type == "8":  # Orderbook L1
-                    await self._handle_orderbook_message(data)
-                elif message_type == "20":  # Welcome/status message
-                    logger.info(f"📋 CryptoCompare status: {data}")
-                else:
-                    logger.debug(f"📨 Unhandled message type {message_type}: {data}")
-                    
-        except json.JSONDecodeError:
+            data = json_loads(raw_message)
+        except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError both subclass it
+            self.ingest_stats["decode_errors"] += 1
             logger.warning(f"❌ Invalid JSON received: {raw_message[:100]}...")
-        except Exception as e:
-            logger.error(f"❌ Error processing message: {e}")
-    
-    async def _handle_ticker_message(self, data: Dict[str, Any]):
-        """Handle ticker (price/volume) message"""
+            return
+        
+        if not isinstance(data, dict):
+            return
+        
+        message_type = data.get("TYPE")
         try:
-            # Extract ticker data
-            symbol = data.get("FROMSYMBOL", "").upper()
-            if symbol not in self.tracked_symbols:
-                return
-            
-            price = float(data.get("PRICE", 0))
-            volume_24h = float(data.get("VOLUME24HOUR", 0))
-            
-            if price > 0:
-                price_update = CCPriceUpdate(
-                    symbol=symbol,
-                    price=price,
-                    volume_24h=volume_24h,
-                    timestamp=datetime.utcnow(),
-                    source="cryptocompare_ws"
-                )
-                
-                # Notify all registered callbacks
-                for callback in self.price_callbacks:
-                    try:
-                        await callback(price_update)
-                    except Exception as e:
-                        logger.error(f"❌ Error in price callback: {e}")
-                
-                logger.debug(f"💰 Price update: {symbol} = ${price:.4f} (Vol: ${volume_24h:,.0f})")
-                
-        except Exception as e:
-            logger.error(f"❌ Error handling ticker message: {e}")
+            decoder = self._decoders.get(message_type)
+            if decoder is not None:
+                decoder(data, time.time_ns())
+            elif message_type == "20":  # Welcome/status message
+                logger.info(f"📋 CryptoCompare status: {data}")
+            else:
+                logger.debug(f"📨 Unhandled message type {message_type}: {data}")
+        except Exception as e:  # A malformed frame must never take the connection down
+            self.ingest_stats["decode_errors"] += 1
+            logger.error(f"❌ Error decoding {message_type} message: {e}")
     
-    async def _handle_trade_message(self, data: Dict[str, Any]):
-        """Handle trade message for real-time price updates"""
-        try:
-            symbol = data.get("FSYM", "").upper()
-            if symbol not in self.tracked_symbols:
-                return
-            
-            price = float(data.get("P", 0))
-            quantity = float(data.get("Q", 0))
-            
-            if price > 0:
-                # Create price update from trade data
-                price_update = CCPriceUpdate(
-                    symbol=symbol,
-                    price=price,
-                    volume_24h=quantity,  # Use trade quantity as volume indicator
-                    timestamp=datetime.utcnow(),
-                    source="cryptocompare_ws_trade"
-                )
-                
-                # Notify callbacks
-                for callback in self.price_callbacks:
-                    try:
-                        await callback(price_update)
-                    except Exception as e:
-                        logger.error(f"❌ Error in trade callback: {e}")
-                
-                logger.debug(f"📈 Trade update: {symbol} = ${price:.4f} (Qty: {quantity})")
-                
-        except Exception as e:
-            logger.error(f"❌ Error handling trade message: {e}")
+    async def _process_message(self, raw_message: str):
+        """Process one incoming message and dispatch it immediately"""
+        self._decode_frame(raw_message)
+        await self.flush()
     
-    async def _handle_orderbook_message(self, data: Dict[str, Any]):
-        """Handle orderbook L1 (best bid/ask) message"""
+    def _tracked_symbol(self, value: Any) -> Optional[str]:
+        """Upper-cased symbol if it is a tracked one; None for untracked or malformed values"""
+        if not isinstance(value, str):
+            return None
+        symbol = value.upper()
+        return symbol if symbol in self._tracked else None
+    
+    def _decode_ticker(self, data: Dict[str, Any], timestamp_ns: int):
+        """Ticker (price/volume) message"""
+        symbol = self._tracked_symbol(data.get("FROMSYMBOL"))
+        if symbol is None:
+            return
+        price = float(data.get("PRICE", 0))
+        if price > 0:
+            self._pending_prices.append(CCPriceUpdate(
+                symbol, price, float(data.get("VOLUME24HOUR", 0)), timestamp_ns, "cryptocompare_ws"
+            ))
+    
+    def _decode_trade(self, data: Dict[str, Any], timestamp_ns: int):
+        """Trade message for real-time price updates"""
+        symbol = self._tracked_symbol(data.get("FSYM"))
+        if symbol is None:
+            return
+        price = float(data.get("P", 0))
+        if price > 0:
+            # Trade quantity is used as the volume indicator
+            self._pending_prices.append(CCPriceUpdate(
+                symbol, price, float(data.get("Q", 0)), timestamp_ns, "cryptocompare_ws_trade"
+            ))
+    
+    def _decode_orderbook(self, data: Dict[str, Any], timestamp_ns: int):
+        """Orderbook L1 (best bid/ask) message"""
+        symbol = self._tracked_symbol(data.get("FSYM"))
+        if symbol is None:
+            return
+        bid_price = float(data.get("BID", 0))
+        ask_price = float(data.get("ASK", 0))
+        if bid_price > 0 and ask_price > 0:
+            self._pending_orderbooks.append(CCOrderBookUpdate(
+                symbol, bid_price, float(data.get("BIDQ", 0)), ask_price, float(data.get("ASKQ", 0)),
+                timestamp_ns, "cryptocompare_ws"
+            ))
+    
+    async def _dispatch_pending(self):
+        """Hand pending updates to callbacks until none are left"""
         try:
-            symbol = data.get("FSYM", "").upper()
-            if symbol not in self.tracked_symbols:
-                return
-            
-            bid_price = float(data.get("BID", 0))
-            ask_price = float(data.get("ASK", 0))
-            bid_quantity = float(data.get("BIDQ", 0))
-            ask_quantity = float(data.get("ASKQ", 0))
-            
-            if bid_price > 0 and ask_price > 0:
-                orderbook_update = CCOrderBookUpdate(
-                    symbol=symbol,
-                    bid_price=bid_price,
-                    bid_quantity=bid_quantity,
-                    ask_price=ask_price,
-                    ask_quantity=ask_quantity,
-                    timestamp=datetime.utcnow(),
-                    source="cryptocompare_ws"
-                )
+            while self._pending_prices or self._pending_orderbooks:
+                prices, self._pending_prices = self._pending_prices, []
+                orderbooks, self._pending_orderbooks = self._pending_orderbooks, []
+                self.ingest_stats["batches"] += 1
+                self.ingest_stats["price_updates"] += len(prices)
+                self.ingest_stats["orderbook_updates"] += len(orderbooks)
                 
-                # Notify orderbook callbacks
-                for callback in self.orderbook_callbacks:
-                    try:
-                        await callback(orderbook_update)
-                    except Exception as e:
-                        logger.error(f"❌ Error in orderbook callback: {e}")
-                
-                spread = ask_price - bid_price
-                spread_pct = (spread / bid_price) * 100 if bid_price > 0 else 0
-                
-                logger.debug(f"📊 Orderbook: {symbol} Bid=${bid_price:.4f} Ask=${ask_price:.4f} Spread={spread_pct:.3f}%")
-                
-        except Exception as e:
-            logger.error(f"❌ Error handling orderbook message: {e}")
+                if prices:
+                    await self._notify(self.price_batch_callbacks, self.price_callbacks, prices, "price")
+                if orderbooks:
+                    await self._notify(self.orderbook_batch_callbacks, self.orderbook_callbacks, orderbooks, "orderbook")
+        finally:
+            self._dispatch_task = None
+    
+    async def _notify(self, batch_callbacks: List[Callable], callbacks: List[Callable], updates: List, kind: str):
+        for callback in batch_callbacks:
+            try:
+                await callback(updates)
+            except Exception as e:
+                logger.error(f"❌ Error in {kind} batch callback: {e}")
+        
+        # Per-update callbacks (one await per update)
+        for callback in callbacks:
+            for update in updates:
+                try:
+                    await callback(update)
+                except Exception as e:
+                    logger.error(f"❌ Error in {kind} callback: {e}")
+    
+    async def flush(self):
+        """Dispatch every pending update now"""
+        if self._dispatch_task is not None:
+            await self._dispatch_task
+        if self._pending_prices or self._pending_orderbooks:
+            self._dispatch_task = asyncio.current_task()
+            await self._dispatch_pending()
     
     async def _handle_connection_error(self):
         """Handle connection errors and attempt reconnection"""
@@ -306,6 +341,16 @@ class CryptoCompareWebSocketClient:
         self.orderbook_callbacks.append(callback)
         logger.info(f"📝 Registered orderbook callback: {callback.__name__}")
     
+    def register_price_batch_callback(self, callback: Callable[[List[CCPriceUpdate]], None]):
+        """Register callback receiving every price update decoded in one event-loop tick"""
+        self.price_batch_callbacks.append(callback)
+        logger.info(f"📝 Registered price batch callback: {callback.__name__}")
+    
+    def register_orderbook_batch_callback(self, callback: Callable[[List[CCOrderBookUpdate]], None]):
+        """Register callback receiving every orderbook update decoded in one event-loop tick"""
+        self.orderbook_batch_callbacks.append(callback)
+        logger.info(f"📝 Registered orderbook batch callback: {callback.__name__}")
+    
     def get_connection_status(self) -> Dict[str, Any]:
         """Get current connection status"""
         return {
@@ -315,6 +360,9 @@ class CryptoCompareWebSocketClient:
             "tracked_symbols": self.tracked_symbols,
             "price_callbacks": len(self.price_callbacks),
             "orderbook_callbacks": len(self.orderbook_callbacks),
+            "batch_callbacks": len(self.price_batch_callbacks) + len(self.orderbook_batch_callbacks),
+            "json_decoder": "orjson" if orjson else "json",
+            "ingest": dict(self.ingest_stats),
             "api_key_configured": self.api_key != 'DEMO_KEY'
         }
 
@@ -10,18 +10,19 @@ import json
 import time
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from decimal import Decimal
 from pathlib import Path
 import statistics
 import numpy as np
 
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
 from .syi_compositor import SYICompositor
 from .trading_engine_service import get_trading_engine_service
 from .ml_insights_service import get_ml_insights_service
 from .batch_analytics_service import get_batch_analytics_service
+from .state_journal import StateJournal, decode_state
 
 logger = logging.getLogger(__name__)
 
@@ -96,7 +97,7 @@ class DashboardService:
     
     def __init__(self):
         # Core service integrations
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
         self.syi_compositor = SYICompositor()
         
@@ -119,6 +120,7 @@ class DashboardService:
         # Data storage
         self.dashboard_dir = Path("/app/data/dashboard")
         self.dashboard_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = StateJournal(self.dashboard_dir, "dashboard")
         
         # Background tasks
         self.is_running = False
@@ -170,6 +172,7 @@ class DashboardService:
         
         # Save dashboard data
         await self._save_dashboard_data()
+        self.journal.close()
         
         logger.info("🛑 Advanced Analytics Dashboard Service stopped")
     
@@ -213,6 +216,7 @@ class DashboardService:
             
             # Cache the result
             self.portfolio_analytics_cache[portfolio_id] = analytics
+            self._journal("portfolio_analytics", portfolio_id, analytics)
             
             # Update metrics
             calculation_time = time.time() - start_time
@@ -376,16 +380,12 @@ class DashboardService:
             if not trading_engine:
                 return None
             
-            # Get trading data from trading engine
-            orders = [o for o in trading_engine.orders.values() if o.client_id == client_id]
-            trades = [t for t in trading_engine.trades.values() if t.client_id == client_id]
-            
-            # Filter by period
+            # Get the client's trading data for the period from the trading engine's indexes
             period_days = {"1d": 1, "7d": 7, "30d": 30}.get(period, 30)
             cutoff_date = datetime.utcnow() - timedelta(days=period_days)
             
-            period_trades = [t for t in trades if t.executed_at > cutoff_date]
-            period_orders = [o for o in orders if o.created_at > cutoff_date]
+            period_trades = trading_engine.get_client_trades(client_id, since=cutoff_date)
+            period_orders = trading_engine.get_client_orders(client_id, since=cutoff_date)
             
             # Calculate trading metrics
             total_trades = len(period_trades)
@@ -425,14 +425,11 @@ class DashboardService:
                 pnl_by_symbol[symbol] = pnl_by_symbol.get(symbol, 0) + pnl_estimate
             
             # Trade frequency (hourly breakdown)
-            trade_frequency = []
-            for hour in range(24):
-                hour_trades = len([t for t in period_trades if t.executed_at.hour == hour])
-                trade_frequency.append({
-                    "hour": hour,
-                    "trade_count": hour_trades,
-                    "volume": sum(float(t.quantity * t.price) for t in period_trades if t.executed_at.hour == hour)
-                })
+            trade_frequency = [{"hour": hour, "trade_count": 0, "volume": 0} for hour in range(24)]
+            for trade in period_trades:
+                bucket = trade_frequency[trade.executed_at.hour]
+                bucket["trade_count"] += 1
+                bucket["volume"] += float(trade.quantity * trade.price)
             
             activity_data = TradingActivityData(
                 client_id=client_id,
@@ -584,6 +581,7 @@ class DashboardService:
             
             # Cache the result
             self.yield_intelligence_cache = yield_intelligence
+            self._journal("yield_intelligence", "latest", yield_intelligence)
             
             # Update metrics
             calculation_time = time.time() - start_time
@@ -626,7 +624,7 @@ class DashboardService:
             
             for client_id in client_ids:
                 # Get client portfolios
-                portfolios = [p for p in trading_engine.portfolios.values() if p.client_id == client_id]
+                portfolios = trading_engine.get_client_portfolios(client_id)
                 
                 if portfolios:
                     # Calculate client metrics
@@ -823,23 +821,23 @@ class DashboardService:
         except Exception as e:
             logger.error(f"❌ Error initializing dashboard data: {e}")
     
+    def _journal(self, kind: str, key: str, value: Any):
+        """Append a changed record to the dashboard journal (no-op until data is loaded)"""
+        if not self.journal.is_open:
+            return
+        try:
+            self.journal.record(kind, key, value)
+            self.journal.commit()
+        except OSError as e:
+            logger.error(f"❌ Error writing dashboard journal: {e}")
+    
     async def _save_dashboard_data(self):
-        """Save dashboard data to persistent storage"""
+        """Compact dashboard data into a snapshot, truncating the journal"""
         try:
-            # Save portfolio analytics
-            portfolio_data = {
-                portfolio_id: asdict(analytics) 
-                for portfolio_id, analytics in self.portfolio_analytics_cache.items()
-            }
-            
-            with open(self.dashboard_dir / "portfolio_analytics.json", 'w') as f:
-                json.dump(portfolio_data, f, indent=2, default=str)
-            
-            # Save yield intelligence
+            state = {"portfolio_analytics": self.portfolio_analytics_cache}
             if self.yield_intelligence_cache:
-                yield_data = asdict(self.yield_intelligence_cache)
-                with open(self.dashboard_dir / "yield_intelligence.json", 'w') as f:
-                    json.dump(yield_data, f, indent=2, default=str)
+                state["yield_intelligence"] = {"latest": self.yield_intelligence_cache}
+            self.journal.snapshot(state)
             
             logger.debug("💾 Dashboard data saved to storage")
             
@@ -847,15 +845,16 @@ class DashboardService:
             logger.error(f"❌ Error saving dashboard data: {e}")
     
     async def _load_dashboard_data(self):
-        """Load dashboard data from persistent storage"""
+        """Load dashboard data from the latest snapshot plus journal"""
         try:
-            # Load portfolio analytics
-            portfolio_file = self.dashboard_dir / "portfolio_analytics.json"
-            if portfolio_file.exists():
-                with open(portfolio_file, 'r') as f:
-                    data = json.load(f)
-                # Note: Would need to reconstruct PortfolioAnalytics objects
-                
+            state = decode_state(self.journal.replay(), {
+                "portfolio_analytics": PortfolioAnalytics,
+                "yield_intelligence": YieldIntelligenceData
+            })
+            self.portfolio_analytics_cache.update(state["portfolio_analytics"])
+            if "latest" in state["yield_intelligence"]:
+                self.yield_intelligence_cache = state["yield_intelligence"]["latest"]
+            
             logger.debug("📂 Dashboard data loaded from storage")
             
         except Exception as e:
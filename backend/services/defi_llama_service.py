@@ -1,10 +1,10 @@
-import aiohttp
 import asyncio
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 from .data_validator import DataValidator
 from .protocol_policy_service import ProtocolPolicyService
+from .http_client_service import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,20 +14,19 @@ class DefiLlamaService:
         self.stablecoins = ["USDT", "USDC", "DAI", "PYUSD", "TUSD"]
         self.validator = DataValidator()
         self.policy_service = ProtocolPolicyService()
+        self.http = get_http_client()
         
     async def get_all_pools(self) -> List[Dict[str, Any]]:
         """Get all yield pools from DefiLlama""" 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/pools") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        pools = data.get('data', [])
-                        logger.info(f"Retrieved {len(pools)} total pools from DefiLlama")
-                        return pools
-                    else:
-                        logger.error(f"DefiLlama API error: {response.status}")
-                        return []
+            response = await self.http.get("defillama", f"{self.base_url}/pools")
+            if response.status == 200:
+                pools = response.data.get('data', [])
+                logger.info(f"Retrieved {len(pools)} total pools from DefiLlama")
+                return pools
+            else:
+                logger.error(f"DefiLlama API error: {response.status}")
+                return []
         except Exception as e:
             logger.error(f"DefiLlama service error: {str(e)}")
             return []
@@ -130,14 +129,12 @@ class DefiLlamaService:
     async def get_pool_history(self, pool_id: str) -> List[Dict[str, Any]]:
         """Get historical data for a specific pool"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/chart/{pool_id}") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('data', [])
-                    else:
-                        logger.error(f"DefiLlama history API error: {response.status}")
-                        return []
+            response = await self.http.get("defillama", f"{self.base_url}/chart/{pool_id}")
+            if response.status == 200:
+                return response.data.get('data', [])
+            else:
+                logger.error(f"DefiLlama history API error: {response.status}")
+                return []
         except Exception as e:
             logger.error(f"DefiLlama history service error: {str(e)}")
             return []
@@ -0,0 +1,255 @@
+"""
+Shared HTTP Client Service
+Pooled, keep-alive aiohttp session for all upstream data sources and webhooks
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+@dataclass
+class HTTPSourceConfig:
+    timeout_seconds: float = 15.0       # Total timeout per attempt
+    max_retries: int = 2                # Retries after the first attempt
+    backoff_seconds: float = 0.5        # Base delay, doubled on each retry
+    max_backoff_seconds: float = 5.0    # Cap on a single retry delay
+    max_concurrency: int = 10           # Concurrent in-flight requests for this source
+
+@dataclass
+class HTTPResponse:
+    status: int
+    data: Any                           # Parsed body for 2xx responses, None otherwise
+    headers: Dict[str, str]
+    url: str
+
+@dataclass
+class LatencyHistogram:
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    errors: int = 0
+    retries: int = 0
+
+    def observe(self, latency_ms: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS_MS + [float('inf')], self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                f"le_{bound}": bucket_count
+                for bound, bucket_count in zip(LATENCY_BUCKETS_MS + ["inf"], self.buckets)
+            }
+        }
+
+class HTTPClientService:
+    """
+    One aiohttp session (and connection pool) shared by every upstream source.
+
+    Connections are kept alive and reused per host, DNS lookups are cached,
+    and each named source gets its own timeout, retry/backoff budget,
+    concurrency limit and latency histogram.
+    """
+
+    def __init__(self):
+        self.config = self._load_default_config()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.started_at: Optional[datetime] = None
+
+    def _load_default_config(self) -> Dict[str, Any]:
+        """Load default connection pool and per-source configuration"""
+        return {
+            "pool": {
+                "max_connections": 100,         # Total open connections
+                "max_connections_per_host": 20, # Per-host pool size
+                "dns_cache_ttl_seconds": 300,   # Cache DNS lookups for 5 minutes
+                "keepalive_timeout_seconds": 30 # Keep idle connections for 30 seconds
+            },
+            "sources": {
+                "default": HTTPSourceConfig(),
+                "defillama": HTTPSourceConfig(timeout_seconds=30.0, max_concurrency=4),
+                "binance": HTTPSourceConfig(timeout_seconds=10.0),
+                "cryptocompare": HTTPSourceConfig(timeout_seconds=10.0),
+                "coingecko": HTTPSourceConfig(timeout_seconds=10.0, max_concurrency=4),
+                "ethereum_rpc": HTTPSourceConfig(timeout_seconds=10.0),
+                "external_api": HTTPSourceConfig(timeout_seconds=15.0),
+                # Webhook callers run their own delivery/retry policy
+                "webhook": HTTPSourceConfig(timeout_seconds=30.0, max_retries=0, max_concurrency=50),
+                "alert_webhook": HTTPSourceConfig(timeout_seconds=10.0, max_retries=0)
+            }
+        }
+
+    async def start(self):
+        """Open the shared session"""
+        await self._get_session()
+        self.started_at = datetime.utcnow()
+        logger.info("✅ Shared HTTP client started")
+
+    async def stop(self):
+        """Close the shared session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        self._semaphores = {}
+        logger.info("✅ Shared HTTP client stopped")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+
+        # Sessions are bound to the loop that created them (scripts may run several loops)
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            pool = self.config["pool"]
+            connector = aiohttp.TCPConnector(
+                limit=pool["max_connections"],
+                limit_per_host=pool["max_connections_per_host"],
+                ttl_dns_cache=pool["dns_cache_ttl_seconds"],
+                keepalive_timeout=pool["keepalive_timeout_seconds"]
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+            self._semaphores = {}
+
+        return self._session
+
+    def get_source_config(self, source: str) -> HTTPSourceConfig:
+        return self.config["sources"].get(source, self.config["sources"]["default"])
+
+    def _get_semaphore(self, source: str) -> asyncio.Semaphore:
+        if source not in self._semaphores:
+            self._semaphores[source] = asyncio.Semaphore(self.get_source_config(source).max_concurrency)
+        return self._semaphores[source]
+
+    async def request(self,
+                      source: str,
+                      method: str,
+                      url: str,
+                      read: Optional[str] = "json",
+                      retry: Optional[bool] = None,
+                      **kwargs) -> HTTPResponse:
+        """
+        Send a request on the shared session.
+
+        `read` selects how a 2xx body is parsed ("json", "text", "bytes" or
+        None). Connection errors, timeouts and retryable statuses are retried
+        with exponential backoff for idempotent methods, or when `retry` is
+        True. The final failure is raised (or returned, for HTTP statuses).
+        """
+        config = self.get_source_config(source)
+        histogram = self.latency.setdefault(source, LatencyHistogram())
+        method = method.upper()
+        retries = config.max_retries if (retry if retry is not None else method in IDEMPOTENT_METHODS) else 0
+        kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=config.timeout_seconds))
+
+        session = await self._get_session()
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self._get_semaphore(source):
+                    async with session.request(method, url, **kwargs) as response:
+                        data = None
+                        if 200 <= response.status < 300 and read is not None:
+                            if read == "json":
+                                data = await response.json()
+                            elif read == "text":
+                                data = await response.text()
+                            else:
+                                data = await response.read()
+                        result = HTTPResponse(
+                            status=response.status,
+                            data=data,
+                            headers=dict(response.headers),
+                            url=str(response.url)
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                histogram.observe((time.perf_counter() - started) * 1000)
+                histogram.errors += 1
+                if attempt >= retries:
+                    raise
+                logger.debug(f"{source} request to {urlsplit(url).netloc} failed ({e!r}), retrying")
+            else:
+                histogram.observe((time.perf_counter() - started) * 1000)
+                if result.status not in RETRYABLE_STATUSES or attempt >= retries:
+                    if result.status >= 400:
+                        histogram.errors += 1
+                    return result
+                logger.debug(f"{source} request to {urlsplit(url).netloc} returned {result.status}, retrying")
+
+            delay = min(config.backoff_seconds * (2 ** attempt), config.max_backoff_seconds)
+            attempt += 1
+            histogram.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, source: str, url: str, **kwargs) -> HTTPResponse:
+        return await self.request(source, "GET", url, **kwargs)
+
+    async def post(self, source: str, url: str, **kwargs) -> HTTPResponse:
+        return await self.request(source, "POST", url, **kwargs)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-source latency histograms and pool status"""
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        return {
+            "session_open": connector is not None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "pool": self.config["pool"],
+            "sources": {source: histogram.to_dict() for source, histogram in self.latency.items()}
+        }
+
+# Global HTTP client instance
+_http_client_service = None
+
+async def start_http_client():
+    """Start the global HTTP client"""
+    await get_http_client().start()
+
+async def stop_http_client():
+    """Stop the global HTTP client"""
+    if _http_client_service is not None:
+        await _http_client_service.stop()
+
+def get_http_client() -> HTTPClientService:
+    """Get the global HTTP client, creating it on first use"""
+    global _http_client_service
+    if _http_client_service is None:
+        _http_client_service = HTTPClientService()
+    return _http_client_service
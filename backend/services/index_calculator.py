@@ -10,7 +10,7 @@ from services.defi_llama_service import DefiLlamaService
 from services.binance_service import BinanceService
 from services.ray_calculator import RAYCalculator
 from services.syi_compositor import SYICompositor
-from services.yield_aggregator import YieldAggregator
+from services.yield_aggregator import get_yield_aggregator
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +31,7 @@ class StableYieldIndexCalculator:
         self.binance = BinanceService()
         self.ray_calculator = RAYCalculator()
         self.syi_compositor = SYICompositor()
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         
         # Caching
         self.cache = {}
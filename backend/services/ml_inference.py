@@ -0,0 +1,97 @@
+"""
+Batched ML Inference
+One scale-and-predict pass over a stacked feature matrix, with per-row outputs
+memoized on the feature bytes and per-call latency statistics
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class InferenceStats:
+    calls: int = 0
+    rows: int = 0
+    cache_hits: int = 0
+    total_ms: float = 0.0
+    last_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, rows: int, cache_hits: int, elapsed_ms: float):
+        self.calls += 1
+        self.rows += rows
+        self.cache_hits += cache_hits
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "cache_hit_rate": round(self.cache_hits / self.rows, 4) if self.rows else None,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "last_ms": round(self.last_ms, 3),
+            "max_ms": round(self.max_ms, 3)
+        }
+
+class MemoizedInference:
+    """
+    Scaled model output for many feature rows at once.
+
+    `run()` stacks the rows into one matrix and looks each row up by its raw
+    bytes; only the misses are scaled and passed to `output` in a single
+    call. The cache belongs to one (model, scaler) pair and is dropped as
+    soon as either object is replaced, e.g. after retraining; it holds at
+    most `max_entries` rows, evicting the least recently used.
+    """
+
+    def __init__(self, output: Callable[[Any, np.ndarray], np.ndarray], max_entries: int = 10000):
+        self.output = output
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._model = None
+        self._scaler = None
+        self.stats = InferenceStats()
+
+    def run(self, model, scaler, rows: List[np.ndarray]) -> np.ndarray:
+        """Model output for each row of `rows` (arrays of shape (n_features,) or (1, n_features))"""
+        started = time.perf_counter()
+        if model is not self._model or scaler is not self._scaler:
+            self._cache.clear()
+            self._model, self._scaler = model, scaler
+
+        X = np.ascontiguousarray(np.vstack(rows), dtype=np.float64)
+        keys = [row.tobytes() for row in X]
+        results = np.empty(len(keys))
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                results[i] = cached
+                self._cache.move_to_end(key)
+
+        if missing:
+            X_missing = X[missing]
+            if scaler is not None:
+                X_missing = scaler.transform(X_missing)
+            computed = np.asarray(self.output(model, X_missing), dtype=np.float64)
+            results[missing] = computed
+            for i, value in zip(missing, computed.tolist()):
+                self._cache[keys[i]] = value
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        self.stats.observe(len(keys), len(keys) - len(missing), (time.perf_counter() - started) * 1000)
+        return results
+
+    def clear(self):
+        self._cache.clear()
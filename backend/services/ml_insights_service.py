@@ -5,26 +5,28 @@ Advanced ML models for yield prediction, anomaly detection, and market intellige
 
 import asyncio
 import logging
+import time
 import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import json
-from pathlib import Path
 from sklearn.ensemble import IsolationForest, RandomForestRegressor
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error
-import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
 from .syi_compositor import SYICompositor
 from .batch_analytics_service import get_batch_analytics_service
+from .ml_inference import MemoizedInference
+from .feature_pipeline import FeaturePipeline, fill_within_symbol
+from .model_registry import ModelVersion, get_model_registry, get_model_trainer
 
 logger = logging.getLogger(__name__)
 
@@ -75,11 +77,119 @@ class PortfolioOptimization:
     current_vs_optimal: Dict[str, Any]
     timestamp: datetime
 
+# Model fits run in the training process (see ModelTrainer); each returns the
+# artifact to publish, or None when there is too little clean data
+
+YIELD_FEATURES = ['hour', 'day_of_week', 'month', 'ma_7', 'ma_30',
+                  'volatility_7', 'volatility_30', 'trend_7', 'trend_30',
+                  'ray', 'risk_penalty', 'confidence_score',
+                  'peg_stability_score', 'liquidity_score']
+ANOMALY_FEATURES = ['apy', 'ray', 'risk_penalty', 'volatility_7', 'volatility_30',
+                    'peg_stability_score', 'liquidity_score']
+RISK_FEATURES = ['apy', 'ma_7', 'ma_30', 'volatility_7', 'volatility_30',
+                 'peg_stability_score', 'liquidity_score']
+SEGMENTATION_FEATURES = ['apy', 'ray', 'risk_penalty', 'peg_stability_score', 'liquidity_score']
+
+def _fit_regressor(data: pd.DataFrame, feature_cols: List[str], target: str, max_depth: int) -> Optional[Dict[str, Any]]:
+    clean_data = data.dropna(subset=feature_cols + [target])
+    if len(clean_data) < 50:
+        return None
+    
+    X = clean_data[feature_cols].values
+    y = clean_data[target].values
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    
+    model = RandomForestRegressor(n_estimators=100, max_depth=max_depth, random_state=42, n_jobs=-1)
+    model.fit(X_train_scaled, y_train)
+    
+    y_pred = model.predict(X_test_scaled)
+    metrics = {'mse': float(mean_squared_error(y_test, y_pred)), 'mae': float(mean_absolute_error(y_test, y_pred))}
+    return {
+        "artifact": {'model': model, 'scaler': scaler, 'feature_cols': feature_cols, 'metrics': metrics},
+        "samples": len(clean_data),
+        "metrics": metrics
+    }
+
+def fit_yield_predictor(data: pd.DataFrame, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Train yield prediction model"""
+    return _fit_regressor(data, YIELD_FEATURES, 'apy', max_depth=10)
+
+def fit_risk_predictor(data: pd.DataFrame, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Train risk prediction model"""
+    return _fit_regressor(data, RISK_FEATURES, 'risk_penalty', max_depth=8)
+
+def fit_anomaly_detector(data: pd.DataFrame, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Train anomaly detection model"""
+    clean_data = data.dropna(subset=ANOMALY_FEATURES)
+    if len(clean_data) < 50:
+        return None
+    
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(clean_data[ANOMALY_FEATURES].values)
+    
+    model = IsolationForest(contamination=config["anomaly_sensitivity"], random_state=42, n_jobs=-1)
+    model.fit(X_scaled)
+    
+    anomaly_labels = model.predict(X_scaled)
+    metrics = {'anomaly_rate': float(np.mean(anomaly_labels == -1))}
+    return {
+        "artifact": {'model': model, 'scaler': scaler, 'feature_cols': ANOMALY_FEATURES},
+        "samples": len(clean_data),
+        "metrics": metrics
+    }
+
+def fit_market_segmentation(data: pd.DataFrame, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Train market segmentation model"""
+    clean_data = data.dropna(subset=SEGMENTATION_FEATURES)
+    if len(clean_data) < 50:
+        return None
+    
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(clean_data[SEGMENTATION_FEATURES].values)
+    
+    model = KMeans(
+        n_clusters=4,  # Conservative, Growth, Aggressive, Speculative
+        random_state=42,
+        n_init=10
+    )
+    cluster_labels = model.fit_predict(X_scaled)
+    
+    # Analyze clusters
+    cluster_analysis = {}
+    for i in range(4):
+        cluster_data = clean_data[cluster_labels == i]
+        cluster_analysis[i] = {
+            'count': len(cluster_data),
+            'avg_apy': cluster_data['apy'].mean(),
+            'avg_ray': cluster_data['ray'].mean(),
+            'avg_risk': cluster_data['risk_penalty'].mean(),
+            'avg_peg_stability': cluster_data['peg_stability_score'].mean(),
+            'avg_liquidity': cluster_data['liquidity_score'].mean()
+        }
+    
+    return {
+        "artifact": {'model': model, 'scaler': scaler, 'feature_cols': SEGMENTATION_FEATURES,
+                     'cluster_analysis': cluster_analysis},
+        "samples": len(clean_data),
+        "metrics": {'clusters': 4, 'inertia': float(model.inertia_)}
+    }
+
+MODEL_FITS = {
+    "yield_predictor": fit_yield_predictor,
+    "anomaly_detector": fit_anomaly_detector,
+    "risk_predictor": fit_risk_predictor,
+    "market_segmentation": fit_market_segmentation
+}
+
 class MLInsightsService:
     """Machine Learning service for advanced yield analytics and predictions"""
     
     def __init__(self):
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
         self.syi_compositor = SYICompositor()
         
@@ -89,13 +199,27 @@ class MLInsightsService:
         self.risk_predictor = None
         self.market_segmentation = None
         
-        # Data preprocessing
-        self.feature_scaler = StandardScaler()
+        # Data preprocessing (one scaler per model, fitted on that model's feature columns)
+        self.scalers: Dict[str, Optional[StandardScaler]] = {}
         self.target_scaler = MinMaxScaler()
         
-        # Model storage paths
-        self.models_dir = Path("/app/data/ml_models")
-        self.models_dir.mkdir(parents=True, exist_ok=True)
+        # Batched inference, memoized per feature row
+        self.yield_inference = MemoizedInference(lambda model, X: model.predict(X))
+        self.anomaly_inference = MemoizedInference(lambda model, X: model.decision_function(X))
+        
+        # Per-symbol rolling features, extended incrementally as history grows
+        self.feature_pipeline = FeaturePipeline()
+        
+        # Versioned model artifacts, fitted in a separate training process
+        self.registry = get_model_registry()
+        self.models_dir = self.registry.root
+        self.trainer = get_model_trainer()
+        self.model_versions: Dict[str, ModelVersion] = {}
+        self.training_task: Optional[asyncio.Task] = None
+        self._training_lock = asyncio.Lock()
+        self._training_backoff: Dict[str, Tuple[float, float]] = {}  # name -> (retry at, delay)
+        self.training_status = {"last_started": None, "last_completed": None,
+                                "last_duration_seconds": None, "last_error": None}
         
         # Insights storage
         self.insights_cache = []
@@ -107,7 +231,9 @@ class MLInsightsService:
             "prediction_horizons": [1, 7, 30],  # days
             "anomaly_sensitivity": 0.15,  # contamination rate
             "min_training_samples": 100,
-            "model_retrain_frequency": "weekly",
+            "model_retrain_interval_seconds": 7 * 24 * 3600,  # weekly; older models are stale
+            "model_refresh_seconds": 60,
+            "training_backoff_seconds": 300,  # First retry delay after a skipped or failed fit
             "feature_importance_threshold": 0.01,
             "confidence_threshold": 0.70,
             "max_cache_size": 10000,
@@ -117,34 +243,24 @@ class MLInsightsService:
         self.is_initialized = False
     
     async def initialize(self):
-        """Initialize ML models and load historical data"""
+        """Serve default or published models and start background training"""
         if self.is_initialized:
             return
         
         logger.info("🤖 Initializing ML Insights Service...")
         
         try:
-            # Load historical data
-            historical_data = await self._load_historical_data()
-            
-            if len(historical_data) >= self.config["min_training_samples"]:
-                # Train ML models
-                await self._train_yield_predictor(historical_data)
-                await self._train_anomaly_detector(historical_data)
-                await self._train_risk_predictor(historical_data)
-                await self._train_market_segmentation(historical_data)
-                
-                logger.info(f"✅ ML models trained with {len(historical_data)} samples")
-            else:
-                logger.warning(f"⚠️ Insufficient data for training ({len(historical_data)} < {self.config['min_training_samples']})")
-                await self._initialize_default_models()
-            
-            self.is_initialized = True
+            # Serve placeholder models, then the latest published versions if there are any
+            await self._initialize_default_models()
+            self.refresh_models()
             logger.info("✅ ML Insights Service initialized")
             
         except Exception as e:
             logger.error(f"❌ Failed to initialize ML Insights Service: {e}")
             await self._initialize_default_models()
+        
+        # Fit on the latest history off the event loop; models are swapped in when published
+        self.training_task = asyncio.create_task(self._training_loop())
     
     async def _load_historical_data(self) -> pd.DataFrame:
         """Load historical data for ML training"""
@@ -152,14 +268,20 @@ class MLInsightsService:
         batch_service = get_batch_analytics_service()
         
         if batch_service and batch_service.historical_data:
-            df = pd.DataFrame(batch_service.historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.sort_values('timestamp')
-            
-            # Create features
-            df = self._create_features(df)
+            records = batch_service.historical_data
+            pipeline = self.feature_pipeline
             
-            return df
+            if pipeline.latest_timestamp is None:
+                pipeline.build(pd.DataFrame(records))
+            else:
+                # Records are appended in time order: only compute features for the new tail
+                start = len(records)
+                while start > 0 and pd.Timestamp(records[start - 1]['timestamp']) > pipeline.latest_timestamp:
+                    start -= 1
+                pipeline.append(pd.DataFrame(records[start:]))
+                pipeline.trim(pd.Timestamp(records[0]['timestamp']))
+            
+            return fill_within_symbol(pipeline.frame.copy())
         else:
             # Fallback: create synthetic data for testing
             logger.warning("⚠️ No historical data available, generating synthetic data for testing")
@@ -167,39 +289,7 @@ class MLInsightsService:
     
     def _create_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create features for ML models"""
-        # Time-based features
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.dayofweek
-        df['month'] = df['timestamp'].dt.month
-        
-        # Technical indicators
-        for symbol in df['symbol'].unique():
-            symbol_data = df[df['symbol'] == symbol].copy()
-            
-            # Moving averages
-            symbol_data['ma_7'] = symbol_data['apy'].rolling(7).mean()
-            symbol_data['ma_30'] = symbol_data['apy'].rolling(30).mean()
-            
-            # Volatility
-            symbol_data['volatility_7'] = symbol_data['apy'].rolling(7).std()
-            symbol_data['volatility_30'] = symbol_data['apy'].rolling(30).std()
-            
-            # Trend indicators
-            symbol_data['trend_7'] = symbol_data['apy'] - symbol_data['ma_7']
-            symbol_data['trend_30'] = symbol_data['apy'] - symbol_data['ma_30']
-            
-            # Risk-adjusted metrics
-            symbol_data['ray_trend'] = symbol_data['ray'].diff()
-            symbol_data['risk_penalty_trend'] = symbol_data['risk_penalty'].diff()
-            
-            df.loc[df['symbol'] == symbol, ['ma_7', 'ma_30', 'volatility_7', 'volatility_30', 
-                                          'trend_7', 'trend_30', 'ray_trend', 'risk_penalty_trend']] = symbol_data[
-                ['ma_7', 'ma_30', 'volatility_7', 'volatility_30', 'trend_7', 'trend_30', 'ray_trend', 'risk_penalty_trend']].values
-        
-        # Fill NaN values
-        df = df.fillna(method='bfill').fillna(method='ffill')
-        
-        return df
+        return fill_within_symbol(FeaturePipeline().build(df))
     
     def _generate_synthetic_data(self) -> pd.DataFrame:
         """Generate synthetic historical data for testing"""
@@ -242,210 +332,134 @@ class MLInsightsService:
         df = pd.DataFrame(data)
         return self._create_features(df)
     
-    async def _train_yield_predictor(self, data: pd.DataFrame):
-        """Train yield prediction model"""
-        try:
-            # Prepare features and targets
-            feature_cols = ['hour', 'day_of_week', 'month', 'ma_7', 'ma_30', 
-                           'volatility_7', 'volatility_30', 'trend_7', 'trend_30',
-                           'ray', 'risk_penalty', 'confidence_score', 
-                           'peg_stability_score', 'liquidity_score']
-            
-            # Filter out rows with NaN values
-            clean_data = data.dropna(subset=feature_cols + ['apy'])
-            
-            if len(clean_data) < 50:
-                logger.warning("⚠️ Insufficient clean data for yield predictor training")
-                return
-            
-            X = clean_data[feature_cols].values
-            y = clean_data['apy'].values
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            
-            # Scale features
-            X_train_scaled = self.feature_scaler.fit_transform(X_train)
-            X_test_scaled = self.feature_scaler.transform(X_test)
-            
-            # Train model
-            self.yield_predictor = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.yield_predictor.fit(X_train_scaled, y_train)
-            
-            # Evaluate model
-            y_pred = self.yield_predictor.predict(X_test_scaled)
-            mse = mean_squared_error(y_test, y_pred)
-            mae = mean_absolute_error(y_test, y_pred)
-            
-            # Save model
-            model_path = self.models_dir / "yield_predictor.pkl"
-            joblib.dump({
-                'model': self.yield_predictor,
-                'scaler': self.feature_scaler,
-                'feature_cols': feature_cols,
-                'metrics': {'mse': mse, 'mae': mae}
-            }, model_path)
-            
-            logger.info(f"✅ Yield predictor trained - MSE: {mse:.4f}, MAE: {mae:.4f}")
+    async def retrain_models(self, names: Optional[List[str]] = None) -> Dict[str, ModelVersion]:
+        """Fit `names` (default: every model) on the latest history in the training process, then hot-swap"""
+        names = list(names or MODEL_FITS)
+        async with self._training_lock:
+            started = time.perf_counter()
+            self.training_status["last_started"] = datetime.utcnow().isoformat()
+            published = {}
+            
+            try:
+                historical_data = await self._load_historical_data()
+                
+                if len(historical_data) < self.config["min_training_samples"]:
+                    logger.warning(f"⚠️ Insufficient data for training ({len(historical_data)} < {self.config['min_training_samples']})")
+                    for name in names:
+                        self._back_off(name)
+                    return published
+                
+                results = await asyncio.gather(*(
+                    self.trainer.train(self.registry, name, MODEL_FITS[name], historical_data, self.config)
+                    for name in names
+                ), return_exceptions=True)
+                
+                for name, result in zip(names, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"❌ Failed to train {name}: {result}")
+                        self._back_off(name)
+                    elif result is None:
+                        logger.warning(f"⚠️ Insufficient clean data for {name} training")
+                        self._back_off(name)
+                    else:
+                        published[name] = result
+                        self._training_backoff.pop(name, None)
+                        logger.info(f"✅ {name} v{result.version} trained in {result.training_duration_seconds:.2f}s - {result.metrics}")
+                
+                self.refresh_models()
+                self.training_status["last_error"] = None
+                
+            except Exception as e:
+                logger.error(f"❌ Model training failed: {e}")
+                self.training_status["last_error"] = str(e)
             
-        except Exception as e:
-            logger.error(f"❌ Failed to train yield predictor: {e}")
+            self.training_status["last_completed"] = datetime.utcnow().isoformat()
+            self.training_status["last_duration_seconds"] = round(time.perf_counter() - started, 3)
+            return published
     
-    async def _train_anomaly_detector(self, data: pd.DataFrame):
-        """Train anomaly detection model"""
-        try:
-            # Prepare features for anomaly detection
-            feature_cols = ['apy', 'ray', 'risk_penalty', 'volatility_7', 'volatility_30',
-                           'peg_stability_score', 'liquidity_score']
-            
-            clean_data = data.dropna(subset=feature_cols)
-            
-            if len(clean_data) < 50:
-                logger.warning("⚠️ Insufficient data for anomaly detector training")
-                return
-            
-            X = clean_data[feature_cols].values
-            
-            # Scale features
-            X_scaled = self.feature_scaler.fit_transform(X)
-            
-            # Train anomaly detector
-            self.anomaly_detector = IsolationForest(
-                contamination=self.config["anomaly_sensitivity"],
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.anomaly_detector.fit(X_scaled)
-            
-            # Evaluate on training data
-            anomaly_scores = self.anomaly_detector.decision_function(X_scaled)
-            anomaly_labels = self.anomaly_detector.predict(X_scaled)
-            
-            # Save model
-            model_path = self.models_dir / "anomaly_detector.pkl"
-            joblib.dump({
-                'model': self.anomaly_detector,
-                'scaler': self.feature_scaler,
-                'feature_cols': feature_cols
-            }, model_path)
-            
-            anomaly_rate = len(anomaly_labels[anomaly_labels == -1]) / len(anomaly_labels)
-            logger.info(f"✅ Anomaly detector trained - Anomaly rate: {anomaly_rate:.2%}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to train anomaly detector: {e}")
+    def refresh_models(self) -> List[str]:
+        """Swap in any model whose published version is newer than the one being served"""
+        swapped = []
+        for name in MODEL_FITS:
+            current = self.registry.current(name)
+            loaded = self.model_versions.get(name)
+            if current is None or (loaded is not None and loaded.version == current.version):
+                continue
+            try:
+                version, artifact = self.registry.load(name)
+            except Exception as e:
+                logger.error(f"❌ Failed to load {name}: {e}")
+                continue
+            # Model and scaler change together, between two awaits
+            setattr(self, name, artifact['model'])
+            self.scalers[name] = artifact['scaler']
+            self.model_versions[name] = version
+            swapped.append(name)
+        
+        if swapped:
+            logger.info(f"🔄 Serving new model versions: {', '.join(f'{n} v{self.model_versions[n].version}' for n in swapped)}")
+        return swapped
     
-    async def _train_risk_predictor(self, data: pd.DataFrame):
-        """Train risk prediction model"""
-        try:
-            # Prepare features and targets for risk prediction
-            feature_cols = ['apy', 'ma_7', 'ma_30', 'volatility_7', 'volatility_30',
-                           'peg_stability_score', 'liquidity_score']
-            
-            clean_data = data.dropna(subset=feature_cols + ['risk_penalty'])
-            
-            if len(clean_data) < 50:
-                logger.warning("⚠️ Insufficient data for risk predictor training")
-                return
-            
-            X = clean_data[feature_cols].values
-            y = clean_data['risk_penalty'].values
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            
-            # Scale features
-            X_train_scaled = self.feature_scaler.fit_transform(X_train)
-            X_test_scaled = self.feature_scaler.transform(X_test)
-            
-            # Train model
-            self.risk_predictor = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=8,
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.risk_predictor.fit(X_train_scaled, y_train)
-            
-            # Evaluate model
-            y_pred = self.risk_predictor.predict(X_test_scaled)
-            mse = mean_squared_error(y_test, y_pred)
-            mae = mean_absolute_error(y_test, y_pred)
-            
-            # Save model
-            model_path = self.models_dir / "risk_predictor.pkl"
-            joblib.dump({
-                'model': self.risk_predictor,
-                'scaler': self.feature_scaler,
-                'feature_cols': feature_cols,
-                'metrics': {'mse': mse, 'mae': mae}
-            }, model_path)
-            
-            logger.info(f"✅ Risk predictor trained - MSE: {mse:.4f}, MAE: {mae:.4f}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to train risk predictor: {e}")
+    def _back_off(self, name: str):
+        """Delay the next attempt at `name`, doubling per failure up to the retrain interval"""
+        _, delay = self._training_backoff.get(name, (0.0, 0.0))
+        delay = min(max(delay * 2, self.config["training_backoff_seconds"]), self.config["model_retrain_interval_seconds"])
+        self._training_backoff[name] = (time.monotonic() + delay, delay)
     
-    async def _train_market_segmentation(self, data: pd.DataFrame):
-        """Train market segmentation model"""
-        try:
-            # Prepare features for clustering
-            feature_cols = ['apy', 'ray', 'risk_penalty', 'peg_stability_score', 'liquidity_score']
-            
-            clean_data = data.dropna(subset=feature_cols)
-            
-            if len(clean_data) < 50:
-                logger.warning("⚠️ Insufficient data for market segmentation training")
-                return
-            
-            X = clean_data[feature_cols].values
-            
-            # Scale features
-            X_scaled = self.feature_scaler.fit_transform(X)
-            
-            # Train clustering model
-            self.market_segmentation = KMeans(
-                n_clusters=4,  # Conservative, Growth, Aggressive, Speculative
-                random_state=42,
-                n_init=10
-            )
-            
-            cluster_labels = self.market_segmentation.fit_predict(X_scaled)
-            
-            # Analyze clusters
-            cluster_analysis = {}
-            for i in range(4):
-                cluster_data = clean_data[cluster_labels == i]
-                cluster_analysis[i] = {
-                    'count': len(cluster_data),
-                    'avg_apy': cluster_data['apy'].mean(),
-                    'avg_ray': cluster_data['ray'].mean(),
-                    'avg_risk': cluster_data['risk_penalty'].mean(),
-                    'avg_peg_stability': cluster_data['peg_stability_score'].mean(),
-                    'avg_liquidity': cluster_data['liquidity_score'].mean()
-                }
-            
-            # Save model
-            model_path = self.models_dir / "market_segmentation.pkl"
-            joblib.dump({
-                'model': self.market_segmentation,
-                'scaler': self.feature_scaler,
-                'feature_cols': feature_cols,
-                'cluster_analysis': cluster_analysis
-            }, model_path)
-            
-            logger.info(f"✅ Market segmentation trained - 4 clusters identified")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to train market segmentation: {e}")
+    def _models_due(self) -> List[str]:
+        """Models with no published version, or a stale one, that are not backing off"""
+        now = time.monotonic()
+        max_age = self.config["model_retrain_interval_seconds"]
+        due = []
+        for name in MODEL_FITS:
+            retry_at, _ = self._training_backoff.get(name, (0.0, 0.0))
+            if now < retry_at:
+                continue
+            version = self.registry.current(name)
+            if version is None or version.age_seconds() > max_age:
+                due.append(name)
+        return due
+    
+    async def _training_loop(self):
+        """
+        Retrain missing or stale models; otherwise pick up versions published elsewhere.
+        
+        Only the process holding the registry's training lease trains, so
+        several serving workers never fit the same models at once.
+        """
+        while True:
+            try:
+                due = self._models_due()
+                if due and self.registry.acquire_training_lease("ml_insights"):
+                    await self.retrain_models(due)
+                else:
+                    self.refresh_models()
+            except Exception as e:
+                logger.error(f"❌ ML training loop error: {e}")
+            await asyncio.sleep(self.config["model_refresh_seconds"])
+    
+    async def stop(self):
+        if self.training_task is not None:
+            self.training_task.cancel()
+            await asyncio.gather(self.training_task, return_exceptions=True)
+            self.training_task = None
+        self.registry.release_training_lease("ml_insights")
+    
+    def _model_status(self, name: str) -> Dict[str, Any]:
+        version = self.model_versions.get(name)
+        if version is None:
+            return {"version": None, "source": "default", "stale": True}
+        age = version.age_seconds()
+        return {
+            "version": version.version,
+            "source": "registry",
+            "trained_at": version.trained_at,
+            "training_duration_seconds": version.training_duration_seconds,
+            "samples": version.samples,
+            "metrics": version.metrics,
+            "age_seconds": round(age, 1),
+            "stale": age > self.config["model_retrain_interval_seconds"]
+        }
     
     async def _initialize_default_models(self):
         """Initialize default models when insufficient data"""
@@ -457,14 +471,16 @@ class MLInsightsService:
         self.risk_predictor = RandomForestRegressor(n_estimators=10, random_state=42)
         self.market_segmentation = KMeans(n_clusters=3, random_state=42)
         
-        # Create dummy training data
-        X_dummy = np.random.random((50, 10))
+        # Create dummy training data, as wide as each model's serving features
+        X_dummy = np.random.random((50, 14))
         y_dummy = np.random.random(50)
         
         self.yield_predictor.fit(X_dummy, y_dummy)
-        self.anomaly_detector.fit(X_dummy)
-        self.risk_predictor.fit(X_dummy, y_dummy)
+        self.anomaly_detector.fit(X_dummy[:, :7])
+        self.risk_predictor.fit(X_dummy[:, :7], y_dummy)
         self.market_segmentation.fit(X_dummy[:, :5])
+        self.scalers = {}
+        self.model_versions = {}
         
         self.is_initialized = True
         logger.info("✅ Default ML models initialized")
@@ -477,48 +493,71 @@ class MLInsightsService:
         predictions = []
         
         try:
+            rows, items = [], []
             for data in current_data:
                 # Extract features
                 features = self._extract_prediction_features(data)
                 
                 if features is None:
                     continue
+                rows.append(features)
+                items.append(data)
+            
+            if rows:
+                # One scale + predict pass for every symbol; horizons are derived from it
+                base = self._predict_base_yields(rows)
+                horizons = {
+                    horizon: self._predict_yield_horizon(base, horizon) if base is not None else (np.zeros(len(rows)), 0.0)
+                    for horizon in (1, 7, 30)
+                }
+                timestamp = datetime.utcnow()
                 
-                # Make predictions for different horizons
-                pred_1d, conf_1d = self._predict_yield_horizon(features, 1)
-                pred_7d, conf_7d = self._predict_yield_horizon(features, 7)
-                pred_30d, conf_30d = self._predict_yield_horizon(features, 30)
-                
-                # Determine trend direction
-                current_yield = float(data.get('currentYield', 0))
-                trend = self._determine_trend_direction(current_yield, pred_7d)
-                
-                prediction = YieldPrediction(
-                    symbol=data.get('stablecoin', 'Unknown'),
-                    current_yield=current_yield,
-                    predicted_yield_1d=pred_1d,
-                    predicted_yield_7d=pred_7d,
-                    predicted_yield_30d=pred_30d,
-                    confidence_1d=conf_1d,
-                    confidence_7d=conf_7d,
-                    confidence_30d=conf_30d,
-                    trend_direction=trend,
-                    prediction_timestamp=datetime.utcnow()
-                )
-                
-                predictions.append(prediction)
+                for i, data in enumerate(items):
+                    pred_1d, conf_1d = float(horizons[1][0][i]), horizons[1][1]
+                    pred_7d, conf_7d = float(horizons[7][0][i]), horizons[7][1]
+                    pred_30d, conf_30d = float(horizons[30][0][i]), horizons[30][1]
+                    
+                    # Determine trend direction
+                    current_yield = float(data.get('currentYield', 0))
+                    trend = self._determine_trend_direction(current_yield, pred_7d)
+                    
+                    prediction = YieldPrediction(
+                        symbol=data.get('stablecoin', 'Unknown'),
+                        current_yield=current_yield,
+                        predicted_yield_1d=pred_1d,
+                        predicted_yield_7d=pred_7d,
+                        predicted_yield_30d=pred_30d,
+                        confidence_1d=conf_1d,
+                        confidence_7d=conf_7d,
+                        confidence_30d=conf_30d,
+                        trend_direction=trend,
+                        prediction_timestamp=timestamp
+                    )
+                    
+                    predictions.append(prediction)
             
             # Cache predictions
             for pred in predictions:
                 self.predictions_cache[pred.symbol] = pred
             
-            logger.info(f"🔮 Generated predictions for {len(predictions)} symbols")
+            logger.info(f"🔮 Generated predictions for {len(predictions)} symbols "
+                        f"({self.yield_inference.stats.last_ms:.1f} ms inference)")
             
         except Exception as e:
             logger.error(f"❌ Error generating yield predictions: {e}")
         
         return predictions
     
+    def _predict_base_yields(self, rows: List[np.ndarray]) -> Optional[np.ndarray]:
+        """Model yield for each feature row, or None without a model"""
+        if self.yield_predictor is None:
+            return None
+        try:
+            return self.yield_inference.run(self.yield_predictor, self.scalers.get("yield_predictor"), rows)
+        except Exception as e:
+            logger.error(f"❌ Error predicting yields: {e}")
+            return None
+    
     def _extract_prediction_features(self, data: Dict[str, Any]) -> Optional[np.ndarray]:
         """Extract features for prediction from current data"""
         try:
@@ -561,32 +600,18 @@ class MLInsightsService:
             logger.error(f"❌ Error extracting prediction features: {e}")
             return None
     
-    def _predict_yield_horizon(self, features: np.ndarray, horizon_days: int) -> Tuple[float, float]:
-        """Predict yield for specific horizon"""
-        try:
-            if self.yield_predictor is None:
-                return 0.0, 0.0
-            
-            # Scale features
-            features_scaled = self.feature_scaler.transform(features)
-            
-            # Make prediction
-            prediction = self.yield_predictor.predict(features_scaled)[0]
-            
-            # Adjust prediction based on horizon (longer horizons = more uncertainty)
-            horizon_factor = 1.0 + (horizon_days - 1) * 0.01  # Small adjustment per day
-            adjusted_prediction = prediction * horizon_factor
-            
-            # Calculate confidence (decreases with horizon)
-            base_confidence = 0.85
-            confidence = base_confidence * (1.0 - horizon_days * 0.01)
-            confidence = max(0.3, min(0.95, confidence))
-            
-            return max(0.1, adjusted_prediction), confidence
-            
-        except Exception as e:
-            logger.error(f"❌ Error predicting yield for horizon {horizon_days}: {e}")
-            return 0.0, 0.0
+    def _predict_yield_horizon(self, base: np.ndarray, horizon_days: int) -> Tuple[np.ndarray, float]:
+        """Predicted yields and confidence for a horizon, from the base model predictions"""
+        # Adjust prediction based on horizon (longer horizons = more uncertainty)
+        horizon_factor = 1.0 + (horizon_days - 1) * 0.01  # Small adjustment per day
+        adjusted = np.maximum(0.1, base * horizon_factor)
+        
+        # Calculate confidence (decreases with horizon)
+        base_confidence = 0.85
+        confidence = base_confidence * (1.0 - horizon_days * 0.01)
+        confidence = max(0.3, min(0.95, confidence))
+        
+        return adjusted, confidence
     
     def _determine_trend_direction(self, current: float, predicted: float) -> str:
         """Determine trend direction"""
@@ -605,16 +630,21 @@ class MLInsightsService:
         anomalies = []
         
         try:
+            rows, items = [], []
             for data in current_data:
                 # Extract features for anomaly detection
                 features = self._extract_anomaly_features(data)
                 
                 if features is None:
                     continue
-                
-                # Detect anomalies
-                alerts = self._detect_data_anomalies(data, features)
-                anomalies.extend(alerts)
+                rows.append(features)
+                items.append(data)
+            
+            if rows and self.anomaly_detector is not None:
+                # One scale + score pass; IsolationForest flags rows scoring below 0
+                scores = self.anomaly_inference.run(self.anomaly_detector, self.scalers.get("anomaly_detector"), rows)
+                for data, anomaly_score in zip(items, scores.tolist()):
+                    anomalies.extend(self._detect_data_anomalies(data, anomaly_score))
             
             # Cache anomalies
             self.anomalies_cache.extend(anomalies)
@@ -658,20 +688,12 @@ class MLInsightsService:
             logger.error(f"❌ Error extracting anomaly features: {e}")
             return None
     
-    def _detect_data_anomalies(self, data: Dict[str, Any], features: np.ndarray) -> List[AnomalyAlert]:
-        """Detect specific types of anomalies"""
+    def _detect_data_anomalies(self, data: Dict[str, Any], anomaly_score: float) -> List[AnomalyAlert]:
+        """Detect specific types of anomalies from an IsolationForest decision score"""
         alerts = []
         
         try:
-            if self.anomaly_detector is None:
-                return alerts
-            
-            # Scale features
-            features_scaled = self.feature_scaler.transform(features)
-            
-            # Get anomaly score
-            anomaly_score = self.anomaly_detector.decision_function(features_scaled)[0]
-            is_anomaly = self.anomaly_detector.predict(features_scaled)[0] == -1
+            is_anomaly = anomaly_score < 0
             
             if is_anomaly:
                 symbol = data.get('stablecoin', 'Unknown')
@@ -930,6 +952,24 @@ class MLInsightsService:
                 "insights_cached": len(self.insights_cache),
                 "anomalies_cached": len(self.anomalies_cache)
             },
+            "inference": {
+                "yield_predictor": self.yield_inference.stats.to_dict(),
+                "anomaly_detector": self.anomaly_inference.stats.to_dict()
+            },
+            "models": {name: self._model_status(name) for name in MODEL_FITS},
+            "training": {
+                **self.training_status,
+                "in_progress": self._training_lock.locked(),
+                "owns_training": self.registry.owns_training,
+                "backing_off": {name: round(retry_at - time.monotonic(), 1)
+                                for name, (retry_at, _) in self._training_backoff.items()
+                                if retry_at > time.monotonic()},
+                "trainer": self.trainer.stats
+            },
+            "feature_pipeline": {
+                "rows": len(self.feature_pipeline),
+                **self.feature_pipeline.stats
+            },
             "configuration": self.config,
             "models_directory": str(self.models_dir),
             "last_update": datetime.utcnow().isoformat()
@@ -954,6 +994,7 @@ async def stop_ml_insights():
     global ml_insights_service
     
     if ml_insights_service:
+        await ml_insights_service.stop()
         ml_insights_service = None
         logger.info("🛑 ML Insights service stopped")
 
@@ -0,0 +1,242 @@
+"""
+Model Registry and Background Trainer
+Versioned model artifacts published atomically on disk, memory-mapped loads
+for serving processes, and model fits run in a separate process
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ModelVersion:
+    name: str
+    version: int
+    trained_at: str
+    training_duration_seconds: float
+    samples: int = 0
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    def age_seconds(self, now: Optional[datetime] = None) -> float:
+        return ((now or datetime.utcnow()) - datetime.fromisoformat(self.trained_at)).total_seconds()
+
+class ModelRegistry:
+    """
+    Versioned artifacts under `root/<name>/v000001/`, one directory per fit.
+
+    A version is written to a temporary directory and renamed into place,
+    then the `CURRENT` pointer is replaced with os.replace, so readers see
+    either the previous complete version or the new one. The pointer is
+    only moved forward, under a per-model lock file, so a slower publisher
+    of an older version cannot roll serving back. Artifacts are
+    dumped uncompressed and loaded with mmap_mode='r': numpy arrays inside
+    them are mapped from the page cache and shared by every process that
+    loads the same version. The newest `keep_versions` versions are kept.
+    """
+
+    def __init__(self, root: Path, keep_versions: int = 3):
+        self.root = Path(root)
+        self.keep_versions = keep_versions
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lease = None
+        self._lease_holders = set()
+
+    @contextmanager
+    def _locked(self, name: str):
+        with open(self.root / name / ".lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def acquire_training_lease(self, holder: str = "default") -> bool:
+        """
+        Make this process the registry's only trainer, if no live process is.
+
+        The lease is an exclusive flock on `.training.lock`, held until every
+        `holder` in this process released it, or until process exit, so
+        another worker takes over once the owner dies. Services sharing the
+        registry instance share the lease.
+        """
+        if self._lease is None:
+            handle = open(self.root / ".training.lock", "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            self._lease = handle
+        self._lease_holders.add(holder)
+        return True
+
+    def release_training_lease(self, holder: str = "default"):
+        self._lease_holders.discard(holder)
+        if self._lease is not None and not self._lease_holders:
+            self._lease.close()
+            self._lease = None
+
+    @property
+    def owns_training(self) -> bool:
+        return self._lease is not None
+
+    def _versions(self, name: str):
+        model_dir = self.root / name
+        if not model_dir.exists():
+            return []
+        return sorted(int(path.name[1:]) for path in model_dir.iterdir()
+                      if path.name.startswith("v") and path.name[1:].isdigit())
+
+    def publish(self, name: str, artifact: Any, training_duration_seconds: float,
+                samples: int = 0, metrics: Optional[Dict[str, Any]] = None) -> ModelVersion:
+        """Write `artifact` as the next version of `name` and make it current"""
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+        staging = model_dir / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir()
+
+        try:
+            version = ModelVersion(name=name, version=0, trained_at=datetime.utcnow().isoformat(),
+                                   training_duration_seconds=round(training_duration_seconds, 3),
+                                   samples=samples, metrics=metrics or {})
+            joblib.dump(artifact, staging / "model.joblib")
+            with self._locked(name):
+                version.version = max(self._versions(name), default=0) + 1
+                (staging / "manifest.json").write_text(json.dumps(asdict(version), default=str))
+                staging.rename(model_dir / f"v{version.version:06d}")
+                self._advance_current(name, version.version)
+                self._prune(name, self._current_number(name))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def _current_number(self, name: str) -> int:
+        try:
+            return int((self.root / name / "CURRENT").read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _advance_current(self, name: str, number: int) -> bool:
+        """Point CURRENT at `number` unless it already points at a newer version (caller holds the lock)"""
+        if number <= self._current_number(name):
+            return False
+        pointer = self.root / name / f".CURRENT-{uuid.uuid4().hex}"
+        pointer.write_text(str(number))
+        os.replace(pointer, self.root / name / "CURRENT")
+        return True
+
+    def _prune(self, name: str, current: int):
+        for old in self._versions(name)[:-self.keep_versions]:
+            if old != current:
+                # Processes still mapping the old files keep them until they reload
+                shutil.rmtree(self.root / name / f"v{old:06d}", ignore_errors=True)
+
+    def current(self, name: str) -> Optional[ModelVersion]:
+        """Manifest of the current version of `name`, or None if none is published"""
+        number = self._current_number(name)
+        if not number:
+            return None
+        try:
+            manifest = self.root / name / f"v{number:06d}" / "manifest.json"
+            return ModelVersion(**json.loads(manifest.read_text()))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load(self, name: str) -> Optional[Tuple[ModelVersion, Any]]:
+        """Current manifest and artifact of `name`, memory-mapped"""
+        version = self.current(name)
+        if version is None:
+            return None
+        path = self.root / name / f"v{version.version:06d}" / "model.joblib"
+        return version, joblib.load(path, mmap_mode="r")
+
+def _train_and_publish(root: str, name: str, fit: Callable[..., Optional[Dict[str, Any]]],
+                       args: Tuple, keep_versions: int) -> Optional[ModelVersion]:
+    """Runs in the training process: fit, then publish the artifact"""
+    started = time.perf_counter()
+    result = fit(*args)
+    if result is None:
+        return None
+    duration = time.perf_counter() - started
+    return ModelRegistry(Path(root), keep_versions).publish(
+        name, result["artifact"], duration, samples=result.get("samples", 0), metrics=result.get("metrics"))
+
+class ModelTrainer:
+    """
+    Runs model fits in a process pool so they never block the event loop.
+
+    `fit` must be a module-level function returning {"artifact": ...,
+    "samples": int, "metrics": {...}} or None to skip publishing. The
+    training process writes the artifact to the registry; the caller gets
+    the published ModelVersion back and loads it when it is ready to swap.
+    Processes are spawned rather than forked, since the serving process
+    runs threads and an event loop.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"runs": 0, "failures": 0, "in_progress": 0, "last_duration_seconds": None}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def train(self, registry: ModelRegistry, name: str, fit: Callable, *args) -> Optional[ModelVersion]:
+        loop = asyncio.get_running_loop()
+        self.stats["in_progress"] += 1
+        started = time.perf_counter()
+        try:
+            version = await loop.run_in_executor(
+                self._pool(), _train_and_publish, str(registry.root), name, fit, args, registry.keep_versions)
+            self.stats["runs"] += 1
+            return version
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self.stats["in_progress"] -= 1
+            self.stats["last_duration_seconds"] = round(time.perf_counter() - started, 3)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Global registry and trainer shared by the ML services
+MODELS_DIR = Path("/app/data/ml_models")
+model_registry = None
+model_trainer = None
+
+def get_model_registry() -> ModelRegistry:
+    """Get the global model registry (one training lease per process)"""
+    global model_registry
+    if model_registry is None:
+        model_registry = ModelRegistry(MODELS_DIR)
+    return model_registry
+
+def get_model_trainer() -> ModelTrainer:
+    """Get the global model trainer"""
+    global model_trainer
+    if model_trainer is None:
+        model_trainer = ModelTrainer()
+    return model_trainer
@@ -0,0 +1,220 @@
+"""
+Order Book and Matching Engine
+Limit order book with price-time priority matching for one trading pair
+"""
+
+import bisect
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+TIME_IN_FORCE = ("GTC", "IOC", "FOK")
+
+@dataclass(slots=True)
+class Fill:
+    """One execution between a resting (maker) order and an incoming (taker) order"""
+    maker_order_id: str
+    maker_owner: str
+    taker_order_id: str
+    taker_owner: str
+    taker_side: str
+    price: Any
+    quantity: Any
+
+class RestingOrder:
+    __slots__ = ("order_id", "owner", "side", "price", "remaining")
+
+    def __init__(self, order_id: str, owner: str, side: str, price: Any, remaining: Any):
+        self.order_id = order_id
+        self.owner = owner
+        self.side = side
+        self.price = price
+        self.remaining = remaining
+
+class PriceLevel:
+    """FIFO queue of the orders resting at one price"""
+    __slots__ = ("price", "orders", "quantity", "count")
+
+    def __init__(self, price: Any):
+        self.price = price
+        self.orders: Deque[RestingOrder] = deque()
+        self.quantity = 0
+        self.count = 0
+
+class OrderBook:
+    """
+    Central limit order book for one symbol.
+
+    Each side keeps an ascending list of its prices (best bid last, best ask
+    first) and a price -> PriceLevel map; a level queues its orders in arrival
+    order, which gives price-time priority. Cancels are O(1) for the order
+    itself: the order is zeroed and unlinked from the id index, and the dead
+    entry is dropped when it reaches the head of its queue. A level is removed
+    as soon as it has no live orders.
+
+    Prices and quantities may be int, float or Decimal, as long as one book
+    uses one type.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._bid_prices: List[Any] = []
+        self._ask_prices: List[Any] = []
+        self._bids: Dict[Any, PriceLevel] = {}
+        self._asks: Dict[Any, PriceLevel] = {}
+        self._orders: Dict[str, RestingOrder] = {}
+        self.stats = {"orders": 0, "cancels": 0, "fills": 0}
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+
+    def remaining(self, order_id: str) -> Optional[Any]:
+        """Unfilled quantity of a resting order, or None if it is not in the book"""
+        order = self._orders.get(order_id)
+        return order.remaining if order is not None else None
+
+    @property
+    def best_bid(self) -> Optional[Any]:
+        return self._bid_prices[-1] if self._bid_prices else None
+
+    @property
+    def best_ask(self) -> Optional[Any]:
+        return self._ask_prices[0] if self._ask_prices else None
+
+    def depth(self, levels: int = 5) -> Dict[str, List[Tuple[Any, Any, int]]]:
+        """(price, quantity, order count) per level, best price first"""
+        return {
+            "bids": [(p, self._bids[p].quantity, self._bids[p].count) for p in reversed(self._bid_prices[-levels:])],
+            "asks": [(p, self._asks[p].quantity, self._asks[p].count) for p in self._ask_prices[:levels]]
+        }
+
+    def submit(self, order_id: str, owner: str, side: str, quantity: Any,
+               price: Optional[Any] = None, time_in_force: str = "GTC") -> List[Fill]:
+        """
+        Match an incoming order and rest any unfilled limit quantity.
+
+        `price=None` is a market order: it takes liquidity up to `quantity` and
+        never rests. IOC orders never rest; FOK orders execute in full or not
+        at all. Returns the fills in execution order.
+        """
+        if quantity <= 0:
+            raise ValueError(f"Order quantity must be positive: {quantity}")
+        if side != BUY and side != SELL:
+            raise ValueError(f"Invalid order side: {side}")
+        if time_in_force not in TIME_IN_FORCE:
+            raise ValueError(f"Unsupported time in force: {time_in_force}")
+        if order_id in self._orders:
+            raise ValueError(f"Duplicate order id: {order_id}")
+
+        self.stats["orders"] += 1
+        fills: List[Fill] = []
+        if time_in_force == "FOK" and self._available(side, price, quantity) < quantity:
+            return fills
+
+        remaining = self._match(order_id, owner, side, quantity, price, fills)
+
+        if remaining and price is not None and time_in_force == "GTC":
+            self._rest(RestingOrder(order_id, owner, side, price, remaining))
+        return fills
+
+    def cancel(self, order_id: str) -> Optional[Any]:
+        """Remove a resting order, returning its unfilled quantity (None if not resting)"""
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return None
+
+        if order.side == BUY:
+            prices, levels = self._bid_prices, self._bids
+        else:
+            prices, levels = self._ask_prices, self._asks
+        level = levels[order.price]
+        remaining = order.remaining
+        order.remaining = 0
+        level.quantity -= remaining
+        level.count -= 1
+        if not level.count:
+            del levels[order.price]
+            del prices[bisect.bisect_left(prices, order.price)]
+        elif len(level.orders) > 2 * level.count + 16:
+            # Many cancelled entries behind a long-lived head order
+            level.orders = deque(o for o in level.orders if o.remaining)
+
+        self.stats["cancels"] += 1
+        return remaining
+
+    def _rest(self, order: RestingOrder):
+        if order.side == BUY:
+            prices, levels = self._bid_prices, self._bids
+        else:
+            prices, levels = self._ask_prices, self._asks
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = PriceLevel(order.price)
+            bisect.insort(prices, order.price)
+        level.orders.append(order)
+        level.quantity += order.remaining
+        level.count += 1
+        self._orders[order.order_id] = order
+
+    def _match(self, order_id: str, owner: str, side: str, quantity: Any,
+               limit: Optional[Any], fills: List[Fill]) -> Any:
+        """Take liquidity from the opposite side; returns the unfilled quantity"""
+        if side == BUY:
+            prices, levels, best = self._ask_prices, self._asks, 0
+        else:
+            prices, levels, best = self._bid_prices, self._bids, -1
+        index = self._orders
+
+        while quantity and prices:
+            price = prices[best]
+            if limit is not None and (price > limit if side == BUY else price < limit):
+                break
+
+            level = levels[price]
+            orders = level.orders
+            while quantity and orders:
+                maker = orders[0]
+                available = maker.remaining
+                if not available:
+                    orders.popleft()  # Cancelled
+                    continue
+
+                traded = quantity if quantity < available else available
+                maker.remaining = available - traded
+                level.quantity -= traded
+                quantity -= traded
+                if not maker.remaining:
+                    orders.popleft()
+                    level.count -= 1
+                    del index[maker.order_id]
+                fills.append(Fill(maker.order_id, maker.owner, order_id, owner, side, price, traded))
+
+            if not level.count:
+                del levels[price]
+                del prices[best]
+
+        self.stats["fills"] += len(fills)
+        return quantity
+
+    def _available(self, side: str, limit: Optional[Any], needed: Any) -> Any:
+        """Opposite-side quantity marketable at `limit`, counted until `needed` is reached"""
+        if side == BUY:
+            prices, levels = self._ask_prices, self._asks
+        else:
+            prices, levels = reversed(self._bid_prices), self._bids
+        total = 0
+        for price in prices:
+            if limit is not None and (price > limit if side == BUY else price < limit):
+                break
+            total += levels[price].quantity
+            if total >= needed:
+                break
+        return total
@@ -0,0 +1,235 @@
+"""
+GCRA Rate Limiter
+Per-key generic cell rate limiting with one float of state per key, lazy O(1)
+expiry, and an optional shared-memory table enforced across worker processes
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tolerates float drift in accumulated TATs, so exactly `burst` requests fit
+_EPSILON = 1e-9
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    remaining: int  # Requests that would still be admitted right now
+    retry_after: float  # Seconds until the next request is admitted (0 when allowed)
+    reset_after: float  # Seconds until the key is back to a full burst
+
+def _gcra(tat: float, now: float, rate_per_minute: float, burst: int):
+    """(allowed, new TAT, decision) for one request against theoretical arrival time `tat`"""
+    interval = 60.0 / rate_per_minute
+    tolerance = interval * burst
+    if tat < now:
+        tat = now
+    new_tat = tat + interval
+    if new_tat - now <= tolerance + _EPSILON:
+        remaining = int((now + tolerance - new_tat) / interval + _EPSILON)
+        return True, new_tat, RateLimitDecision(True, remaining, 0.0, new_tat - now)
+    return False, tat, RateLimitDecision(False, 0, new_tat - tolerance - now, tat - now)
+
+class GCRALimiter:
+    """
+    In-process GCRA (token bucket) limiter.
+
+    Each key holds only its theoretical arrival time (TAT): the instant its
+    bucket would be full again. A request is admitted when advancing the TAT
+    by one emission interval (60 / rate_per_minute) keeps it within `burst`
+    intervals of now, so a key can burst `burst` requests and then refills
+    continuously - there are no window edges to double up on.
+
+    TATs live in a flat array indexed through a key -> slot dict. A key whose
+    TAT has passed is indistinguishable from a new key, so its slot can be
+    freed at any time; every decision advances a clock hand over `sweep`
+    slots and frees the expired ones, which bounds memory without periodic
+    full scans. Decisions never await, so they are atomic on the event loop.
+    """
+
+    backend = "local"
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sweep: int = 2):
+        self.clock = clock
+        self.sweep = sweep
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._tats = array("d")
+        self._free: List[int] = []
+        self._hand = 0
+        self.stats = {"allowed": 0, "limited": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def decide(self, key: str, rate_per_minute: float, burst: int, now: Optional[float] = None) -> RateLimitDecision:
+        now = self.clock() if now is None else now
+        slot = self._slots.get(key)
+        allowed, tat, decision = _gcra(now if slot is None else self._tats[slot], now, rate_per_minute, burst)
+
+        if allowed:
+            self.stats["allowed"] += 1
+            if slot is None:
+                slot = self._allocate(key)
+            self._tats[slot] = tat
+        else:
+            self.stats["limited"] += 1
+
+        self._expire(now)
+        return decision
+
+    def _allocate(self, key: str) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._tats.append(0.0)
+        self._slots[key] = slot
+        return slot
+
+    def _expire(self, now: float):
+        size = len(self._keys)
+        if not size:
+            return
+        keys, tats = self._keys, self._tats
+        for _ in range(self.sweep):
+            hand = self._hand = (self._hand + 1) % size
+            key = keys[hand]
+            if key is not None and tats[hand] <= now:
+                del self._slots[key]
+                keys[hand] = None
+                self._free.append(hand)
+                self.stats["expired"] += 1
+
+    def close(self):
+        pass
+
+class SharedGCRALimiter:
+    """
+    GCRA limiter whose state lives in a named shared-memory table, so every
+    worker process on the host (e.g. uvicorn --workers N) enforces one limit.
+
+    The table is `buckets` rows of 8 slots, each slot a 64-bit key
+    fingerprint and a float64 TAT (128 bytes per row, laid out as 8 keys then
+    8 TATs). A key probes only its own row: a matching slot, else an empty or
+    expired one, else the slot closest to expiry is evicted. Rows are guarded
+    by fcntl byte-range locks striped over a lock file; those are
+    per-process, which is all the single-threaded event loop needs. TATs use
+    CLOCK_MONOTONIC, which is shared by all processes on the host.
+    """
+
+    backend = "shared"
+    ROW = struct.Struct("<8Q8d")
+    SLOTS = 8
+
+    def __init__(self, name: str, buckets: int = 65536, lock_stripes: int = 256,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.buckets = buckets
+        self.lock_stripes = lock_stripes
+        self.clock = clock
+        self.stats = {"allowed": 0, "limited": 0, "evicted": 0}
+
+        size = buckets * self.ROW.size
+        try:
+            self._shm = self._open(name, create=True, size=size)
+            self.created = True
+        except FileExistsError:
+            self._shm = self._open(name)
+            self.created = False
+            if self._shm.size < size:
+                self._shm.close()
+                raise ValueError(f"Shared rate limit table {name} holds fewer than {buckets} buckets")
+
+        self._buf = self._shm.buf
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        logger.info(f"✅ Shared rate limit table {name} {'created' if self.created else 'attached'} ({buckets} buckets)")
+
+    @staticmethod
+    def _open(name: str, **options) -> shared_memory.SharedMemory:
+        """
+        Open the table without resource tracking: the table outlives whichever
+        worker created it and is removed only by close(unlink=True)
+        """
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False, **options)
+        shm = shared_memory.SharedMemory(name=name, **options)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+    @staticmethod
+    def fingerprint(key: str) -> int:
+        """Stable across processes, unlike hash(); 0 marks an empty slot"""
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def decide(self, key: str, rate_per_minute: float, burst: int, now: Optional[float] = None) -> RateLimitDecision:
+        now = self.clock() if now is None else now
+        fingerprint = self.fingerprint(key)
+        bucket = fingerprint % self.buckets
+        offset = bucket * self.ROW.size
+        stripe = bucket % self.lock_stripes
+
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, stripe)
+        try:
+            row = self.ROW.unpack_from(self._buf, offset)
+            keys, tats = row[:self.SLOTS], row[self.SLOTS:]
+            if fingerprint in keys:
+                slot = keys.index(fingerprint)
+                tat = tats[slot]
+            else:
+                slot = min(range(self.SLOTS), key=lambda i: tats[i] if keys[i] else float("-inf"))
+                if keys[slot] and tats[slot] > now:
+                    self.stats["evicted"] += 1
+                tat = now
+
+            allowed, tat, decision = _gcra(tat, now, rate_per_minute, burst)
+            if allowed:
+                struct.pack_into("<Q", self._buf, offset + 8 * slot, fingerprint)
+                struct.pack_into("<d", self._buf, offset + 8 * (self.SLOTS + slot), tat)
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, stripe)
+
+        self.stats["allowed" if allowed else "limited"] += 1
+        return decision
+
+    def __len__(self) -> int:
+        """Keys in the table that are not yet expired (a full scan, for status reporting)"""
+        table = np.ndarray((self.buckets, 2, self.SLOTS), dtype="<u8", buffer=self._buf)
+        tats = table[:, 1, :].view("<f8")
+        return int(np.count_nonzero((table[:, 0, :] != 0) & (tats > self.clock())))
+
+    def close(self, unlink: bool = False):
+        """Detach this process; `unlink` removes the table for every process"""
+        if self._shm is None:
+            return
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            if sys.version_info < (3, 13):
+                # unlink() unregisters from the resource tracker, which _open already did
+                resource_tracker.register(self._shm._name, "shared_memory")
+            self._shm.unlink()
+        os.close(self._lock_fd)
+        self._shm = None
+
+def create_rate_limiter(backend: str = "local", **options):
+    """GCRALimiter for "local", SharedGCRALimiter for "shared" (falls back to local if unavailable)"""
+    if backend == "shared":
+        try:
+            return SharedGCRALimiter(**options)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Shared rate limit table unavailable, limiting per process: {e}")
+    return GCRALimiter()
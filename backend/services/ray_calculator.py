@@ -5,11 +5,13 @@ Calculates institutional-grade risk-adjusted yields for StableYield Index compos
 
 import math
 import statistics
+import numpy as np
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 from enum import Enum
+from .robust_stats import LeaveOneOutColumn
 
 logger = logging.getLogger(__name__)
 
@@ -518,26 +520,253 @@ class RAYCalculator:
         return excluded
     
     def calculate_ray_batch(self, yields: List[Dict[str, Any]]) -> List[RAYResult]:
-        """Calculate RAY for a batch of yields with market context"""
+        """
+        Calculate RAY for a batch of yields with market context.
+
+        Each yield uses every other yield in the batch as its market context,
+        exactly as calculate_ray(yield_data, yields[:i] + yields[i+1:]) would,
+        but the pool set is turned into NumPy columns once and the
+        leave-one-out context statistics are derived from a single sort.
+        """
         logger.info(f"Calculating RAY for batch of {len(yields)} yields")
         
-        results = []
-        for i, yield_data in enumerate(yields):
-            # Use other yields as market context
-            market_context = yields[:i] + yields[i+1:]
-            
-            result = self.calculate_ray(yield_data, market_context)
-            results.append(result)
+        if not yields:
+            return []
+        
+        columns = self._ray_input_columns(yields)
+        
+        # Temporal stability against the leave-one-out market context
+        context_medians = self._context_medians(columns["current_yield"])
+        
+        results = self._ray_results_from_columns(yields, columns, context_medians, market_context_size=len(yields) - 1)
         
         # Log summary
-        avg_ray = statistics.mean([r.risk_adjusted_yield for r in results])
-        avg_penalty = statistics.mean([r.risk_penalty for r in results])
-        avg_confidence = statistics.mean([r.confidence_score for r in results])
+        avg_ray = float(np.mean([r.risk_adjusted_yield for r in results]))
+        avg_penalty = float(np.mean([r.risk_penalty for r in results]))
+        avg_confidence = float(np.mean([r.confidence_score for r in results]))
         
         logger.info(f"RAY calculation complete: Avg RAY={avg_ray:.2f}%, Avg penalty={avg_penalty:.1%}, Avg confidence={avg_confidence:.2f}")
         
         return results
     
+    def input_fingerprint(self, yield_data: Dict[str, Any]) -> Tuple:
+        """
+        Every field the RAY scoring reads from a yield record.
+
+        Two records with equal fingerprints get identical per-pool RAY inputs,
+        so incremental callers only recompute pools whose fingerprint changed.
+        Keep in sync with the _extract/_calculate/_get helpers above.
+        """
+        metadata = yield_data.get('metadata', {})
+        sanitization = metadata.get('sanitization', {})
+        liquidity_metrics = metadata.get('liquidity_metrics', {})
+        protocol_info = metadata.get('protocol_info', {})
+        return (
+            yield_data.get('currentYield'), yield_data.get('apy'),
+            yield_data.get('apy_base'), yield_data.get('baseAPY'),
+            yield_data.get('apy_reward'), yield_data.get('rewardAPY'),
+            yield_data.get('stablecoin'), yield_data.get('canonical_stablecoin_id'),
+            yield_data.get('source'), yield_data.get('canonical_protocol_id'),
+            yield_data.get('sourceType'),
+            yield_data.get('tvl'), yield_data.get('tvlUsd'), yield_data.get('totalValueLocked'),
+            bool(sanitization), sanitization.get('original_apy'), sanitization.get('confidence_score'),
+            bool(liquidity_metrics), liquidity_metrics.get('tvl_usd'),
+            bool(protocol_info), protocol_info.get('reputation_score')
+        )
+    
+    def _ray_input_columns(self, yields: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Per-pool input columns (dict parsing is the only per-row Python work)"""
+        n = len(yields)
+        return {
+            "base_apy": np.fromiter((self._extract_base_apy(y) for y in yields), dtype=float, count=n),
+            "peg": np.fromiter((self._calculate_peg_stability(y) for y in yields), dtype=float, count=n),
+            "liquidity": np.fromiter((self._calculate_liquidity_score(y) for y in yields), dtype=float, count=n),
+            "counterparty": np.fromiter((self._calculate_counterparty_score(y) for y in yields), dtype=float, count=n),
+            "protocol": np.fromiter((self._get_protocol_reputation(y) for y in yields), dtype=float, count=n),
+            "current_yield": np.fromiter((float(y.get('currentYield', 0)) for y in yields), dtype=float, count=n),
+            "sanitization_confidence": np.fromiter((self._get_sanitization_confidence(y) for y in yields), dtype=float, count=n),
+        }
+    
+    def _context_medians(self, current_yields: np.ndarray) -> np.ndarray:
+        """Leave-one-out median yield per pool; NaN when the market context is too small"""
+        # Market context needs more than one other yield
+        if len(current_yields) <= 2:
+            return np.full(len(current_yields), np.nan)
+        return LeaveOneOutColumn(current_yields).median()
+    
+    def _ray_results_from_columns(self,
+                                  yields: List[Dict[str, Any]],
+                                  columns: Dict[str, np.ndarray],
+                                  context_medians: np.ndarray,
+                                  market_context_size: int) -> List[RAYResult]:
+        """
+        RAYResults for rows given their input columns and context medians.
+
+        Every step is element-wise, so a row's result only depends on its own
+        inputs and median, whichever other rows are computed alongside it.
+        """
+        peg_scores = columns["peg"]
+        liquidity_scores = columns["liquidity"]
+        counterparty_scores = columns["counterparty"]
+        protocol_scores = columns["protocol"]
+        temporal_scores = self._calculate_temporal_stability_batch(columns["current_yield"], context_medians)
+        
+        # Risk penalties, array-wise
+        config = self.config["risk_penalties"]
+        penalties = {}
+        for name, scores in (
+            ("peg_stability", peg_scores),
+            ("liquidity_risk", liquidity_scores),
+            ("counterparty_risk", counterparty_scores),
+            ("protocol_risk", protocol_scores),
+            ("temporal_risk", temporal_scores),
+        ):
+            penalties[name] = self._apply_penalty_curve_array(
+                1 - scores,
+                config[name]["max_penalty"],
+                config[name]["penalty_curve"]
+            )
+        
+        n = len(yields)
+        if self.config["calculation_methodology"]["compound_penalties"]:
+            total_penalty = np.ones(n)
+            for penalty in penalties.values():
+                total_penalty *= (1 - penalty)
+            total_penalty = 1 - total_penalty
+        else:
+            total_penalty = np.minimum(1.0, sum(penalties.values()))
+        
+        # Risk adjustment
+        base_apy = columns["base_apy"]
+        risk_adjusted_yields = base_apy * (1 - total_penalty)
+        
+        # Confidence scores
+        confidence_scores = self._calculate_ray_confidence_batch(
+            np.minimum.reduce([peg_scores, liquidity_scores, counterparty_scores, protocol_scores, temporal_scores]),
+            protocol_scores,
+            columns["sanitization_confidence"]
+        )
+        
+        # Materialize RAYResult objects
+        calculation_timestamp = datetime.utcnow().isoformat()
+        calculation_method = "compound_penalties" if self.config["calculation_methodology"]["compound_penalties"] else "additive_penalties"
+        
+        rows = zip(
+            base_apy.tolist(), risk_adjusted_yields.tolist(), total_penalty.tolist(),
+            peg_scores.tolist(), liquidity_scores.tolist(), counterparty_scores.tolist(),
+            protocol_scores.tolist(), temporal_scores.tolist(), confidence_scores.tolist(),
+            penalties["peg_stability"].tolist(), penalties["liquidity_risk"].tolist(),
+            penalties["counterparty_risk"].tolist(), penalties["protocol_risk"].tolist(),
+            penalties["temporal_risk"].tolist()
+        )
+        
+        results = []
+        for yield_data, (base, ray, penalty, peg, liquidity, counterparty, protocol, temporal,
+                         confidence, peg_p, liquidity_p, counterparty_p, protocol_p, temporal_p) in zip(yields, rows):
+            results.append(RAYResult(
+                base_apy=base,
+                risk_adjusted_yield=ray,
+                risk_penalty=penalty,
+                risk_factors=RiskFactors(
+                    peg_stability_score=peg,
+                    liquidity_score=liquidity,
+                    counterparty_score=counterparty,
+                    protocol_reputation=protocol,
+                    temporal_stability=temporal
+                ),
+                confidence_score=confidence,
+                breakdown={
+                    "base_apy": base,
+                    "peg_penalty": peg_p,
+                    "liquidity_penalty": liquidity_p,
+                    "counterparty_penalty": counterparty_p,
+                    "protocol_penalty": protocol_p,
+                    "temporal_penalty": temporal_p,
+                    "total_penalty": penalty,
+                    "final_ray": ray
+                },
+                metadata={
+                    "calculation_timestamp": calculation_timestamp,
+                    "methodology_version": "1.0.0",
+                    "market_context_size": market_context_size,
+                    "excluded_rewards": self._get_excluded_rewards(yield_data),
+                    "calculation_method": calculation_method
+                }
+            ))
+        
+        return results
+    
+    def _calculate_temporal_stability_batch(self, current_yields: np.ndarray, median_yields: np.ndarray) -> np.ndarray:
+        """Array version of _calculate_temporal_stability given leave-one-out medians"""
+        # Fallback based on yield level (very high yields are often unstable)
+        stability = np.select(
+            [current_yields > 50, current_yields > 25, current_yields > 15],
+            [0.30, 0.50, 0.70],
+            default=0.85
+        )
+        
+        # NaN medians (no market context) compare False and keep the fallback
+        has_median = median_yields > 0
+        deviation_ratio = np.abs(current_yields - median_yields) / np.where(has_median, median_yields, 1.0)
+        
+        context_stability = np.select(
+            [deviation_ratio <= 0.10, deviation_ratio <= 0.25],
+            [0.95, 0.85 - (deviation_ratio * 1.0)],
+            default=np.maximum(0.30, 0.85 - (deviation_ratio * 2.0))
+        )
+        
+        return np.where(has_median, context_stability, stability)
+    
+    def _apply_penalty_curve_array(self, risk_factor: np.ndarray, max_penalty: float, curve_type: str) -> np.ndarray:
+        """Array version of _apply_penalty_curve"""
+        # Curves are evaluated on the clipped factor; the bounds are restored below
+        clipped = np.clip(risk_factor, 0.0, 1.0)
+        
+        if curve_type == "linear":
+            penalty = clipped * max_penalty
+        elif curve_type == "exponential":
+            penalty = max_penalty * (1 - np.exp(-3 * clipped))
+        elif curve_type == "quadratic":
+            penalty = max_penalty * (clipped ** 2)
+        elif curve_type == "logarithmic":
+            penalty = max_penalty * (np.log(1 + clipped) / math.log(2))
+        elif curve_type == "step":
+            penalty = np.select([clipped < 0.3, clipped < 0.7], [0.0, max_penalty * 0.5], default=max_penalty)
+        else:
+            penalty = clipped * max_penalty  # Default to linear
+        
+        penalty = np.where(risk_factor >= 1, max_penalty, penalty)
+        return np.where(risk_factor <= 0, 0.0, penalty)
+    
+    def _get_sanitization_confidence(self, yield_data: Dict[str, Any]) -> float:
+        """Sanitization confidence for a yield, NaN when no sanitization metadata exists"""
+        sanitization = yield_data.get('metadata', {}).get('sanitization', {})
+        if sanitization:
+            return float(sanitization.get('confidence_score', 0.80))
+        return math.nan
+    
+    def _calculate_ray_confidence_batch(self,
+                                        min_risk_scores: np.ndarray,
+                                        protocol_scores: np.ndarray,
+                                        sanitization_confidence: np.ndarray) -> np.ndarray:
+        """Array version of _calculate_ray_confidence"""
+        confidence = np.select(
+            [min_risk_scores < 0.30, min_risk_scores < 0.50],
+            [0.80 - 0.30, 0.80 - 0.15],
+            default=0.80
+        )
+        
+        has_sanitization = ~np.isnan(sanitization_confidence)
+        confidence = np.where(
+            has_sanitization,
+            (confidence * 0.7) + (np.nan_to_num(sanitization_confidence) * 0.3),
+            confidence
+        )
+        
+        confidence = np.where(protocol_scores > 0.90, confidence + 0.05, confidence)
+        
+        return np.clip(confidence, 0.0, 1.0)
+    
     def get_ray_summary(self) -> Dict[str, Any]:
         """Get summary of RAY calculation configuration"""
         return {
@@ -546,4 +775,4 @@ class RAYCalculator:
             "supported_risk_factors": [factor.value for factor in RiskFactorType],
             "penalty_curves": ["linear", "exponential", "quadratic", "logarithmic", "step"],
             "last_updated": datetime.utcnow().isoformat()
-        }
\ No newline at end of file
+        }
@@ -5,33 +5,48 @@ Integrates real-time WebSocket data with the existing yield and index calculatio
 
 import asyncio
 import logging
+import time
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from dataclasses import asdict
 from collections import defaultdict, deque
 
+import numpy as np
+
 from .cryptocompare_websocket import CCPriceUpdate, CCOrderBookUpdate, get_cryptocompare_client
 from .websocket_service import WebSocketConnectionManager
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
-from .syi_compositor import SYICompositor
+from .syi_compositor import IncrementalSYICompositor
+from .tick_store import TickStore, PRICE_FIELDS, ORDERBOOK_FIELDS
 
 logger = logging.getLogger(__name__)
 
 class RealTimeDataIntegrator:
-    """Integrates real-time market data with StableYield calculations"""
+    """
+    Integrates real-time market data with StableYield calculations.
+
+    Event-driven: the CryptoCompare callbacks only put ticks on bounded
+    queues. Consumer tasks cache each tick and schedule a debounced worker
+    for its symbol, which recomputes that symbol's metrics once per debounce
+    window and publishes them. SYI recomposition runs only when a metric
+    change crosses the SYI thresholds or the yield feed changes.
+    """
     
-    def __init__(self):
-        self.websocket_manager = WebSocketConnectionManager()
-        self.yield_aggregator = YieldAggregator()
+    def __init__(self, websocket_manager: Optional[WebSocketConnectionManager] = None,
+                 queue_size: int = 10_000, debounce_seconds: float = 1.0):
+        # Shared with the /stream routes so their subscribers receive these updates
+        self.websocket_manager = websocket_manager or WebSocketConnectionManager()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
-        self.syi_compositor = SYICompositor()
+        # Keeps per-pool RAY, eligibility and cap state between ticks
+        self.syi_compositor = IncrementalSYICompositor()
         
-        # Price data cache (last 100 updates per symbol)
-        self.price_cache: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
+        # Price tick store (last 100 ticks per symbol, columnar)
+        self.price_cache = TickStore(100, PRICE_FIELDS)
         
-        # Orderbook data cache (last 50 updates per symbol)
-        self.orderbook_cache: Dict[str, deque] = defaultdict(lambda: deque(maxlen=50))
+        # Orderbook tick store (last 50 ticks per symbol, columnar)
+        self.orderbook_cache = TickStore(50, ORDERBOOK_FIELDS)
         
         # Peg stability metrics cache
         self.peg_metrics: Dict[str, Dict[str, Any]] = {}
@@ -44,10 +59,35 @@ class RealTimeDataIntegrator:
         self.last_liquidity_calculation = {}
         self.last_syi_calculation = None
         
-        # Calculation intervals (in seconds)
-        self.peg_calculation_interval = 30  # 30 seconds
-        self.liquidity_calculation_interval = 60  # 1 minute
-        self.syi_calculation_interval = 60  # 1 minute
+        # Ingest queues: (perf_counter at receipt, update); the oldest tick is dropped when full
+        self.price_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.orderbook_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        
+        # Per-symbol metric workers recompute at most once per debounce window
+        self.debounce_seconds = debounce_seconds
+        self._symbol_workers: Dict[tuple, asyncio.Task] = {}
+        self._pending_since: Dict[tuple, float] = {}
+        
+        # Metric changes that trigger SYI recomposition
+        self.syi_peg_score_threshold = 0.01
+        self.syi_liquidity_score_threshold = 0.02
+        self.syi_min_interval = 5  # seconds between recompositions
+        self.yield_refresh_interval = 60  # the aggregator serves cached yields, so this poll is cheap
+        self._syi_trigger = asyncio.Event()
+        self._syi_pending_since: Optional[float] = None
+        self.current_yields: List[Dict[str, Any]] = []
+        
+        # Pipeline observability: counters and tick-to-publish latency per stream (seconds)
+        self.pipeline_metrics = {
+            'price_ticks': 0,
+            'orderbook_ticks': 0,
+            'ticks_dropped': 0,
+            'peg_recomputes': 0,
+            'liquidity_recomputes': 0,
+            'syi_triggers': 0,
+            'syi_recompositions': 0
+        }
+        self.latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
         
         # Real-time flags
         self.is_running = False
@@ -65,15 +105,15 @@ class RealTimeDataIntegrator:
         # Get CryptoCompare WebSocket client and register callbacks
         cc_client = get_cryptocompare_client()
         if cc_client:
-            cc_client.register_price_callback(self._handle_price_update)
-            cc_client.register_orderbook_callback(self._handle_orderbook_update)
+            cc_client.register_price_batch_callback(self._handle_price_updates)
+            cc_client.register_orderbook_batch_callback(self._handle_orderbook_updates)
             
-            # Start background calculation tasks
+            # Start pipeline tasks
             self.tasks = [
-                asyncio.create_task(self._peg_stability_calculator()),
-                asyncio.create_task(self._liquidity_metrics_calculator()),
-                asyncio.create_task(self._syi_realtime_calculator()),
-                asyncio.create_task(self._websocket_broadcaster())
+                asyncio.create_task(self._price_consumer()),
+                asyncio.create_task(self._orderbook_consumer()),
+                asyncio.create_task(self._syi_worker()),
+                asyncio.create_task(self._yield_refresher())
             ]
             
             logger.info("✅ Real-time data integrator started")
@@ -87,90 +127,154 @@ class RealTimeDataIntegrator:
         
         self.is_running = False
         
-        # Cancel all background tasks
-        for task in self.tasks:
+        # Cancel all background tasks, including pending symbol workers
+        tasks = self.tasks + list(self._symbol_workers.values())
+        for task in tasks:
             task.cancel()
         
         # Wait for tasks to complete
-        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._symbol_workers.clear()
+        self._pending_since.clear()
         
         logger.info("🛑 Real-time data integrator stopped")
     
-    async def _handle_price_update(self, price_update: CCPriceUpdate):
-        """Handle incoming price updates from WebSocket"""
-        try:
-            symbol = price_update.symbol
-            
-            # Add to price cache
-            self.price_cache[symbol].append({
-                'price': price_update.price,
-                'volume_24h': price_update.volume_24h,
-                'timestamp': price_update.timestamp,
-                'source': price_update.source
-            })
-            
-            logger.debug(f"💰 Cached price update: {symbol} = ${price_update.price:.4f}")
-            
-            # Trigger peg stability calculation if enough time has passed
-            last_calc = self.last_peg_calculation.get(symbol, datetime.min)
-            if (datetime.utcnow() - last_calc).total_seconds() >= self.peg_calculation_interval:
-                await self._calculate_peg_stability(symbol)
+    def _enqueue_tick(self, queue: asyncio.Queue, update):
+        """Put a tick on its ingest queue without waiting; a full queue drops its oldest tick"""
+        if queue.full():
+            queue.get_nowait()
+            self.pipeline_metrics['ticks_dropped'] += 1
+        queue.put_nowait((time.perf_counter(), update))
+    
+    async def _handle_price_updates(self, price_updates: List[CCPriceUpdate]):
+        """Handle a batch of price updates from WebSocket (receive path: enqueue only)"""
+        for price_update in price_updates:
+            self._enqueue_tick(self.price_queue, price_update)
+    
+    async def _handle_orderbook_updates(self, orderbook_updates: List[CCOrderBookUpdate]):
+        """Handle a batch of orderbook updates from WebSocket (receive path: enqueue only)"""
+        for orderbook_update in orderbook_updates:
+            self._enqueue_tick(self.orderbook_queue, orderbook_update)
+    
+    async def _price_consumer(self):
+        """Cache price ticks and schedule the symbol's peg stability worker"""
+        while self.is_running:
+            try:
+                received_at, price_update = await self.price_queue.get()
+                symbol = price_update.symbol
                 
-        except Exception as e:
-            logger.error(f"❌ Error handling price update: {e}")
+                self.price_cache.append(symbol, price_update.timestamp_ns,
+                                        price_update.price, price_update.volume_24h)
+                self.pipeline_metrics['price_ticks'] += 1
+                
+                logger.debug(f"💰 Cached price update: {symbol} = ${price_update.price:.4f}")
+                self._schedule_symbol_worker('peg', symbol, received_at)
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Error handling price update: {e}")
     
-    async def _handle_orderbook_update(self, orderbook_update: CCOrderBookUpdate):
-        """Handle incoming orderbook updates from WebSocket"""
+    async def _orderbook_consumer(self):
+        """Cache orderbook ticks and schedule the symbol's liquidity worker"""
+        while self.is_running:
+            try:
+                received_at, orderbook_update = await self.orderbook_queue.get()
+                symbol = orderbook_update.symbol
+                
+                self.orderbook_cache.append(symbol, orderbook_update.timestamp_ns,
+                                            orderbook_update.bid_price, orderbook_update.bid_quantity,
+                                            orderbook_update.ask_price, orderbook_update.ask_quantity)
+                self.pipeline_metrics['orderbook_ticks'] += 1
+                
+                logger.debug(f"📊 Cached orderbook: {symbol}")
+                self._schedule_symbol_worker('liquidity', symbol, received_at)
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Error handling orderbook update: {e}")
+    
+    def _schedule_symbol_worker(self, kind: str, symbol: str, received_at: float):
+        """Start a debounced worker for (kind, symbol) unless one is already pending"""
+        key = (kind, symbol)
+        self._pending_since.setdefault(key, received_at)
+        if key not in self._symbol_workers:
+            self._symbol_workers[key] = asyncio.create_task(self._symbol_worker(kind, symbol))
+    
+    async def _symbol_worker(self, kind: str, symbol: str):
+        """Recompute one symbol's metrics after the debounce window, then publish"""
+        key = (kind, symbol)
         try:
-            symbol = orderbook_update.symbol
-            
-            # Add to orderbook cache
-            self.orderbook_cache[symbol].append({
-                'bid_price': orderbook_update.bid_price,
-                'bid_quantity': orderbook_update.bid_quantity,
-                'ask_price': orderbook_update.ask_price,
-                'ask_quantity': orderbook_update.ask_quantity,
-                'timestamp': orderbook_update.timestamp,
-                'source': orderbook_update.source
-            })
+            await asyncio.sleep(self.debounce_seconds)
+        finally:
+            # Ticks arriving from here on schedule a new worker
+            self._symbol_workers.pop(key, None)
+            received_at = self._pending_since.pop(key, None)
+        
+        try:
+            if kind == 'peg':
+                metrics, stream, threshold = self.peg_metrics, 'peg_metrics', self.syi_peg_score_threshold
+                score_key = 'peg_stability_score'
+                previous = metrics.get(symbol)
+                await self._calculate_peg_stability(symbol)
+                self.pipeline_metrics['peg_recomputes'] += 1
+            else:
+                metrics, stream, threshold = self.liquidity_metrics, 'liquidity_metrics', self.syi_liquidity_score_threshold
+                score_key = 'liquidity_score'
+                previous = metrics.get(symbol)
+                await self._calculate_liquidity_metrics(symbol)
+                self.pipeline_metrics['liquidity_recomputes'] += 1
             
-            # Calculate spread for liquidity analysis
-            spread = orderbook_update.ask_price - orderbook_update.bid_price
-            spread_pct = (spread / orderbook_update.bid_price) * 100 if orderbook_update.bid_price > 0 else 0
+            current = metrics.get(symbol)
+            if current is None or current is previous:
+                return  # Not enough data yet
             
-            logger.debug(f"📊 Cached orderbook: {symbol} Spread={spread_pct:.3f}%")
+            await self.websocket_manager.publish(stream, metrics)
+            self.latencies[stream].append(time.perf_counter() - received_at)
             
-            # Trigger liquidity calculation if enough time has passed
-            last_calc = self.last_liquidity_calculation.get(symbol, datetime.min)
-            if (datetime.utcnow() - last_calc).total_seconds() >= self.liquidity_calculation_interval:
-                await self._calculate_liquidity_metrics(symbol)
+            if self._crosses_threshold(previous, current, score_key, threshold):
+                self._trigger_syi(received_at)
                 
         except Exception as e:
-            logger.error(f"❌ Error handling orderbook update: {e}")
+            logger.error(f"❌ Error in {kind} worker for {symbol}: {e}")
+    
+    @staticmethod
+    def _crosses_threshold(previous: Optional[Dict[str, Any]], current: Dict[str, Any],
+                           score_key: str, threshold: float) -> bool:
+        """True when a symbol's metrics changed enough to affect the index inputs"""
+        if previous is None or previous['assessment'] != current['assessment']:
+            return True
+        return abs(current[score_key] - previous[score_key]) >= threshold
+    
+    def _trigger_syi(self, received_at: float):
+        """Request an SYI recomposition; triggers are coalesced until the worker runs"""
+        if self._syi_pending_since is None or received_at < self._syi_pending_since:
+            self._syi_pending_since = received_at
+        self.pipeline_metrics['syi_triggers'] += 1
+        self._syi_trigger.set()
     
     async def _calculate_peg_stability(self, symbol: str):
         """Calculate real-time peg stability metrics"""
         try:
-            prices = list(self.price_cache[symbol])
-            if len(prices) < 10:  # Need at least 10 data points
+            if self.price_cache.count(symbol) < 10:  # Need at least 10 data points
                 return
             
-            # Get recent prices (last 30 minutes worth)
-            cutoff_time = datetime.utcnow() - timedelta(minutes=30)
-            recent_prices = [p for p in prices if p['timestamp'] >= cutoff_time]
+            # Get recent prices (last 30 minutes worth, a view into the tick store)
+            cutoff_ns = time.time_ns() - 30 * 60 * 1_000_000_000
+            price_values = self.price_cache.window(symbol, cutoff_ns)['price']
             
-            if not recent_prices:
+            if not len(price_values):
                 return
             
             # Calculate peg stability metrics
-            price_values = [p['price'] for p in recent_prices]
             target_peg = 1.0  # USD peg target
             
             # Calculate deviations from peg
-            deviations = [abs(price - target_peg) for price in price_values]
-            max_deviation = max(deviations)
-            avg_deviation = sum(deviations) / len(deviations)
-            current_deviation = abs(recent_prices[-1]['price'] - target_peg)
+            deviations = np.abs(price_values - target_peg)
+            max_deviation = float(deviations.max())
+            avg_deviation = float(deviations.mean())
+            current_deviation = float(deviations[-1])
             
             # Calculate peg stability score (0-1, where 1 is perfect peg)
             # Penalize based on maximum deviation in the period
@@ -186,12 +290,12 @@ class RealTimeDataIntegrator:
             # Store peg metrics
             self.peg_metrics[symbol] = {
                 'symbol': symbol,
-                'current_price': recent_prices[-1]['price'],
+                'current_price': float(price_values[-1]),
                 'current_deviation': current_deviation,
                 'max_deviation_30min': max_deviation,
                 'avg_deviation_30min': avg_deviation,
                 'peg_stability_score': peg_score,
-                'data_points': len(recent_prices),
+                'data_points': len(price_values),
                 'calculation_timestamp': datetime.utcnow().isoformat(),
                 'assessment': 'Excellent' if peg_score > 0.95 else
                            'Good' if peg_score > 0.85 else
@@ -208,34 +312,24 @@ class RealTimeDataIntegrator:
     async def _calculate_liquidity_metrics(self, symbol: str):
         """Calculate real-time liquidity metrics"""
         try:
-            orderbooks = list(self.orderbook_cache[symbol])
-            if len(orderbooks) < 5:  # Need at least 5 data points
+            if self.orderbook_cache.count(symbol) < 5:  # Need at least 5 data points
                 return
             
-            # Get recent orderbooks (last 10 minutes)
-            cutoff_time = datetime.utcnow() - timedelta(minutes=10)
-            recent_books = [ob for ob in orderbooks if ob['timestamp'] >= cutoff_time]
+            # Get recent orderbooks (last 10 minutes, views into the tick store)
+            cutoff_ns = time.time_ns() - 10 * 60 * 1_000_000_000
+            books = self.orderbook_cache.window(symbol, cutoff_ns)
+            bid_prices, ask_prices = books['bid_price'], books['ask_price']
             
-            if not recent_books:
+            if not len(bid_prices):
                 return
             
-            # Calculate liquidity metrics
-            spreads = []
-            bid_depths = []
-            ask_depths = []
-            
-            for book in recent_books:
-                spread = book['ask_price'] - book['bid_price']
-                spread_pct = (spread / book['bid_price']) * 100 if book['bid_price'] > 0 else 0
-                spreads.append(spread_pct)
-                
-                bid_depths.append(book['bid_quantity'])
-                ask_depths.append(book['ask_quantity'])
+            # Calculate liquidity metrics (spread is 0 where the bid is missing)
+            spreads = np.zeros(len(bid_prices))
+            np.divide((ask_prices - bid_prices) * 100, bid_prices, out=spreads, where=bid_prices > 0)
             
-            # Calculate metrics
-            avg_spread = sum(spreads) / len(spreads)
-            avg_bid_depth = sum(bid_depths) / len(bid_depths)
-            avg_ask_depth = sum(ask_depths) / len(ask_depths)
+            avg_spread = float(spreads.mean())
+            avg_bid_depth = float(books['bid_quantity'].mean())
+            avg_ask_depth = float(books['ask_quantity'].mean())
             avg_total_depth = avg_bid_depth + avg_ask_depth
             
             # Calculate liquidity score (0-1, where 1 is perfect liquidity)
@@ -253,7 +347,7 @@ class RealTimeDataIntegrator:
                 'avg_ask_depth_usd': avg_ask_depth,
                 'total_depth_usd': avg_total_depth,
                 'liquidity_score': liquidity_score,
-                'data_points': len(recent_books),
+                'data_points': len(bid_prices),
                 'calculation_timestamp': datetime.utcnow().isoformat(),
                 'assessment': 'Excellent' if liquidity_score > 0.90 else
                              'Good' if liquidity_score > 0.75 else
@@ -267,125 +361,105 @@ class RealTimeDataIntegrator:
         except Exception as e:
             logger.error(f"❌ Error calculating liquidity metrics for {symbol}: {e}")
     
-    async def _peg_stability_calculator(self):
-        """Background task for peg stability calculations"""
+    async def _yield_refresher(self):
+        """Refresh the yield feed and trigger SYI recomposition when it changed"""
         while self.is_running:
             try:
-                await asyncio.sleep(self.peg_calculation_interval)
+                current_yields = await self.yield_aggregator.get_all_yields()
+                if current_yields != self.current_yields:
+                    self.current_yields = current_yields
+                    self._trigger_syi(time.perf_counter())
                 
-                # Calculate peg stability for all symbols with data
-                for symbol in self.price_cache.keys():
-                    await self._calculate_peg_stability(symbol)
-                    
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ Error in peg stability calculator: {e}")
-    
-    async def _liquidity_metrics_calculator(self):
-        """Background task for liquidity metrics calculations"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(self.liquidity_calculation_interval)
+                await asyncio.sleep(self.yield_refresh_interval)
                 
-                # Calculate liquidity metrics for all symbols with data
-                for symbol in self.orderbook_cache.keys():
-                    await self._calculate_liquidity_metrics(symbol)
-                    
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"❌ Error in liquidity calculator: {e}")
+                logger.error(f"❌ Error refreshing yields: {e}")
+                await asyncio.sleep(self.yield_refresh_interval)
     
-    async def _syi_realtime_calculator(self):
-        """Background task for real-time SYI calculations"""
+    async def _syi_worker(self):
+        """Recompose SYI when triggered, at most once per syi_min_interval"""
         while self.is_running:
             try:
-                await asyncio.sleep(self.syi_calculation_interval)
-                
-                # Skip calculation if no real-time data available
-                if not self.peg_metrics and not self.liquidity_metrics:
-                    continue
-                
-                # Get current yield data
-                current_yields = await self.yield_aggregator.get_all_yields()
+                await self._syi_trigger.wait()
                 
-                # Enhance yield data with real-time metrics
-                enhanced_yields = []
-                for yield_data in current_yields:
-                    symbol = yield_data.get('stablecoin', yield_data.get('canonical_stablecoin_id', 'Unknown'))
-                    
-                    # Add real-time peg metrics
-                    if symbol in self.peg_metrics:
-                        if 'metadata' not in yield_data:
-                            yield_data['metadata'] = {}
-                        yield_data['metadata']['realtime_peg_metrics'] = self.peg_metrics[symbol]
-                    
-                    # Add real-time liquidity metrics
-                    if symbol in self.liquidity_metrics:
-                        if 'metadata' not in yield_data:
-                            yield_data['metadata'] = {}
-                        yield_data['metadata']['realtime_liquidity_metrics'] = self.liquidity_metrics[symbol]
-                    
-                    enhanced_yields.append(yield_data)
+                # Coalesce triggers that arrive within the minimum interval
+                if self.last_syi_calculation:
+                    elapsed = (datetime.utcnow() - self.last_syi_calculation).total_seconds()
+                    await asyncio.sleep(max(0.0, self.syi_min_interval - elapsed))
                 
-                # Calculate real-time SYI if we have enhanced data
-                if enhanced_yields:
-                    syi_composition = self.syi_compositor.compose_syi(enhanced_yields)
-                    
-                    # Store SYI data for broadcasting
-                    self.last_syi_data = {
-                        'index_value': syi_composition.index_value,
-                        'constituent_count': syi_composition.constituent_count,
-                        'calculation_timestamp': syi_composition.calculation_timestamp,
-                        'quality_metrics': syi_composition.quality_metrics,
-                        'enhanced_with_realtime': True,
-                        'realtime_symbols': list(set(self.peg_metrics.keys()) | set(self.liquidity_metrics.keys()))
-                    }
-                    
-                    self.last_syi_calculation = datetime.utcnow()
-                    
-                    logger.info(f"📊 Real-time SYI: {syi_composition.index_value:.4f} ({syi_composition.constituent_count} constituents)")
+                self._syi_trigger.clear()
+                received_at, self._syi_pending_since = self._syi_pending_since, None
+                await self._recompose_syi(received_at)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"❌ Error in SYI real-time calculator: {e}")
     
-    async def _websocket_broadcaster(self):
-        """Background task for broadcasting real-time data via WebSocket"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(5)  # Broadcast every 5 seconds
-                
-                # Broadcast peg metrics
-                if self.peg_metrics:
-                    await self.websocket_manager.broadcast('peg_metrics', {
-                        'type': 'peg_metrics_update',
-                        'data': self.peg_metrics,
-                        'timestamp': datetime.utcnow().isoformat()
-                    })
-                
-                # Broadcast liquidity metrics  
-                if self.liquidity_metrics:
-                    await self.websocket_manager.broadcast('liquidity_metrics', {
-                        'type': 'liquidity_metrics_update',
-                        'data': self.liquidity_metrics,
-                        'timestamp': datetime.utcnow().isoformat()
-                    })
-                
-                # Broadcast SYI updates
-                if hasattr(self, 'last_syi_data'):
-                    await self.websocket_manager.broadcast('syi_live', {
-                        'type': 'syi_live_update',
-                        'data': self.last_syi_data,
-                        'timestamp': datetime.utcnow().isoformat()
-                    })
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ Error in WebSocket broadcaster: {e}")
+    async def _recompose_syi(self, received_at: Optional[float]):
+        """Compose SYI from the current yields enhanced with real-time metrics, then publish"""
+        # Skip calculation if no real-time data available
+        if not self.current_yields or (not self.peg_metrics and not self.liquidity_metrics):
+            return
+        
+        # Enhance yield data with real-time metrics (copies: the aggregator's records are shared)
+        enhanced_yields = []
+        for yield_data in self.current_yields:
+            symbol = yield_data.get('stablecoin', yield_data.get('canonical_stablecoin_id', 'Unknown'))
+            realtime = {}
+            if symbol in self.peg_metrics:
+                realtime['realtime_peg_metrics'] = self.peg_metrics[symbol]
+            if symbol in self.liquidity_metrics:
+                realtime['realtime_liquidity_metrics'] = self.liquidity_metrics[symbol]
+            if realtime:
+                yield_data = {**yield_data, 'metadata': {**yield_data.get('metadata', {}), **realtime}}
+            enhanced_yields.append(yield_data)
+        
+        syi_composition = self.syi_compositor.compose_syi(enhanced_yields)
+        self.pipeline_metrics['syi_recompositions'] += 1
+        
+        # Store SYI data for broadcasting
+        self.last_syi_data = {
+            'index_value': syi_composition.index_value,
+            'constituent_count': syi_composition.constituent_count,
+            'calculation_timestamp': syi_composition.calculation_timestamp,
+            'quality_metrics': syi_composition.quality_metrics,
+            'enhanced_with_realtime': True,
+            'realtime_symbols': sorted(set(self.peg_metrics.keys()) | set(self.liquidity_metrics.keys()))
+        }
+        self.last_syi_calculation = datetime.utcnow()
+        
+        await self.websocket_manager.publish('syi_live', self.last_syi_data)
+        if received_at is not None:
+            self.latencies['syi_live'].append(time.perf_counter() - received_at)
+        
+        update = self.syi_compositor.last_update
+        logger.info(f"📊 Real-time SYI: {syi_composition.index_value:.4f} ({syi_composition.constituent_count} constituents, "
+                    f"{update['recomputed_rays']}/{update['pools']} pools recomputed)")
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Queue depths, counters and tick-to-publish latency (ms) per stream"""
+        latency = {}
+        for stream, samples in self.latencies.items():
+            values = np.array(samples) * 1000
+            latency[stream] = {
+                'samples': len(values),
+                'p50_ms': float(np.percentile(values, 50)),
+                'p99_ms': float(np.percentile(values, 99)),
+                'max_ms': float(values.max())
+            }
+        return {
+            'queue_depths': {
+                'price': self.price_queue.qsize(),
+                'orderbook': self.orderbook_queue.qsize()
+            },
+            'pending_symbol_workers': len(self._symbol_workers),
+            'syi_pending': self._syi_trigger.is_set(),
+            **self.pipeline_metrics,
+            'tick_to_publish_latency': latency
+        }
     
     def get_realtime_status(self) -> Dict[str, Any]:
         """Get current real-time integration status"""
@@ -393,16 +467,21 @@ class RealTimeDataIntegrator:
             'is_running': self.is_running,
             'price_cache_symbols': list(self.price_cache.keys()),
             'orderbook_cache_symbols': list(self.orderbook_cache.keys()),
+            'tick_store': {
+                'price': self.price_cache.stats(),
+                'orderbook': self.orderbook_cache.stats()
+            },
             'peg_metrics_available': list(self.peg_metrics.keys()),
             'liquidity_metrics_available': list(self.liquidity_metrics.keys()),
             'last_syi_calculation': self.last_syi_calculation.isoformat() if self.last_syi_calculation else None,
             'calculation_intervals': {
-                'peg_stability': f"{self.peg_calculation_interval}s",
-                'liquidity_metrics': f"{self.liquidity_calculation_interval}s", 
-                'syi_calculation': f"{self.syi_calculation_interval}s"
+                'metrics_debounce': f"{self.debounce_seconds}s",
+                'syi_min_interval': f"{self.syi_min_interval}s",
+                'yield_refresh': f"{self.yield_refresh_interval}s"
             },
             'active_tasks': len([t for t in self.tasks if not t.done()]),
-            'websocket_connections': self.websocket_manager.connection_count
+            'websocket_connections': self.websocket_manager.connection_count,
+            'pipeline': self.get_pipeline_stats()
         }
     
     def get_peg_metrics(self) -> Dict[str, Any]:
@@ -416,12 +495,12 @@ class RealTimeDataIntegrator:
 # Global real-time integrator instance
 realtime_integrator = None
 
-async def start_realtime_integration():
-    """Start the global real-time data integrator"""
+async def start_realtime_integration(websocket_manager: Optional[WebSocketConnectionManager] = None):
+    """Start the global real-time data integrator, publishing through websocket_manager if given"""
     global realtime_integrator
     
     if realtime_integrator is None:
-        realtime_integrator = RealTimeDataIntegrator()
+        realtime_integrator = RealTimeDataIntegrator(websocket_manager)
         await realtime_integrator.start()
         logger.info("🚀 Real-time data integrator started")
     else:
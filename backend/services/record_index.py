@@ -0,0 +1,91 @@
+"""
+Record Index for Client-Scoped Queries
+Secondary indexes by client, symbol and time bucket, maintained on write
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class RecordIndex:
+    """
+    Secondary index over immutable (client_id, symbol, timestamp) attributes
+    of records such as orders and trades.
+
+    Each record id is filed under four partitions: all records, its client,
+    its symbol, and its (client, symbol) pair. Within a partition ids are
+    grouped into time buckets of `bucket_hours`, with the bucket keys kept
+    sorted, so a query touches only the buckets overlapping its time range
+    and costs O(buckets + result size) rather than a scan of all records.
+    """
+
+    def __init__(self, bucket_hours: int = 1):
+        self.bucket_hours = bucket_hours
+        self._partitions: Dict[Hashable, Dict[int, List[Tuple[datetime, str]]]] = {}
+        self._bucket_keys: Dict[Hashable, List[int]] = {}
+        self._ids = set()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._ids
+
+    def _bucket(self, timestamp: datetime) -> int:
+        return (timestamp.toordinal() * 24 + timestamp.hour) // self.bucket_hours
+
+    def add(self, record_id: str, client_id: str, symbol: str, timestamp: datetime):
+        """File a record under its partitions; re-adding a known id is a no-op"""
+        if record_id in self._ids:
+            return
+        self._ids.add(record_id)
+
+        bucket = self._bucket(timestamp)
+        entry = (timestamp, record_id)
+        for partition in (None, ("client", client_id), ("symbol", symbol), ("pair", client_id, symbol)):
+            buckets = self._partitions.setdefault(partition, {})
+            if bucket not in buckets:
+                buckets[bucket] = []
+                keys = self._bucket_keys.setdefault(partition, [])
+                if not keys or bucket > keys[-1]:
+                    keys.append(bucket)  # Common case: records arrive in time order
+                else:
+                    insort(keys, bucket)
+            buckets[bucket].append(entry)
+
+    def ids(self, client_id: Optional[str] = None, symbol: Optional[str] = None,
+            since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[str]:
+        """Ids matching all given filters (time range inclusive), oldest first"""
+        if client_id is not None and symbol is not None:
+            partition = ("pair", client_id, symbol)
+        elif client_id is not None:
+            partition = ("client", client_id)
+        elif symbol is not None:
+            partition = ("symbol", symbol)
+        else:
+            partition = None
+
+        buckets = self._partitions.get(partition)
+        if not buckets:
+            return []
+        keys = self._bucket_keys[partition]
+
+        start = bisect_left(keys, self._bucket(since)) if since is not None else 0
+        stop = bisect_left(keys, self._bucket(until) + 1) if until is not None else len(keys)
+
+        result = []
+        for position in range(start, stop):
+            entries = buckets[keys[position]]
+            # Only the edge buckets can hold entries outside the range
+            if (since is not None and position == start) or (until is not None and position == stop - 1):
+                entries = [
+                    entry for entry in entries
+                    if (since is None or entry[0] >= since) and (until is None or entry[0] <= until)
+                ]
+            result.extend(record_id for _, record_id in sorted(entries))
+        return result
+
+    def clear(self):
+        self._partitions.clear()
+        self._bucket_keys.clear()
+        self._ids.clear()
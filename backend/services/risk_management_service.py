@@ -5,22 +5,27 @@ dynamic risk limits, and regulatory compliance features
 """
 
 import asyncio
+import functools
 import logging
+import multiprocessing
 import json
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Deque, Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 import statistics
+from collections import deque
 from pathlib import Path
-from scipy.stats import norm
+from concurrent.futures import ProcessPoolExecutor
 
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
 from .trading_engine_service import get_trading_engine_service
 from .ml_insights_service import get_ml_insights_service
 from .ai_portfolio_service import get_ai_portfolio_service
+from .var_engine import VaRInput, VaRResult, compute_var_batch
+from .stress_grid import StressGrid, scenario_shock
 
 logger = logging.getLogger(__name__)
 
@@ -92,27 +97,44 @@ class EnhancedRiskManagementService:
     
     def __init__(self):
         # Core service integrations
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
         
         # Risk management data
         self.risk_limits: Dict[str, List[RiskLimit]] = {}  # portfolio_id -> limits
         self.active_alerts: Dict[str, RiskAlert] = {}
         self.risk_history: Dict[str, List[Dict[str, Any]]] = {}  # portfolio_id -> history
+        self.daily_closes: Dict[str, Deque[float]] = {}  # portfolio_id -> values at each completed UTC day's close
+        self._open_day: Dict[str, Tuple[str, float]] = {}  # portfolio_id -> (UTC date, latest value)
         
         # Configuration
         self.config = self._load_risk_config()
         self.stress_scenarios = self._initialize_stress_scenarios()
+        self.stress_grid = StressGrid(self.stress_scenarios, self._is_defi_asset)
+        self.stress_results: Dict[str, Dict[str, Dict[str, float]]] = {}  # portfolio_id -> scenario_id -> impact
         
         # Service state
         self.is_running = False
         self.background_tasks = []
+        self._var_pool: Optional[ProcessPoolExecutor] = None
         
     def _load_risk_config(self) -> Dict[str, Any]:
         """Load risk management configuration"""
         return {
             "monitoring_interval": 60,  # seconds
             "var_confidence_levels": [0.95, 0.99],
+            "var_engine": {
+                "horizons_days": [1, 7],
+                "paths": 20_000,  # Monte Carlo paths per portfolio
+                "chunk_size": 10_000,  # Paths generated per NumPy batch
+                "seed": None,  # Fixed seed for reproducible runs
+                "student_t_df": None,  # Fat-tailed daily shocks when set (e.g. 4)
+                "min_history": 250,  # Daily returns needed to use historical simulation instead
+                "asset_correlation": 0.7,  # Pairwise correlation between stablecoin positions
+                "asset_volatilities": {},  # Annualized volatility per asset; others use the portfolio estimate
+                "parallel_min_portfolios": 8,  # Batches at least this large run in a process pool
+                "max_workers": None
+            },
             "stress_test_frequency": 3600,  # 1 hour
             "alert_cooldown_minutes": 15,
             "max_portfolio_concentration": 0.25,  # 25%
@@ -242,6 +264,10 @@ class EnhancedRiskManagementService:
             await asyncio.gather(*self.background_tasks, return_exceptions=True)
             self.background_tasks.clear()
             
+            if self._var_pool is not None:
+                self._var_pool.shutdown(wait=False, cancel_futures=True)
+                self._var_pool = None
+            
             logger.info("🛑 Enhanced Risk Management service stopped")
             
             return {
@@ -262,8 +288,10 @@ class EnhancedRiskManagementService:
                 ai_portfolio_service = get_ai_portfolio_service()
                 if ai_portfolio_service and ai_portfolio_service.ai_portfolios:
                     
-                    for portfolio_id in ai_portfolio_service.ai_portfolios.keys():
-                        await self._monitor_portfolio_risk(portfolio_id)
+                    # One simulation batch for every portfolio, then per-portfolio limit checks
+                    batch_metrics = await self.calculate_risk_metrics_batch(list(ai_portfolio_service.ai_portfolios.keys()))
+                    for portfolio_id, risk_metrics in batch_metrics.items():
+                        await self._monitor_portfolio_risk(portfolio_id, risk_metrics)
                 
                 await asyncio.sleep(self.config["monitoring_interval"])
                 
@@ -271,11 +299,12 @@ class EnhancedRiskManagementService:
                 logger.error(f"❌ Error in risk monitoring loop: {e}")
                 await asyncio.sleep(30)  # Wait before retry
     
-    async def _monitor_portfolio_risk(self, portfolio_id: str):
+    async def _monitor_portfolio_risk(self, portfolio_id: str, risk_metrics: Optional[Dict[str, float]] = None):
         """Monitor risk for a specific portfolio"""
         try:
             # Calculate current risk metrics
-            risk_metrics = await self.calculate_risk_metrics(portfolio_id)
+            if risk_metrics is None:
+                risk_metrics = await self.calculate_risk_metrics(portfolio_id)
             
             # Check risk limits
             violated_limits = await self._check_risk_limits(portfolio_id, risk_metrics)
@@ -288,8 +317,9 @@ class EnhancedRiskManagementService:
             if portfolio_id not in self.risk_history:
                 self.risk_history[portfolio_id] = []
             
+            now = datetime.utcnow()
             self.risk_history[portfolio_id].append({
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now.isoformat(),
                 "risk_metrics": risk_metrics,
                 "alerts_count": len([a for a in self.active_alerts.values() 
                                   if a.portfolio_id == portfolio_id and not a.resolved])
@@ -298,10 +328,25 @@ class EnhancedRiskManagementService:
             # Keep only last 1000 records
             if len(self.risk_history[portfolio_id]) > 1000:
                 self.risk_history[portfolio_id] = self.risk_history[portfolio_id][-1000:]
+            
+            self._record_daily_close(portfolio_id, now, risk_metrics.get("portfolio_value", 0))
                 
         except Exception as e:
             logger.error(f"❌ Error monitoring portfolio risk {portfolio_id}: {e}")
     
+    def _record_daily_close(self, portfolio_id: str, timestamp: datetime, value: float):
+        """Track the open UTC day's latest value; when the day rolls over it becomes that day's close"""
+        day = timestamp.date().isoformat()
+        open_day = self._open_day.get(portfolio_id)
+        if open_day is not None and open_day[0] != day:
+            if portfolio_id not in self.daily_closes:
+                # Enough closes for historical simulation over the longest horizon, and no more
+                engine_config = self.config["var_engine"]
+                kept = engine_config["min_history"] + max(engine_config["horizons_days"]) + 1
+                self.daily_closes[portfolio_id] = deque(maxlen=kept)
+            self.daily_closes[portfolio_id].append(open_day[1])
+        self._open_day[portfolio_id] = (day, value)
+    
     async def _check_risk_limits(self, portfolio_id: str, risk_metrics: Dict[str, float]) -> List[RiskLimit]:
         """Check if portfolio violates any risk limits"""
         violated_limits = []
@@ -403,13 +448,8 @@ class EnhancedRiskManagementService:
                 ai_portfolio_service = get_ai_portfolio_service()
                 if ai_portfolio_service and ai_portfolio_service.ai_portfolios:
                     
-                    for portfolio_id in ai_portfolio_service.ai_portfolios.keys():
-                        # Run stress tests for each scenario
-                        for scenario in self.stress_scenarios:
-                            try:
-                                await self.run_stress_test(portfolio_id, scenario.scenario_id)
-                            except Exception as e:
-                                logger.error(f"❌ Error in stress test {scenario.scenario_id} for {portfolio_id}: {e}")
+                    # Every portfolio x scenario in one grid run; unchanged portfolios come from cache
+                    await self.run_stress_grid(list(ai_portfolio_service.ai_portfolios.keys()))
                 
                 # Wait for next stress test cycle
                 await asyncio.sleep(self.config["stress_test_frequency"])
@@ -521,117 +561,190 @@ class EnhancedRiskManagementService:
     
     async def calculate_risk_metrics(self, portfolio_id: str) -> Dict[str, float]:
         """Calculate comprehensive risk metrics for a portfolio"""
+        return (await self.calculate_risk_metrics_batch([portfolio_id])).get(portfolio_id, {})
+    
+    async def calculate_risk_metrics_batch(self, portfolio_ids: List[str]) -> Dict[str, Dict[str, float]]:
+        """Risk metrics for many portfolios: state is fetched once each and VaR/ES simulated in one batch"""
+        results = {portfolio_id: {} for portfolio_id in portfolio_ids}
         try:
             # Get portfolio data from trading engine
             trading_engine = get_trading_engine_service()
             if not trading_engine:
-                logger.error(f"❌ Trading Engine service not available for portfolio {portfolio_id}")
-                return {}
-            
-            # Get portfolio performance data
-            try:
-                portfolio_performance = await trading_engine.get_portfolio_performance(portfolio_id)
-            except ValueError as e:
-                logger.error(f"❌ Error calculating risk metrics for {portfolio_id}: {e}")
-                return {}
+                logger.error(f"❌ Trading Engine service not available for portfolios {portfolio_ids}")
+                return results
+            
+            performances = {}
+            var_inputs = []
+            for portfolio_id in portfolio_ids:
+                try:
+                    portfolio_performance = await trading_engine.get_portfolio_performance(portfolio_id)
+                except ValueError as e:
+                    logger.error(f"❌ Error calculating risk metrics for {portfolio_id}: {e}")
+                    continue
+                
+                var_input = await self._build_var_input(portfolio_id, portfolio_performance)
+                if var_input is None:
+                    logger.warning(f"⚠️ Portfolio {portfolio_id} has no allocation or zero value")
+                    continue
+                
+                performances[portfolio_id] = portfolio_performance
+                var_inputs.append(var_input)
             
-            current_allocation = portfolio_performance.get("current_allocation", {})
-            portfolio_value = portfolio_performance.get("total_value", 0)
-            
-            if not current_allocation or portfolio_value == 0:
-                logger.warning(f"⚠️ Portfolio {portfolio_id} has no allocation or zero value")
-                return {}
-            
-            # Calculate Value at Risk (VaR)
-            var_1d_95 = await self._calculate_var(portfolio_id, 1, 0.95)
-            var_1d_99 = await self._calculate_var(portfolio_id, 1, 0.99)
-            var_7d_95 = await self._calculate_var(portfolio_id, 7, 0.95)
-            
-            # Calculate Expected Shortfall
-            es_1d_95 = await self._calculate_expected_shortfall(portfolio_id, 1, 0.95)
-            
-            # Calculate Maximum Drawdown
-            max_drawdown = await self._calculate_max_drawdown(portfolio_id)
-            
-            # Calculate Concentration Risk
-            concentration_risk = max(current_allocation.values()) if current_allocation else 0
-            
-            # Calculate Diversification Ratio
-            diversification_ratio = await self._calculate_diversification_ratio(current_allocation)
-            
-            # Calculate Liquidity Risk
-            liquidity_risk = await self._calculate_liquidity_risk(portfolio_id)
-            
-            # Calculate Correlation Risk
-            correlation_risk = await self._calculate_correlation_risk(current_allocation)
-            
-            # Volatility metrics
-            volatility_1d = await self._calculate_volatility(portfolio_id, 1)
-            volatility_30d = await self._calculate_volatility(portfolio_id, 30)
-            
-            risk_metrics = {
-                "var_1d_95": var_1d_95,
-                "var_1d_99": var_1d_99, 
-                "var_7d_95": var_7d_95,
-                "expected_shortfall_1d": es_1d_95,
-                "max_drawdown": max_drawdown,
-                "concentration_risk": concentration_risk,
-                "diversification_ratio": diversification_ratio,
-                "liquidity_risk": liquidity_risk,
-                "correlation_risk": correlation_risk,
-                "volatility_1d": volatility_1d,
-                "volatility_30d": volatility_30d,
-                "portfolio_value": portfolio_value
-            }
+            # Calculate Value at Risk and Expected Shortfall for all horizons and confidence levels
+            for var_result in await self._simulate_var(var_inputs):
+                portfolio_id = var_result.portfolio_id
+                try:
+                    results[portfolio_id] = await self._compose_risk_metrics(
+                        portfolio_id, performances[portfolio_id], var_result
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Error calculating risk metrics for {portfolio_id}: {e}")
             
-            return risk_metrics
+            return results
             
         except Exception as e:
-            logger.error(f"❌ Error calculating risk metrics for {portfolio_id}: {e}")
-            return {}
+            logger.error(f"❌ Error calculating risk metrics for {portfolio_ids}: {e}")
+            return results
     
-    async def _calculate_var(self, portfolio_id: str, horizon_days: int, confidence: float) -> float:
-        """Calculate Value at Risk using historical simulation"""
-        try:
-            # This is a simplified VaR calculation
-            # In production, would use historical returns and Monte Carlo simulation
-            
-            # Get portfolio volatility (simplified)
-            volatility = await self._calculate_volatility(portfolio_id, 252)  # Annualized
-            
-            # Convert to horizon volatility
-            horizon_volatility = volatility * np.sqrt(horizon_days / 252)
-            
-            # Calculate VaR using normal distribution approximation
-            var_multiplier = norm.ppf(1 - confidence)  # Z-score for confidence level
-            
-            # Get portfolio value
-            trading_engine = get_trading_engine_service()
-            if trading_engine:
-                portfolio_performance = await trading_engine.get_portfolio_performance(portfolio_id)
-                portfolio_value = portfolio_performance.get("total_value", 0)
-                
-                # VaR = Portfolio Value * Volatility * Z-score
-                var_amount = portfolio_value * horizon_volatility * abs(var_multiplier)
-                return round(var_amount, 2)
-            
-            return 0.0
-            
-        except Exception as e:
-            logger.error(f"❌ Error calculating VaR: {e}")
-            return 0.0
+    async def _compose_risk_metrics(self, portfolio_id: str, portfolio_performance: Dict[str, Any],
+                                    var_result: VaRResult) -> Dict[str, float]:
+        """Combine simulated VaR/ES with the remaining risk metrics"""
+        current_allocation = portfolio_performance.get("current_allocation", {})
+        portfolio_value = portfolio_performance.get("total_value", 0)
+        
+        var_metrics = self._var_metrics(var_result)
+        
+        # Calculate Maximum Drawdown
+        max_drawdown = await self._calculate_max_drawdown(portfolio_id)
+        
+        # Calculate Concentration Risk
+        concentration_risk = max(current_allocation.values()) if current_allocation else 0
+        
+        # Calculate Diversification Ratio
+        diversification_ratio = await self._calculate_diversification_ratio(current_allocation)
+        
+        # Calculate Liquidity Risk
+        liquidity_risk = await self._calculate_liquidity_risk(portfolio_id)
+        
+        # Calculate Correlation Risk
+        correlation_risk = await self._calculate_correlation_risk(current_allocation)
+        
+        # Volatility metrics
+        volatility_1d = await self._calculate_volatility(portfolio_id, 1)
+        volatility_30d = await self._calculate_volatility(portfolio_id, 30)
+        
+        risk_metrics = {
+            **var_metrics,
+            "expected_shortfall_1d": var_metrics.get("es_1d_95", 0.0),
+            "max_drawdown": max_drawdown,
+            "concentration_risk": concentration_risk,
+            "diversification_ratio": diversification_ratio,
+            "liquidity_risk": liquidity_risk,
+            "correlation_risk": correlation_risk,
+            "volatility_1d": volatility_1d,
+            "volatility_30d": volatility_30d,
+            "portfolio_value": portfolio_value
+        }
+        
+        return risk_metrics
+    
+    async def _build_var_input(self, portfolio_id: str, portfolio_performance: Dict[str, Any]) -> Optional[VaRInput]:
+        """Simulation inputs from one portfolio_performance snapshot"""
+        current_allocation = portfolio_performance.get("current_allocation", {})
+        portfolio_value = portfolio_performance.get("total_value", 0)
+        
+        if not current_allocation or portfolio_value == 0:
+            return None
+        
+        engine_config = self.config["var_engine"]
+        assets = list(current_allocation.keys())
+        weights = np.array([current_allocation[asset] for asset in assets], dtype=float)
+        if weights.sum() == 0:
+            return None
+        weights /= weights.sum()  # Allocation is reported in percent
+        
+        # Annualized portfolio volatility estimate, used for assets without their own
+        volatility = await self._calculate_volatility(portfolio_id, 252)
+        volatilities = np.array([
+            0.0 if asset == "CASH" else engine_config["asset_volatilities"].get(asset, volatility)
+            for asset in assets
+        ])
+        correlation = np.full((len(assets), len(assets)), engine_config["asset_correlation"])
+        np.fill_diagonal(correlation, 1.0)
+        
+        # Daily portfolio returns from the recorded closes enable historical simulation
+        historical_returns = self._daily_returns(self.daily_closes.get(portfolio_id, ()))
+        if len(historical_returns) < engine_config["min_history"]:
+            historical_returns = None
+        
+        return VaRInput(
+            portfolio_id=portfolio_id,
+            portfolio_value=float(portfolio_value),
+            weights=weights,
+            volatilities=volatilities,
+            correlation=correlation,
+            historical_returns=historical_returns
+        )
     
-    async def _calculate_expected_shortfall(self, portfolio_id: str, horizon_days: int, confidence: float) -> float:
-        """Calculate Expected Shortfall (Conditional VaR)"""
+    @staticmethod
+    def _daily_returns(closes: Sequence[float]) -> np.ndarray:
+        """Close-to-close returns, skipping days that start from a zero value"""
+        values = np.asarray(closes, dtype=float)
+        previous, current = values[:-1], values[1:]
+        valid = previous > 0
+        return (current[valid] - previous[valid]) / previous[valid]
+    
+    def _get_var_pool(self) -> ProcessPoolExecutor:
+        """Long-lived worker pool for large VaR batches, created on first use"""
+        if self._var_pool is None:
+            self._var_pool = ProcessPoolExecutor(max_workers=self.config["var_engine"]["max_workers"],
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._var_pool
+    
+    async def _simulate_var(self, var_inputs: List[VaRInput]) -> List[VaRResult]:
+        """Run the VaR engine off the event loop; large batches are spread over a process pool"""
+        if not var_inputs:
+            return []
+        
+        engine_config = self.config["var_engine"]
+        parallel = len(var_inputs) >= engine_config["parallel_min_portfolios"]
+        run = functools.partial(
+            compute_var_batch,
+            var_inputs,
+            engine_config["horizons_days"],
+            self.config["var_confidence_levels"],
+            n_paths=engine_config["paths"],
+            seed=engine_config["seed"],
+            chunk_size=engine_config["chunk_size"],
+            student_t_df=engine_config["student_t_df"],
+            min_history=engine_config["min_history"],
+            max_workers=engine_config["max_workers"] if parallel else 1,
+            executor=self._get_var_pool() if parallel else None
+        )
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+    
+    def _var_metrics(self, var_result: VaRResult) -> Dict[str, float]:
+        """Flatten VaR/ES into var_{horizon}d_{confidence} and es_{horizon}d_{confidence} metrics"""
+        metrics = {}
+        for (horizon, confidence), value in var_result.var.items():
+            metrics[f"var_{horizon}d_{round(confidence * 100)}"] = value
+        for (horizon, confidence), value in var_result.expected_shortfall.items():
+            metrics[f"es_{horizon}d_{round(confidence * 100)}"] = value
+        return metrics
+    
+    async def _calculate_var(self, portfolio_id: str, portfolio_performance: Dict[str, Any],
+                             horizon_days: int, confidence: float) -> float:
+        """Value at Risk for a configured horizon and confidence from a portfolio_performance snapshot"""
         try:
-            # Simplified ES calculation (typically 1.3x VaR for normal distribution)
-            var = await self._calculate_var(portfolio_id, horizon_days, confidence)
-            expected_shortfall = var * 1.3
+            var_input = await self._build_var_input(portfolio_id, portfolio_performance)
+            if var_input is None:
+                return 0.0
             
-            return round(expected_shortfall, 2)
+            (var_result,) = await self._simulate_var([var_input])
+            return var_result.var.get((horizon_days, confidence), 0.0)
             
         except Exception as e:
-            logger.error(f"❌ Error calculating Expected Shortfall: {e}")
+            logger.error(f"❌ Error calculating VaR: {e}")
             return 0.0
     
     async def _calculate_max_drawdown(self, portfolio_id: str) -> float:
@@ -790,26 +903,19 @@ class EnhancedRiskManagementService:
             current_allocation = portfolio_performance.get("current_allocation", {})
             current_value = portfolio_performance.get("total_value", 0)
             
-            if not current_allocation or current_value == 0:
+            if not current_allocation or current_value == 0 or sum(current_allocation.values()) == 0:
                 raise ValueError("Portfolio data not available")
             
             # Apply stress scenario
             stressed_value = current_value
             asset_impacts = {}
+            total_weight = sum(current_allocation.values())
             
             for asset, weight in current_allocation.items():
-                asset_value = current_value * weight
+                asset_value = current_value * weight / total_weight  # Allocation is reported in percent
                 
                 # Apply asset-specific shock
-                shock = 0.0
-                if asset.upper() in scenario.asset_shocks:
-                    shock = scenario.asset_shocks[asset.upper()]
-                elif "all" in scenario.asset_shocks:
-                    shock = scenario.asset_shocks["all"]
-                elif "DeFi" in scenario.asset_shocks and self._is_defi_asset(asset):
-                    shock = scenario.asset_shocks["DeFi"]
-                elif "CeFi" in scenario.asset_shocks and not self._is_defi_asset(asset):
-                    shock = scenario.asset_shocks["CeFi"]
+                shock = scenario_shock(scenario.asset_shocks, asset, self._is_defi_asset(asset))
                 
                 # Calculate stressed asset value
                 stressed_asset_value = asset_value * (1 + shock)
@@ -830,7 +936,7 @@ class EnhancedRiskManagementService:
             
             # Calculate risk metrics under stress
             var_multiplier = scenario.volatility_multipliers.get("all", 1.0)
-            stressed_var = await self._calculate_var(portfolio_id, 1, 0.95) * var_multiplier
+            stressed_var = await self._calculate_var(portfolio_id, portfolio_performance, 1, 0.95) * var_multiplier
             
             return {
                 "scenario": {
@@ -860,6 +966,53 @@ class EnhancedRiskManagementService:
             logger.error(f"❌ Error running stress test: {e}")
             raise
     
+    async def run_stress_grid(self, portfolio_ids: List[str]) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Stress every portfolio against every scenario; impacts per portfolio_id -> scenario_id"""
+        trading_engine = get_trading_engine_service()
+        if not trading_engine:
+            raise ValueError("Trading engine not available")
+        
+        # Exposures in currency from one performance snapshot per portfolio
+        exposures = {}
+        portfolio_values = {}
+        for portfolio_id in portfolio_ids:
+            try:
+                portfolio_performance = await trading_engine.get_portfolio_performance(portfolio_id)
+            except ValueError as e:
+                logger.error(f"❌ Error in stress test for {portfolio_id}: {e}")
+                continue
+            
+            current_allocation = portfolio_performance.get("current_allocation", {})
+            current_value = portfolio_performance.get("total_value", 0)
+            total_weight = sum(current_allocation.values())
+            if not current_allocation or current_value == 0 or total_weight == 0:
+                continue
+            
+            exposures[portfolio_id] = {
+                asset: current_value * weight / total_weight  # Allocation is reported in percent
+                for asset, weight in current_allocation.items()
+            }
+            portfolio_values[portfolio_id] = current_value
+        
+        grid_pnl = self.stress_grid.run(exposures)
+        
+        results = {}
+        for portfolio_id, scenario_pnl in grid_pnl.items():
+            current_value = portfolio_values[portfolio_id]
+            results[portfolio_id] = {
+                scenario_id: {
+                    "original_value": current_value,
+                    "stressed_value": current_value + total_impact,
+                    "total_impact": total_impact,
+                    "impact_percentage": round(total_impact / current_value * 100, 2)
+                }
+                for scenario_id, total_impact in scenario_pnl.items()
+            }
+        
+        self.stress_results.update(results)
+        
+        return results
+    
     def _is_defi_asset(self, asset: str) -> bool:
         """Determine if asset is from DeFi protocol"""
         # Simplified DeFi detection
@@ -883,6 +1036,11 @@ class EnhancedRiskManagementService:
                     "critical_alerts": critical_alerts,
                     "monitoring_interval": f"{self.config['monitoring_interval']} seconds"
                 },
+                "stress_grid": {
+                    **self.stress_grid.stats,
+                    "stressed_portfolios": len(self.stress_results),
+                    "scenarios": len(self.stress_grid.scenarios)
+                },
                 "risk_capabilities": [
                     "Real-time Risk Monitoring",
                     "Dynamic Risk Limit Management",
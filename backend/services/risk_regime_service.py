@@ -412,17 +412,16 @@ Message: {alert.message}"""
     
     async def _send_webhook(self, url: str, message: str, webhook_type: str):
         """Send webhook notification"""
-        import aiohttp
+        from services.http_client_service import get_http_client
         
         if webhook_type == 'slack':
             payload = {"text": message}
         else:
             payload = {"message": message, "subject": "Risk Regime Alert"}
             
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as response:
-                if response.status != 200:
-                    raise Exception(f"Webhook returned status {response.status}")
+        response = await get_http_client().post("alert_webhook", url, json=payload, read=None)
+        if response.status != 200:
+            raise Exception(f"Webhook returned status {response.status}")
     
     async def _get_historical_data(self, eval_date: date, days: int = 50) -> List[Dict]:
         """Get historical regime data for calculations"""
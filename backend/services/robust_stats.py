@@ -0,0 +1,157 @@
+"""
+Leave-One-Out Robust Statistics Kernel
+Sorted-array order statistics for batch market-context calculations
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class LeaveOneOutColumn:
+    """
+    A numeric column where every element is evaluated against all the others.
+
+    Batch services (sanitizer, RAY calculator) compare each pool with the rest
+    of the batch, i.e. with ``values[:i] + values[i+1:]``. Rebuilding and
+    re-sorting that context per element is O(N² log N). Here the column is
+    sorted once; removing the element at sorted rank r shifts every later
+    order statistic down by one, so any order statistic of the remaining
+    values is read by index arithmetic.
+
+    Elements outside ``members`` are evaluated against the full member set
+    (they have nothing to remove). All methods return one value per element,
+    NaN where an element's context is empty.
+    """
+
+    def __init__(self, values: np.ndarray, members: Optional[np.ndarray] = None):
+        values = np.asarray(values, dtype=float)
+        if members is None:
+            members = np.ones(len(values), dtype=bool)
+
+        member_index = np.flatnonzero(members)
+        order = np.argsort(values[member_index], kind="stable")
+
+        self.sorted_values = values[member_index][order]
+        self.count = len(self.sorted_values)
+
+        # Sorted rank of each element's own value; `count` means "nothing removed"
+        self.removed_rank = np.full(len(values), self.count, dtype=np.intp)
+        self.removed_rank[member_index[order]] = np.arange(self.count)
+        self.sizes = self.count - members.astype(np.intp)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def order_statistic(self, k: np.ndarray) -> np.ndarray:
+        """k-th smallest remaining value (0-indexed) for every element"""
+        if self.count == 0:
+            return np.full(len(self), np.nan)
+        k = np.broadcast_to(np.asarray(k, dtype=np.intp), self.sizes.shape)
+        index = np.clip(k + (k >= self.removed_rank), 0, self.count - 1)
+        return np.where((k >= 0) & (k < self.sizes), self.sorted_values[index], np.nan)
+
+    def median(self) -> np.ndarray:
+        """Leave-one-out median, matching statistics.median"""
+        lower = self.order_statistic((self.sizes - 1) // 2)
+        upper = self.order_statistic(self.sizes // 2)
+        return np.where(self.sizes % 2 == 1, upper, (lower + upper) / 2)
+
+    def percentile(self, q: float) -> np.ndarray:
+        """Leave-one-out percentile, matching np.percentile's default linear method"""
+        quantile = np.true_divide(q, 100)
+        virtual_index = (self.sizes - 1) * quantile
+        previous_index = np.floor(virtual_index).astype(np.intp)
+        next_index = np.minimum(previous_index + 1, self.sizes - 1)
+        gamma = virtual_index - previous_index
+
+        previous_values = self.order_statistic(previous_index)
+        next_values = self.order_statistic(next_index)
+
+        # Same two-sided lerp as numpy, for bit-identical results
+        diff = next_values - previous_values
+        return np.where(
+            gamma >= 0.5,
+            next_values - diff * (1 - gamma),
+            previous_values + diff * gamma
+        )
+
+    def median_absolute_deviation(self, medians: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Leave-one-out MAD, matching statistics.median([abs(x - m) for x in context]).
+
+        Around the median m the deviations form two increasing runs: values
+        below m walking left and values at or above m walking right. The k-th
+        smallest deviation is the k-th element of the merge of those runs,
+        found by a binary search over how many come from the left run.
+        """
+        if medians is None:
+            medians = self.median()
+
+        # Number of remaining values strictly below the median
+        below = np.searchsorted(self.sorted_values, medians, side="left")
+        below = below - (self.removed_rank < below)
+
+        lower = self._kth_deviation((self.sizes - 1) // 2, medians, below)
+        upper = self._kth_deviation(self.sizes // 2, medians, below)
+        return np.where(self.sizes % 2 == 1, upper, (lower + upper) / 2)
+
+    def _kth_deviation(self, k: np.ndarray, medians: np.ndarray, below: np.ndarray) -> np.ndarray:
+        """k-th smallest |x - median| over each element's remaining values"""
+        left_length = below
+        right_length = self.sizes - below
+
+        def left(j):
+            return medians - self.order_statistic(below - 1 - j)
+
+        def right(j):
+            return self.order_statistic(below + j) - medians
+
+        # Smallest split `taken` with left[taken] >= right[k - taken]
+        lo = np.maximum(0, k + 1 - right_length)
+        hi = np.minimum(k + 1, left_length)
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            enough = left(mid) >= right(k - mid)
+            hi = np.where(active & enough, mid, hi)
+            lo = np.where(active & ~enough, mid + 1, lo)
+
+        from_left = np.where(lo > 0, left(lo - 1), -np.inf)
+        from_right = np.where(k - lo >= 0, right(k - lo), -np.inf)
+        return np.where(self.sizes > 0, np.maximum(from_left, from_right), np.nan)
+
+    def mean_stdev(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Leave-one-out mean and sample standard deviation"""
+        if self.count == 0:
+            empty = np.full(len(self), np.nan)
+            return empty, empty
+
+        # Shift by the column mean so the running sums do not cancel
+        shift = float(np.mean(self.sorted_values))
+        deviations = self.sorted_values - shift
+        total = np.sum(deviations)
+        total_squares = np.sum(deviations ** 2)
+
+        removed = np.where(
+            self.removed_rank < self.count,
+            deviations[np.minimum(self.removed_rank, self.count - 1)],
+            0.0
+        )
+        sizes = self.sizes.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            remaining = total - removed
+            remaining_squares = total_squares - removed ** 2
+            means = shift + remaining / sizes
+            variances = np.maximum(remaining_squares - remaining ** 2 / sizes, 0.0) / (sizes - 1)
+
+        # The running sums leave a rounding residue when all remaining values are
+        # equal; statistics.mean/stdev are exact there, so match them exactly
+        lowest = self.order_statistic(0)
+        constant = (self.sizes > 0) & (lowest == self.order_statistic(self.sizes - 1))
+        means = np.where(constant, lowest, means)
+        variances = np.where(constant, 0.0, variances)
+
+        return means, np.sqrt(variances)
@@ -0,0 +1,239 @@
+"""
+State Journal for Service Persistence
+Append-only write-ahead journal of keyed record changes with periodic compacted snapshots
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import typing
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+State = Dict[str, Dict[str, Any]]  # kind -> key -> record
+
+def to_record(value: Any) -> Any:
+    """JSON-ready copy of a value: dataclasses become dicts, enums their values, decimals strings"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: to_record(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: to_record(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_record(item) for item in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()  # NumPy scalar
+    return value
+
+def _decode(annotation: Any, value: Any) -> Any:
+    if value is None or annotation is Any:
+        return value
+
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        options = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _decode(options[0], value) if len(options) == 1 else value
+    if origin in (list, List):
+        (item_type,) = typing.get_args(annotation) or (Any,)
+        return [_decode(item_type, item) for item in value]
+    if origin in (dict, Dict):
+        _, item_type = typing.get_args(annotation) or (Any, Any)
+        return {key: _decode(item_type, item) for key, item in value.items()}
+
+    if dataclasses.is_dataclass(annotation):
+        return from_record(annotation, value)
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return annotation(value)
+        if issubclass(annotation, Decimal):
+            return Decimal(str(value))
+        if issubclass(annotation, datetime):
+            return datetime.fromisoformat(value)
+    return value
+
+def from_record(cls: type, record: Dict[str, Any]):
+    """Rebuild a dataclass from `to_record` output, converting fields by their annotations"""
+    hints = typing.get_type_hints(cls)
+    kwargs = {
+        field.name: _decode(hints[field.name], record[field.name])
+        for field in dataclasses.fields(cls)
+        if field.name in record  # Missing fields take their defaults; unknown ones are dropped
+    }
+    return cls(**kwargs)
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+class StateJournal:
+    """
+    Write-ahead journal plus compacted snapshot for one service's state.
+
+    State is a set of kinds (e.g. "orders"), each a map of key -> record. A
+    change is staged with `record()` and made durable with `commit()`, which
+    appends every staged change as one JSON line per change in a single
+    write, so cost is proportional to what changed rather than to history.
+    `snapshot()` atomically replaces `<name>.snapshot.json` with the full
+    state and truncates the journal. `replay()` loads the snapshot and
+    re-applies journal entries newer than it; a torn final line from a crash
+    mid-write, including one cut off right before its newline, is dropped.
+    """
+
+    def __init__(self, directory: Path, name: str, compact_every: int = 10000, fsync: bool = False):
+        self.directory = Path(directory)
+        self.name = name
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.journal_path = self.directory / f"{name}.journal"
+        self.snapshot_path = self.directory / f"{name}.snapshot.json"
+
+        self._file = None
+        self._pending: List[str] = []
+        self._seq = 0
+        self.entries_since_snapshot = 0
+        self.stats = {"commits": 0, "entries_written": 0, "snapshots": 0, "entries_replayed": 0}
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    @property
+    def should_compact(self) -> bool:
+        return self.entries_since_snapshot >= self.compact_every
+
+    def exists(self) -> bool:
+        return self.snapshot_path.exists() or self.journal_path.exists()
+
+    def replay(self) -> State:
+        """Rebuild the last committed state and open the journal for appends"""
+        state: State = {}
+        snapshot_seq = 0
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot.get("seq", 0)
+            state = snapshot.get("state", {})
+
+        self._seq = snapshot_seq
+        replayed, valid_bytes = 0, 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        # A line is complete only with its newline, even if the JSON already parses
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated entry")
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"⚠️ Dropping torn entry at end of {self.journal_path.name}")
+                        break
+                    valid_bytes += len(line)
+                    # Entries at or before the snapshot survive a crash between snapshot and truncate
+                    if entry["seq"] <= snapshot_seq:
+                        continue
+                    self._apply(state, entry)
+                    self._seq = entry["seq"]
+                    replayed += 1
+            if valid_bytes < self.journal_path.stat().st_size:
+                os.truncate(self.journal_path, valid_bytes)
+
+        self.entries_since_snapshot = replayed
+        self.stats["entries_replayed"] += replayed
+        self._open()
+        return state
+
+    @staticmethod
+    def _apply(state: State, entry: Dict[str, Any]):
+        records = state.setdefault(entry["kind"], {})
+        if entry.get("data") is None:
+            records.pop(entry["key"], None)
+        else:
+            records[entry["key"]] = entry["data"]
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+
+    def record(self, kind: str, key: str, value: Any):
+        """Stage an upsert of `key` (or a delete when `value` is None) until the next commit"""
+        self._seq += 1
+        entry = {"seq": self._seq, "kind": kind, "key": key, "data": None if value is None else to_record(value)}
+        self._pending.append(json.dumps(entry, separators=(",", ":"), default=_json_default))
+
+    def commit(self) -> int:
+        """Append staged entries to the journal in one write; returns the number written"""
+        if not self._pending or self._file is None:
+            return 0
+        count = len(self._pending)
+        self._file.write("\n".join(self._pending) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._pending.clear()
+        self.entries_since_snapshot += count
+        self.stats["commits"] += 1
+        self.stats["entries_written"] += count
+        return count
+
+    def snapshot(self, state: Dict[str, Dict[str, Any]]):
+        """Write the full state (objects are converted with `to_record`) and truncate the journal"""
+        self._pending.clear()  # The snapshot supersedes anything staged
+        payload = {
+            "seq": self._seq,
+            "saved_at": datetime.utcnow().isoformat(),
+            "state": {kind: {key: to_record(value) for key, value in records.items()} for kind, records in state.items()},
+        }
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), default=_json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        if self._file is not None:
+            self._file.close()
+        with open(self.journal_path, "w"):
+            pass
+        self._open()
+
+        self.entries_since_snapshot = 0
+        self.stats["snapshots"] += 1
+
+    def close(self):
+        self.commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries_since_snapshot": self.entries_since_snapshot,
+            "journal_bytes": self.journal_path.stat().st_size if self.journal_path.exists() else 0,
+        }
+
+def decode_state(state: State, types: Dict[str, type]) -> Dict[str, Dict[str, Any]]:
+    """Rebuild the dataclasses of each kind in `types`; records that fail to decode are skipped"""
+    decoded: Dict[str, Dict[str, Any]] = {}
+    for kind, cls in types.items():
+        decoded[kind] = {}
+        for key, record in state.get(kind, {}).items():
+            try:
+                decoded[kind][key] = from_record(cls, record)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"❌ Skipping unreadable {kind} record {key}: {e}")
+    return decoded
@@ -0,0 +1,101 @@
+"""
+Stress Grid for Portfolio Stress Testing
+Every portfolio x scenario P&L from one exposure-by-shock matrix multiply,
+cached per (portfolio version, scenario version)
+"""
+
+import hashlib
+import json
+import logging
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def scenario_shock(asset_shocks: Dict[str, float], asset: str, is_defi: bool) -> float:
+    """Shock applied to one asset: its own entry, else "all", else its DeFi/CeFi bucket"""
+    if asset.upper() in asset_shocks:
+        return asset_shocks[asset.upper()]
+    if "all" in asset_shocks:
+        return asset_shocks["all"]
+    if is_defi and "DeFi" in asset_shocks:
+        return asset_shocks["DeFi"]
+    if not is_defi and "CeFi" in asset_shocks:
+        return asset_shocks["CeFi"]
+    return 0.0
+
+def exposure_version(exposures: Dict[str, float]) -> str:
+    """Content version of a portfolio's exposures (cent precision)"""
+    payload = json.dumps(sorted((asset, round(value, 2)) for asset, value in exposures.items()))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+class StressGrid:
+    """
+    Stress P&L for many portfolios against every scenario at once.
+
+    Scenarios are columns of a shock matrix S (assets x scenarios) and stale
+    portfolios are rows of an exposure matrix E (portfolios x assets) in
+    currency, so all P&L is E @ S. Results are cached per portfolio with the
+    portfolio version and the scenario-set version they were computed
+    against; a portfolio is re-stressed only when either changes.
+    """
+
+    def __init__(self, scenarios: List, is_defi: Callable[[str], bool]):
+        self.is_defi = is_defi
+        self._cache: Dict[str, Tuple[Hashable, str, Dict[str, float]]] = {}
+        self.stats = {"runs": 0, "portfolios_computed": 0, "portfolios_cached": 0}
+        self.set_scenarios(scenarios)
+
+    def set_scenarios(self, scenarios: List):
+        self.scenarios = list(scenarios)
+        self.scenario_ids = [scenario.scenario_id for scenario in self.scenarios]
+        payload = json.dumps([[s.scenario_id, s.asset_shocks] for s in self.scenarios], sort_keys=True)
+        self.scenario_version = hashlib.sha1(payload.encode()).hexdigest()
+
+    def shock_matrix(self, assets: List[str]) -> np.ndarray:
+        """Shocks with one row per asset and one column per scenario"""
+        matrix = np.zeros((len(assets), len(self.scenarios)))
+        for row, asset in enumerate(assets):
+            is_defi = self.is_defi(asset)
+            for column, scenario in enumerate(self.scenarios):
+                matrix[row, column] = scenario_shock(scenario.asset_shocks, asset, is_defi)
+        return matrix
+
+    def run(self, exposures: Dict[str, Dict[str, float]],
+            versions: Optional[Dict[str, Hashable]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        P&L per scenario id for each portfolio in `exposures` (asset -> value in currency).
+
+        `versions` overrides the content version of a portfolio's exposures
+        (e.g. an update counter); unchanged portfolios are served from cache.
+        """
+        versions = versions or {}
+        current = {
+            portfolio_id: versions.get(portfolio_id) or exposure_version(portfolio_exposures)
+            for portfolio_id, portfolio_exposures in exposures.items()
+        }
+        stale = [
+            portfolio_id for portfolio_id, version in current.items()
+            if self._cache.get(portfolio_id, (None, None))[:2] != (version, self.scenario_version)
+        ]
+
+        if stale:
+            assets = sorted({asset for portfolio_id in stale for asset in exposures[portfolio_id]})
+            column = {asset: index for index, asset in enumerate(assets)}
+            exposure_matrix = np.zeros((len(stale), len(assets)))
+            for row, portfolio_id in enumerate(stale):
+                for asset, value in exposures[portfolio_id].items():
+                    exposure_matrix[row, column[asset]] = value
+
+            pnl = exposure_matrix @ self.shock_matrix(assets)
+
+            for row, portfolio_id in enumerate(stale):
+                self._cache[portfolio_id] = (
+                    current[portfolio_id], self.scenario_version, dict(zip(self.scenario_ids, pnl[row].tolist()))
+                )
+
+        self.stats["runs"] += 1
+        self.stats["portfolios_computed"] += len(stale)
+        self.stats["portfolios_cached"] += len(exposures) - len(stale)
+        return {portfolio_id: self._cache[portfolio_id][2] for portfolio_id in exposures}
@@ -5,6 +5,7 @@ Composes institutional-grade StableYield Index using Risk-Adjusted Yields with T
 
 import statistics
 import math
+import numpy as np
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
@@ -94,6 +95,11 @@ class SYICompositor:
         # Step 4: Apply weight caps and diversification requirements
         final_constituents = self._apply_weight_caps(weighted_constituents)
         
+        # Steps 5-7: Index value, quality metrics, breakdown and final composition
+        return self._build_composition(final_constituents, ray_results)
+    
+    def _build_composition(self, final_constituents: List[SYIConstituent], ray_results: List[RAYResult]) -> SYIComposition:
+        """Calculate the index value, quality metrics and breakdown of the final constituents"""
         # Step 5: Calculate final index value
         index_value = self._calculate_index_value(final_constituents)
         
@@ -121,27 +127,36 @@ class SYICompositor:
                                 yield_data: List[Dict[str, Any]], 
                                 ray_results: List[RAYResult]) -> List[Tuple[Dict[str, Any], RAYResult]]:
         """Apply inclusion criteria to filter eligible constituents"""
+        eligible = [
+            (yield_item, ray_result) for yield_item, ray_result in zip(yield_data, ray_results)
+            if self._is_eligible(yield_item, ray_result, self._extract_tvl(yield_item))
+        ]
+        return self._limit_constituents(eligible)
+    
+    def _is_eligible(self, yield_item: Dict[str, Any], ray_result: RAYResult, tvl_usd: float) -> bool:
+        """Check a single yield against the inclusion criteria"""
         config = self.config["inclusion_criteria"]
-        eligible = []
         
-        for yield_item, ray_result in zip(yield_data, ray_results):
-            # Check minimum confidence score
-            if ray_result.confidence_score < config["min_confidence_score"]:
-                logger.debug(f"Excluding {yield_item.get('stablecoin', 'Unknown')} - low confidence: {ray_result.confidence_score:.2f}")
-                continue
-            
-            # Check minimum TVL
-            tvl_usd = self._extract_tvl(yield_item)
-            if tvl_usd < config["min_tvl_usd"]:
-                logger.debug(f"Excluding {yield_item.get('stablecoin', 'Unknown')} - low TVL: ${tvl_usd:,.0f}")
-                continue
-            
-            # Check if RAY is positive and reasonable
-            if ray_result.risk_adjusted_yield <= 0 or ray_result.risk_adjusted_yield > 100:
-                logger.debug(f"Excluding {yield_item.get('stablecoin', 'Unknown')} - invalid RAY: {ray_result.risk_adjusted_yield:.2f}%")
-                continue
-            
-            eligible.append((yield_item, ray_result))
+        # Check minimum confidence score
+        if ray_result.confidence_score < config["min_confidence_score"]:
+            logger.debug(f"Excluding {yield_item.get('stablecoin', 'Unknown')} - low confidence: {ray_result.confidence_score:.2f}")
+            return False
+        
+        # Check minimum TVL
+        if tvl_usd < config["min_tvl_usd"]:
+            logger.debug(f"Excluding {yield_item.get('stablecoin', 'Unknown')} - low TVL: ${tvl_usd:,.0f}")
+            return False
+        
+        # Check if RAY is positive and reasonable
+        if ray_result.risk_adjusted_yield <= 0 or ray_result.risk_adjusted_yield > 100:
+            logger.debug(f"Excluding {yield_item.get('stablecoin', 'Unknown')} - invalid RAY: {ray_result.risk_adjusted_yield:.2f}%")
+            return False
+        
+        return True
+    
+    def _limit_constituents(self, eligible: List[Tuple]) -> List[Tuple]:
+        """Keep the top constituents by RAY * confidence (tuples carry the RAYResult second)"""
+        config = self.config["inclusion_criteria"]
         
         # Apply maximum constituents limit
         if len(eligible) > config["max_constituents"]:
@@ -188,32 +203,35 @@ class SYICompositor:
                 confidence_weight = confidence / sum(confidence_scores) if sum(confidence_scores) > 0 else base_weight
                 base_weight = (base_weight * 0.7) + (confidence_weight * 0.3)
             
-            # Create constituent
-            constituent = SYIConstituent(
-                stablecoin=yield_item.get('stablecoin', yield_item.get('canonical_stablecoin_id', 'Unknown')),
-                protocol=yield_item.get('source', yield_item.get('canonical_protocol_id', 'Unknown')),
-                weight=base_weight,
-                ray=ray_result.risk_adjusted_yield,
-                base_apy=ray_result.base_apy,
-                risk_penalty=ray_result.risk_penalty,
-                tvl_usd=tvl_usd,
-                confidence_score=ray_result.confidence_score,
-                metadata={
-                    'ray_breakdown': ray_result.breakdown,
-                    'risk_factors': {
-                        'peg_stability': ray_result.risk_factors.peg_stability_score,
-                        'liquidity': ray_result.risk_factors.liquidity_score,
-                        'counterparty': ray_result.risk_factors.counterparty_score,
-                        'protocol_reputation': ray_result.risk_factors.protocol_reputation,
-                        'temporal_stability': ray_result.risk_factors.temporal_stability
-                    },
-                    'original_yield_data': yield_item
-                }
-            )
+            constituent = self._make_constituent(yield_item, ray_result, tvl_usd, base_weight)
             constituents.append(constituent)
         
         return constituents
     
+    def _make_constituent(self, yield_item: Dict[str, Any], ray_result: RAYResult, tvl_usd: float, weight: float) -> SYIConstituent:
+        """Create a constituent from its yield data and RAY result"""
+        return SYIConstituent(
+            stablecoin=yield_item.get('stablecoin', yield_item.get('canonical_stablecoin_id', 'Unknown')),
+            protocol=yield_item.get('source', yield_item.get('canonical_protocol_id', 'Unknown')),
+            weight=weight,
+            ray=ray_result.risk_adjusted_yield,
+            base_apy=ray_result.base_apy,
+            risk_penalty=ray_result.risk_penalty,
+            tvl_usd=tvl_usd,
+            confidence_score=ray_result.confidence_score,
+            metadata={
+                'ray_breakdown': ray_result.breakdown,
+                'risk_factors': {
+                    'peg_stability': ray_result.risk_factors.peg_stability_score,
+                    'liquidity': ray_result.risk_factors.liquidity_score,
+                    'counterparty': ray_result.risk_factors.counterparty_score,
+                    'protocol_reputation': ray_result.risk_factors.protocol_reputation,
+                    'temporal_stability': ray_result.risk_factors.temporal_stability
+                },
+                'original_yield_data': yield_item
+            }
+        )
+    
     def _apply_weight_caps(self, constituents: List[SYIConstituent]) -> List[SYIConstituent]:
         """Apply weight caps and diversification requirements"""
         config = self.config["weighting_methodology"]
@@ -455,4 +473,155 @@ class SYICompositor:
             "rebalancing": "continuous_with_thresholds",
             "config": self.config,
             "last_updated": datetime.utcnow().isoformat()
-        }
\ No newline at end of file
+        }
+
+class IncrementalSYICompositor(SYICompositor):
+    """
+    SYICompositor that keeps per-pool state between compositions.
+
+    Pools are matched across calls by pool_id (or stablecoin and protocol) and
+    compared by the fingerprint of the fields RAY and TVL extraction read.
+    Only pools whose inputs changed, or whose leave-one-out market median
+    moved, get their RAY and eligibility recomputed. Weights and caps only
+    depend on the selected constituents' TVL, confidence and protocol, so the
+    capped weights are reused while those are unchanged. Results are
+    identical to SYICompositor.compose_syi on the same yield data.
+
+    Call reset() after changing the config.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.reset()
+    
+    def reset(self):
+        """Drop all cached state; the next composition is a full recompute"""
+        self._row_of: Dict[Any, int] = {}
+        self._fingerprints: List[Tuple] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._tvl = np.empty(0)
+        self._medians = np.empty(0)
+        self._ray_results: List[RAYResult] = []
+        self._eligible: List[bool] = []
+        self._weight_key: Optional[Tuple] = None
+        self._capped_weights: List[Tuple[int, float]] = []
+        self.last_update: Dict[str, Any] = {}
+    
+    def _pool_keys(self, yield_data: List[Dict[str, Any]]) -> List[Tuple]:
+        """Stable key per pool; repeated keys are told apart by occurrence"""
+        occurrences = {}
+        keys = []
+        for yield_item in yield_data:
+            pool = yield_item.get('pool_id') or (
+                yield_item.get('stablecoin', yield_item.get('canonical_stablecoin_id')),
+                yield_item.get('source', yield_item.get('canonical_protocol_id'))
+            )
+            occurrence = occurrences.get(pool, 0)
+            occurrences[pool] = occurrence + 1
+            keys.append((pool, occurrence))
+        return keys
+    
+    def _fingerprint(self, yield_item: Dict[str, Any]) -> Tuple:
+        # RAY inputs plus the liquidity string read by _extract_tvl
+        return self.ray_calculator.input_fingerprint(yield_item) + (yield_item.get('liquidity'),)
+    
+    def compose_syi(self, yield_data: List[Dict[str, Any]]) -> SYIComposition:
+        """
+        Compose the StableYield Index, recomputing only what changed since the last call
+        """
+        logger.info(f"Composing SYI from {len(yield_data)} yield sources (incremental)")
+        
+        n = len(yield_data)
+        keys = self._pool_keys(yield_data)
+        fingerprints = [self._fingerprint(yield_item) for yield_item in yield_data]
+        
+        # Step 1: Match pools with the previous call; a changed fingerprint counts as a new pool
+        previous_rows = np.array([
+            row if row >= 0 and self._fingerprints[row] == fingerprint else -1
+            for row, fingerprint in ((self._row_of.get(key, -1), fingerprint) for key, fingerprint in zip(keys, fingerprints))
+        ], dtype=np.intp)
+        reused = previous_rows >= 0
+        changed = np.flatnonzero(~reused)
+        
+        # Step 2: Input columns, parsing only the changed pools
+        changed_items = [yield_data[i] for i in changed]
+        fresh_columns = self.ray_calculator._ray_input_columns(changed_items)
+        columns = {}
+        for name, fresh in fresh_columns.items():
+            column = np.empty(n)
+            column[reused] = self._columns[name][previous_rows[reused]] if self._columns else []
+            column[changed] = fresh
+            columns[name] = column
+        tvl = np.empty(n)
+        tvl[reused] = self._tvl[previous_rows[reused]]
+        tvl[changed] = [self._extract_tvl(yield_item) for yield_item in changed_items]
+        
+        # Step 3: RAY for changed pools and pools whose market context median moved
+        medians = self.ray_calculator._context_medians(columns["current_yield"])
+        previous_medians = np.full(n, np.nan)
+        previous_medians[reused] = self._medians[previous_rows[reused]]
+        same_median = (medians == previous_medians) | (np.isnan(medians) & np.isnan(previous_medians))
+        stale = np.flatnonzero(~reused | ~same_median)
+        
+        stale_results = self.ray_calculator._ray_results_from_columns(
+            [yield_data[i] for i in stale],
+            {name: column[stale] for name, column in columns.items()},
+            medians[stale],
+            market_context_size=n - 1
+        ) if len(stale) else []
+        
+        ray_results = [None] * n
+        eligible = [False] * n
+        for i in np.flatnonzero(reused).tolist():
+            ray_results[i] = self._ray_results[previous_rows[i]]
+            ray_results[i].metadata["market_context_size"] = n - 1
+            eligible[i] = self._eligible[previous_rows[i]]
+        
+        # Step 4: Inclusion criteria for the recomputed pools
+        for i, ray_result in zip(stale.tolist(), stale_results):
+            ray_results[i] = ray_result
+            eligible[i] = self._is_eligible(yield_data[i], ray_result, float(tvl[i]))
+        
+        selected = self._limit_constituents([
+            (yield_data[i], ray_results[i], i) for i in range(n) if eligible[i]
+        ])
+        selected_rows = [row for _, _, row in selected]
+        selected = [(yield_item, ray_result) for yield_item, ray_result, _ in selected]
+        
+        # Step 5: Weights and caps, reused while their inputs are unchanged
+        weight_key = tuple(
+            (keys[row], float(tvl[row]), ray_results[row].confidence_score,
+             yield_data[row].get('source', yield_data[row].get('canonical_protocol_id', 'Unknown')))
+            for row in selected_rows
+        )
+        weights_reused = weight_key == self._weight_key
+        if weights_reused:
+            final_constituents = [
+                self._make_constituent(selected[position][0], selected[position][1],
+                                       float(tvl[selected_rows[position]]), weight)
+                for position, weight in self._capped_weights
+            ]
+        else:
+            weighted_constituents = self._calculate_weights(selected)
+            positions = {id(c): position for position, c in enumerate(weighted_constituents)}
+            final_constituents = self._apply_weight_caps(weighted_constituents)
+            self._capped_weights = [(positions[id(c)], c.weight) for c in final_constituents]
+            self._weight_key = weight_key
+        
+        # Keep state for the next call
+        self._row_of = {key: i for i, key in enumerate(keys)}
+        self._fingerprints = fingerprints
+        self._columns = columns
+        self._tvl = tvl
+        self._medians = medians
+        self._ray_results = ray_results
+        self._eligible = eligible
+        self.last_update = {
+            "pools": n,
+            "changed_pools": len(changed),
+            "recomputed_rays": len(stale),
+            "weights_reused": weights_reused
+        }
+        
+        # Steps 6-8: Index value, quality metrics, breakdown and final composition
+        return self._build_composition(final_constituents, ray_results)
@@ -0,0 +1,138 @@
+"""
+Tick Store for Real-Time Market Data
+Per-symbol fixed-capacity ring buffers of parallel NumPy columns
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Column layouts used by RealTimeDataIntegrator
+PRICE_FIELDS = ("price", "volume_24h")
+ORDERBOOK_FIELDS = ("bid_price", "bid_quantity", "ask_price", "ask_quantity")
+
+def to_epoch_ns(timestamp: datetime) -> int:
+    """Epoch nanoseconds of a naive-UTC or aware datetime (exact to the microsecond)"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - EPOCH) // _MICROSECOND * 1000
+
+class TickSeries:
+    """
+    Time-ordered ticks of one symbol, bounded to `capacity`.
+
+    Storage is an int64 timestamp column plus one float64 row per field,
+    preallocated at 2 x capacity. Ticks are appended at the end; when the end
+    is reached the newest `capacity` ticks are moved back to the front, so the
+    live window is always one contiguous slice and window queries can return
+    views instead of copies. Appending a tick allocates nothing.
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str]):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        size = 2 * capacity
+        self._timestamps = np.zeros(size, dtype=np.int64)
+        self._values = np.full((len(self.fields), size), np.nan)
+        self._rows = {field: row for row, field in enumerate(self.fields)}
+        self._start = 0
+        self._end = 0
+        self._last_timestamp = None  # Python int copy of the newest timestamp (cheaper than reading the array)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def _compact(self):
+        """Move the live window to the front of the columns"""
+        count = len(self)
+        self._timestamps[:count] = self._timestamps[self._start:self._end]
+        self._values[:, :count] = self._values[:, self._start:self._end]
+        self._start, self._end = 0, count
+
+    def append(self, timestamp_ns: int, values: Sequence[float]):
+        """Add a tick (values in field order), evicting the oldest once capacity is reached"""
+        if self._end == len(self._timestamps):
+            self._compact()
+
+        position = self._end
+        if self._last_timestamp is None or timestamp_ns >= self._last_timestamp:
+            self._last_timestamp = timestamp_ns
+        elif position > self._start:
+            # Late tick: shift newer ticks right to keep the columns time-ordered
+            position = self._start + int(np.searchsorted(self.timestamps_ns, timestamp_ns, side="right"))
+            self._timestamps[position + 1:self._end + 1] = self._timestamps[position:self._end]
+            self._values[:, position + 1:self._end + 1] = self._values[:, position:self._end]
+
+        self._timestamps[position] = timestamp_ns
+        self._values[:, position] = values
+        self._end += 1
+
+        if len(self) > self.capacity:
+            self._start += 1
+
+    @property
+    def timestamps_ns(self) -> np.ndarray:
+        return self._timestamps[self._start:self._end]
+
+    def column(self, field: str) -> np.ndarray:
+        return self._values[self._rows[field], self._start:self._end]
+
+    def window(self, since_ns: int) -> Dict[str, np.ndarray]:
+        """
+        Views of the ticks at or after `since_ns`, keyed by field plus 'timestamp_ns'.
+
+        The views share memory with the series: use them before the next
+        append, or copy them.
+        """
+        offset = self._start + int(np.searchsorted(self.timestamps_ns, since_ns, side="left"))
+        window = {field: self._values[row, offset:self._end] for field, row in self._rows.items()}
+        window['timestamp_ns'] = self._timestamps[offset:self._end]
+        return window
+
+    @property
+    def allocated_bytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+class TickStore:
+    """Per-symbol TickSeries sharing one column layout"""
+
+    def __init__(self, capacity_per_symbol: int, fields: Sequence[str]):
+        self.capacity_per_symbol = capacity_per_symbol
+        self.fields = tuple(fields)
+        self.series: Dict[str, TickSeries] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.series
+
+    def keys(self):
+        return self.series.keys()
+
+    def append(self, symbol: str, timestamp_ns: int, *values: float):
+        series = self.series.get(symbol)
+        if series is None:
+            series = self.series[symbol] = TickSeries(self.capacity_per_symbol, self.fields)
+        series.append(timestamp_ns, values)
+
+    def count(self, symbol: str) -> int:
+        series = self.series.get(symbol)
+        return len(series) if series is not None else 0
+
+    def window(self, symbol: str, since_ns: int) -> Optional[Dict[str, np.ndarray]]:
+        """Zero-copy window of one symbol's ticks, or None for an unknown symbol"""
+        series = self.series.get(symbol)
+        return series.window(since_ns) if series is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "symbols": len(self.series),
+            "ticks": sum(len(series) for series in self.series.values()),
+            "capacity_per_symbol": self.capacity_per_symbol,
+            "allocated_bytes": sum(series.allocated_bytes for series in self.series.values())
+        }
@@ -7,19 +7,23 @@ import asyncio
 import logging
 import uuid
 import time
+from collections import Counter
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import json
 from pathlib import Path
 import aiohttp
 from decimal import Decimal, ROUND_HALF_UP
 
-from .yield_aggregator import YieldAggregator
+from .yield_aggregator import get_yield_aggregator
 from .ray_calculator import RAYCalculator
 from .syi_compositor import SYICompositor
 from .ml_insights_service import get_ml_insights_service
+from .order_book import OrderBook, Fill, TIME_IN_FORCE
+from .state_journal import StateJournal, decode_state, from_record
+from .record_index import RecordIndex
 
 logger = logging.getLogger(__name__)
 
@@ -146,7 +150,7 @@ class TradingEngineService:
     
     def __init__(self):
         # Core services
-        self.yield_aggregator = YieldAggregator()
+        self.yield_aggregator = get_yield_aggregator()
         self.ray_calculator = RAYCalculator()
         self.syi_compositor = SYICompositor()
         
@@ -158,6 +162,15 @@ class TradingEngineService:
         self.portfolios: Dict[str, Portfolio] = {}
         self.rebalance_strategies: Dict[str, RebalanceStrategy] = {}
         
+        # Secondary indexes, maintained on write so client-scoped views never scan all records
+        self.order_index = RecordIndex()  # By client, symbol and created_at bucket
+        self.trade_index = RecordIndex()  # By client, symbol and executed_at bucket
+        self.positions_by_client: Dict[str, Dict[str, str]] = {}  # client_id -> symbol -> position key
+        self.portfolios_by_client: Dict[str, List[str]] = {}
+        self.order_status_counts: Counter = Counter()
+        self.trade_status_counts: Counter = Counter()
+        self.unsettled_trades: Dict[str, None] = {}  # Executed trade ids, oldest first
+        
         # Exchange connections (simulated)
         self.exchange_connections = {
             "binance": {"connected": True, "latency": 0.05},
@@ -169,7 +182,10 @@ class TradingEngineService:
         
         # Market data cache
         self.market_prices: Dict[str, Decimal] = {}
-        self.order_books: Dict[str, Dict[str, Any]] = {}
+        self.order_books: Dict[str, Dict[str, Any]] = {}  # Top of book per symbol
+        
+        # Matching engine: one price-time priority book per trading pair
+        self.matching_books: Dict[str, OrderBook] = {}
         
         # Risk management
         self.risk_limits = {
@@ -189,6 +205,12 @@ class TradingEngineService:
                 "execution_timeout": 30,  # seconds
                 "max_slippage": 0.005  # 50 basis points
             },
+            "liquidity": {
+                "synthetic_quotes": True,  # Quote a ladder around the market price into each book
+                "levels": 5,
+                "quote_size": Decimal('1000000'),
+                "level_spacing": Decimal('0.0001')
+            },
             "risk": {
                 "pre_trade_checks": True,
                 "position_limits": True,
@@ -200,12 +222,21 @@ class TradingEngineService:
                 "max_rebalance_frequency": "daily",
                 "transaction_cost_threshold": 0.002,  # 20 basis points
                 "drift_tolerance": 0.05  # 5%
+            },
+            "persistence": {
+                "compact_every": 10000,  # Journal entries between snapshots
+                "fsync": False  # fsync each commit (flush-only survives process crashes, not power loss)
             }
         }
         
-        # Data storage
+        # Data storage: write-ahead journal of order/trade/position changes plus compacted snapshots
         self.trading_dir = Path("/app/data/trading")
         self.trading_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = StateJournal(
+            self.trading_dir, "trading",
+            compact_every=self.config["persistence"]["compact_every"],
+            fsync=self.config["persistence"]["fsync"]
+        )
         
         # Background tasks
         self.is_running = False
@@ -228,10 +259,12 @@ class TradingEngineService:
         # Initialize market data
         await self._initialize_market_data()
         
+        # Re-enter loaded working orders into the books
+        await self._restore_working_orders()
+        
         # Start background tasks
         self.background_tasks = [
             asyncio.create_task(self._market_data_updater()),
-            asyncio.create_task(self._order_processor()),
             asyncio.create_task(self._position_manager()),
             asyncio.create_task(self._rebalance_scheduler()),
             asyncio.create_task(self._risk_monitor()),
@@ -255,6 +288,7 @@ class TradingEngineService:
         
         # Save data
         await self._save_trading_data()
+        self.journal.close()
         
         logger.info("🛑 Advanced Trading Engine Service stopped")
     
@@ -289,6 +323,7 @@ class TradingEngineService:
             )
             
             self.trading_pairs[symbol] = trading_pair
+            self.matching_books[symbol] = OrderBook(symbol)
         
         logger.info(f"📈 Initialized {len(self.trading_pairs)} trading pairs")
     
@@ -311,22 +346,15 @@ class TradingEngineService:
             self.market_prices[symbol] = price
             
             # Initialize order book
-            self.order_books[symbol] = {
-                "bid": price - Decimal('0.0001'),
-                "ask": price + Decimal('0.0001'),
-                "bid_size": Decimal('50000'),
-                "ask_size": Decimal('50000'),
-                "spread": Decimal('0.0002'),
-                "timestamp": datetime.utcnow()
-            }
+            await self._refresh_synthetic_quotes(symbol)
         
         logger.info(f"💹 Initialized market data for {len(self.market_prices)} symbols")
     
     # Order Management
     async def create_order(self, client_id: str, symbol: str, side: str, order_type: str, 
                           quantity: Decimal, price: Optional[Decimal] = None, 
-                          stop_price: Optional[Decimal] = None) -> Order:
-        """Create a new trading order"""
+                          stop_price: Optional[Decimal] = None, time_in_force: str = "GTC") -> Order:
+        """Create a new trading order and match it against the pair's order book"""
         
         # Validate trading pair
         if symbol not in self.trading_pairs:
@@ -341,6 +369,16 @@ class TradingEngineService:
         if quantity > trading_pair.max_order_size:
             raise ValueError(f"Order size {quantity} exceeds maximum {trading_pair.max_order_size}")
         
+        time_in_force = time_in_force.upper()
+        if time_in_force not in TIME_IN_FORCE:
+            raise ValueError(f"Unsupported time in force: {time_in_force}")
+        
+        if order_type.lower() == OrderType.LIMIT.value:
+            if price is None or price <= 0:
+                raise ValueError("Limit orders require a positive price")
+            # Snap to the pair's price precision so equal prices share one book level
+            price = price.quantize(Decimal('0.1') ** trading_pair.price_precision, rounding=ROUND_HALF_UP)
+        
         # Pre-trade risk checks
         if self.config["risk"]["pre_trade_checks"]:
             await self._validate_pre_trade_risk(client_id, symbol, side, quantity, price)
@@ -360,15 +398,17 @@ class TradingEngineService:
             status=OrderStatus.PENDING,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
-            remaining_quantity=quantity
+            remaining_quantity=quantity,
+            time_in_force=time_in_force
         )
         
         self.orders[order_id] = order
+        self._index_order(order)
         
         logger.info(f"📋 Created order {order_id}: {side} {quantity} {symbol} @ {price or 'market'}")
         
-        # Queue for execution
-        await self._queue_order_for_execution(order)
+        await self._execute_order(order)
+        await self._commit_journal()
         
         return order
     
@@ -377,7 +417,7 @@ class TradingEngineService:
         """Validate pre-trade risk limits"""
         
         # Check position limits
-        current_positions = [p for p in self.positions.values() if p.client_id == client_id]
+        current_positions = self.get_client_positions(client_id)
         
         if side == "buy":
             # Check if buy would exceed concentration limit
@@ -396,78 +436,161 @@ class TradingEngineService:
         
         logger.debug(f"✅ Pre-trade risk checks passed for {client_id}")
     
-    async def _queue_order_for_execution(self, order: Order):
-        """Queue order for execution processing"""
-        # In a real system, this would send to execution queue
-        # For simulation, we'll process immediately in background
-        asyncio.create_task(self._execute_order(order))
-    
     async def _execute_order(self, order: Order):
-        """Execute a trading order"""
+        """Match an order against its book; unfilled limit (GTC) quantity rests in the book"""
+        book = self.matching_books[order.symbol]
+        
+        if order.order_type == OrderType.LIMIT:
+            limit_price, time_in_force = order.price, order.time_in_force
+        else:
+            # Market, stop and take-profit orders take liquidity immediately and never rest
+            limit_price, time_in_force = None, "IOC"
+        
         try:
-            order.status = OrderStatus.OPEN
-            order.updated_at = datetime.utcnow()
-            
-            # Get current market price
-            current_price = self.market_prices[order.symbol]
-            
-            # Determine execution price
-            if order.order_type == OrderType.MARKET:
-                execution_price = current_price
-            elif order.order_type == OrderType.LIMIT:
-                if order.side == OrderSide.BUY and order.price >= current_price:
-                    execution_price = min(order.price, current_price)
-                elif order.side == OrderSide.SELL and order.price <= current_price:
-                    execution_price = max(order.price, current_price)
-                else:
-                    # Limit not reached, keep order open
-                    return
-            else:
-                execution_price = current_price
-            
-            # Simulate execution delay
-            await asyncio.sleep(0.1)
-            
-            # Calculate trading fees
-            trading_pair = self.trading_pairs[order.symbol]
-            commission = order.quantity * execution_price * trading_pair.taker_fee
-            
-            # Create trade record
-            trade_id = f"trade_{int(time.time())}_{uuid.uuid4().hex[:8]}"
-            
-            trade = Trade(
-                trade_id=trade_id,
-                order_id=order.order_id,
-                client_id=order.client_id,
-                symbol=order.symbol,
-                side=order.side,
-                quantity=order.quantity,
-                price=execution_price,
-                commission=commission,
-                commission_asset="USD",
-                executed_at=datetime.utcnow(),
-                status=TradeStatus.EXECUTED,
-                exchange="synthetic"
-            )
-            
-            self.trades[trade_id] = trade
-            
-            # Update order status
-            order.status = OrderStatus.FILLED
-            order.filled_quantity = order.quantity
-            order.remaining_quantity = Decimal('0')
-            order.average_price = execution_price
-            order.updated_at = datetime.utcnow()
-            
-            # Update or create position
-            await self._update_position(trade)
-            
-            logger.info(f"✅ Executed trade {trade_id}: {order.side.value} {order.quantity} {order.symbol} @ {execution_price}")
-            
-        except Exception as e:
+            fills = book.submit(order.order_id, order.client_id, order.side.value,
+                                order.remaining_quantity, limit_price, time_in_force)
+        except ValueError as e:
             logger.error(f"❌ Order execution failed {order.order_id}: {e}")
-            order.status = OrderStatus.REJECTED
-            order.updated_at = datetime.utcnow()
+            self._set_order_status(order, OrderStatus.REJECTED)
+            self._journal("orders", order.order_id, order)
+            return
+        
+        if order.status == OrderStatus.PENDING:
+            self._set_order_status(order, OrderStatus.OPEN)
+        
+        await self._process_fills(fills)
+        
+        if order.remaining_quantity and order.order_id not in book:
+            # IOC/FOK/market remainder is cancelled rather than rested
+            self._set_order_status(order, OrderStatus.CANCELLED)
+        
+        self._journal("orders", order.order_id, order)
+        self._sync_top_of_book(order.symbol)
+        
+        if fills:
+            logger.info(f"✅ Executed {order.order_id} in {len(fills)} fills: {order.side.value} "
+                        f"{order.filled_quantity} {order.symbol} @ {order.average_price} ({order.status.value})")
+    
+    async def _process_fills(self, fills: List[Fill]):
+        """Record both sides of each fill; synthetic liquidity has no order or position records"""
+        for fill in fills:
+            taker = self.orders.get(fill.taker_order_id)
+            if taker is not None:
+                await self._apply_fill(taker, fill, self.trading_pairs[taker.symbol].taker_fee)
+            maker = self.orders.get(fill.maker_order_id)
+            if maker is not None:
+                await self._apply_fill(maker, fill, self.trading_pairs[maker.symbol].maker_fee)
+    
+    async def _apply_fill(self, order: Order, fill: Fill, fee_rate: Decimal):
+        """Update an order with one fill and book the resulting trade and position"""
+        filled_quantity = order.filled_quantity + fill.quantity
+        if order.average_price is None or not order.filled_quantity:
+            order.average_price = fill.price
+        else:
+            order.average_price = (order.average_price * order.filled_quantity + fill.price * fill.quantity) / filled_quantity
+        order.filled_quantity = filled_quantity
+        order.remaining_quantity = order.quantity - filled_quantity
+        self._set_order_status(order, OrderStatus.PARTIALLY_FILLED if order.remaining_quantity else OrderStatus.FILLED)
+        
+        trade_id = f"trade_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        trade = Trade(
+            trade_id=trade_id,
+            order_id=order.order_id,
+            client_id=order.client_id,
+            symbol=order.symbol,
+            side=order.side,
+            quantity=fill.quantity,
+            price=fill.price,
+            commission=fill.quantity * fill.price * fee_rate,
+            commission_asset="USD",
+            executed_at=datetime.utcnow(),
+            status=TradeStatus.EXECUTED,
+            exchange="synthetic"
+        )
+        
+        self.trades[trade_id] = trade
+        self._index_trade(trade)
+        self._journal("orders", order.order_id, order)
+        self._journal("trades", trade_id, trade)
+        
+        await self._update_position(trade)
+    
+    async def cancel_order(self, order_id: str, client_id: Optional[str] = None) -> Order:
+        """Cancel the unfilled quantity of a resting order"""
+        order = self.orders.get(order_id)
+        if order is None or (client_id is not None and order.client_id != client_id):
+            raise ValueError(f"Order {order_id} not found")
+        
+        if self.matching_books[order.symbol].cancel(order_id) is None:
+            raise ValueError(f"Order {order_id} is not open (status: {order.status.value})")
+        
+        self._set_order_status(order, OrderStatus.CANCELLED)
+        self._journal("orders", order_id, order)
+        await self._commit_journal()
+        self._sync_top_of_book(order.symbol)
+        
+        logger.info(f"🚫 Cancelled order {order_id}: {order.remaining_quantity} {order.symbol} unfilled")
+        
+        return order
+    
+    async def _restore_working_orders(self):
+        """Re-submit loaded orders that were pending or resting when the engine stopped"""
+        working = [
+            order for order in self.orders.values()
+            if order.status in [OrderStatus.PENDING, OrderStatus.OPEN, OrderStatus.PARTIALLY_FILLED]
+            and order.symbol in self.matching_books
+        ]
+        
+        for order in sorted(working, key=lambda o: o.created_at):
+            if order.remaining_quantity is None:
+                order.remaining_quantity = order.quantity - order.filled_quantity
+            await self._execute_order(order)
+        
+        await self._commit_journal()
+        
+        if working:
+            logger.info(f"📚 Restored {len(working)} working orders into the order books")
+    
+    async def _refresh_synthetic_quotes(self, symbol: str):
+        """Replace the synthetic liquidity ladder around the current market price"""
+        book = self.matching_books[symbol]
+        liquidity = self.config["liquidity"]
+        
+        if liquidity["synthetic_quotes"]:
+            price = self.market_prices[symbol]
+            for level in range(liquidity["levels"]):
+                offset = Decimal('0.0001') + liquidity["level_spacing"] * level
+                for side, quote_price in (("buy", price - offset), ("sell", price + offset)):
+                    quote_id = f"quote_{symbol}_{side}_{level}"
+                    book.cancel(quote_id)
+                    quote_price = quote_price.quantize(
+                        Decimal('0.1') ** self.trading_pairs[symbol].price_precision,
+                        rounding=ROUND_HALF_UP
+                    )
+                    # A moving quote can cross resting client orders: those fill as makers
+                    fills = book.submit(quote_id, "synthetic_liquidity", side, liquidity["quote_size"], quote_price)
+                    await self._process_fills(fills)
+            await self._commit_journal()
+        
+        self._sync_top_of_book(symbol)
+    
+    def _sync_top_of_book(self, symbol: str):
+        """Mirror the matching book's best levels into the market data cache"""
+        book = self.matching_books[symbol]
+        top = book.depth(levels=1)
+        price = self.market_prices.get(symbol, Decimal('1'))
+        bid, bid_size = (top["bids"][0][0], top["bids"][0][1]) if top["bids"] else (price, Decimal('0'))
+        ask, ask_size = (top["asks"][0][0], top["asks"][0][1]) if top["asks"] else (price, Decimal('0'))
+        
+        self.order_books[symbol] = {
+            "bid": bid,
+            "ask": ask,
+            "bid_size": bid_size,
+            "ask_size": ask_size,
+            "spread": ask - bid,
+            "resting_orders": len(book),
+            "timestamp": datetime.utcnow()
+        }
     
     async def _update_position(self, trade: Trade):
         """Update client position after trade execution"""
@@ -509,9 +632,73 @@ class TradingEngineService:
             )
             
             self.positions[position_key] = position
+            self._index_position(position_key, position)
         
+        self._journal("positions", position_key, position)
         logger.debug(f"📊 Updated position {position_key}: {position.quantity} @ {position.average_price}")
     
+    # Indexed Lookups
+    def _set_order_status(self, order: Order, status: OrderStatus):
+        self.order_status_counts[order.status] -= 1
+        self.order_status_counts[status] += 1
+        order.status = status
+        order.updated_at = datetime.utcnow()
+    
+    def _index_order(self, order: Order):
+        if order.order_id not in self.order_index:
+            self.order_index.add(order.order_id, order.client_id, order.symbol, order.created_at)
+            self.order_status_counts[order.status] += 1
+    
+    def _index_trade(self, trade: Trade):
+        if trade.trade_id not in self.trade_index:
+            self.trade_index.add(trade.trade_id, trade.client_id, trade.symbol, trade.executed_at)
+            self.trade_status_counts[trade.status] += 1
+            if trade.status == TradeStatus.EXECUTED:
+                self.unsettled_trades[trade.trade_id] = None
+    
+    def _index_position(self, position_key: str, position: Position):
+        self.positions_by_client.setdefault(position.client_id, {})[position.symbol] = position_key
+    
+    def _index_portfolio(self, portfolio: Portfolio):
+        portfolio_ids = self.portfolios_by_client.setdefault(portfolio.client_id, [])
+        if portfolio.portfolio_id not in portfolio_ids:
+            portfolio_ids.append(portfolio.portfolio_id)
+    
+    def _rebuild_indexes(self):
+        """Rebuild every secondary index from the primary collections (after loading)"""
+        self.order_index.clear()
+        self.trade_index.clear()
+        self.positions_by_client.clear()
+        self.portfolios_by_client.clear()
+        self.order_status_counts.clear()
+        self.trade_status_counts.clear()
+        self.unsettled_trades.clear()
+        
+        for order in sorted(self.orders.values(), key=lambda o: o.created_at):
+            self._index_order(order)
+        for trade in sorted(self.trades.values(), key=lambda t: t.executed_at):
+            self._index_trade(trade)
+        for position_key, position in self.positions.items():
+            self._index_position(position_key, position)
+        for portfolio in self.portfolios.values():
+            self._index_portfolio(portfolio)
+    
+    def get_client_orders(self, client_id: Optional[str] = None, symbol: Optional[str] = None,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Order]:
+        """Orders matching the filters (created_at range inclusive), oldest first"""
+        return [self.orders[order_id] for order_id in self.order_index.ids(client_id, symbol, since, until)]
+    
+    def get_client_trades(self, client_id: Optional[str] = None, symbol: Optional[str] = None,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Trade]:
+        """Trades matching the filters (executed_at range inclusive), oldest first"""
+        return [self.trades[trade_id] for trade_id in self.trade_index.ids(client_id, symbol, since, until)]
+    
+    def get_client_positions(self, client_id: str) -> List[Position]:
+        return [self.positions[key] for key in self.positions_by_client.get(client_id, {}).values()]
+    
+    def get_client_portfolios(self, client_id: str) -> List[Portfolio]:
+        return [self.portfolios[portfolio_id] for portfolio_id in self.portfolios_by_client.get(client_id, [])]
+    
     # Portfolio Management
     async def create_portfolio(self, client_id: str, name: str, 
                              target_allocation: Dict[str, Decimal], 
@@ -533,6 +720,9 @@ class TradingEngineService:
         )
         
         self.portfolios[portfolio_id] = portfolio
+        self._index_portfolio(portfolio)
+        self._journal("portfolios", portfolio_id, portfolio)
+        await self._commit_journal()
         
         logger.info(f"📁 Created portfolio {portfolio_id} for {client_id}: {name}")
         
@@ -556,6 +746,9 @@ class TradingEngineService:
         )
         
         self.portfolios[portfolio_id] = portfolio
+        self._index_portfolio(portfolio)
+        self._journal("portfolios", portfolio_id, portfolio)
+        await self._commit_journal()
         
         logger.info(f"📁 Created portfolio {portfolio_id} for {client_id}: {name}")
         
@@ -569,7 +762,7 @@ class TradingEngineService:
         portfolio = self.portfolios[portfolio_id]
         
         # Get current positions
-        client_positions = [p for p in self.positions.values() if p.client_id == portfolio.client_id]
+        client_positions = self.get_client_positions(portfolio.client_id)
         
         # Update current prices and calculate unrealized PnL
         total_value = portfolio.cash_balance
@@ -656,6 +849,8 @@ class TradingEngineService:
         )
         
         self.rebalance_strategies[strategy_id] = strategy
+        self._journal("rebalance_strategies", strategy_id, strategy)
+        await self._commit_journal()
         
         logger.info(f"🔄 Created rebalance strategy {strategy_id}: {name}")
         
@@ -925,9 +1120,7 @@ class TradingEngineService:
                     self.market_prices[symbol] = new_price
                     
                     # Update order book
-                    self.order_books[symbol]["bid"] = new_price - Decimal('0.0001')
-                    self.order_books[symbol]["ask"] = new_price + Decimal('0.0001')
-                    self.order_books[symbol]["timestamp"] = datetime.utcnow()
+                    await self._refresh_synthetic_quotes(symbol)
                 
                 await asyncio.sleep(1)  # Update every second
                 
@@ -935,26 +1128,6 @@ class TradingEngineService:
                 logger.error(f"❌ Market data updater error: {e}")
                 await asyncio.sleep(5)
     
-    async def _order_processor(self):
-        """Process pending orders"""
-        while self.is_running:
-            try:
-                # Find orders that need processing
-                pending_orders = [
-                    order for order in self.orders.values()
-                    if order.status in [OrderStatus.PENDING, OrderStatus.OPEN]
-                ]
-                
-                for order in pending_orders:
-                    if order.status == OrderStatus.PENDING:
-                        await self._execute_order(order)
-                
-                await asyncio.sleep(0.5)  # Process every 500ms
-                
-            except Exception as e:
-                logger.error(f"❌ Order processor error: {e}")
-                await asyncio.sleep(5)
-    
     async def _position_manager(self):
         """Update position values and PnL"""
         while self.is_running:
@@ -1053,19 +1226,24 @@ class TradingEngineService:
         """Process trade settlements"""
         while self.is_running:
             try:
-                # Find trades that need settlement
-                unsettled_trades = [
-                    trade for trade in self.trades.values()
-                    if trade.status == TradeStatus.EXECUTED
-                ]
-                
-                for trade in unsettled_trades:
+                # Unsettled trades are kept oldest first, so stop at the first one still inside the delay
+                for trade_id in list(self.unsettled_trades):
+                    trade = self.trades[trade_id]
+                    
                     # Simulate settlement delay (T+1)
-                    if (datetime.utcnow() - trade.executed_at).total_seconds() > 3600:  # 1 hour delay
-                        trade.status = TradeStatus.SETTLED
-                        trade.settlement_date = datetime.utcnow()
-                        
-                        logger.debug(f"💰 Trade settled: {trade.trade_id}")
+                    if (datetime.utcnow() - trade.executed_at).total_seconds() <= 3600:  # 1 hour delay
+                        break
+                    
+                    del self.unsettled_trades[trade_id]
+                    self.trade_status_counts[trade.status] -= 1
+                    self.trade_status_counts[TradeStatus.SETTLED] += 1
+                    trade.status = TradeStatus.SETTLED
+                    trade.settlement_date = datetime.utcnow()
+                    self._journal("trades", trade.trade_id, trade)
+                    
+                    logger.debug(f"💰 Trade settled: {trade.trade_id}")
+                
+                await self._commit_journal()
                 
                 await asyncio.sleep(300)  # Check every 5 minutes
                 
@@ -1074,52 +1252,70 @@ class TradingEngineService:
                 await asyncio.sleep(300)
     
     # Data Persistence
+    def _journal(self, kind: str, key: str, value: Any):
+        """Stage a changed record for the next journal commit (no-op until data is loaded)"""
+        if self.journal.is_open:
+            self.journal.record(kind, key, value)
+    
+    async def _commit_journal(self):
+        """Append staged changes to the journal, compacting into a snapshot when it grows long"""
+        if not self.journal.is_open:
+            return
+        try:
+            self.journal.commit()
+            if self.journal.should_compact:
+                await self._save_trading_data()
+        except OSError as e:
+            logger.error(f"❌ Error writing trading journal: {e}")
+    
+    def _trading_state(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "orders": self.orders,
+            "trades": self.trades,
+            "positions": self.positions,
+            "portfolios": self.portfolios,
+            "rebalance_strategies": self.rebalance_strategies
+        }
+    
     async def _load_trading_data(self):
-        """Load trading data from storage"""
+        """Replay the latest snapshot plus journal, migrating a legacy orders.json if present"""
         try:
-            # Load orders
-            orders_file = self.trading_dir / "orders.json"
-            if orders_file.exists():
-                with open(orders_file, 'r') as f:
+            legacy_file = self.trading_dir / "orders.json"
+            if self.journal.exists() or not legacy_file.exists():
+                state = decode_state(self.journal.replay(), {
+                    "orders": Order,
+                    "trades": Trade,
+                    "positions": Position,
+                    "portfolios": Portfolio,
+                    "rebalance_strategies": RebalanceStrategy
+                })
+                for kind, records in state.items():
+                    getattr(self, kind).update(records)
+                self._rebuild_indexes()
+            else:
+                with open(legacy_file, 'r') as f:
                     orders_data = json.load(f)
                 
                 for order_data in orders_data:
-                    order = Order(**order_data)
-                    order.created_at = datetime.fromisoformat(order_data["created_at"])
-                    order.updated_at = datetime.fromisoformat(order_data["updated_at"])
-                    order.side = OrderSide(order_data["side"])
-                    order.order_type = OrderType(order_data["order_type"])
-                    order.status = OrderStatus(order_data["status"])
-                    
+                    order = from_record(Order, order_data)
                     self.orders[order.order_id] = order
+                    self._index_order(order)
+                
+                self.journal.replay()
+                await self._save_trading_data()
+                legacy_file.rename(legacy_file.with_suffix(".json.migrated"))
             
-            # Load other data structures similarly...
-            logger.info(f"📂 Loaded {len(self.orders)} orders from storage")
+            logger.info(f"📂 Loaded {len(self.orders)} orders, {len(self.trades)} trades, "
+                        f"{len(self.positions)} positions, {len(self.portfolios)} portfolios from storage")
             
         except Exception as e:
             logger.error(f"❌ Error loading trading data: {e}")
     
     async def _save_trading_data(self):
-        """Save trading data to storage"""
+        """Write a compacted snapshot of all trading state and truncate the journal"""
         try:
-            # Save orders
-            orders_file = self.trading_dir / "orders.json"
-            orders_data = []
-            
-            for order in self.orders.values():
-                order_data = asdict(order)
-                order_data["created_at"] = order.created_at.isoformat()
-                order_data["updated_at"] = order.updated_at.isoformat()
-                order_data["side"] = order.side.value
-                order_data["order_type"] = order.order_type.value
-                order_data["status"] = order.status.value
-                orders_data.append(order_data)
-            
-            with open(orders_file, 'w') as f:
-                json.dump(orders_data, f, indent=2, default=str)
-            
-            # Save other data structures similarly...
-            logger.info(f"💾 Saved {len(self.orders)} orders to storage")
+            self.journal.snapshot(self._trading_state())
+            logger.info(f"💾 Saved snapshot of {len(self.orders)} orders, {len(self.trades)} trades to storage")
             
         except Exception as e:
             logger.error(f"❌ Error saving trading data: {e}")
@@ -1136,14 +1332,19 @@ class TradingEngineService:
             },
             "orders": {
                 "total_orders": len(self.orders),
-                "pending_orders": len([o for o in self.orders.values() if o.status == OrderStatus.PENDING]),
-                "open_orders": len([o for o in self.orders.values() if o.status == OrderStatus.OPEN]),
-                "filled_orders": len([o for o in self.orders.values() if o.status == OrderStatus.FILLED])
+                "pending_orders": self.order_status_counts[OrderStatus.PENDING],
+                "open_orders": self.order_status_counts[OrderStatus.OPEN],
+                "partially_filled_orders": self.order_status_counts[OrderStatus.PARTIALLY_FILLED],
+                "filled_orders": self.order_status_counts[OrderStatus.FILLED]
+            },
+            "order_books": {
+                symbol: {**book.stats, "resting_orders": len(book)}
+                for symbol, book in self.matching_books.items()
             },
             "trades": {
                 "total_trades": len(self.trades),
-                "executed_trades": len([t for t in self.trades.values() if t.status == TradeStatus.EXECUTED]),
-                "settled_trades": len([t for t in self.trades.values() if t.status == TradeStatus.SETTLED])
+                "executed_trades": self.trade_status_counts[TradeStatus.EXECUTED],
+                "settled_trades": self.trade_status_counts[TradeStatus.SETTLED]
             },
             "positions": {
                 "total_positions": len(self.positions),
@@ -1158,6 +1359,7 @@ class TradingEngineService:
                 "connected_exchanges": len([e for e in self.exchange_connections.values() if e["connected"]]),
                 "total_exchanges": len(self.exchange_connections)
             },
+            "persistence": self.journal.get_stats(),
             "risk_monitoring": {
                 "max_order_size": float(self.risk_limits["max_order_size"]),
                 "max_position_size": float(self.risk_limits["max_position_size"]),
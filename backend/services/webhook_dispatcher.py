@@ -0,0 +1,330 @@
+"""
+Webhook Dispatcher
+Concurrent, per-endpoint ordered webhook delivery with scheduled retries,
+circuit breakers and a durable journal of undelivered events
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .state_journal import StateJournal, decode_state
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WebhookPayload:
+    """An event body, serialized once and shared by every subscriber's delivery"""
+    payload_id: str
+    event: str
+    timestamp: str
+    body: str
+
+@dataclass
+class WebhookDelivery:
+    delivery_id: str
+    payload_id: str
+    webhook_id: str
+    url: str
+    signature: str
+    seq: int  # Publish order, restored after a restart
+    attempts: int = 0
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one endpoint.
+
+    Opens after `failure_threshold` failures in a row and rejects attempts
+    for `reset_seconds`; the next attempt after that is a half-open trial
+    that closes the breaker on success or re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_until: Optional[float] = None
+
+    def allow(self, now: float) -> bool:
+        return self.opened_until is None or now >= self.opened_until
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_until = None
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_until = now + self.reset_seconds
+
+SendFunction = Callable[[str, str, Dict[str, str]], Awaitable[int]]
+
+class WebhookDispatcher:
+    """
+    Delivers webhooks with `workers` concurrent tasks.
+
+    Deliveries are queued per endpoint URL and each URL has at most one
+    delivery in flight, so a client sees its events in publish order while
+    other clients' endpoints proceed independently. A failed attempt does
+    not hold a worker: the endpoint is parked on a delay heap until its
+    retry is due (exponential from `retry_delay_seconds`), or until its
+    circuit breaker lets a trial through. A delivery is dropped after
+    `retry_attempts` failed attempts.
+
+    Each published event is serialized once; subscribers sharing a secret
+    share the signature. Pending payloads and deliveries are written to a
+    StateJournal when published and removed when finished, so undelivered
+    events are replayed on the next start.
+    """
+
+    def __init__(self, send: SendFunction, sign: Callable[[str, str], str],
+                 journal: Optional[StateJournal] = None, workers: int = 8,
+                 retry_attempts: int = 3, retry_delay_seconds: float = 5.0,
+                 failure_threshold: int = 5, reset_seconds: float = 60.0,
+                 max_pending_per_endpoint: int = 10000,
+                 on_delivered: Optional[Callable[[WebhookDelivery], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.send = send
+        self.sign = sign
+        self.journal = journal
+        self.workers = workers
+        self.retry_attempts = retry_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_pending_per_endpoint = max_pending_per_endpoint
+        self.on_delivered = on_delivered
+        self.clock = clock
+
+        self.payloads: Dict[str, WebhookPayload] = {}
+        self._payload_refs: Dict[str, int] = {}
+        self._queues: Dict[str, Deque[WebhookDelivery]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._delayed: List[Tuple[float, int, str]] = []
+        self._delay_order = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._seq = 0
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"published": 0, "delivered": 0, "failed": 0, "retried": 0,
+                      "rejected_open_circuit": 0, "dropped_backlog": 0, "replayed": 0}
+
+    @property
+    def queue_size(self) -> int:
+        """Deliveries not yet finished, across all endpoints"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def start(self):
+        if self._tasks:
+            return
+        if self.journal is not None:
+            self._replay()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._scheduler()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.journal is not None:
+            self.journal.close()
+
+    def publish(self, event: str, data: Dict[str, Any], webhooks: List[Any],
+                timestamp: Optional[str] = None) -> int:
+        """Queue `event` for every webhook in `webhooks`; returns the number of deliveries queued"""
+        if not webhooks:
+            return 0
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        payload = WebhookPayload(
+            payload_id=uuid.uuid4().hex,
+            event=event,
+            timestamp=timestamp,
+            body=json.dumps({"event": event, "timestamp": timestamp, "data": data}, default=str)
+        )
+
+        signatures: Dict[str, str] = {}
+        queued = []
+        for webhook in webhooks:
+            queue = self._queues.get(webhook.url)
+            if queue is not None and len(queue) >= self.max_pending_per_endpoint:
+                self.stats["dropped_backlog"] += 1
+                logger.warning(f"⚠️ Webhook backlog full for {webhook.url}, dropping {event}")
+                continue
+            if webhook.secret not in signatures:
+                signatures[webhook.secret] = self.sign(payload.body, webhook.secret)
+            self._seq += 1
+            queued.append(WebhookDelivery(
+                delivery_id=uuid.uuid4().hex,
+                payload_id=payload.payload_id,
+                webhook_id=webhook.webhook_id,
+                url=webhook.url,
+                signature=signatures[webhook.secret],
+                seq=self._seq
+            ))
+
+        if not queued:
+            return 0
+        self.payloads[payload.payload_id] = payload
+        self._payload_refs[payload.payload_id] = len(queued)
+        self._journal_record("payloads", payload.payload_id, payload)
+        for delivery in queued:
+            self._journal_record("deliveries", delivery.delivery_id, delivery)
+            self._enqueue(delivery)
+        self._journal_commit()
+
+        self.stats["published"] += len(queued)
+        return len(queued)
+
+    def _enqueue(self, delivery: WebhookDelivery):
+        queue = self._queues.get(delivery.url)
+        if queue is None:
+            queue = self._queues[delivery.url] = deque()
+            self._ready.put_nowait(delivery.url)  # Idle endpoint: schedule it
+        queue.append(delivery)
+
+    def _schedule(self, url: str, due: float):
+        heapq.heappush(self._delayed, (due, next(self._delay_order), url))
+        self._wakeup.set()
+
+    async def _scheduler(self):
+        """Move endpoints whose retry or breaker timeout is due back onto the ready queue"""
+        while True:
+            self._wakeup.clear()
+            now = self.clock()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, url = heapq.heappop(self._delayed)
+                self._ready.put_nowait(url)
+            timeout = self._delayed[0][0] - now if self._delayed else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            url = await self._ready.get()
+            try:
+                await self._process(url)
+            except Exception as e:
+                logger.error(f"❌ Error in webhook dispatcher: {e}")
+                if url in self._queues:
+                    self._schedule(url, self.clock() + self.retry_delay_seconds)
+
+    async def _process(self, url: str):
+        queue = self._queues[url]
+        delivery = queue[0]
+        breaker = self.breakers.setdefault(url, CircuitBreaker(self.failure_threshold, self.reset_seconds))
+
+        if not breaker.allow(self.clock()):
+            self.stats["rejected_open_circuit"] += 1
+            self._schedule(url, breaker.opened_until)
+            return
+
+        payload = self.payloads[delivery.payload_id]
+        headers = {
+            "Content-Type": "application/json",
+            "X-StableYield-Event": payload.event,
+            "X-StableYield-Signature": delivery.signature,
+            "X-StableYield-Timestamp": payload.timestamp
+        }
+        delivery.attempts += 1
+        try:
+            status = await self.send(url, payload.body, headers)
+            delivered = status < 400
+            if not delivered:
+                logger.warning(f"⚠️ Webhook delivery failed (attempt {delivery.attempts}): HTTP {status}")
+        except Exception as e:
+            delivered = False
+            logger.warning(f"⚠️ Webhook delivery error (attempt {delivery.attempts}): {e}")
+
+        if delivered:
+            breaker.record_success()
+            self.stats["delivered"] += 1
+            logger.debug(f"✅ Webhook delivered to {url}")
+            if self.on_delivered is not None:
+                self.on_delivered(delivery)
+        else:
+            breaker.record_failure(self.clock())
+            if delivery.attempts < self.retry_attempts:
+                self.stats["retried"] += 1
+                delay = self.retry_delay_seconds * (2 ** (delivery.attempts - 1))
+                self._schedule(url, max(self.clock() + delay, breaker.opened_until or 0.0))
+                return
+            self.stats["failed"] += 1
+            logger.error(f"❌ Failed to deliver webhook to {url} after {delivery.attempts} attempts")
+
+        self._finish(queue, delivery)
+
+    def _finish(self, queue: Deque[WebhookDelivery], delivery: WebhookDelivery):
+        queue.popleft()
+        self._journal_record("deliveries", delivery.delivery_id, None)
+        self._payload_refs[delivery.payload_id] -= 1
+        if not self._payload_refs[delivery.payload_id]:
+            del self._payload_refs[delivery.payload_id]
+            del self.payloads[delivery.payload_id]
+            self._journal_record("payloads", delivery.payload_id, None)
+        self._journal_commit()
+
+        if queue:
+            self._ready.put_nowait(delivery.url)
+        else:
+            del self._queues[delivery.url]
+
+    def _journal_record(self, kind: str, key: str, value: Any):
+        if self.journal is not None and self.journal.is_open:
+            self.journal.record(kind, key, value)
+
+    def _journal_commit(self):
+        """Make staged changes durable, compacting to the pending set when the journal grows"""
+        if self.journal is None or not self.journal.is_open:
+            return
+        try:
+            if self.journal.should_compact:
+                self.journal.snapshot({
+                    "payloads": dict(self.payloads),
+                    "deliveries": {d.delivery_id: d for queue in self._queues.values() for d in queue}
+                })
+            else:
+                self.journal.commit()
+        except Exception as e:
+            logger.error(f"❌ Error writing webhook journal: {e}")
+
+    def _replay(self):
+        """Re-queue deliveries left undelivered by the previous run, in publish order"""
+        try:
+            state = decode_state(self.journal.replay(), {"payloads": WebhookPayload, "deliveries": WebhookDelivery})
+        except Exception as e:
+            logger.error(f"❌ Error replaying webhook journal: {e}")
+            return
+
+        for delivery in sorted(state["deliveries"].values(), key=lambda d: d.seq):
+            payload = state["payloads"].get(delivery.payload_id)
+            if payload is None:
+                continue
+            self.payloads.setdefault(payload.payload_id, payload)
+            self._payload_refs[payload.payload_id] = self._payload_refs.get(payload.payload_id, 0) + 1
+            delivery.attempts = 0
+            self._seq = max(self._seq, delivery.seq)
+            self._enqueue(delivery)
+            self.stats["replayed"] += 1
+
+        if self.stats["replayed"]:
+            logger.info(f"📂 Replayed {self.stats['replayed']} undelivered webhooks")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_size": self.queue_size,
+            "endpoints_pending": len(self._queues),
+            "open_circuits": [url for url, breaker in self.breakers.items() if breaker.opened_until is not None],
+            "journal": self.journal.get_stats() if self.journal is not None and self.journal.is_open else None
+        }
@@ -6,18 +6,106 @@ Handles WebSocket connections for live index updates and data streaming
 import asyncio
 import json
 import logging
+from collections import deque
+from urllib.parse import parse_qs, urlparse
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Union
 import websockets
 from websockets.server import WebSocketServerProtocol
 from dataclasses import asdict
 
+from .stream_protocol import DeltaStream, ENCODINGS, PROTOCOL_VERSION, encode_message
+
 logger = logging.getLogger(__name__)
 
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+class ClientConnection:
+    """
+    Outbound side of one WebSocket connection.
+
+    Messages are queued (bounded to queue_size) and written by a dedicated
+    writer task, so a slow client only ever delays itself. When the queue is
+    full the manager's slow-consumer policy decides what happens.
+    """
+    
+    def __init__(self, websocket, stream_type: str, queue_size: int, encoding: str = "json"):
+        self.websocket = websocket
+        self.stream_type = stream_type
+        self.queue_size = queue_size
+        self.encoding = encoding
+        self.synced = False  # True once a stream snapshot has been queued; later updates go out as diffs
+        self.queue: deque = deque()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        
+        # Starlette WebSockets send with send_text/send_bytes; websockets connections with send
+        self._send_text = getattr(websocket, 'send_text', None) or websocket.send
+        self._send_bytes = getattr(websocket, 'send_bytes', None) or websocket.send
+    
+    @property
+    def is_full(self) -> bool:
+        return len(self.queue) >= self.queue_size
+    
+    def _send(self, message: Union[str, bytes]):
+        return self._send_bytes(message) if isinstance(message, bytes) else self._send_text(message)
+    
+    def enqueue(self, message: Union[str, bytes], policy: str) -> bool:
+        """Queue a message; returns False when the client must be disconnected"""
+        if len(self.queue) >= self.queue_size:
+            if policy == "disconnect":
+                return False
+            if policy == "coalesce":
+                # Stream messages are full snapshots: only the latest one matters
+                self.messages_dropped += len(self.queue)
+                self.queue.clear()
+            else:  # drop_oldest
+                self.queue.popleft()
+                self.messages_dropped += 1
+        
+        self.queue.append(message)
+        self.ready.set()
+        return True
+    
+    async def run_writer(self, send_timeout: Optional[float]):
+        """Write queued messages in order until cancelled or the send fails"""
+        while True:
+            await self.ready.wait()
+            while self.queue:
+                message = self.queue.popleft()
+                if send_timeout is None:
+                    await self._send(message)
+                else:
+                    await asyncio.wait_for(self._send(message), timeout=send_timeout)
+                self.messages_sent += 1
+            self.ready.clear()
+
 class WebSocketConnectionManager:
-    """Manages WebSocket connections and broadcasting"""
+    """
+    Manages WebSocket connections and broadcasting.
+
+    Broadcasts encode the payload once and append it to each connection's
+    bounded queue without awaiting any client. When a queue is full,
+    slow_consumer_policy applies: "drop_oldest" discards the oldest queued
+    message, "coalesce" keeps only the newest snapshot, and "disconnect"
+    closes the connection. send_timeout (seconds) additionally bounds each
+    individual send; None leaves stuck peers to the queue policy and the
+    server's ping timeout.
+
+    publish() is the delta path: each stream keeps a versioned DeltaStream,
+    new subscribers are sent one snapshot and everyone else only the
+    field-level diff. A client whose queue overflows (or that asks for a
+    resync) has its backlog replaced by the current snapshot, since a dropped
+    diff would leave a sequence gap.
+    """
     
-    def __init__(self):
+    def __init__(self, queue_size: int = 64, slow_consumer_policy: str = "drop_oldest",
+                 send_timeout: Optional[float] = None):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        
         self.connections: Dict[str, Set[WebSocketServerProtocol]] = {
             'syi_live': set(),
             'constituents': set(),
@@ -25,28 +113,93 @@ class WebSocketConnectionManager:
             'peg_metrics': set(),
             'liquidity_metrics': set()
         }
+        self.clients: Dict[WebSocketServerProtocol, ClientConnection] = {}
+        self.streams: Dict[str, DeltaStream] = {stream: DeltaStream(stream) for stream in self.connections}
         self.connection_count = 0
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.send_timeout = send_timeout
+        self.metrics = {
+            "broadcasts": 0,
+            "publishes": 0,
+            "snapshots_queued": 0,
+            "diffs_queued": 0,
+            "resyncs": 0,
+            "messages_queued": 0,
+            "messages_dropped": 0,
+            "slow_consumer_disconnects": 0,
+            "send_failures": 0
+        }
     
-    async def connect(self, websocket: WebSocketServerProtocol, stream_type: str):
+    async def connect(self, websocket: WebSocketServerProtocol, stream_type: str, encoding: str = "json"):
         """Add new WebSocket connection"""
-        if stream_type in self.connections:
+        if encoding not in ENCODINGS:
+            await websocket.close(code=4000, reason="Unsupported encoding")
+        elif stream_type in self.connections:
+            client = ClientConnection(websocket, stream_type, self.queue_size, encoding)
+            client.writer = asyncio.create_task(self._run_writer(client))
+            self.clients[websocket] = client
             self.connections[stream_type].add(websocket)
             self.connection_count += 1
             logger.info(f"✅ WebSocket connected to {stream_type} (total: {self.connection_count})")
             
-            # Send welcome message
+            # Send welcome message, then the current state if the stream has one
             await self._send_welcome_message(websocket, stream_type)
+            if self.streams[stream_type].seq:
+                self._queue_snapshot(client)
         else:
             await websocket.close(code=4000, reason="Invalid stream type")
     
     async def disconnect(self, websocket: WebSocketServerProtocol):
         """Remove WebSocket connection"""
+        client = self._remove(websocket)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+            await asyncio.gather(client.writer, return_exceptions=True)
+    
+    def _remove(self, websocket: WebSocketServerProtocol) -> Optional[ClientConnection]:
+        client = self.clients.pop(websocket, None)
         for stream_type, connections in self.connections.items():
             if websocket in connections:
                 connections.remove(websocket)
                 self.connection_count -= 1
                 logger.info(f"❌ WebSocket disconnected from {stream_type} (total: {self.connection_count})")
                 break
+        if client:
+            self.metrics["messages_dropped"] += client.messages_dropped
+        return client
+    
+    async def _run_writer(self, client: ClientConnection):
+        try:
+            await client.run_writer(self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except websockets.exceptions.ConnectionClosed:
+            self._remove(client.websocket)
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket: {e}")
+            self.metrics["send_failures"] += 1
+            self._remove(client.websocket)
+    
+    async def _close_slow_consumer(self, client: ClientConnection):
+        """Close a client whose queue overflowed under the disconnect policy"""
+        self.metrics["slow_consumer_disconnects"] += 1
+        try:
+            await asyncio.wait_for(client.websocket.close(code=1008, reason="Slow consumer"), timeout=10)
+        except Exception:
+            pass
+    
+    def _enqueue(self, websocket: WebSocketServerProtocol, message: Union[str, bytes],
+                 policy: Optional[str] = None):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        if client.enqueue(message, policy or self.slow_consumer_policy):
+            self.metrics["messages_queued"] += 1
+        else:
+            self._remove(websocket)
+            client.writer.cancel()
+            asyncio.create_task(self._close_slow_consumer(client))
     
     async def broadcast_to_stream(self, stream_type: str, data: Dict):
         """Broadcast data to all connections in a stream"""
@@ -57,28 +210,80 @@ class WebSocketConnectionManager:
         if not connections:
             return
         
+        # Encoded once; every queue holds the same string
         message = json.dumps({
             'type': stream_type,
             'timestamp': datetime.utcnow().isoformat(),
             'data': data
         })
         
-        # Send to all connections concurrently
-        disconnected = []
+        # Queue for every connection; writer tasks do the sending
         for websocket in connections:
-            try:
-                await websocket.send(message)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.append(websocket)
-            except Exception as e:
-                logger.error(f"Error sending to WebSocket: {e}")
-                disconnected.append(websocket)
+            self._enqueue(websocket, message)
+        self.metrics["broadcasts"] += 1
         
-        # Clean up disconnected websockets
-        for websocket in disconnected:
-            await self.disconnect(websocket)
+        logger.debug(f"📡 Queued broadcast for {len(connections)} {stream_type} connections")
+    
+    def _queue_snapshot(self, client: ClientConnection, replace_backlog: bool = False):
+        """Queue the current stream snapshot, optionally discarding everything queued before it"""
+        stream = self.streams[client.stream_type]
+        if replace_backlog:
+            client.messages_dropped += len(client.queue)
+            client.queue.clear()
+        client.synced = True
+        self._enqueue(client.websocket, stream.snapshot_message(client.encoding))
+        self.metrics["snapshots_queued"] += 1
+    
+    async def publish(self, stream_type: str, data: Dict) -> int:
+        """
+        Publish the latest state of a stream using the delta protocol.
+
+        Returns the new sequence number, or 0 if nothing changed and nothing was sent.
+        """
+        stream = self.streams.get(stream_type)
+        if stream is None or not stream.update(data):
+            return 0
+        self.metrics["publishes"] += 1
         
-        logger.debug(f"📡 Broadcasted to {len(connections) - len(disconnected)} {stream_type} connections")
+        # Diffs and snapshots are encoded at most once per encoding and shared by every queue
+        for websocket in self.connections[stream_type].copy():
+            client = self.clients.get(websocket)
+            if client is None:
+                continue
+            if client.is_full and self.slow_consumer_policy != "disconnect":
+                self._queue_snapshot(client, replace_backlog=True)
+            elif not client.synced:
+                self._queue_snapshot(client)
+            else:
+                self._enqueue(websocket, stream.diff_message(client.encoding))
+                self.metrics["diffs_queued"] += 1
+        
+        logger.debug(f"📡 Published {stream_type} seq {stream.seq} to {len(self.connections[stream_type])} connections")
+        return stream.seq
+    
+    def resync(self, websocket: WebSocketServerProtocol) -> bool:
+        """Queue a fresh snapshot for a client that detected a sequence gap"""
+        client = self.clients.get(websocket)
+        if client is None or not self.streams[client.stream_type].seq:
+            return False
+        self.metrics["resyncs"] += 1
+        self._queue_snapshot(client, replace_backlog=True)
+        return True
+    
+    async def handle_client_message(self, websocket: WebSocketServerProtocol, data: Dict):
+        """Handle protocol messages from clients (resync, ping)"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        
+        message_type = data.get('type')
+        if message_type == 'resync':
+            self.resync(websocket)
+        elif message_type == 'ping':
+            self._enqueue(websocket, encode_message({
+                'type': 'pong',
+                'timestamp': datetime.utcnow().isoformat()
+            }, client.encoding))
     
     async def broadcast(self, stream_type: str, data: Dict):
         """Alias for broadcast_to_stream for compatibility"""
@@ -86,21 +291,43 @@ class WebSocketConnectionManager:
     
     async def _send_welcome_message(self, websocket: WebSocketServerProtocol, stream_type: str):
         """Send welcome message with stream info"""
+        client = self.clients[websocket]
         welcome = {
             'type': 'welcome',
             'stream': stream_type,
+            'protocol': PROTOCOL_VERSION,
+            'encoding': client.encoding,
+            'seq': self.streams[stream_type].seq,
             'timestamp': datetime.utcnow().isoformat(),
             'message': f'Connected to StableYield {stream_type} stream'
         }
-        await websocket.send(json.dumps(welcome))
+        self._enqueue(websocket, encode_message(welcome, client.encoding))
+    
+    async def close_all(self):
+        """Stop every writer task (used on shutdown)"""
+        for websocket in list(self.clients):
+            await self.disconnect(websocket)
     
     def get_connection_stats(self) -> Dict:
         """Get connection statistics"""
+        clients = list(self.clients.values())
         return {
             'total_connections': self.connection_count,
             'streams': {
                 stream: len(connections) 
                 for stream, connections in self.connections.items()
+            },
+            'delta_streams': {
+                stream: {'seq': delta.seq, **delta.metrics}
+                for stream, delta in self.streams.items()
+            },
+            'fanout': {
+                'slow_consumer_policy': self.slow_consumer_policy,
+                'queue_size': self.queue_size,
+                'queued_messages': sum(len(client.queue) for client in clients),
+                'max_queue_depth': max((len(client.queue) for client in clients), default=0),
+                **self.metrics,
+                'messages_dropped': self.metrics["messages_dropped"] + sum(c.messages_dropped for c in clients)
             }
         }
 
@@ -166,6 +393,7 @@ class WebSocketService:
     
     async def stop_server(self):
         """Stop WebSocket server"""
+        await self.manager.close_all()
         if self.server:
             self.server.close()
             await self.server.wait_closed()
@@ -181,8 +409,9 @@ class WebSocketService:
                 await websocket.close(code=4000, reason="Invalid stream path")
                 return
             
-            # Add connection to manager
-            await self.manager.connect(websocket, stream_type)
+            # Add connection to manager (?encoding=msgpack selects binary frames)
+            encoding = parse_qs(urlparse(path).query).get('encoding', ['json'])[0]
+            await self.manager.connect(websocket, stream_type, encoding)
             
             # Send initial data
             await self._send_initial_data(websocket, stream_type)
@@ -250,6 +479,10 @@ class WebSocketService:
                 'symbols': symbols
             }))
             
+        elif message_type == 'resync':
+            # Client detected a sequence gap in the delta stream
+            self.manager.resync(websocket)
+            
         elif message_type == 'ping':
             # Handle ping/pong
             await websocket.send(json.dumps({
@@ -265,8 +498,8 @@ class WebSocketService:
                     # Get latest index data
                     current_index = await self.index_storage.get_latest_index_value()
                     if current_index:
-                        # Broadcast to SYI stream
-                        await self.manager.broadcast_to_stream('syi_live', {
+                        # Publish to SYI stream (diffed against the previous state)
+                        await self.manager.publish('syi_live', {
                             'value': current_index.value,
                             'timestamp': current_index.timestamp.isoformat(),
                             'constituents_count': len(current_index.constituents),
@@ -284,7 +517,7 @@ class WebSocketService:
                                 'liquidity_score': constituent.liquidity_score
                             })
                         
-                        await self.manager.broadcast_to_stream('constituents', {
+                        await self.manager.publish('constituents', {
                             'constituents': constituents_data,
                             'index_value': current_index.value
                         })
@@ -312,15 +545,15 @@ class WebSocketService:
     # Public methods for broadcasting data from external services
     async def broadcast_index_update(self, index_data: Dict):
         """Broadcast index update to all connected clients"""
-        await self.manager.broadcast_to_stream('syi_live', index_data)
+        await self.manager.publish('syi_live', index_data)
     
     async def broadcast_ray_update(self, ray_data: Dict):
         """Broadcast RAY update to all connected clients"""  
-        await self.manager.broadcast_to_stream('ray_all', ray_data)
+        await self.manager.publish('ray_all', ray_data)
     
     async def broadcast_peg_metrics(self, peg_data: Dict):
         """Broadcast peg stability metrics"""
-        await self.manager.broadcast_to_stream('peg_metrics', peg_data)
+        await self.manager.publish('peg_metrics', peg_data)
     
     def get_service_status(self) -> Dict:
         """Get WebSocket service status"""
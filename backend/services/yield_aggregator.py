@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 import statistics
+import time
 from .defi_llama_service import DefiLlamaService
 from .binance_service import BinanceService
 from .protocol_policy_service import ProtocolPolicyService
@@ -19,14 +20,64 @@ class YieldAggregator:
         self.cache = {}
         self.cache_expiry = {}
         self.cache_duration = timedelta(minutes=5)  # Cache for 5 minutes
+        self.stale_duration = timedelta(minutes=30)  # Serve stale data while revalidating for 30 minutes
+        
+        # Single-flight refresh: concurrent callers await the same task
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "cache_hits": 0,
+            "stale_hits": 0,
+            "coalesced_waits": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "last_refresh_latency_ms": None,
+            "total_refresh_latency_ms": 0.0,
+            "last_refresh_at": None
+        }
         
     async def get_all_yields(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
-        """Get aggregated yields from all sources"""
+        """
+        Get aggregated yields from all sources.
+        
+        Fresh snapshots are served from cache. A stale snapshot (within
+        stale_duration of expiry) is served immediately while one background
+        refresh revalidates it. Otherwise callers wait for a refresh, and
+        concurrent callers share the same in-flight refresh.
+        """
         cache_key = "all_yields"
         
-        # Check cache first
-        if not force_refresh and self._is_cache_valid(cache_key):
-            return self.cache[cache_key]
+        if not force_refresh:
+            # Check cache first
+            if self._is_cache_valid(cache_key):
+                self.metrics["cache_hits"] += 1
+                return list(self.cache[cache_key])
+            
+            # Stale-while-revalidate
+            if self._is_cache_servable_stale(cache_key):
+                self.metrics["stale_hits"] += 1
+                self._get_refresh_task()
+                return list(self.cache[cache_key])
+        
+        task = self._get_refresh_task()
+        # Shield so a cancelled caller does not cancel the shared refresh
+        return list(await asyncio.shield(task))
+    
+    def _get_refresh_task(self) -> asyncio.Task:
+        """Return the in-flight refresh task, starting one if none is running"""
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.metrics["coalesced_waits"] += 1
+            return task
+        
+        self._refresh_task = loop.create_task(self._refresh_yields())
+        return self._refresh_task
+    
+    async def _refresh_yields(self) -> List[Dict[str, Any]]:
+        """Fetch, combine, filter and sanitize yields, then update the cache"""
+        cache_key = "all_yields"
+        started = time.perf_counter()
         
         try:
             # Get data from all sources concurrently
@@ -69,7 +120,29 @@ class YieldAggregator:
             
         except Exception as e:
             logger.error(f"Yield aggregation error: {str(e)}")
-            return self._get_fallback_data()
+            self.metrics["refresh_failures"] += 1
+            # Keep serving the last good snapshot if there is one
+            return self.cache.get(cache_key) or self._get_fallback_data()
+        
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.metrics["refreshes"] += 1
+            self.metrics["last_refresh_latency_ms"] = round(latency_ms, 2)
+            self.metrics["total_refresh_latency_ms"] += latency_ms
+            self.metrics["last_refresh_at"] = datetime.utcnow().isoformat()
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Cache hit, coalescing and refresh latency metrics"""
+        cache_key = "all_yields"
+        refreshes = self.metrics["refreshes"]
+        
+        return {
+            **self.metrics,
+            "avg_refresh_latency_ms": round(self.metrics["total_refresh_latency_ms"] / refreshes, 2) if refreshes else None,
+            "refresh_in_flight": self._refresh_task is not None and not self._refresh_task.done(),
+            "cache_state": "fresh" if self._is_cache_valid(cache_key) else "stale" if cache_key in self.cache else "empty",
+            "cache_expires_at": self.cache_expiry[cache_key].isoformat() if cache_key in self.cache_expiry else None
+        }
     
     def _combine_yields(self, defi_yields: Dict, cefi_yields: Dict) -> List[Dict[str, Any]]:
         """Combine yields from different sources, prioritizing higher yields"""
@@ -305,6 +378,12 @@ class YieldAggregator:
             return False
         return datetime.utcnow() < self.cache_expiry[cache_key]
     
+    def _is_cache_servable_stale(self, cache_key: str) -> bool:
+        """Check if an expired cache entry may still be served while revalidating"""
+        if cache_key not in self.cache or cache_key not in self.cache_expiry:
+            return False
+        return datetime.utcnow() < self.cache_expiry[cache_key] + self.stale_duration
+    
     def _get_fallback_data(self) -> List[Dict[str, Any]]:
         """Fallback data when all APIs fail"""
         return [
@@ -382,4 +461,14 @@ class YieldAggregator:
     async def refresh_cache(self):
         """Force refresh all cached data"""
         await self.get_all_yields(force_refresh=True)
-        logger.info("Yield data cache refreshed")
\ No newline at end of file
+        logger.info("Yield data cache refreshed")
+
+# Global aggregator instance shared by all services and routes
+_yield_aggregator = None
+
+def get_yield_aggregator() -> YieldAggregator:
+    """Get the process-wide yield aggregator"""
+    global _yield_aggregator
+    if _yield_aggregator is None:
+        _yield_aggregator = YieldAggregator()
+    return _yield_aggregator
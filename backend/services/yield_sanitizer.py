@@ -5,12 +5,13 @@ Statistical outlier detection and APY cleaning for institutional-grade yield dat
 
 import statistics
 import numpy as np
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Callable
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 from enum import Enum
 import json
+from .robust_stats import LeaveOneOutColumn
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +99,30 @@ class YieldSanitizer:
         """
         Sanitize a single yield data point using statistical methods
         """
+        detect_outliers = None
+        if market_context:
+            detect_outliers = lambda apy: self._detect_outliers(apy, market_context, yield_data)
+        
+        return self._sanitize_yield(
+            yield_data,
+            len(market_context) if market_context else 0,
+            detect_outliers,
+            lambda: self._winsorization_bounds(
+                [float(y.get('apy', y.get('currentYield', 0))) for y in market_context]
+            )
+        )
+    
+    def _sanitize_yield(self,
+                        yield_data: Dict[str, Any],
+                        market_context_size: int,
+                        detect_outliers: Optional[Callable[[float], Tuple[float, SanitizationAction, List[str]]]],
+                        winsorization_bounds: Callable[[], Tuple[float, float]]) -> YieldSanitizationResult:
+        """
+        Sanitization pipeline shared by the single and batch paths.
+        
+        The market context only enters through detect_outliers (None when
+        there is no context) and the lazily evaluated winsorization_bounds.
+        """
         original_apy = float(yield_data.get('apy', yield_data.get('currentYield', 0)))
         warnings = []
         metadata = {
@@ -113,16 +138,14 @@ class YieldSanitizer:
         outlier_score = 0.0
         outlier_action = SanitizationAction.ACCEPT
         
-        if market_context:
-            outlier_score, outlier_action, outlier_warnings = self._detect_outliers(
-                sanitized_apy, market_context, yield_data
-            )
+        if detect_outliers is not None:
+            outlier_score, outlier_action, outlier_warnings = detect_outliers(sanitized_apy)
             warnings.extend(outlier_warnings)
             
             # Apply outlier treatment
             if outlier_action in [SanitizationAction.CAP, SanitizationAction.WINSORIZE]:
-                sanitized_apy = self._apply_outlier_treatment(
-                    sanitized_apy, market_context, outlier_action
+                sanitized_apy = self._treat_outlier(
+                    sanitized_apy, outlier_action, winsorization_bounds
                 )
         
         # Step 3: Base vs Reward APY preference
@@ -163,7 +186,7 @@ class YieldSanitizer:
         metadata.update({
             'bounds_checked': True,
             'outlier_score': outlier_score,
-            'market_context_size': len(market_context) if market_context else 0,
+            'market_context_size': market_context_size,
             'adjustment_magnitude': abs(sanitized_apy - original_apy),
             'warnings_count': len(warnings)
         })
@@ -222,7 +245,7 @@ class YieldSanitizer:
         ]
         
         if len(context_apys) < 3:
-            return 0.0, SanitizationAction.ACCEPT, ["Insufficient market context for outlier detection"]
+            return self._insufficient_context()
         
         config = self.config['outlier_detection']
         method = config['method']
@@ -236,15 +259,25 @@ class YieldSanitizer:
         elif method == "PERCENTILE":
             return self._percentile_outlier_detection(apy, context_apys, config)
         else:
-            return 0.0, SanitizationAction.ACCEPT, [f"Unknown outlier detection method: {method}"]
+            return self._unknown_method(method)
+    
+    def _insufficient_context(self) -> Tuple[float, SanitizationAction, List[str]]:
+        return 0.0, SanitizationAction.ACCEPT, ["Insufficient market context for outlier detection"]
+    
+    def _unknown_method(self, method: str) -> Tuple[float, SanitizationAction, List[str]]:
+        return 0.0, SanitizationAction.ACCEPT, [f"Unknown outlier detection method: {method}"]
     
     def _mad_outlier_detection(self, apy: float, context_apys: List[float], threshold: float) -> Tuple[float, SanitizationAction, List[str]]:
         """Median Absolute Deviation outlier detection"""
-        warnings = []
-        
         median = statistics.median(context_apys)
         mad = statistics.median([abs(x - median) for x in context_apys])
         
+        return self._classify_mad_outlier(apy, median, mad, threshold)
+    
+    def _classify_mad_outlier(self, apy: float, median: float, mad: float, threshold: float) -> Tuple[float, SanitizationAction, List[str]]:
+        """Classify an APY against a context median and MAD"""
+        warnings = []
+        
         if mad == 0:
             mad = 0.01  # Avoid division by zero
         
@@ -262,11 +295,16 @@ class YieldSanitizer:
     
     def _iqr_outlier_detection(self, apy: float, context_apys: List[float], multiplier: float) -> Tuple[float, SanitizationAction, List[str]]:
         """Interquartile Range outlier detection"""
-        warnings = []
         context_apys.sort()
         
         q1 = np.percentile(context_apys, 25)
         q3 = np.percentile(context_apys, 75)
+        
+        return self._classify_iqr_outlier(apy, q1, q3, multiplier)
+    
+    def _classify_iqr_outlier(self, apy: float, q1: float, q3: float, multiplier: float) -> Tuple[float, SanitizationAction, List[str]]:
+        """Classify an APY against context quartiles"""
+        warnings = []
         iqr = q3 - q1
         
         lower_bound = q1 - multiplier * iqr
@@ -288,11 +326,18 @@ class YieldSanitizer:
     
     def _z_score_outlier_detection(self, apy: float, context_apys: List[float], threshold: float) -> Tuple[float, SanitizationAction, List[str]]:
         """Z-Score outlier detection"""
-        warnings = []
-        
         mean_apy = statistics.mean(context_apys)
         stdev_apy = statistics.stdev(context_apys) if len(context_apys) > 1 else 0.01
         
+        return self._classify_z_score_outlier(apy, mean_apy, stdev_apy, threshold)
+    
+    def _classify_z_score_outlier(self, apy: float, mean_apy: float, stdev_apy: float, threshold: float) -> Tuple[float, SanitizationAction, List[str]]:
+        """Classify an APY against a context mean and standard deviation"""
+        warnings = []
+        
+        if stdev_apy == 0:
+            stdev_apy = 0.01  # Avoid division by zero
+        
         z_score = abs(apy - mean_apy) / stdev_apy
         
         if z_score > threshold:
@@ -307,11 +352,15 @@ class YieldSanitizer:
     
     def _percentile_outlier_detection(self, apy: float, context_apys: List[float], config: Dict) -> Tuple[float, SanitizationAction, List[str]]:
         """Percentile-based outlier detection"""
-        warnings = []
-        
         lower_percentile = np.percentile(context_apys, config['percentile_lower'])
         upper_percentile = np.percentile(context_apys, config['percentile_upper'])
         
+        return self._classify_percentile_outlier(apy, lower_percentile, upper_percentile)
+    
+    def _classify_percentile_outlier(self, apy: float, lower_percentile: float, upper_percentile: float) -> Tuple[float, SanitizationAction, List[str]]:
+        """Classify an APY against context percentile bounds"""
+        warnings = []
+        
         if apy < lower_percentile or apy > upper_percentile:
             range_size = upper_percentile - lower_percentile
             if apy < lower_percentile:
@@ -332,6 +381,18 @@ class YieldSanitizer:
         """Apply outlier treatment (capping or winsorization)"""
         apys = [float(y.get('apy', y.get('currentYield', 0))) for y in context_apys]
         
+        return self._treat_outlier(apy, action, lambda: self._winsorization_bounds(apys))
+    
+    def _winsorization_bounds(self, apys: List[float]) -> Tuple[float, float]:
+        """Winsorization percentiles of the context APYs"""
+        config = self.config['winsorization']
+        return (
+            np.percentile(apys, config['lower_percentile']),
+            np.percentile(apys, config['upper_percentile'])
+        )
+    
+    def _treat_outlier(self, apy: float, action: SanitizationAction, winsorization_bounds: Callable[[], Tuple[float, float]]) -> float:
+        """Cap or winsorize an APY; winsorization bounds are only computed when needed"""
         if action == SanitizationAction.CAP:
             # Cap to reasonable maximum
             reasonable_max = self.config['apy_bounds']['reasonable_maximum']
@@ -339,9 +400,7 @@ class YieldSanitizer:
             
         elif action == SanitizationAction.WINSORIZE:
             # Winsorize to percentiles
-            config = self.config['winsorization']
-            lower_p = np.percentile(apys, config['lower_percentile'])
-            upper_p = np.percentile(apys, config['upper_percentile'])
+            lower_p, upper_p = winsorization_bounds()
             
             if apy < lower_p:
                 return lower_p
@@ -485,15 +544,38 @@ class YieldSanitizer:
         return SanitizationAction.ACCEPT
     
     def sanitize_yield_batch(self, yields: List[Dict[str, Any]]) -> List[YieldSanitizationResult]:
-        """Sanitize a batch of yields with market context"""
+        """
+        Sanitize a batch of yields with market context.
+        
+        Each yield is sanitized against every other yield in the batch, with
+        the same result as sanitize_yield(yield_data, yields[:i] + yields[i+1:]).
+        The APY column is sorted once and each element's leave-one-out
+        statistics are read from it, instead of rebuilding the context per yield.
+        """
         logger.info(f"Sanitizing batch of {len(yields)} yields")
         
+        if not yields:
+            return []
+        
+        market_context_size = len(yields) - 1
+        detectors = self._batch_outlier_detectors(yields) if market_context_size else [None] * len(yields)
+        
+        # Winsorization always uses the full context, zero APYs included
+        winsorization = LeaveOneOutColumn(
+            np.array([float(y.get('apy', y.get('currentYield', 0))) for y in yields])
+        )
+        config = self.config['winsorization']
+        lower_bounds = winsorization.percentile(config['lower_percentile'])
+        upper_bounds = winsorization.percentile(config['upper_percentile'])
+        
         results = []
         for i, yield_data in enumerate(yields):
-            # Use other yields as market context (excluding current one)
-            market_context = yields[:i] + yields[i+1:]
-            
-            result = self.sanitize_yield(yield_data, market_context)
+            result = self._sanitize_yield(
+                yield_data,
+                market_context_size,
+                detectors[i],
+                lambda i=i: (lower_bounds[i], upper_bounds[i])
+            )
             results.append(result)
         
         # Log summary statistics
@@ -509,6 +591,44 @@ class YieldSanitizer:
         
         return results
     
+    def _batch_outlier_detectors(self, yields: List[Dict[str, Any]]) -> List[Callable[[float], Tuple[float, SanitizationAction, List[str]]]]:
+        """Per-yield outlier detectors backed by leave-one-out statistics of the batch"""
+        # Mirrors _detect_outliers: only yields with a non-zero APY form the context
+        context = LeaveOneOutColumn(
+            np.array([float(y.get('apy', y.get('currentYield', 0))) for y in yields]),
+            np.array([bool(y.get('apy') or y.get('currentYield')) for y in yields])
+        )
+        
+        config = self.config['outlier_detection']
+        method = config['method']
+        
+        if method == "MAD":
+            medians = context.median()
+            mads = context.median_absolute_deviation(medians)
+            medians, mads = medians.tolist(), mads.tolist()
+            detect = lambda i, apy: self._classify_mad_outlier(apy, medians[i], mads[i], config['mad_threshold'])
+        elif method == "IQR":
+            q1s = context.percentile(25)
+            q3s = context.percentile(75)
+            detect = lambda i, apy: self._classify_iqr_outlier(apy, q1s[i], q3s[i], config['iqr_multiplier'])
+        elif method == "Z_SCORE":
+            means, stdevs = context.mean_stdev()
+            means, stdevs = means.tolist(), stdevs.tolist()
+            detect = lambda i, apy: self._classify_z_score_outlier(apy, means[i], stdevs[i], config['z_score_threshold'])
+        elif method == "PERCENTILE":
+            lower = context.percentile(config['percentile_lower'])
+            upper = context.percentile(config['percentile_upper'])
+            detect = lambda i, apy: self._classify_percentile_outlier(apy, lower[i], upper[i])
+        else:
+            detect = lambda i, apy: self._unknown_method(method)
+        
+        sufficient = (context.sizes >= 3).tolist()
+        
+        return [
+            (lambda apy, i=i: detect(i, apy)) if sufficient[i] else (lambda apy: self._insufficient_context())
+            for i in range(len(yields))
+        ]
+    
     def get_sanitization_summary(self) -> Dict[str, Any]:
         """Get summary of sanitization configuration and statistics"""
         return {
@@ -0,0 +1,119 @@
+"""
+Unit Tests for CryptoCompare WebSocket frame decoding
+Slotted update records and batched callback dispatch over a replayed frame stream
+"""
+
+import asyncio
+import json
+
+from services.cryptocompare_websocket import CryptoCompareWebSocketClient, CCPriceUpdate, CCOrderBookUpdate
+
+def ticker(symbol, price, volume=1e6):
+    return json.dumps({"TYPE": "24", "FROMSYMBOL": symbol, "PRICE": price, "VOLUME24HOUR": volume})
+
+def trade(symbol, price, quantity=10.0):
+    return json.dumps({"TYPE": "0", "FSYM": symbol, "P": price, "Q": quantity})
+
+def orderbook(symbol, bid, ask):
+    return json.dumps({"TYPE": "8", "FSYM": symbol, "BID": bid, "BIDQ": 5e5, "ASK": ask, "ASKQ": 4e5})
+
+class ReplayConnection:
+    """Yields recorded frames, returning to the event loop after every `chunk` frames like a socket read"""
+
+    def __init__(self, frames, chunk):
+        self.frames = frames
+        self.chunk = chunk
+
+    async def __aiter__(self):
+        for i, frame in enumerate(self.frames):
+            if i and i % self.chunk == 0:
+                await asyncio.sleep(0)
+            yield frame
+
+def test_frames_decode_to_slotted_records():
+    frames = [ticker("usdt", 1.0002), trade("DAI", 0.9995, 12.5), orderbook("USDC", 0.9999, 1.0001),
+              ticker("BTC", 65000.0), ticker("USDT", 0), "{not json", json.dumps(["heartbeat"]),
+              json.dumps({"TYPE": "999"}), json.dumps({"TYPE": "24", "FROMSYMBOL": "FRAX", "PRICE": "abc"})]
+
+    async def scenario():
+        client = CryptoCompareWebSocketClient()
+        prices, books = [], []
+
+        async def on_prices(updates):
+            prices.extend(updates)
+
+        async def on_books(updates):
+            books.extend(updates)
+
+        client.register_price_batch_callback(on_prices)
+        client.register_orderbook_batch_callback(on_books)
+        for frame in frames:
+            client.ingest_frame(frame)
+        await client.flush()
+        return client, prices, books
+
+    client, prices, books = asyncio.run(scenario())
+
+    assert [(p.symbol, p.price, p.volume_24h, p.source) for p in prices] == [
+        ("USDT", 1.0002, 1e6, "cryptocompare_ws"),
+        ("DAI", 0.9995, 12.5, "cryptocompare_ws_trade")
+    ]
+    assert [(b.symbol, b.bid_price, b.ask_price, b.ask_quantity) for b in books] == [("USDC", 0.9999, 1.0001, 4e5)]
+    assert not hasattr(prices[0], '__dict__') and not hasattr(books[0], '__dict__')
+    assert isinstance(prices[0], CCPriceUpdate) and isinstance(books[0], CCOrderBookUpdate)
+    assert prices[0].timestamp.year >= 2024
+    assert client.ingest_stats["frames"] == len(frames) and client.ingest_stats["decode_errors"] == 2
+
+def test_callbacks_receive_one_batch_per_loop_tick():
+    frames = [ticker("USDT", 1.0 + i / 1e6) for i in range(100)] + [orderbook("DAI", 0.999, 1.001)]
+
+    async def scenario():
+        client = CryptoCompareWebSocketClient()
+        client.connection = ReplayConnection(frames, chunk=25)
+        batches, singles = [], []
+
+        async def on_prices(updates):
+            batches.append([u.price for u in updates])
+
+        async def on_price(update):
+            singles.append(update.price)
+
+        client.register_price_batch_callback(on_prices)
+        client.register_price_callback(on_price)
+        await client._listen_for_messages()
+        return client, batches, singles
+
+    client, batches, singles = asyncio.run(scenario())
+
+    assert [len(batch) for batch in batches] == [25, 25, 25, 25]
+    assert [price for batch in batches for price in batch] == singles == [1.0 + i / 1e6 for i in range(100)]
+    # The trailing orderbook frame arrives in a fifth read
+    assert client.ingest_stats["batches"] == 5 and client.ingest_stats["orderbook_updates"] == 1
+
+def test_malformed_frames_are_counted_without_dropping_the_connection():
+    frames = [json.dumps({"TYPE": "0", "FSYM": None}), json.dumps({"TYPE": "8", "FSYM": 5}),
+              json.dumps({"TYPE": "24", "FROMSYMBOL": ["USDT"], "PRICE": 1.0}), json.dumps({"TYPE": ["24"]}),
+              json.dumps({"TYPE": "8", "FSYM": "DAI", "BID": {"px": 1}, "ASK": 1.001}),
+              trade("USDT", 1.0001)]
+
+    async def scenario():
+        client = CryptoCompareWebSocketClient()
+        client.connection = ReplayConnection(frames, chunk=len(frames))
+        prices, errors = [], []
+
+        async def on_prices(updates):
+            prices.extend(updates)
+
+        async def on_error():
+            errors.append(True)
+
+        client._handle_connection_error = on_error
+        client.register_price_batch_callback(on_prices)
+        await client._listen_for_messages()
+        return client, prices, errors
+
+    client, prices, errors = asyncio.run(scenario())
+
+    assert not errors
+    assert [(p.symbol, p.price) for p in prices] == [("USDT", 1.0001)]
+    assert client.ingest_stats["frames"] == len(frames) and client.ingest_stats["decode_errors"] == 2
@@ -0,0 +1,123 @@
+"""
+Unit Tests for the feature pipeline
+Vectorized per-symbol features matching a per-symbol rolling reference,
+fills that stay within a symbol, and incremental appends matching a rebuild
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from services import ml_insights_service as ml_module
+from services.feature_pipeline import FeaturePipeline, fill_within_symbol
+
+FEATURES = ['ma_7', 'ma_30', 'volatility_7', 'volatility_30', 'trend_7', 'trend_30', 'ray_trend', 'risk_penalty_trend']
+
+def make_history(rows, symbols=5, seed=0, start=datetime(2024, 1, 1)):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': [start + timedelta(hours=i) for i in range(rows)],
+        'symbol': rng.choice([f"COIN{i}" for i in range(symbols)], size=rows),
+        'apy': rng.normal(4.0, 0.5, size=rows),
+        'ray': rng.normal(3.5, 0.4, size=rows),
+        'risk_penalty': rng.uniform(0.1, 0.3, size=rows),
+        'confidence_score': rng.uniform(0.5, 1.0, size=rows),
+    })
+
+def reference_features(df):
+    """Per-symbol rolling windows, one slice at a time"""
+    frames = []
+    for _, data in df.sort_values(['symbol', 'timestamp']).groupby('symbol'):
+        data = data.copy()
+        for window in (7, 30):
+            data[f'ma_{window}'] = data['apy'].rolling(window).mean()
+            data[f'volatility_{window}'] = data['apy'].rolling(window).std()
+            data[f'trend_{window}'] = data['apy'] - data[f'ma_{window}']
+        data['ray_trend'] = data['ray'].diff()
+        data['risk_penalty_trend'] = data['risk_penalty'].diff()
+        frames.append(data)
+    return pd.concat(frames, ignore_index=True)
+
+def assert_features_equal(actual, expected):
+    actual = actual.sort_values(['symbol', 'timestamp'], ignore_index=True)
+    expected = expected.sort_values(['symbol', 'timestamp'], ignore_index=True)
+    assert list(actual['symbol'].astype(str)) == list(expected['symbol'].astype(str))
+    for column in FEATURES:
+        assert np.allclose(actual[column], expected[column], equal_nan=True), column
+
+def test_build_matches_per_symbol_rolling():
+    history = make_history(2000)
+    features = FeaturePipeline().build(history)
+
+    assert isinstance(features['symbol'].dtype, pd.CategoricalDtype)
+    assert features['hour'].tolist() == features['timestamp'].dt.hour.tolist()
+    assert_features_equal(features, reference_features(history))
+
+def test_fill_never_crosses_symbols():
+    history = make_history(200, symbols=2)
+    history.loc[history['symbol'] == 'COIN1', 'ray'] = np.nan
+    filled = fill_within_symbol(FeaturePipeline().build(history))
+
+    coin0 = filled[filled['symbol'] == 'COIN0']
+    coin1 = filled[filled['symbol'] == 'COIN1']
+    assert coin1['ray'].isna().all() and coin1['ray_trend'].isna().all()
+    assert not coin0[FEATURES].isna().any().any()
+    # The first rows take the symbol's own first full window
+    assert coin0['ma_30'].iloc[0] == coin0['ma_30'].iloc[29]
+
+def test_append_matches_full_rebuild():
+    history = make_history(3000, symbols=7)
+    pipeline = FeaturePipeline()
+    pipeline.build(history.iloc[:2000])
+    for start in range(2000, 3000, 250):
+        computed = pipeline.append(history.iloc[start:start + 250])
+        assert len(computed) == 250
+
+    assert pipeline.stats == {"builds": 1, "appends": 4, "rows_computed": 3000}
+    assert len(pipeline) == 3000
+    assert_features_equal(pipeline.frame, reference_features(history))
+
+def test_append_new_symbol_and_out_of_order_rows():
+    history = make_history(600, symbols=3)
+    pipeline = FeaturePipeline()
+    pipeline.build(history.iloc[:500])
+
+    late = make_history(40, symbols=1, seed=1, start=datetime(2024, 3, 1)).assign(symbol='NEWCOIN')
+    pipeline.append(late)
+    assert pipeline.stats["builds"] == 1
+    assert_features_equal(pipeline.frame, reference_features(pd.concat([history.iloc[:500], late])))
+
+    # A row older than its symbol's latest timestamp forces a rebuild
+    pipeline.append(history.iloc[500:])
+    pipeline.append(history.iloc[:1].assign(timestamp=datetime(2023, 12, 1)))
+    assert pipeline.stats["builds"] == 2
+    everything = pd.concat([history, late, history.iloc[:1].assign(timestamp=datetime(2023, 12, 1))])
+    assert_features_equal(pipeline.frame, reference_features(everything))
+
+def test_service_loads_history_incrementally(monkeypatch):
+    history = make_history(400, symbols=4)
+    batch = SimpleNamespace(historical_data=history.iloc[:300].to_dict('records'))
+    monkeypatch.setattr(ml_module, "get_batch_analytics_service", lambda: batch)
+    service = ml_module.MLInsightsService()
+
+    first = asyncio.run(service._load_historical_data())
+    assert len(first) == 300
+
+    # Retention drops the oldest rows while new rows arrive
+    batch.historical_data = history.iloc[50:].to_dict('records')
+    second = asyncio.run(service._load_historical_data())
+
+    assert service.feature_pipeline.stats["rows_computed"] == 400
+    assert len(second) == 350 and second['timestamp'].min() == history['timestamp'].iloc[50]
+    assert not second[FEATURES].isna().any().any()
+    assert service.get_ml_status()["feature_pipeline"]["appends"] == 1
+
+def test_synthetic_data_has_complete_features():
+    service = ml_module.MLInsightsService()
+    data = service._generate_synthetic_data()
+    assert len(data) == 1000
+    assert not data[FEATURES].isna().any().any()
+    assert service.feature_pipeline.latest_timestamp is None
@@ -0,0 +1,95 @@
+"""
+Unit Tests for Shared HTTP Client Service
+Tests against a local aiohttp server: connection reuse, retries and latency metrics
+"""
+
+import asyncio
+from aiohttp import web
+from services.http_client_service import HTTPClientService, HTTPSourceConfig
+
+async def run_with_server(handlers, scenario):
+    """Start a local server with the given routes, run scenario(client, base_url)"""
+    app = web.Application()
+    for path, handler in handlers.items():
+        app.router.add_route("*", path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    client = HTTPClientService()
+    client.config["sources"]["test"] = HTTPSourceConfig(timeout_seconds=2.0, max_retries=2, backoff_seconds=0.01)
+    try:
+        return await scenario(client, f"http://127.0.0.1:{port}")
+    finally:
+        await client.stop()
+        await runner.cleanup()
+
+def test_connections_are_reused_across_requests():
+    peers = set()
+
+    async def handler(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    async def scenario(client, base_url):
+        for _ in range(5):
+            response = await client.get("test", f"{base_url}/data")
+            assert response.status == 200
+            assert response.data == {"ok": True}
+
+    asyncio.run(run_with_server({"/data": handler}, scenario))
+
+    # One keep-alive connection served every request
+    assert len(peers) == 1
+
+def test_retryable_status_is_retried_with_backoff():
+    calls = []
+
+    async def flaky(request):
+        calls.append(request.method)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.json_response({"attempt": len(calls)})
+
+    async def scenario(client, base_url):
+        response = await client.get("test", f"{base_url}/flaky")
+        return response, client.get_metrics()["sources"]["test"]
+
+    response, metrics = asyncio.run(run_with_server({"/flaky": flaky}, scenario))
+
+    assert response.status == 200
+    assert response.data == {"attempt": 3}
+    assert metrics["count"] == 3
+    assert metrics["retries"] == 2
+
+def test_post_is_not_retried_by_default():
+    calls = []
+
+    async def failing(request):
+        calls.append(request.method)
+        return web.Response(status=503)
+
+    async def scenario(client, base_url):
+        return await client.post("test", f"{base_url}/hook", json={"event": "x"}, read=None)
+
+    response = asyncio.run(run_with_server({"/hook": failing}, scenario))
+
+    assert response.status == 503
+    assert calls == ["POST"]
+
+def test_latency_histogram_buckets():
+    async def handler(request):
+        return web.json_response({})
+
+    async def scenario(client, base_url):
+        for _ in range(4):
+            await client.get("test", f"{base_url}/fast")
+        return client.get_metrics()
+
+    metrics = asyncio.run(run_with_server({"/fast": handler}, scenario))["sources"]["test"]
+
+    assert metrics["count"] == 4
+    assert sum(metrics["buckets"].values()) == 4
+    assert metrics["p50_ms"] is not None
@@ -0,0 +1,107 @@
+"""
+Unit Tests for batched ML inference
+One scale-and-predict pass per call matching per-row inference, row
+memoization and its invalidation on retraining, and the MLInsightsService
+prediction and anomaly paths built on it
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from services.ml_inference import MemoizedInference
+from services.ml_insights_service import MLInsightsService
+
+class CountingModel:
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return self.model.predict(X)
+
+def fitted_regressor(seed=0, features=14):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, features))
+    y = X[:, 3] * 2 + rng.normal(scale=0.1, size=200)
+    scaler = StandardScaler().fit(X)
+    return RandomForestRegressor(n_estimators=10, random_state=seed).fit(scaler.transform(X), y), scaler
+
+def make_yields(count):
+    return [
+        {"stablecoin": f"COIN{i}", "currentYield": 2.0 + i * 0.5,
+         "metadata": {"ray_calculation": {"risk_adjusted_yield": 1.5 + i * 0.4}}}
+        for i in range(count)
+    ]
+
+def test_batch_matches_per_row_and_memoizes():
+    regressor, scaler = fitted_regressor()
+    model = CountingModel(regressor)
+    inference = MemoizedInference(lambda m, X: m.predict(X))
+    rows = [np.random.default_rng(i).normal(size=(1, 14)) for i in range(8)]
+
+    batched = inference.run(model, scaler, rows)
+    assert model.calls == [8]
+    assert np.allclose(batched, [regressor.predict(scaler.transform(row))[0] for row in rows])
+
+    # Repeated rows are served from the cache; only new rows reach the model
+    again = inference.run(model, scaler, rows[:4] + [np.ones(14)])
+    assert model.calls == [8, 1]
+    assert np.array_equal(again[:4], batched[:4])
+    assert inference.stats.cache_hits == 4 and inference.stats.rows == 13
+
+    # A retrained model invalidates every cached row
+    retrained = CountingModel(fitted_regressor(seed=1)[0])
+    inference.run(retrained, scaler, rows)
+    assert retrained.calls == [8]
+
+def test_cache_is_bounded_lru():
+    inference = MemoizedInference(lambda m, X: X[:, 0], max_entries=3)
+    rows = [np.array([float(i)]) for i in range(5)]
+    inference.run("model", None, rows[:3])
+    inference.run("model", None, rows[:1])  # Touch row 0
+    inference.run("model", None, rows[3:4])
+    assert list(inference._cache) == [rows[2].tobytes(), rows[0].tobytes(), rows[3].tobytes()]
+
+def test_predict_yields_scales_and_predicts_once():
+    regressor, scaler = fitted_regressor()
+    service = MLInsightsService()
+    service.yield_predictor, service.scalers["yield_predictor"] = CountingModel(regressor), scaler
+    service.is_initialized = True
+    yields = make_yields(6)
+
+    predictions = asyncio.run(service.predict_yields(yields))
+
+    assert service.yield_predictor.calls == [6]
+    assert [p.symbol for p in predictions] == [f"COIN{i}" for i in range(6)]
+    for data, p in zip(yields, predictions):
+        base = regressor.predict(scaler.transform(service._extract_prediction_features(data)))[0]
+        assert p.predicted_yield_1d == pytest.approx(max(0.1, base))
+        assert p.predicted_yield_7d == pytest.approx(max(0.1, base * 1.06))
+        assert p.predicted_yield_30d == pytest.approx(max(0.1, base * 1.29))
+        assert (p.confidence_1d, p.confidence_7d, p.confidence_30d) == pytest.approx((0.8415, 0.7905, 0.595))
+    assert service.get_ml_status()["inference"]["yield_predictor"]["calls"] == 1
+
+def test_detect_anomalies_matches_isolation_forest_predict():
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(300, 7))
+    scaler = StandardScaler().fit(X)
+    detector = IsolationForest(contamination=0.15, random_state=0).fit(scaler.transform(X))
+
+    service = MLInsightsService()
+    service.anomaly_detector, service.scalers["anomaly_detector"] = detector, scaler
+    service.is_initialized = True
+    yields = make_yields(10) + [{"stablecoin": "SPIKE", "currentYield": 80.0}]
+
+    alerts = asyncio.run(service.detect_anomalies(yields))
+
+    features = np.vstack([service._extract_anomaly_features(data) for data in yields])
+    flagged = detector.predict(scaler.transform(features)) == -1
+    assert [a.symbol for a in alerts] == [y["stablecoin"] for y, f in zip(yields, flagged) if f]
+    assert "SPIKE" in {a.symbol for a in alerts}
+    spike = next(a for a in alerts if a.symbol == "SPIKE")
+    assert spike.anomaly_type == "yield_spike" and spike.severity == "high"
@@ -0,0 +1,226 @@
+"""
+Unit Tests for the model registry and background trainer
+Versioned atomic publishing, memory-mapped loads, fits in a separate process
+while the event loop keeps running, and hot-swapping the ML services' models
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from services.ai_portfolio_service import AIPortfolioService
+from services.ml_insights_service import MODEL_FITS, MLInsightsService
+from services.model_registry import ModelRegistry, ModelTrainer, ModelVersion, get_model_registry
+
+def fit_in_child(rows, sleep_seconds=0.0):
+    import time
+    time.sleep(sleep_seconds)
+    scaler = StandardScaler().fit(np.arange(rows * 2, dtype=float).reshape(rows, 2))
+    return {"artifact": {"scaler": scaler}, "samples": rows, "metrics": {"pid": os.getpid()}}
+
+def fit_nothing():
+    return None
+
+@pytest.fixture(scope="module")
+def trainer():
+    trainer = ModelTrainer()
+    yield trainer
+    trainer.shutdown()
+
+def test_publish_versions_and_memory_mapped_load(tmp_path):
+    registry = ModelRegistry(tmp_path, keep_versions=2)
+    assert registry.current("model") is None and registry.load("model") is None
+
+    for rows in (10, 20, 30):
+        version = registry.publish("model", {"weights": np.ones(rows)}, 1.5, samples=rows, metrics={"rows": rows})
+
+    assert version.version == 3 and registry.current("model") == version
+    loaded_version, artifact = registry.load("model")
+    assert loaded_version.metrics == {"rows": 30} and loaded_version.training_duration_seconds == 1.5
+    assert isinstance(artifact["weights"], np.memmap) and len(artifact["weights"]) == 30
+    # Only the newest versions are kept, and no staging leftovers remain
+    assert sorted(path.name for path in (tmp_path / "model").iterdir()) == [".lock", "CURRENT", "v000002", "v000003"]
+
+def test_current_never_moves_back_to_an_older_version(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    registry.publish("model", {"weights": np.zeros(1)}, 0.1)
+    registry.publish("model", {"weights": np.zeros(2)}, 0.1)
+    # A slower publisher finishing with the older version must not roll serving back
+    with registry._locked("model"):
+        assert not registry._advance_current("model", 1)
+    assert registry.current("model").version == 2
+
+def test_training_lease_has_a_single_owner(tmp_path):
+    first, second = ModelRegistry(tmp_path), ModelRegistry(tmp_path)
+    assert first.acquire_training_lease() and first.acquire_training_lease()
+    assert not second.acquire_training_lease() and not second.owns_training
+    first.release_training_lease()
+    assert second.acquire_training_lease()
+    second.release_training_lease()
+
+def test_services_share_one_registry_and_lease(tmp_path):
+    assert MLInsightsService().registry is AIPortfolioService().model_registry is get_model_registry()
+    registry = ModelRegistry(tmp_path)
+    assert registry.acquire_training_lease("ml_insights") and registry.acquire_training_lease("ai_portfolio")
+    registry.release_training_lease("ml_insights")
+    # The lease is kept while another service of the process still holds it
+    assert registry.owns_training and not ModelRegistry(tmp_path).acquire_training_lease()
+    registry.release_training_lease("ai_portfolio")
+    assert not registry.owns_training
+
+def test_unfinished_version_is_never_current(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    registry.publish("model", {"weights": np.zeros(3)}, 0.1)
+    # A crashed publisher leaves a staging directory behind; readers ignore it
+    (tmp_path / "model" / ".staging-crashed").mkdir()
+    assert registry.current("model").version == 1
+    assert registry.publish("model", {"weights": np.zeros(3)}, 0.1).version == 2
+
+def test_version_age():
+    version = ModelVersion("model", 1, (datetime.utcnow() - timedelta(hours=2)).isoformat(), 3.0)
+    assert 7190 < version.age_seconds() < 7210
+
+def test_trainer_fits_in_another_process_without_blocking_loop(tmp_path, trainer):
+    registry = ModelRegistry(tmp_path)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        version = await trainer.train(registry, "scaler", fit_in_child, 50, 0.5)
+        skipped = await trainer.train(registry, "scaler", fit_nothing)
+        task.cancel()
+        return version, skipped, ticks
+
+    version, skipped, ticks = asyncio.run(scenario())
+    assert version.metrics["pid"] != os.getpid() and version.samples == 50
+    assert version.training_duration_seconds >= 0.5
+    assert skipped is None and registry.current("scaler").version == 1
+    assert ticks >= 20
+    assert trainer.stats["runs"] == 2 and trainer.stats["in_progress"] == 0
+
+def test_ml_service_trains_in_background_and_hot_swaps(tmp_path, trainer):
+    def make_service():
+        service = MLInsightsService()
+        service.registry = ModelRegistry(tmp_path)
+        service.trainer = trainer
+        return service
+
+    async def scenario():
+        service = make_service()
+        await service.initialize()
+        assert service.get_ml_status()["models"]["yield_predictor"]["source"] == "default"
+        default_predictor = service.yield_predictor
+        # Synthetic history is used when no batch analytics data is available
+        await asyncio.wait_for(_wait_for_versions(service), 120)
+        await service.stop()
+        assert service.yield_predictor is not default_predictor
+        return service
+
+    service = asyncio.run(scenario())
+    status = service.get_ml_status()
+    for name in MODEL_FITS:
+        model = status["models"][name]
+        assert model["version"] == 1 and model["source"] == "registry" and not model["stale"]
+        assert model["training_duration_seconds"] > 0
+    assert status["training"]["last_duration_seconds"] > 0 and not status["training"]["in_progress"]
+    assert "mse" in status["models"]["yield_predictor"]["metrics"]
+
+    # Another serving process picks up the published versions without training
+    other = make_service()
+    asyncio.run(other._initialize_default_models())
+    assert sorted(other.refresh_models()) == sorted(MODEL_FITS)
+    assert other.model_versions["risk_predictor"].version == 1
+    assert isinstance(other.scalers["yield_predictor"].mean_, np.memmap)
+    assert other.refresh_models() == []
+
+class SkippingTrainer:
+    """Publishes nothing, like a fit without enough clean data"""
+    stats = {}
+
+    def __init__(self):
+        self.trained = []
+
+    async def train(self, registry, name, fit, *args):
+        self.trained.append(name)
+        return None
+
+def test_only_due_models_are_retrained_and_skipped_fits_back_off(tmp_path):
+    service = MLInsightsService()
+    service.registry = ModelRegistry(tmp_path)
+    service.trainer = SkippingTrainer()
+    fresh, missing = ["yield_predictor", "anomaly_detector", "risk_predictor"], "market_segmentation"
+    for name in fresh:
+        service.registry.publish(name, {"model": None, "scaler": None}, 1.0)
+
+    assert service._models_due() == [missing]
+    assert asyncio.run(service.retrain_models(service._models_due())) == {}
+    assert service.trainer.trained == [missing]
+
+    # The skipped model waits out its backoff instead of refitting every refresh
+    assert service._models_due() == []
+    status = service.get_ml_status()["training"]
+    assert 0 < status["backing_off"][missing] <= service.config["training_backoff_seconds"]
+    service._training_backoff[missing] = (0.0, 300.0)
+    assert service._models_due() == [missing]
+    service._back_off(missing)
+    assert service._training_backoff[missing][1] == 600.0
+
+class PublishingTrainer:
+    """Publishes a portfolio model version in-process"""
+    stats = {}
+
+    def __init__(self):
+        self.trained = []
+
+    async def train(self, registry, name, fit, *args):
+        self.trained.append(name)
+        artifact = {"scaler": StandardScaler(), "portfolio_optimizer": None, "return_predictor": None}
+        return registry.publish(name, artifact, 0.1)
+
+def test_portfolio_models_train_in_the_lease_owner_only_when_due(tmp_path):
+    def make_service(**config):
+        service = AIPortfolioService()
+        service.model_registry = ModelRegistry(tmp_path)
+        service.trainer = PublishingTrainer()
+        service.yield_aggregator = SimpleNamespace(get_all_yields=_some_yields)
+        service.config.update(model_update_interval=0, **config)
+        return service
+
+    async def run_updater(service):
+        service.is_running = True
+        task = asyncio.create_task(service._model_updater())
+        await asyncio.sleep(0.05)
+        service.is_running = False
+        await task
+
+    owner = make_service()
+    asyncio.run(run_updater(owner))
+    # Fitted once, then fresh for the rest of the loop
+    assert owner.trainer.trained == ["ai_portfolio"] and owner.model_version.version == 1
+    assert owner.model_registry.owns_training
+
+    # Another worker finds the model due but cannot take the lease, so it only loads
+    other = make_service(model_max_age_seconds=-1)
+    asyncio.run(run_updater(other))
+    assert other.trainer.trained == [] and other.model_version.version == 1
+    assert not other._model_status()["owns_training"]
+    owner.model_registry.release_training_lease("ai_portfolio")
+
+async def _some_yields():
+    return [{"stablecoin": "USDT"}]
+
+async def _wait_for_versions(service):
+    while len(service.model_versions) < len(MODEL_FITS):
+        await asyncio.sleep(0.05)
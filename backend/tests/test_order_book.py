@@ -0,0 +1,134 @@
+"""
+Unit Tests for the Order Book matching engine
+Price-time priority, partial fills, cancels and time in force, plus the
+TradingEngineService integration (fills, resting orders, synthetic liquidity)
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from services.order_book import OrderBook
+from services.trading_engine_service import TradingEngineService, OrderStatus
+
+def test_price_time_priority_with_partial_fills():
+    book = OrderBook("TEST/USD")
+    book.submit("s1", "alice", "sell", 100, price=101)
+    book.submit("s2", "bob", "sell", 50, price=100)
+    book.submit("s3", "carol", "sell", 70, price=100)  # Same price as s2, queued behind it
+
+    fills = book.submit("b1", "dave", "buy", 150, price=101)
+
+    assert [(f.maker_order_id, f.price, f.quantity) for f in fills] == [("s2", 100, 50), ("s3", 100, 70), ("s1", 101, 30)]
+    assert all(f.taker_order_id == "b1" and f.taker_side == "buy" for f in fills)
+    assert book.remaining("s1") == 70 and "s2" not in book and "s3" not in book
+    assert "b1" not in book  # Fully filled, nothing rests
+    assert book.depth() == {"bids": [], "asks": [(101, 70, 1)]}
+
+def test_unfilled_limit_quantity_rests_and_market_orders_never_rest():
+    book = OrderBook("TEST/USD")
+    book.submit("s1", "alice", "sell", 40, price=100)
+
+    fills = book.submit("b1", "bob", "buy", 100, price=100)
+    assert sum(f.quantity for f in fills) == 40
+    assert book.remaining("b1") == 60 and book.best_bid == 100 and book.best_ask is None
+
+    # A market sell sweeps the bid and the rest of it is dropped
+    fills = book.submit("m1", "carol", "sell", 500)
+    assert [(f.maker_order_id, f.quantity) for f in fills] == [("b1", 60)]
+    assert len(book) == 0 and "m1" not in book
+
+def test_cancel_removes_order_and_preserves_queue_order():
+    book = OrderBook("TEST/USD")
+    for i in range(4):
+        book.submit(f"b{i}", "alice", "buy", 10, price=99)
+    book.submit("b9", "alice", "buy", 10, price=98)
+
+    assert book.cancel("b1") == 10
+    assert book.cancel("b1") is None
+    assert book.cancel("b9") == 10
+    assert book.depth() == {"bids": [(99, 30, 3)], "asks": []}
+
+    fills = book.submit("s1", "bob", "sell", 25, price=90)
+    assert [(f.maker_order_id, f.quantity) for f in fills] == [("b0", 10), ("b2", 10), ("b3", 5)]
+    assert book.stats == {"orders": 6, "cancels": 2, "fills": 3}
+
+def test_ioc_and_fok_time_in_force():
+    book = OrderBook("TEST/USD")
+    book.submit("s1", "alice", "sell", 30, price=100)
+    book.submit("s2", "alice", "sell", 30, price=102)
+
+    # FOK cannot be satisfied within its limit, so nothing trades
+    assert book.submit("f1", "bob", "buy", 50, price=101, time_in_force="FOK") == []
+    assert book.remaining("s1") == 30
+
+    fills = book.submit("i1", "bob", "buy", 50, price=101, time_in_force="IOC")
+    assert sum(f.quantity for f in fills) == 30 and "i1" not in book
+
+    fills = book.submit("f2", "bob", "buy", 30, price=102, time_in_force="FOK")
+    assert sum(f.quantity for f in fills) == 30 and len(book) == 0
+
+    with pytest.raises(ValueError):
+        book.submit("x", "bob", "buy", 0, price=100)
+
+def make_engine(synthetic_quotes: bool) -> TradingEngineService:
+    engine = TradingEngineService()
+    engine.config["liquidity"]["synthetic_quotes"] = synthetic_quotes
+    engine.config["risk"]["pre_trade_checks"] = False
+    return engine
+
+def test_engine_matches_client_orders_and_cancels():
+    async def scenario():
+        engine = make_engine(synthetic_quotes=False)
+        await engine._initialize_trading_pairs()
+        await engine._initialize_market_data()
+
+        maker = await engine.create_order("maker", "USDT/USD", "sell", "limit", Decimal('1000'), Decimal('1.0002'))
+        taker = await engine.create_order("taker", "USDT/USD", "buy", "limit", Decimal('1500'), Decimal('1.0003'))
+        after_match = (maker.status, taker.status, taker.remaining_quantity)
+
+        cancelled = await engine.cancel_order(taker.order_id)
+        with pytest.raises(ValueError):
+            await engine.cancel_order(maker.order_id)
+        return engine, maker, cancelled, after_match
+
+    engine, maker, taker, after_match = asyncio.run(scenario())
+
+    assert after_match == (OrderStatus.FILLED, OrderStatus.PARTIALLY_FILLED, Decimal('500'))
+    assert taker.status == OrderStatus.CANCELLED and taker.filled_quantity == Decimal('1000')
+    assert maker.average_price == taker.average_price == Decimal('1.0002')  # Maker's price
+
+    trades = sorted(engine.trades.values(), key=lambda t: t.client_id)
+    pair = engine.trading_pairs["USDT/USD"]
+    assert [(t.client_id, t.quantity) for t in trades] == [("maker", Decimal('1000')), ("taker", Decimal('1000'))]
+    assert trades[0].commission == Decimal('1000') * Decimal('1.0002') * pair.maker_fee
+    assert trades[1].commission == Decimal('1000') * Decimal('1.0002') * pair.taker_fee
+    assert engine.positions["taker_USDT/USD"].quantity == Decimal('1000')
+    assert engine.positions["maker_USDT/USD"].quantity == Decimal('-1000')
+    assert len(engine.matching_books["USDT/USD"]) == 0
+
+def test_engine_synthetic_liquidity_fills_market_and_resting_orders():
+    async def scenario():
+        engine = make_engine(synthetic_quotes=True)
+        await engine._initialize_trading_pairs()
+        await engine._initialize_market_data()
+
+        market = await engine.create_order("client", "DAI/USD", "buy", "market", Decimal('2500000'))
+
+        # A bid below the ladder rests until the market moves down through it
+        bid_price = engine.market_prices["DAI/USD"] - Decimal('0.001')
+        resting = await engine.create_order("client", "DAI/USD", "buy", "limit", Decimal('5000'), bid_price)
+        status_before = resting.status
+        engine.market_prices["DAI/USD"] = bid_price - Decimal('0.0005')
+        await engine._refresh_synthetic_quotes("DAI/USD")
+        return engine, market, resting, status_before
+
+    engine, market, resting, status_before = asyncio.run(scenario())
+
+    assert market.status == OrderStatus.FILLED
+    # 1M per level: the order walks three ask levels
+    assert len([t for t in engine.trades.values() if t.order_id == market.order_id]) == 3
+    assert status_before == OrderStatus.OPEN
+    assert resting.status == OrderStatus.FILLED and resting.average_price == resting.price
+    assert engine.order_books["DAI/USD"]["bid"] < engine.order_books["DAI/USD"]["ask"]
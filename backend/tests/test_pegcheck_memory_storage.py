@@ -0,0 +1,121 @@
+"""
+Unit Tests for PegCheck MemoryStorage history index
+Columnar ring-buffer queries against a scan of the stored payloads
+"""
+
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if app_dir not in sys.path:
+    sys.path.append(app_dir)
+
+from pegcheck.core.compute import compute_peg_analysis
+from pegcheck.storage.columnar import SymbolSeries, BYTES_PER_POINT
+from pegcheck.storage.memory import MemoryStorage
+
+SYMBOLS = ["USDT", "USDC", "DAI", "FRAX"]
+
+def make_payload(rng: random.Random, timestamp: int):
+    coingecko = {s: rng.choice([rng.gauss(1.0, 0.004), float("nan")]) for s in SYMBOLS}
+    cryptocompare = {s: rng.gauss(1.0, 0.004) for s in SYMBOLS if rng.random() < 0.8}
+    chainlink = {s: rng.gauss(1.0, 0.002) for s in SYMBOLS[:2]} if rng.random() < 0.5 else None
+    payload = compute_peg_analysis(coingecko, cryptocompare, chainlink, symbols=SYMBOLS)
+    payload.as_of = timestamp
+    for report in payload.reports:
+        report.timestamp = timestamp
+    return payload
+
+def scan_history(payloads, symbol, since):
+    """Reference: walk every stored report"""
+    history = [
+        (datetime.fromtimestamp(r.timestamp), float(r.avg_ref), r.status.value)
+        for p in payloads for r in p.reports
+        if r.symbol == symbol and r.timestamp >= since and not math.isnan(r.avg_ref)
+    ]
+    history.sort(key=lambda x: x[0])
+    return history
+
+def scan_reliability(payloads, source, since):
+    counts = {}
+    for p in payloads:
+        if p.as_of < since:
+            continue
+        for symbol, price in (getattr(p, source) or {}).items():
+            stats = counts.setdefault(symbol, {"total": 0, "success": 0})
+            stats["total"] += 1
+            stats["success"] += int(not math.isnan(price) and price > 0)
+    return {s: c["success"] / c["total"] for s, c in counts.items()}
+
+def test_queries_match_payload_scan():
+    """History and reliability match a full scan, including late points and eviction"""
+    rng = random.Random(3)
+    now = int(time.time())
+    storage = MemoryStorage(max_records=120)
+    timestamps = [now - 3600 * 200 + 3000 * i for i in range(300)]
+    # A few late arrivals out of order
+    for i in (50, 140, 260):
+        timestamps[i] -= 9000
+
+    async def scenario():
+        for ts in timestamps:
+            await storage.store_peg_check(make_payload(rng, ts))
+        retained = [record["payload"] for record in storage.peg_checks]
+        results = {}
+        for hours in (1, 24, 168, 1000):
+            for symbol in SYMBOLS + ["PYUSD"]:
+                results[(symbol, hours)] = await storage.get_peg_history(symbol, hours)
+            results[("reliability", hours)] = await storage.get_source_reliability("cryptocompare", hours)
+            results[("chainlink", hours)] = await storage.get_source_reliability("chainlink", hours)
+        return retained, results
+
+    retained, results = asyncio.run(scenario())
+
+    # Each symbol gets one point per check, so the series window equals the payload deque
+    for hours in (1, 24, 168, 1000):
+        since = time.time() - hours * 3600
+        for symbol in SYMBOLS + ["PYUSD"]:
+            assert results[(symbol, hours)] == scan_history(retained, symbol, since)
+        for source in ("reliability", "chainlink"):
+            name = "cryptocompare" if source == "reliability" else source
+            got = {s: v["success_rate"] for s, v in results[(source, hours)].items()}
+            assert got == scan_reliability(retained, name, since)
+
+def test_history_arrays_are_time_ordered_copies():
+    storage = MemoryStorage(max_records=50)
+    rng = random.Random(1)
+    now = int(time.time())
+
+    async def scenario():
+        for i in range(40):
+            await storage.store_peg_check(make_payload(rng, now - 100 * (40 - i)))
+        arrays = await storage.get_peg_history_arrays("USDC", hours=1)
+        for i in range(200):
+            await storage.store_peg_check(make_payload(rng, now + i))
+        return arrays
+
+    timestamps, prices, statuses = asyncio.run(scenario())
+
+    assert timestamps.dtype == np.int64 and statuses.dtype == np.int8
+    assert np.all(np.diff(timestamps) >= 0)
+    assert np.all(timestamps >= now - 3600) and not np.isnan(prices).any()
+    # Later appends and compaction leave returned arrays untouched
+    assert np.all(timestamps <= now)
+
+def test_series_memory_is_bounded():
+    series = SymbolSeries(capacity=100)
+    for i in range(1_000):
+        series.append(i, 1.0, 0, 1, 1)
+
+    assert len(series) == 100
+    assert series.timestamps.tolist() == list(range(900, 1_000))
+    assert series.allocated_bytes == 2 * 100 * BYTES_PER_POINT
+    assert series.trim_before(950) == 50
+    assert series.timestamps[0] == 950
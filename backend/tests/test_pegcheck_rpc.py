@@ -0,0 +1,167 @@
+"""
+Unit Tests for batched PegCheck on-chain reads
+Tests against a local stub RPC server: JSON-RPC batch arrays, Multicall3 and the decimals cache
+"""
+
+import asyncio
+import math
+import os
+import sys
+import pytest
+from aiohttp import web
+
+app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if app_dir not in sys.path:
+    sys.path.append(app_dir)
+
+from pegcheck.core.config import CHAINLINK_FEEDS, UNISWAP_POOLS, MULTICALL3_ADDRESS
+from pegcheck.sources import chainlink, uniswap, rpc, http
+
+FEED_ANSWERS = {"USDT": 100_010_000, "USDC": 99_990_000, "DAI": 100_000_000}  # 8 decimals
+POOL_TICKS = {"USDT": 196_000, "DAI": -80_000}
+NOW = 1_700_000_000
+
+def word(value: int) -> str:
+    return f"{value % 2**256:064x}"
+
+def build_contracts():
+    """Return values by (lowercase address, selector)"""
+    contracts = {}
+    for symbol, answer in FEED_ANSWERS.items():
+        address = CHAINLINK_FEEDS[symbol].lower()
+        contracts[(address, "313ce567")] = "0x" + word(8)
+        contracts[(address, "feaf968c")] = "0x" + word(1) + word(answer) + word(NOW) + word(NOW) + word(1)
+    for symbol, tick in POOL_TICKS.items():
+        address = UNISWAP_POOLS[symbol]["address"].lower()
+        contracts[(address, "3850c7bd")] = "0x" + word(2**96) + word(tick) + word(0) * 5
+    return contracts
+
+class StubRPC:
+    """Minimal eth_call node: answers single calls, batch arrays and Multicall3 aggregate3"""
+
+    def __init__(self):
+        self.contracts = build_contracts()
+        self.http_requests = 0
+        self.eth_calls = []
+
+    def call(self, target: str, data: str):
+        self.eth_calls.append((target.lower(), data[2:10]))
+        return self.contracts.get((target.lower(), data[2:10]))
+
+    def aggregate3(self, data: bytes) -> str:
+        def read(offset):
+            return int.from_bytes(data[offset:offset + 32], "big")
+
+        table = read(0) + 32
+        results = []
+        for i in range(read(table - 32)):
+            start = table + read(table + 32 * i)
+            target = "0x" + data[start + 12:start + 32].hex()
+            call_start = start + read(start + 64)
+            call_data = data[call_start + 32:call_start + 32 + read(call_start)]
+            result = self.call(target, "0x" + call_data.hex())
+            results.append((result is not None, bytes.fromhex(result[2:]) if result else b""))
+
+        # Encode (bool success, bytes returnData)[]
+        encoded = []
+        for success, return_data in results:
+            padded = return_data + b"\x00" * ((-len(return_data)) % 32)
+            encoded.append(word(int(success)) + word(0x40) + word(len(return_data)) + padded.hex())
+        offsets, position = [], 32 * len(encoded)
+        for item in encoded:
+            offsets.append(word(position))
+            position += len(item) // 2
+        return "0x" + word(0x20) + word(len(encoded)) + "".join(offsets) + "".join(encoded)
+
+    def respond(self, request: dict) -> dict:
+        call, block = request["params"]
+        if call["to"].lower() == MULTICALL3_ADDRESS.lower():
+            result = self.aggregate3(bytes.fromhex(call["data"][10:]))
+        else:
+            result = self.call(call["to"], call["data"])
+        if result is None:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "execution reverted"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handle(self, request):
+        self.http_requests += 1
+        body = await request.json()
+        if isinstance(body, list):
+            # Answer out of order, as real nodes may
+            return web.json_response([self.respond(item) for item in reversed(body)])
+        return web.json_response(self.respond(body))
+
+def run_against_stub(monkeypatch, mode, scenario):
+    stub = StubRPC()
+    monkeypatch.setattr(chainlink, "_decimals_cache", {})
+    monkeypatch.setattr(rpc, "ETH_RPC_BATCH_MODE", mode)
+
+    async def runner():
+        app = web.Application()
+        app.router.add_post("/", stub.handle)
+        app_runner = web.AppRunner(app)
+        await app_runner.setup()
+        site = web.TCPSite(app_runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(rpc, "ETH_RPC_URL", f"http://127.0.0.1:{port}/")
+        try:
+            return await scenario(stub)
+        finally:
+            await http.close_session()
+            await app_runner.cleanup()
+
+    return asyncio.run(runner())
+
+def expected_pool_price(symbol: str) -> float:
+    pool = UNISWAP_POOLS[symbol]
+    ratio = uniswap._tick_to_price(POOL_TICKS[symbol],
+                                   uniswap.TOKEN_DECIMALS.get(pool["token0"], 18),
+                                   uniswap.TOKEN_DECIMALS.get(pool["token1"], 18))
+    return 3000.0 / ratio
+
+@pytest.mark.parametrize("mode", ["jsonrpc", "multicall"])
+def test_chainlink_feeds_in_one_round_trip(monkeypatch, mode):
+    """All feeds are read in one request; decimals are only fetched once per feed"""
+    symbols = ["USDT", "USDC", "DAI", "PYUSD"]
+
+    async def scenario(stub):
+        first = await chainlink.fetch_async(symbols)
+        first_requests, first_calls = stub.http_requests, len(stub.eth_calls)
+        second = await chainlink.fetch_async(symbols)
+        return first, second, first_requests, first_calls, stub
+
+    first, second, first_requests, first_calls, stub = run_against_stub(monkeypatch, mode, scenario)
+
+    for prices in (first, second):
+        assert prices["USDT"] == pytest.approx(1.0001)
+        assert prices["USDC"] == pytest.approx(0.9999)
+        assert prices["DAI"] == pytest.approx(1.0)
+        assert math.isnan(prices["PYUSD"])  # No feed configured
+
+    assert first_requests == 1
+    assert first_calls == 6
+    assert stub.http_requests == 2
+    assert len(stub.eth_calls) - first_calls == 3  # latestRoundData only
+    assert all(selector == "feaf968c" for _, selector in stub.eth_calls[first_calls:])
+
+@pytest.mark.parametrize("mode", ["jsonrpc", "multicall"])
+def test_uniswap_pools_in_one_round_trip(monkeypatch, mode):
+    """All pools are read in one request; a reverted call only affects its own symbol"""
+    async def scenario(stub):
+        prices = await uniswap.fetch_async(["USDT", "USDC", "DAI", "FRAX"])
+        return prices, stub
+
+    prices, stub = run_against_stub(monkeypatch, mode, scenario)
+
+    assert stub.http_requests == 1
+    assert len(stub.eth_calls) == 3
+    assert prices["USDT"] == pytest.approx(expected_pool_price("USDT"))
+    assert prices["DAI"] == pytest.approx(expected_pool_price("DAI"))
+    assert math.isnan(prices["USDC"])  # Stub has no state for this pool
+    assert math.isnan(prices["FRAX"])  # No pool configured
+
+def test_batch_eth_call_without_rpc_url(monkeypatch):
+    """Unconfigured RPC returns one None per call instead of raising"""
+    monkeypatch.setattr(rpc, "ETH_RPC_URL", "")
+    assert asyncio.run(rpc.batch_eth_call([("0x01", "0x313ce567")] * 3)) == [None] * 3
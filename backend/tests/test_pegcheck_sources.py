@@ -0,0 +1,123 @@
+"""
+Unit Tests for the async PegCheck source fetch path
+Tests against a local aiohttp server: concurrent fan-out, sync wrappers and per-source deadlines
+"""
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from aiohttp import web
+
+app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if app_dir not in sys.path:
+    sys.path.append(app_dir)
+
+from pegcheck.core import compute
+from pegcheck.sources import coingecko, cryptocompare, http
+
+SYMBOLS = ["USDT", "USDC", "DAI", "FRAX"]
+CC_DELAY = 0.2
+
+async def coingecko_price(request):
+    ids = request.query["ids"].split(",")
+    return web.json_response({gecko_id: {"usd": 1.001} for gecko_id in ids})
+
+async def cryptocompare_price(request):
+    await asyncio.sleep(CC_DELAY)
+    if request.query["fsym"] == "FRAX":
+        return web.json_response({"Response": "Error"})
+    return web.json_response({"USD": 0.999})
+
+async def start_server():
+    app = web.Application()
+    app.router.add_get("/simple/price", coingecko_price)
+    app.router.add_get("/data/price", cryptocompare_price)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def test_async_fetch_runs_sources_concurrently(monkeypatch):
+    """Per-symbol CryptoCompare requests overlap instead of adding up"""
+    async def scenario():
+        runner, base_url = await start_server()
+        monkeypatch.setattr(coingecko, "COINGECKO_BASE_URL", base_url)
+        monkeypatch.setattr(cryptocompare, "CRYPTOCOMPARE_BASE_URL", base_url)
+        try:
+            started = time.perf_counter()
+            prices, errors = await compute.fetch_all_sources(SYMBOLS)
+            elapsed = time.perf_counter() - started
+        finally:
+            await http.close_session()
+            await runner.cleanup()
+        return prices, errors, elapsed
+
+    prices, errors, elapsed = asyncio.run(scenario())
+
+    assert errors == []
+    assert prices["coingecko"] == {symbol: 1.001 for symbol in SYMBOLS}
+    assert {s: p for s, p in prices["cryptocompare"].items() if s != "FRAX"} == {"USDT": 0.999, "USDC": 0.999, "DAI": 0.999}
+    assert math.isnan(prices["cryptocompare"]["FRAX"])
+    assert elapsed < CC_DELAY * len(SYMBOLS) * 0.75
+
+def test_sync_wrapper_matches_async_fetch(monkeypatch):
+    """The blocking fetch() runs the async path on its own loop and closes the session"""
+    loop = asyncio.new_event_loop()
+    try:
+        runner, base_url = loop.run_until_complete(start_server())
+        monkeypatch.setattr(cryptocompare, "CRYPTOCOMPARE_BASE_URL", base_url)
+
+        # Serve the local endpoint from a background thread while the wrapper runs its own loop
+        server_thread = threading.Thread(target=loop.run_forever, daemon=True)
+        server_thread.start()
+        try:
+            prices = cryptocompare.fetch(["USDT", "USDC"])
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            server_thread.join()
+        loop.run_until_complete(runner.cleanup())
+    finally:
+        loop.close()
+
+    assert prices == {"USDT": 0.999, "USDC": 0.999}
+    assert http._session is None
+
+def test_driver_enforces_per_source_deadlines(monkeypatch):
+    """A source that misses its deadline contributes NaN and an error, without delaying the rest"""
+    async def slow_fetch(symbols):
+        await asyncio.sleep(5)
+        return {symbol: 1.0 for symbol in symbols}
+
+    async def fast_fetch(symbols):
+        await asyncio.sleep(0.05)
+        return {symbol: 1.0 for symbol in symbols}
+
+    async def failing_fetch(symbols):
+        raise RuntimeError("rpc unavailable")
+
+    monkeypatch.setattr(coingecko, "fetch_async", fast_fetch)
+    monkeypatch.setattr(cryptocompare, "fetch_async", slow_fetch)
+    monkeypatch.setattr(compute.chainlink, "fetch_async", failing_fetch)
+    monkeypatch.setattr(compute.uniswap, "fetch_async", fast_fetch)
+
+    started = time.perf_counter()
+    payload = asyncio.run(compute.compute_peg_analysis_async(
+        ["USDT", "DAI"],
+        with_oracle=True,
+        with_dex=True,
+        deadlines={"cryptocompare": 0.2}
+    ))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert payload.coingecko == {"USDT": 1.0, "DAI": 1.0}
+    assert payload.uniswap == {"USDT": 1.0, "DAI": 1.0}
+    assert all(math.isnan(price) for price in payload.cryptocompare.values())
+    assert all(math.isnan(price) for price in payload.chainlink.values())
+    assert sorted(payload.errors) == ["chainlink: rpc unavailable", "cryptocompare: no response within 0.2s"]
+    assert [r.sources_used for r in payload.reports] == [["coingecko", "uniswap"]] * 2
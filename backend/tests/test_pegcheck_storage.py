@@ -0,0 +1,80 @@
+"""
+Unit Tests for the PegCheck PostgreSQL write path
+Row building for the COPY bulk path and the write-behind buffer triggers
+(database writes are captured by overriding store_peg_checks)
+"""
+
+import asyncio
+import math
+import os
+import sys
+
+app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if app_dir not in sys.path:
+    sys.path.append(app_dir)
+
+from pegcheck.core.compute import compute_peg_analysis
+from pegcheck.storage.postgres import PostgreSQLStorage, PEG_CHECK_COLUMNS, PEG_REPORT_COLUMNS
+
+def make_payload(price: float = 1.0):
+    return compute_peg_analysis({"USDT": price, "DAI": float("nan")}, {"USDT": price}, symbols=["USDT", "DAI"])
+
+class RecordingStorage(PostgreSQLStorage):
+    """Captures bulk writes instead of sending them to PostgreSQL"""
+
+    def __init__(self, fail_writes: int = 0, **kwargs):
+        super().__init__("postgresql://unused", **kwargs)
+        self.batches = []
+        self.fail_writes = fail_writes
+
+    async def store_peg_checks(self, payloads):
+        if self.fail_writes:
+            self.fail_writes -= 1
+            return False
+        self.batches.append(list(payloads))
+        return True
+
+def test_records_match_copy_columns():
+    """COPY records line up with the column lists and store NaN as NULL"""
+    storage = PostgreSQLStorage("postgresql://unused")
+    payload = make_payload()
+
+    check_record = storage._peg_check_record(7, payload)
+    report_records = [storage._peg_report_record(7, report) for report in payload.reports]
+
+    assert len(check_record) == len(PEG_CHECK_COLUMNS)
+    assert all(len(record) == len(PEG_REPORT_COLUMNS) for record in report_records)
+    assert check_record[0] == 7
+    usdt, dai = report_records
+    assert usdt[0] == 7 and usdt[2] == "USDT" and usdt[3] == 1.0
+    assert dai[2] == "DAI" and dai[3:7] == (None, None, None, None)
+
+def test_write_behind_size_trigger():
+    """Checks are grouped into one write once flush_max_checks accumulate"""
+    async def scenario():
+        storage = RecordingStorage(write_behind=True, flush_max_checks=3, flush_interval_seconds=60)
+        for i in range(7):
+            assert await storage.store_peg_check(make_payload(1.0 + i / 1000))
+        sizes = [len(batch) for batch in storage.batches]
+        await storage.flush()
+        return sizes, [len(batch) for batch in storage.batches]
+
+    before_flush, after_flush = asyncio.run(scenario())
+
+    assert before_flush == [3, 3]
+    assert after_flush == [3, 3, 1]
+
+def test_write_behind_time_trigger_and_retry():
+    """A failed flush keeps its checks; the interval flush writes them on the next round"""
+    async def scenario():
+        storage = RecordingStorage(fail_writes=1, write_behind=True, flush_max_checks=100,
+                                   flush_interval_seconds=0.05)
+        await storage.store_peg_check(make_payload())
+        await storage.store_peg_check(make_payload())
+        await asyncio.sleep(0.3)
+        return storage
+
+    storage = asyncio.run(scenario())
+
+    assert [len(batch) for batch in storage.batches] == [2]
+    assert storage._buffer == []
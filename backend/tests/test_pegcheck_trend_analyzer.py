@@ -0,0 +1,160 @@
+"""
+Unit Tests for the PegCheck TrendAnalyzer
+Vectorized batch analysis and running windows against a per-symbol reference
+built with the statistics module
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+import pytest
+
+app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if app_dir not in sys.path:
+    sys.path.append(app_dir)
+
+from pegcheck.analytics.trend_analyzer import TrendAnalyzer, RollingTrendWindow
+from pegcheck.core.compute import compute_peg_analysis
+from pegcheck.storage.memory import MemoryStorage
+
+SYMBOLS = ["USDT", "USDC", "DAI", "FRAX", "TUSD"]
+DRIFT = {"USDT": 0.0, "USDC": 0.00002, "DAI": -0.0004, "FRAX": 0.0, "TUSD": 0.0}
+NOISE = {"USDT": 0.0005, "USDC": 0.001, "DAI": 0.003, "FRAX": 0.02, "TUSD": 0.001}
+
+def make_payload(rng: random.Random, step: int, timestamp: int, symbols=SYMBOLS):
+    prices = {s: 1.0 + DRIFT[s] * step + rng.gauss(0, NOISE[s]) for s in symbols}
+    if step % 7 == 0:
+        prices["TUSD"] = float("nan")  # Missing points are skipped
+    payload = compute_peg_analysis(prices, {}, symbols=symbols)
+    payload.as_of = timestamp
+    for report in payload.reports:
+        report.timestamp = timestamp
+    return payload
+
+def reference_analysis(history):
+    """Field values as computed by the original per-symbol implementation"""
+    prices = [price for _, price, _ in history if price > 0]
+    deviations = [abs(p - 1.0) * 10000 for p in prices]
+    statuses = [status for _, _, status in history]
+    half = len(prices) // 2
+    return {
+        "data_points": len(history),
+        "avg_price": statistics.mean(prices),
+        "min_price": min(prices),
+        "max_price": max(prices),
+        "price_volatility": statistics.stdev(prices),
+        "avg_deviation_bps": statistics.mean(deviations),
+        "max_deviation_bps": max(deviations),
+        "deviation_episodes": sum(d >= 25 for d in deviations),
+        "depeg_episodes": sum(d >= 50 for d in deviations),
+        "time_in_normal": statuses.count("normal") / len(statuses) * 100,
+        "time_in_warning": statuses.count("warning") / len(statuses) * 100,
+        "time_in_depeg": statuses.count("depeg") / len(statuses) * 100,
+        "first_half": statistics.mean(prices[:half]),
+        "second_half": statistics.mean(prices[half:]),
+    }
+
+def assert_matches(analysis, expected):
+    for field, value in expected.items():
+        if field in ("first_half", "second_half"):
+            continue
+        assert getattr(analysis, field) == pytest.approx(value, rel=1e-9, abs=1e-9), field
+    change_pct = (expected["second_half"] - expected["first_half"]) / expected["first_half"] * 100
+    if abs(change_pct) < 0.1:
+        assert analysis.price_trend == "stable"
+    elif change_pct > 0.5:
+        assert analysis.price_trend == "upward"
+    elif change_pct < -0.5:
+        assert analysis.price_trend == "downward"
+    assert analysis.stability_grade == "ABCDF"[sum(analysis.risk_score >= b for b in (10, 25, 50, 75))]
+
+def fill_storage(storage, rng, count, now, step_seconds=300):
+    async def scenario():
+        for step in range(count):
+            await storage.store_peg_check(make_payload(rng, step, now - step_seconds * (count - step)))
+    asyncio.run(scenario())
+
+def test_batch_matches_reference():
+    """Every field matches the statistics-module computation; one storage call for all symbols"""
+    storage = MemoryStorage(max_records=2000)
+    fill_storage(storage, random.Random(5), 1500, int(time.time()))
+
+    calls = []
+    batch = storage.get_peg_history_batch
+
+    async def counting_batch(symbols, hours=24):
+        calls.append(list(symbols))
+        return await batch(symbols, hours)
+
+    storage.get_peg_history_batch = counting_batch
+    analyzer = TrendAnalyzer(storage)
+
+    async def scenario():
+        analyses = await analyzer.analyze_market_trends(SYMBOLS + ["PYUSD"], hours=72)
+        histories = {s: await storage.get_peg_history(s, 72) for s in SYMBOLS}
+        return analyses, histories
+
+    analyses, histories = asyncio.run(scenario())
+
+    assert calls == [SYMBOLS + ["PYUSD"]]
+    assert set(analyses) == set(SYMBOLS)  # No history for PYUSD
+    for symbol in SYMBOLS:
+        assert_matches(analyses[symbol], reference_analysis(histories[symbol]))
+    assert analyses["DAI"].price_trend == "downward"
+    assert analyses["FRAX"].stability_grade in "DF"
+
+def test_too_few_points_returns_none():
+    storage = MemoryStorage()
+    fill_storage(storage, random.Random(1), 9, int(time.time()))
+    analyzer = TrendAnalyzer(storage)
+
+    assert asyncio.run(analyzer.analyze_symbol_trends("USDT", hours=1)) is None
+
+def test_incremental_updates_match_batch():
+    """A tracked window updated per payload agrees with a full recomputation"""
+    rng = random.Random(9)
+    now = int(time.time())
+    storage = MemoryStorage(max_records=5000)
+    fill_storage(storage, rng, 400, now - 600 * 300, step_seconds=600)
+    analyzer = TrendAnalyzer(storage)
+
+    async def scenario():
+        await analyzer.track(SYMBOLS, hours=48)
+        for step in range(400, 700):
+            payload = make_payload(rng, step, now - 600 * (700 - step))
+            await storage.store_peg_check(payload)
+            analyzer.observe_payload(payload)
+        incremental = analyzer.incremental_trends(SYMBOLS, hours=48)
+        recomputed = await TrendAnalyzer(storage).analyze_market_trends(SYMBOLS, hours=48)
+        return incremental, recomputed
+
+    incremental, recomputed = asyncio.run(scenario())
+
+    assert set(incremental) == set(recomputed) == set(SYMBOLS)
+    for symbol in SYMBOLS:
+        got, expected = incremental[symbol], recomputed[symbol]
+        for field, value in vars(expected).items():
+            if isinstance(value, float):
+                assert getattr(got, field) == pytest.approx(value, rel=1e-7, abs=1e-9), (symbol, field)
+            else:
+                assert getattr(got, field) == value, (symbol, field)
+    assert len(analyzer.windows[("USDT", 48)]) == recomputed["USDT"].data_points
+
+def test_window_late_point_and_eviction():
+    window = RollingTrendWindow("USDT", hours=1)
+    for i, price in enumerate([1.0, 1.002, 0.999, 1.001, 1.004, 0.998, 1.0, 1.003, 1.001, 0.997]):
+        window.add(1_000 + 60 * i, price, 0)
+    window.add(1_030, 1.006, 1)  # Late point
+    analysis = window.analysis(now=1_000 + 540)
+
+    assert analysis.data_points == 11
+    assert analysis.max_price == pytest.approx(1.006)
+    assert analysis.time_in_warning == pytest.approx(100 / 11)
+
+    window.add(1_000 + 3600 + 45, 1.0, 0)  # Evicts the points at 1000 and 1030
+    assert len(window) == 10
+    assert window.analysis(now=1_000 + 3600 + 45).max_price == pytest.approx(1.004)
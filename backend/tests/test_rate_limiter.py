@@ -0,0 +1,91 @@
+"""
+Unit Tests for the GCRA rate limiter
+Burst and continuous refill without window-edge doubling, lazy slot expiry,
+one limit shared by several processes, and APIGatewayService.check_rate_limit
+"""
+
+import asyncio
+import multiprocessing
+import uuid
+
+import pytest
+
+from services.api_gateway_service import APIGatewayService
+from services.rate_limiter import GCRALimiter, SharedGCRALimiter
+
+def test_burst_then_continuous_refill():
+    limiter = GCRALimiter()
+    decisions = [limiter.decide("k", 60, 5, now=100.0) for _ in range(6)]
+    assert [d.allowed for d in decisions] == [True] * 5 + [False]
+    assert [d.remaining for d in decisions[:5]] == [4, 3, 2, 1, 0]
+    assert decisions[-1].retry_after == pytest.approx(1.0)
+    assert decisions[4].reset_after == pytest.approx(5.0)
+
+    # One request per emission interval refills, half an interval does not
+    assert not limiter.decide("k", 60, 5, now=100.5).allowed
+    assert limiter.decide("k", 60, 5, now=101.0).allowed
+    assert not limiter.decide("k", 60, 5, now=101.0).allowed
+
+def test_no_double_burst_across_minute_boundary():
+    limiter = GCRALimiter()
+    # A fixed window would admit 2 x 100 around t=60; GCRA admits the burst plus what refilled
+    allowed = sum(limiter.decide("k", 100, 100, now=59.9).allowed for _ in range(150))
+    allowed += sum(limiter.decide("k", 100, 100, now=60.1).allowed for _ in range(150))
+    assert allowed == 100
+
+def test_expired_keys_are_reclaimed_lazily():
+    limiter = GCRALimiter(sweep=2)
+    for i in range(100):
+        limiter.decide(f"client_{i}", 60, 10, now=0.0)
+    assert len(limiter) == 100
+
+    # Every key is full again after one interval; each decision frees up to 2 slots
+    for _ in range(20):
+        limiter.decide("hot", 60, 10, now=10.0)
+    assert 101 - 2 * 20 <= len(limiter) < 101
+    for _ in range(40):
+        limiter.decide("hot", 60, 10, now=10.0)
+    assert len(limiter) == 1
+    assert limiter.stats["expired"] == 100
+
+    # Freed slots are reused rather than growing the arrays
+    limiter.decide("new", 60, 10, now=10.0)
+    assert len(limiter) == 2 and len(limiter._keys) == 101
+
+def _shared_worker(args):
+    name, attempts = args
+    limiter = SharedGCRALimiter(name, buckets=64)
+    try:
+        return sum(limiter.decide("client_a_/api/yields", 60, 100, now=1_000.0).allowed for _ in range(attempts))
+    finally:
+        limiter.close()
+
+def test_shared_backend_enforces_one_limit_across_processes():
+    name = f"test_rate_limits_{uuid.uuid4().hex[:8]}"
+    owner = SharedGCRALimiter(name, buckets=64, clock=lambda: 1_000.0)
+    try:
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            allowed = pool.map(_shared_worker, [(name, 60)] * 4)
+        assert sum(allowed) == 100
+        assert not owner.decide("client_a_/api/yields", 60, 100, now=1_000.0).allowed
+        assert owner.decide("client_b_/api/yields", 60, 100, now=1_000.0).allowed
+        assert len(owner) == 2
+    finally:
+        owner.close(unlink=True)
+
+def test_gateway_check_rate_limit():
+    service = APIGatewayService()
+    clock = [0.0]
+    service.rate_limiter.clock = lambda: clock[0]
+
+    async def scenario():
+        return [await service.check_rate_limit("c1", "/api/yields", "basic") for _ in range(151)]
+
+    results = asyncio.run(scenario())
+    assert all(allowed for allowed, _ in results[:150])
+    assert results[0][1]["requests_remaining"] == 99 and results[0][1]["burst_remaining"] == 149
+    denied, info = results[150]
+    assert not denied and info["requests_remaining"] == 0
+    assert info["retry_after"] == pytest.approx(0.6)
+    assert service.api_metrics["rate_limited_requests"] == 1
+    assert service.get_gateway_status()["rate_limiting"]["active_buckets"] == 1
@@ -0,0 +1,94 @@
+"""
+Unit Tests for RAY Calculator Service
+Parity of the vectorized batch engine against the scalar calculate_ray path
+"""
+
+import random
+import pytest
+import numpy as np
+from services.ray_calculator import RAYCalculator
+
+STABLECOINS = ['USDT', 'USDC', 'DAI', 'TUSD', 'PYUSD', 'FRAX', 'USDP', 'GHO']
+PROTOCOLS = ['aave_v3', 'compound_v3', 'curve', 'uniswap_v3', 'morpho', 'yearn', 'unknown_farm']
+
+def make_pool(rng: random.Random) -> dict:
+    """Build a yield record with a random mix of the optional fields"""
+    pool = {
+        'stablecoin': rng.choice(STABLECOINS),
+        'source': rng.choice(PROTOCOLS),
+        'sourceType': rng.choice(['DeFi', 'CeFi', 'Unknown']),
+        'currentYield': rng.choice([rng.uniform(0, 12), rng.uniform(0, 80), 0.0]),
+    }
+    if rng.random() < 0.5:
+        pool['apy_base'] = rng.uniform(0, 10)
+        if rng.random() < 0.5:
+            pool['apy_reward'] = rng.uniform(0, 15)
+    if rng.random() < 0.5:
+        pool['tvlUsd'] = rng.choice([0, rng.uniform(0, 2e7), rng.uniform(1e7, 1e8), 5e8])
+    else:
+        pool['tvl'] = rng.choice(['$1.2B', '$45M', '$900K', '1234567'])
+    metadata = {}
+    if rng.random() < 0.3:
+        metadata['protocol_info'] = {'reputation_score': rng.uniform(0.4, 0.99)}
+    if rng.random() < 0.3:
+        metadata['sanitization'] = {'confidence_score': rng.uniform(0, 1)}
+    if rng.random() < 0.2:
+        metadata['liquidity_metrics'] = {'tvl_usd': rng.uniform(0, 2e8)}
+    if metadata:
+        pool['metadata'] = metadata
+    return pool
+
+def assert_same_result(batch, scalar):
+    assert batch.base_apy == pytest.approx(scalar.base_apy, rel=1e-12, abs=1e-15)
+    assert batch.risk_adjusted_yield == pytest.approx(scalar.risk_adjusted_yield, rel=1e-12, abs=1e-15)
+    assert batch.risk_penalty == pytest.approx(scalar.risk_penalty, rel=1e-12, abs=1e-15)
+    assert batch.confidence_score == pytest.approx(scalar.confidence_score, rel=1e-12, abs=1e-15)
+    assert vars(batch.risk_factors) == pytest.approx(vars(scalar.risk_factors), rel=1e-12, abs=1e-15)
+    assert batch.breakdown == pytest.approx(scalar.breakdown, rel=1e-12, abs=1e-15)
+
+    ignored = {'calculation_timestamp'}
+    assert {k: v for k, v in batch.metadata.items() if k not in ignored} == \
+        {k: v for k, v in scalar.metadata.items() if k not in ignored}
+
+class TestRAYBatchEngine:
+
+    def setup_method(self):
+        """Setup test environment"""
+        self.calculator = RAYCalculator()
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 4, 25, 200])
+    def test_batch_matches_scalar_path(self, size):
+        """Batch results must equal calculate_ray with leave-one-out context"""
+        rng = random.Random(size)
+        yields = [make_pool(rng) for _ in range(size)]
+
+        batch_results = self.calculator.calculate_ray_batch(yields)
+
+        assert len(batch_results) == size
+        for i, result in enumerate(batch_results):
+            scalar = self.calculator.calculate_ray(yields[i], yields[:i] + yields[i+1:])
+            assert_same_result(result, scalar)
+
+    def test_batch_matches_scalar_with_additive_penalties(self):
+        """Parity holds for the additive penalty methodology as well"""
+        self.calculator.config["calculation_methodology"]["compound_penalties"] = False
+        rng = random.Random(7)
+        yields = [make_pool(rng) for _ in range(50)]
+
+        for i, result in enumerate(self.calculator.calculate_ray_batch(yields)):
+            scalar = self.calculator.calculate_ray(yields[i], yields[:i] + yields[i+1:])
+            assert_same_result(result, scalar)
+
+    @pytest.mark.parametrize("curve", ["linear", "exponential", "quadratic", "logarithmic", "step", "unknown"])
+    def test_penalty_curve_array_matches_scalar(self, curve):
+        """Array penalty curves agree with _apply_penalty_curve, including the bounds"""
+        factors = np.array([-0.5, 0.0, 0.1, 0.29, 0.3, 0.5, 0.69, 0.7, 0.99, 1.0, 1.5])
+
+        array_penalties = self.calculator._apply_penalty_curve_array(factors, 0.4, curve)
+        scalar_penalties = [self.calculator._apply_penalty_curve(f, 0.4, curve) for f in factors.tolist()]
+
+        assert array_penalties.tolist() == pytest.approx(scalar_penalties, rel=1e-12, abs=1e-15)
+
+    def test_empty_batch(self):
+        """Empty batches return no results"""
+        assert self.calculator.calculate_ray_batch([]) == []
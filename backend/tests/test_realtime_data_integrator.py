@@ -0,0 +1,110 @@
+"""
+Unit Tests for the event-driven RealTimeDataIntegrator pipeline
+Debounced per-symbol workers and threshold-triggered SYI recomposition,
+driven through the registered CryptoCompare callbacks
+"""
+
+import asyncio
+import random
+import time
+
+from services import realtime_data_integrator
+from services.cryptocompare_websocket import CCPriceUpdate
+from services.realtime_data_integrator import RealTimeDataIntegrator
+from test_syi_compositor import make_pools
+from test_websocket_service import FakeSocket
+
+class FakeCryptoCompareClient:
+    def __init__(self):
+        self.price_batch_callbacks = []
+        self.orderbook_batch_callbacks = []
+
+    def register_price_batch_callback(self, callback):
+        self.price_batch_callbacks.append(callback)
+
+    def register_orderbook_batch_callback(self, callback):
+        self.orderbook_batch_callbacks.append(callback)
+
+    async def push_prices(self, symbol: str, price: float, count: int):
+        updates = [CCPriceUpdate(symbol, price, 1e6, time.time_ns()) for _ in range(count)]
+        for callback in self.price_batch_callbacks:
+            await callback(updates)
+
+class FakeYieldAggregator:
+    def __init__(self, yields):
+        self.yields = yields
+
+    async def get_all_yields(self):
+        return self.yields
+
+def start_integrator(monkeypatch, yields=None):
+    client = FakeCryptoCompareClient()
+    monkeypatch.setattr(realtime_data_integrator, "get_cryptocompare_client", lambda: client)
+    integrator = RealTimeDataIntegrator(debounce_seconds=0.05)
+    integrator.yield_aggregator = FakeYieldAggregator(yields or [])
+    integrator.syi_min_interval = 0
+    return integrator, client
+
+async def settle(integrator, timeout: float = 5.0):
+    """Wait until every queued tick is consumed and no symbol worker is pending"""
+    deadline = time.monotonic() + timeout
+    while integrator.price_queue.qsize() or integrator._symbol_workers:
+        assert time.monotonic() < deadline, "pipeline did not settle"
+        await asyncio.sleep(0.01)
+
+def test_ticks_are_debounced_per_symbol(monkeypatch):
+    """A burst of ticks gives one metrics recompute and one publish per symbol"""
+    async def scenario():
+        integrator, client = start_integrator(monkeypatch)
+        subscriber = FakeSocket()
+        await integrator.websocket_manager.connect(subscriber, 'peg_metrics')
+        await integrator.start()
+
+        await client.push_prices('USDT', 1.0001, 30)
+        await client.push_prices('DAI', 0.9998, 30)
+        depth_after_burst = integrator.price_queue.qsize()
+        await settle(integrator)
+
+        stats = integrator.get_pipeline_stats()
+        await integrator.stop()
+        await integrator.websocket_manager.close_all()
+        return integrator, subscriber, depth_after_burst, stats
+
+    integrator, subscriber, depth_after_burst, stats = asyncio.run(scenario())
+
+    # The callbacks only enqueue; the consumer drains the queue afterwards
+    assert depth_after_burst == 60
+    assert stats['queue_depths'] == {'price': 0, 'orderbook': 0}
+    assert stats['price_ticks'] == 60 and stats['peg_recomputes'] == 2
+    assert stats['pending_symbol_workers'] == 0
+    assert stats['tick_to_publish_latency']['peg_metrics']['samples'] == 2
+    assert set(integrator.peg_metrics) == {'USDT', 'DAI'}
+    assert len(subscriber.sent) == 3  # welcome, then one message per published symbol
+
+def test_syi_recomposes_only_when_threshold_crossed(monkeypatch):
+    pools = make_pools(random.Random(4), 30)
+
+    async def scenario():
+        integrator, client = start_integrator(monkeypatch, pools)
+        await integrator.start()
+        await asyncio.sleep(0.01)  # Yield refresher loads the feed
+
+        counts = []
+        # New symbol, unchanged score, then a depeg that drops the score to Poor
+        for price in (1.0, 1.0001, 0.97):
+            await client.push_prices('USDT', price, 20)
+            await asyncio.sleep(0.2)
+            counts.append(integrator.pipeline_metrics['syi_recompositions'])
+
+        stats = integrator.get_pipeline_stats()
+        await integrator.stop()
+        return integrator, counts, stats
+
+    integrator, counts, stats = asyncio.run(scenario())
+
+    assert counts == [1, 1, 2]
+    assert stats['peg_recomputes'] == 3
+    assert integrator.peg_metrics['USDT']['assessment'] == 'Poor'
+    assert stats['tick_to_publish_latency']['syi_live']['samples'] == 2
+    # The aggregator's records are not mutated with real-time metadata
+    assert not any('realtime_peg_metrics' in pool.get('metadata', {}) for pool in pools)
@@ -0,0 +1,75 @@
+"""
+Unit Tests for the record index
+Indexed lookups against a scan of all records, and the TradingEngineService
+indexes and status counts maintained on write
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from services.record_index import RecordIndex
+from services.trading_engine_service import TradingEngineService, OrderStatus, TradeStatus
+
+def test_lookups_match_record_scan():
+    rng = random.Random(11)
+    index = RecordIndex(bucket_hours=6)
+    start = datetime(2025, 3, 1)
+    records = []
+    for i in range(2000):
+        # Mostly in time order, with some late arrivals
+        timestamp = start + timedelta(minutes=i * 7 - (rng.randint(0, 3000) if rng.random() < 0.1 else 0))
+        record = (f"r{i}", rng.choice(["alice", "bob", "carol"]), rng.choice(["USDT/USD", "DAI/USD"]), timestamp)
+        records.append(record)
+        index.add(*record)
+    index.add("r0", "bob", "DAI/USD", start)  # Known ids are not re-filed
+
+    assert len(index) == 2000
+    for _ in range(50):
+        client_id = rng.choice([None, "alice", "bob", "carol", "dave"])
+        symbol = rng.choice([None, "USDT/USD", "DAI/USD"])
+        since = rng.choice([None, start + timedelta(hours=rng.uniform(0, 250))])
+        until = rng.choice([None, start + timedelta(hours=rng.uniform(0, 250))])
+
+        expected = sorted(
+            (timestamp, record_id) for record_id, client, sym, timestamp in records
+            if (client_id is None or client == client_id) and (symbol is None or sym == symbol)
+            and (since is None or timestamp >= since) and (until is None or timestamp <= until)
+        )
+        assert index.ids(client_id, symbol, since, until) == [record_id for _, record_id in expected]
+
+def test_engine_indexes_client_views_and_status_counts():
+    async def scenario():
+        engine = TradingEngineService()
+        engine.config["liquidity"]["synthetic_quotes"] = False
+        engine.config["risk"]["pre_trade_checks"] = False
+        await engine._initialize_trading_pairs()
+        await engine._initialize_market_data()
+
+        await engine.create_portfolio("taker", "Main", {"USDT": Decimal('1')})
+        await engine.create_order("maker", "USDT/USD", "sell", "limit", Decimal('1000'), Decimal('1.0002'))
+        await engine.create_order("maker", "DAI/USD", "sell", "limit", Decimal('500'), Decimal('1.0010'))
+        await engine.create_order("taker", "USDT/USD", "buy", "limit", Decimal('400'), Decimal('1.0002'))
+        return engine
+
+    engine = asyncio.run(scenario())
+
+    assert [o.symbol for o in engine.get_client_orders("maker")] == ["USDT/USD", "DAI/USD"]
+    assert len(engine.get_client_orders("maker", symbol="DAI/USD")) == 1
+    assert engine.get_client_orders("maker", since=datetime.utcnow() + timedelta(hours=2)) == []
+    assert [t.client_id for t in engine.get_client_trades(symbol="USDT/USD")] == ["taker", "maker"]  # Taker booked first
+    assert [p.symbol for p in engine.get_client_positions("maker")] == ["USDT/USD"]
+    assert [p.name for p in engine.get_client_portfolios("taker")] == ["Main"]
+
+    status = engine.get_trading_status()
+    assert status["orders"]["open_orders"] == 1  # DAI ask
+    assert status["orders"]["partially_filled_orders"] == 1  # USDT ask
+    assert status["orders"]["filled_orders"] == 1
+    assert status["trades"]["executed_trades"] == 2 and list(engine.unsettled_trades) == list(engine.trades)
+
+    # Indexes rebuilt from the primary collections match the ones maintained on write
+    maintained = (engine.get_client_orders("maker"), +engine.order_status_counts, +engine.trade_status_counts)
+    engine._rebuild_indexes()
+    assert maintained == (engine.get_client_orders("maker"), +engine.order_status_counts, +engine.trade_status_counts)
+    assert engine.trade_status_counts[TradeStatus.EXECUTED] == 2 and engine.order_status_counts[OrderStatus.PENDING] == 0
@@ -0,0 +1,135 @@
+"""
+Unit Tests for the state journal
+Record round trips, snapshot compaction, torn-write recovery, and a
+TradingEngineService restart that replays orders, trades and positions
+"""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+from services.state_journal import StateJournal, to_record, from_record
+from services.trading_engine_service import TradingEngineService, Order, OrderSide, OrderStatus, OrderType, Portfolio, Position
+
+def make_order(order_id: str, filled: str = '0') -> Order:
+    now = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    return Order(
+        order_id=order_id, client_id="client", symbol="USDT/USD", side=OrderSide.BUY,
+        order_type=OrderType.LIMIT, quantity=Decimal('1000'), price=Decimal('1.0002'), stop_price=None,
+        status=OrderStatus.OPEN, created_at=now, updated_at=now,
+        filled_quantity=Decimal(filled), remaining_quantity=Decimal('1000') - Decimal(filled)
+    )
+
+def test_records_round_trip_nested_dataclasses():
+    now = datetime(2025, 1, 2)
+    position = Position("p1", "client", "USDT/USD", Decimal('5'), Decimal('1.0001'), Decimal('1'),
+                        Decimal('0'), Decimal('-0.5'), now, now)
+    portfolio = Portfolio("pf1", "client", "Main", Decimal('100'), Decimal('95'), [position],
+                          {"USDT": Decimal('0.6')}, now, now)
+
+    assert from_record(Portfolio, to_record(portfolio)) == portfolio
+    assert from_record(Order, to_record(make_order("o1"))) == make_order("o1")
+
+def test_replay_applies_journal_after_snapshot(tmp_path):
+    journal = StateJournal(tmp_path, "test")
+    assert journal.replay() == {}
+
+    journal.record("orders", "o1", make_order("o1"))
+    journal.record("orders", "o2", make_order("o2"))
+    assert journal.commit() == 2
+    journal.snapshot({"orders": {"o1": make_order("o1"), "o2": make_order("o2")}})
+    assert journal.journal_path.stat().st_size == 0
+
+    journal.record("orders", "o1", make_order("o1", filled='400'))
+    journal.record("orders", "o2", None)  # Delete
+    journal.commit()
+    journal.record("orders", "o3", make_order("o3"))  # Staged but never committed
+    journal._file.close()
+
+    state = StateJournal(tmp_path, "test").replay()
+    assert sorted(state["orders"]) == ["o1"]
+    assert from_record(Order, state["orders"]["o1"]).filled_quantity == Decimal('400')
+
+def test_torn_tail_is_dropped_and_entries_older_than_snapshot_are_skipped(tmp_path):
+    journal = StateJournal(tmp_path, "test")
+    journal.replay()
+    for i in range(3):
+        journal.record("orders", f"o{i}", make_order(f"o{i}", filled=str(i)))
+    journal.commit()
+    committed = journal.journal_path.read_bytes()
+
+    # Crash after the snapshot was replaced but before the journal was truncated, mid-append
+    journal.snapshot({"orders": {"o0": make_order("o0", filled='7')}})
+    journal.close()
+    journal.journal_path.write_bytes(committed + b'{"seq": 4, "kind": "ord')
+
+    reopened = StateJournal(tmp_path, "test")
+    state = reopened.replay()
+    assert from_record(Order, state["orders"]["o0"]).filled_quantity == Decimal('7')
+    assert sorted(state["orders"]) == ["o0"]
+    assert reopened.journal_path.read_bytes() == committed  # Torn bytes removed before new appends
+
+    reopened.record("orders", "o9", make_order("o9"))
+    reopened.commit()
+    reopened.close()
+    assert sorted(StateJournal(tmp_path, "test").replay()["orders"]) == ["o0", "o9"]
+
+def test_write_torn_before_newline_does_not_swallow_later_commits(tmp_path):
+    journal = StateJournal(tmp_path, "test")
+    journal.replay()
+    journal.record("orders", "o0", make_order("o0"))
+    journal.commit()
+    committed = journal.journal_path.read_bytes()
+    journal.record("orders", "o1", make_order("o1"))
+    journal.commit()
+    journal.close()
+    # Crash right after the closing brace of the last entry: valid JSON, no newline
+    journal.journal_path.write_bytes(journal.journal_path.read_bytes()[:-1])
+
+    reopened = StateJournal(tmp_path, "test")
+    assert sorted(reopened.replay()["orders"]) == ["o0"]
+    assert reopened.journal_path.read_bytes() == committed
+    reopened.record("orders", "o2", make_order("o2"))
+    reopened.commit()
+    reopened.close()
+    assert sorted(StateJournal(tmp_path, "test").replay()["orders"]) == ["o0", "o2"]
+
+def test_trading_engine_state_survives_restart_without_clean_stop(tmp_path):
+    def make_engine() -> TradingEngineService:
+        engine = TradingEngineService()
+        engine.config["liquidity"]["synthetic_quotes"] = False
+        engine.config["risk"]["pre_trade_checks"] = False
+        engine.trading_dir = tmp_path
+        engine.journal = StateJournal(tmp_path, "trading", compact_every=5)
+        return engine
+
+    async def first_run():
+        engine = make_engine()
+        await engine._initialize_trading_pairs()
+        await engine._load_trading_data()
+        await engine._initialize_market_data()
+        await engine.create_portfolio("taker", "Main", {"USDT": Decimal('1')})
+        await engine.create_order("maker", "USDT/USD", "sell", "limit", Decimal('1000'), Decimal('1.0002'))
+        await engine.create_order("maker", "USDT/USD", "sell", "limit", Decimal('800'), Decimal('1.0004'))
+        await engine.create_order("taker", "USDT/USD", "buy", "limit", Decimal('1500'), Decimal('1.0004'))
+        return engine  # No stop(): state must come from snapshot + journal
+
+    async def second_run():
+        engine = make_engine()
+        await engine._initialize_trading_pairs()
+        await engine._load_trading_data()
+        await engine._initialize_market_data()
+        await engine._restore_working_orders()
+        return engine
+
+    before = asyncio.run(first_run())
+    assert before.journal.stats["snapshots"] >= 1  # compact_every=5 forced at least one compaction
+    after = asyncio.run(second_run())
+
+    assert after.orders == before.orders
+    assert after.trades == before.trades
+    assert after.positions == before.positions
+    assert after.portfolios == before.portfolios
+    # The partially filled maker order is back in the book with its unfilled quantity
+    resting = [o for o in after.orders.values() if o.status == OrderStatus.PARTIALLY_FILLED]
+    assert len(resting) == 1 and after.matching_books["USDT/USD"].remaining(resting[0].order_id) == Decimal('300')
@@ -0,0 +1,197 @@
+"""
+Unit Tests for the delta stream protocol
+Diff/apply round trips and snapshot + diff delivery through WebSocketConnectionManager
+"""
+
+import asyncio
+import copy
+import json
+import random
+
+import pytest
+
+from services.stream_protocol import DeltaStreamClient, apply_diff, decode_message, diff_fields
+from services.websocket_service import WebSocketConnectionManager
+from test_websocket_service import FakeSocket
+
+def make_metrics(rng: random.Random, symbols=8):
+    return {
+        f"SYM{i}": {
+            'current_price': round(rng.gauss(1.0, 0.001), 6),
+            'peg_stability_score': round(rng.random(), 4),
+            'assessment': rng.choice(["Excellent", "Good", "Fair"]),
+            'sources': [rng.randint(0, 3) for _ in range(rng.randint(1, 3))]
+        }
+        for i in range(symbols) if rng.random() < 0.9
+    }
+
+def mutate(rng: random.Random, state: dict) -> dict:
+    state = copy.deepcopy(state)
+    for symbol in rng.sample(sorted(state), k=min(2, len(state))):
+        state[symbol]['current_price'] = round(rng.gauss(1.0, 0.001), 6)
+    if rng.random() < 0.3:
+        state[f"NEW{rng.randint(0, 5)}"] = {'current_price': 1.0, 'sources': [1]}
+    if rng.random() < 0.2 and state:
+        del state[rng.choice(sorted(state))]
+    if rng.random() < 0.3 and state:
+        state[rng.choice(sorted(state))]['sources'] = [rng.randint(0, 3) for _ in range(rng.randint(1, 4))]
+    return state
+
+@pytest.mark.parametrize("seed", range(5))
+def test_diff_round_trip(seed):
+    """Applying diff_fields(old, new) to old reproduces new"""
+    rng = random.Random(seed)
+    state = make_metrics(rng)
+    for _ in range(50):
+        new_state = mutate(rng, state)
+        ops = diff_fields(state, new_state)
+        assert apply_diff(copy.deepcopy(state), ops) == new_state
+        assert (ops == []) == (state == new_state)
+        state = new_state
+
+def test_diff_is_field_level():
+    old = {'USDT': {'price': 1.0, 'score': 0.99}, 'DAI': {'price': 0.999}}
+    new = {'USDT': {'price': 1.0001, 'score': 0.99}, 'FRAX': {'price': 1.0}}
+
+    assert diff_fields(old, new) == [
+        ["set", ['USDT', 'price'], 1.0001],
+        ["set", ['FRAX'], {'price': 1.0}],
+        ["del", ['DAI']]
+    ]
+    # A list that changes length is replaced whole
+    assert diff_fields({'a': [1, 2]}, {'a': [1, 2, 3]}) == [["set", ['a'], [1, 2, 3]]]
+
+def decode_all(socket):
+    return [decode_message(message) for message in socket.sent]
+
+def test_late_subscriber_gets_snapshot_then_diffs():
+    rng = random.Random(7)
+    states = [make_metrics(rng)]
+    for _ in range(5):
+        states.append(mutate(rng, states[-1]))
+
+    async def scenario():
+        manager = WebSocketConnectionManager()
+        early, late = FakeSocket(), FakeSocket()
+        await manager.connect(early, 'peg_metrics')
+        for i, state in enumerate(states):
+            if i == 3:
+                await manager.connect(late, 'peg_metrics')
+            await manager.publish('peg_metrics', state)
+        unchanged = await manager.publish('peg_metrics', copy.deepcopy(states[-1]))
+        await asyncio.sleep(0.01)
+        stats = manager.get_connection_stats()
+        await manager.close_all()
+        return early, late, unchanged, stats
+
+    early, late, unchanged, stats = asyncio.run(scenario())
+
+    assert unchanged == 0
+    for socket, first_snapshot in ((early, 1), (late, 3)):
+        messages = decode_all(socket)
+        assert messages[0]['type'] == 'welcome'
+        assert messages[1]['type'] == 'snapshot' and messages[1]['seq'] == first_snapshot
+        assert all(m['type'] == 'diff' for m in messages[2:])
+
+        client = DeltaStreamClient()
+        assert all(client.handle(m) for m in messages)
+        assert client.state == states[-1] and client.seq == len(states)
+    assert stats['delta_streams']['peg_metrics']['seq'] == len(states)
+
+def test_overflow_and_resync_send_snapshot():
+    """A client whose backlog overflows gets one snapshot instead of a sequence gap"""
+    async def scenario():
+        manager = WebSocketConnectionManager(queue_size=3)
+        slow = FakeSocket(blocked=True)
+        await manager.connect(slow, 'constituents')
+        await asyncio.sleep(0)  # Writer picks up the welcome message and blocks
+
+        for n in range(9):
+            await manager.publish('constituents', {'index_value': n, 'constituents': [{'weight': 0.5}]})
+        overflow_queue = [json.loads(m) for m in manager.clients[slow].queue]
+
+        manager.resync(slow)
+        resync_queue = [json.loads(m) for m in manager.clients[slow].queue]
+        await manager.close_all()
+        return overflow_queue, resync_queue
+
+    overflow_queue, resync_queue = asyncio.run(scenario())
+
+    client = DeltaStreamClient()
+    assert [m['type'] for m in overflow_queue] == ['snapshot', 'diff', 'diff']
+    assert all(client.handle(m) for m in overflow_queue)
+    assert client.state['index_value'] == 8 and client.seq == 9
+    # The resync snapshot replaces the backlog
+    assert [(m['type'], m['seq']) for m in resync_queue] == [('snapshot', 9)]
+
+def test_sequence_gap_requires_resync():
+    client = DeltaStreamClient()
+    assert client.handle({'type': 'snapshot', 'seq': 4, 'data': {'a': 1}})
+    assert client.handle({'type': 'diff', 'seq': 5, 'ops': [["set", ['a'], 2]]})
+    assert not client.handle({'type': 'diff', 'seq': 7, 'ops': [["set", ['a'], 4]]})
+    assert client.state == {'a': 2}
+
+def test_msgpack_clients_share_binary_frames():
+    pytest.importorskip("msgpack")
+
+    class StarletteSocket(FakeSocket):
+        async def send_text(self, message):
+            self.sent.append(message)
+
+        async def send_bytes(self, message):
+            self.sent.append(message)
+
+    async def scenario():
+        manager = WebSocketConnectionManager()
+        binary = [StarletteSocket() for _ in range(3)]
+        text = StarletteSocket()
+        for socket in binary:
+            await manager.connect(socket, 'ray_all', encoding='msgpack')
+        await manager.connect(text, 'ray_all')
+        await manager.publish('ray_all', {'USDT': {'ray': 4.2}})
+        await manager.publish('ray_all', {'USDT': {'ray': 4.3}})
+        await asyncio.sleep(0.01)
+        await manager.close_all()
+        return binary, text
+
+    binary, text = asyncio.run(scenario())
+
+    assert all(isinstance(m, bytes) for m in binary[0].sent)
+    assert all(isinstance(m, str) for m in text.sent)
+    assert all(socket.sent[2] is binary[0].sent[2] for socket in binary)
+    assert decode_message(binary[0].sent[2]) == json.loads(text.sent[2])
+    assert decode_message(binary[0].sent[2])['ops'] == [["set", ['USDT', 'ray'], 4.3]]
+
+def test_unsupported_encoding_rejected():
+    async def scenario():
+        manager = WebSocketConnectionManager()
+        socket = FakeSocket()
+        await manager.connect(socket, 'ray_all', encoding='xml')
+        return socket, manager.connection_count
+
+    socket, count = asyncio.run(scenario())
+
+    assert socket.closed == (4000, "Unsupported encoding") and count == 0
+
+def test_broadcast_test_endpoint_uses_the_delta_protocol(monkeypatch):
+    from routes import websocket_routes
+
+    async def scenario():
+        manager = WebSocketConnectionManager()
+        monkeypatch.setattr(websocket_routes, "websocket_manager", manager)
+        socket = FakeSocket()
+        await manager.connect(socket, 'peg_metrics')
+        await manager.publish('peg_metrics', {'DAI': {'current_price': 0.9995}})
+        response = await websocket_routes.broadcast_test_data()
+        await asyncio.sleep(0.01)
+        await manager.close_all()
+        return socket, response
+
+    socket, response = asyncio.run(scenario())
+
+    messages = decode_all(socket)
+    assert [m['type'] for m in messages] == ['welcome', 'snapshot', 'diff']
+    client = DeltaStreamClient()
+    assert all(client.handle(m) for m in messages)
+    assert client.state['USDT']['test_broadcast'] and client.seq == 2
+    assert response['sequences'] == {'syi_live': 1, 'peg_metrics': 2} and response['connections_notified'] == 1
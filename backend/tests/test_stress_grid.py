@@ -0,0 +1,94 @@
+"""
+Unit Tests for the stress grid
+Grid P&L against per-call run_stress_test, and the per-(portfolio version,
+scenario version) cache
+"""
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from services import risk_management_service
+from services.risk_management_service import EnhancedRiskManagementService
+from services.stress_grid import StressGrid
+
+ALLOCATIONS = {
+    "p_cefi": {"USDT": 50.0, "USDC": 30.0, "DAI": 20.0},
+    "p_defi": {"aave_usdc": 60.0, "curve_3pool": 25.0, "USDT": 15.0},
+    "p_cash": {"CASH": 100.0},
+}
+
+class FakeTradingEngine:
+    def __init__(self):
+        self.values = {"p_cefi": 1_000_000.0, "p_defi": 250_000.0, "p_cash": 50_000.0}
+
+    async def get_portfolio_performance(self, portfolio_id):
+        if portfolio_id not in self.values:
+            raise ValueError(f"Portfolio {portfolio_id} not found")
+        return {"total_value": self.values[portfolio_id], "current_allocation": dict(ALLOCATIONS[portfolio_id])}
+
+def make_service(monkeypatch, engine):
+    monkeypatch.setattr(risk_management_service, "get_trading_engine_service", lambda: engine)
+    service = EnhancedRiskManagementService()
+
+    async def no_var(portfolio_id, performance, horizon_days, confidence):
+        return 0.0
+    service._calculate_var = no_var
+    return service
+
+def test_grid_matches_per_scenario_stress_tests(monkeypatch):
+    service = make_service(monkeypatch, FakeTradingEngine())
+
+    async def scenario():
+        grid = await service.run_stress_grid(list(ALLOCATIONS) + ["missing"])
+        single = {
+            (portfolio_id, s.scenario_id): await service.run_stress_test(portfolio_id, s.scenario_id)
+            for portfolio_id in ALLOCATIONS for s in service.stress_scenarios
+        }
+        return grid, single
+
+    grid, single = asyncio.run(scenario())
+
+    assert sorted(grid) == sorted(ALLOCATIONS)
+    for (portfolio_id, scenario_id), result in single.items():
+        cell = grid[portfolio_id][scenario_id]
+        assert cell["total_impact"] == pytest.approx(result["portfolio_impact"]["total_impact"])
+        assert cell["impact_percentage"] == result["portfolio_impact"]["impact_percentage"]
+
+    # 5% USDT, 2% USDC, 3% DAI depeg on a 50/30/20 book
+    assert grid["p_cefi"]["peg_break"]["total_impact"] == pytest.approx(-1_000_000 * (0.5 * 0.05 + 0.3 * 0.02 + 0.2 * 0.03))
+    # DeFi names take the DeFi shock, USDT its CeFi shock
+    assert grid["p_defi"]["defi_crisis"]["total_impact"] == pytest.approx(-250_000 * (0.85 * 0.25 + 0.15 * 0.05))
+
+def test_unchanged_portfolios_are_served_from_cache(monkeypatch):
+    engine = FakeTradingEngine()
+    service = make_service(monkeypatch, engine)
+
+    asyncio.run(service.run_stress_grid(list(ALLOCATIONS)))
+    assert service.stress_grid.stats["portfolios_computed"] == 3
+
+    engine.values["p_defi"] = 300_000.0
+    results = asyncio.run(service.run_stress_grid(list(ALLOCATIONS)))
+    assert service.stress_grid.stats["portfolios_computed"] == 4  # Only the changed portfolio
+    assert service.stress_grid.stats["portfolios_cached"] == 2
+    assert results["p_defi"]["black_swan"]["total_impact"] == pytest.approx(-60_000)
+
+    # A changed scenario set invalidates every cached portfolio
+    scenarios = [replace(s, asset_shocks={"all": -0.5}) if s.scenario_id == "black_swan" else s
+                 for s in service.stress_scenarios]
+    service.stress_grid.set_scenarios(scenarios)
+    results = asyncio.run(service.run_stress_grid(list(ALLOCATIONS)))
+    assert service.stress_grid.stats["portfolios_computed"] == 7
+    assert results["p_cefi"]["black_swan"]["total_impact"] == pytest.approx(-500_000)
+
+def test_grid_versions_override_content_hash():
+    class Scenario:
+        scenario_id = "s"
+        asset_shocks = {"all": -0.1}
+
+    grid = StressGrid([Scenario()], is_defi=lambda asset: False)
+    assert grid.run({"p": {"USDT": 100.0}}, versions={"p": 1}) == {"p": {"s": pytest.approx(-10.0)}}
+    # Same explicit version: cached even though the exposure moved
+    assert grid.run({"p": {"USDT": 200.0}}, versions={"p": 1}) == {"p": {"s": pytest.approx(-10.0)}}
+    assert grid.run({"p": {"USDT": 200.0}}, versions={"p": 2}) == {"p": {"s": pytest.approx(-20.0)}}
@@ -0,0 +1,87 @@
+"""
+Unit Tests for the incremental SYI compositor
+Randomized update sequences must give exactly the composition of a full recompute
+"""
+
+import dataclasses
+import random
+import pytest
+from services.syi_compositor import SYICompositor, IncrementalSYICompositor
+from test_ray_calculator import make_pool, STABLECOINS
+
+def make_pools(rng: random.Random, size: int) -> list:
+    pools = []
+    for i in range(size):
+        pool = make_pool(rng)
+        if rng.random() < 0.9:
+            pool['pool_id'] = f"pool-{i}"
+        pools.append(pool)
+    return pools
+
+def mutate(rng: random.Random, pools: list, next_id: list) -> list:
+    """Apply one random tick: yield, TVL or peg input changes, or pool set changes"""
+    pools = list(pools)
+    action = rng.choice(["yield", "yield", "tvl", "peg", "sanitization", "none", "add", "remove", "shuffle"])
+    i = rng.randrange(len(pools))
+    pool = dict(pools[i])
+    if action == "yield":
+        pool['currentYield'] = max(0.0, pool['currentYield'] + rng.gauss(0, 0.2))
+        if 'apy_base' in pool:
+            pool['apy_base'] = max(0.0, pool['apy_base'] + rng.gauss(0, 0.2))
+    elif action == "tvl":
+        pool['tvlUsd'] = rng.choice([5e6, rng.uniform(1e7, 1e8), 5e8])
+        pool.pop('tvl', None)
+    elif action == "peg":
+        pool['stablecoin'] = rng.choice(STABLECOINS)
+    elif action == "sanitization":
+        pool['metadata'] = dict(pool.get('metadata', {}), sanitization={'confidence_score': rng.uniform(0, 1)})
+    elif action == "add":
+        new_pool = make_pool(rng)
+        new_pool['pool_id'] = f"pool-new-{next_id[0]}"
+        next_id[0] += 1
+        pools.insert(rng.randrange(len(pools) + 1), new_pool)
+    elif action == "remove" and len(pools) > 4:
+        pools.pop(i)
+        return pools
+    elif action == "shuffle":
+        rng.shuffle(pools)
+        return pools
+    # Unchanged pools may still arrive as fresh dict objects
+    pools[i] = pool if action != "none" else dict(pool)
+    return pools
+
+def composition_fields(composition) -> dict:
+    fields = dataclasses.asdict(composition)
+    fields.pop('calculation_timestamp')
+    return fields
+
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_matches_full_recompute(seed):
+    """Property: after any sequence of ticks the composition equals a fresh compose_syi"""
+    rng = random.Random(seed)
+    pools = make_pools(rng, rng.choice([3, 12, 40, 120]))
+    incremental = IncrementalSYICompositor()
+    next_id = [0]
+
+    for _ in range(60):
+        expected = SYICompositor().compose_syi(pools)
+        assert composition_fields(incremental.compose_syi(pools)) == composition_fields(expected)
+        pools = mutate(rng, pools, next_id)
+
+def test_only_changed_pools_are_recomputed():
+    rng = random.Random(11)
+    pools = make_pools(rng, 80)
+    for i, pool in enumerate(pools):
+        pool['pool_id'] = f"pool-{i}"
+    compositor = IncrementalSYICompositor()
+    compositor.compose_syi(pools)
+
+    compositor.compose_syi([dict(pool) for pool in pools])
+    assert compositor.last_update == {"pools": 80, "changed_pools": 0, "recomputed_rays": 0, "weights_reused": True}
+
+    # A TVL change leaves the market context medians alone
+    pools[5] = dict(pools[5], tvlUsd=pools[5].get('tvlUsd', 0) + 1e6)
+    pools[5].pop('tvl', None)
+    compositor.compose_syi(pools)
+    assert compositor.last_update["changed_pools"] == 1
+    assert compositor.last_update["recomputed_rays"] == 1
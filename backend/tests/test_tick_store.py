@@ -0,0 +1,56 @@
+"""
+Unit Tests for the columnar tick store
+Window queries against a scan of the appended ticks, and vectorized metrics
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from services.tick_store import TickSeries, TickStore, PRICE_FIELDS, ORDERBOOK_FIELDS, to_epoch_ns
+
+def test_windows_match_tick_scan():
+    """Windows equal a filter over all retained ticks, including late ticks and eviction"""
+    rng = random.Random(5)
+    store = TickStore(64, PRICE_FIELDS)
+    ticks = []
+    now = 1_700_000_000 * 10**9
+    for i in range(500):
+        timestamp = now + i * 10**9 - (rng.randint(1, 5) * 10**9 if rng.random() < 0.05 else 0)
+        tick = (timestamp, rng.gauss(1.0, 0.002), rng.uniform(1e6, 1e7))
+        ticks.append(tick)
+        store.append('USDT', *tick)
+
+        if i % 25 == 0:
+            retained = sorted(ticks, key=lambda t: t[0])[-len(store.series['USDT']):]
+            since = timestamp - rng.randint(0, 80) * 10**9
+            expected = [t for t in retained if t[0] >= since]
+            window = store.window('USDT', since)
+            assert window['timestamp_ns'].tolist() == [t[0] for t in expected]
+            assert window['price'].tolist() == [t[1] for t in expected]
+            assert window['volume_24h'].tolist() == [t[2] for t in expected]
+
+    assert store.count('USDT') == 64
+    assert store.window('DAI', 0) is None
+
+def test_windows_are_views_and_appends_allocate_nothing():
+    series = TickSeries(100, ORDERBOOK_FIELDS)
+    allocated = series.allocated_bytes
+    for i in range(1_000):
+        series.append(i, (1.0, 10.0, 1.001, 12.0))
+
+    window = series.window(950)
+    assert len(window['bid_price']) == 50 and window['timestamp_ns'][0] == 950
+    assert np.shares_memory(window['bid_price'], series._values)
+    assert np.shares_memory(window['timestamp_ns'], series._timestamps)
+    assert series.allocated_bytes == allocated == 2 * 100 * 8 * (1 + len(ORDERBOOK_FIELDS))
+
+def test_epoch_ns_conversion():
+    naive_utc = datetime(2024, 3, 1, 12, 30, 15, 123456)
+    aware = naive_utc.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+
+    assert to_epoch_ns(naive_utc) == 1709296215123456000
+    assert to_epoch_ns(aware) == to_epoch_ns(naive_utc)
+    assert abs(to_epoch_ns(datetime.utcnow()) - time.time_ns()) < 10**9
@@ -0,0 +1,154 @@
+"""
+Unit Tests for the VaR engine
+Monte Carlo against the closed-form normal VaR/ES, historical simulation against
+a direct window scan, reproducibility across chunking and workers, and the
+EnhancedRiskManagementService metrics built from one portfolio fetch
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from services import risk_management_service
+from services.risk_management_service import EnhancedRiskManagementService
+from services.var_engine import VaRInput, compute_var, compute_var_batch, daily_covariance, historical_losses, tail_measures
+
+def make_input(portfolio_id: str = "p1", history=None) -> VaRInput:
+    return VaRInput(
+        portfolio_id=portfolio_id,
+        portfolio_value=1_000_000.0,
+        weights=np.array([0.5, 0.3, 0.2]),
+        volatilities=np.array([0.20, 0.10, 0.0]),  # Third asset is cash
+        correlation=np.array([[1.0, 0.3, 0.0], [0.3, 1.0, 0.0], [0.0, 0.0, 1.0]]),
+        historical_returns=history
+    )
+
+def test_monte_carlo_matches_normal_closed_form():
+    inputs = make_input()
+    result = compute_var(inputs, [1, 7], [0.95, 0.99], n_paths=200_000, seed=3)
+    sigma = np.sqrt(inputs.weights @ daily_covariance(inputs.volatilities, inputs.correlation) @ inputs.weights)
+
+    assert result.method == "monte_carlo" and result.observations == 200_000
+    for horizon in (1, 7):
+        for confidence in (0.95, 0.99):
+            scale = inputs.portfolio_value * sigma * np.sqrt(horizon)
+            expected_var = scale * norm.ppf(confidence)
+            expected_es = scale * norm.pdf(norm.ppf(confidence)) / (1 - confidence)
+            assert result.var[(horizon, confidence)] == pytest.approx(expected_var, rel=0.02)
+            assert result.expected_shortfall[(horizon, confidence)] == pytest.approx(expected_es, rel=0.02)
+
+def test_results_are_reproducible_across_chunks_and_workers():
+    a = compute_var(make_input(), [1, 7], [0.95], n_paths=30_000, seed=11, chunk_size=30_000)
+    b = compute_var(make_input(), [1, 7], [0.95], n_paths=30_000, seed=11, chunk_size=7_000)
+    assert a.var == b.var and a.expected_shortfall == b.expected_shortfall
+
+    t_a = compute_var(make_input(), [1, 7], [0.95], n_paths=20_000, seed=1, chunk_size=20_000, student_t_df=4)
+    t_b = compute_var(make_input(), [1, 7], [0.95], n_paths=20_000, seed=1, chunk_size=5_000, student_t_df=4)
+    assert t_a.var == t_b.var and t_a.expected_shortfall == t_b.expected_shortfall
+    assert t_a.var != a.var
+
+    portfolios = [make_input(f"p{i}") for i in range(4)]
+    serial = compute_var_batch(portfolios, [1, 7], [0.95, 0.99], n_paths=5_000, seed=5, max_workers=1)
+    pooled = compute_var_batch(portfolios, [1, 7], [0.95, 0.99], n_paths=5_000, seed=5, max_workers=2)
+    assert [r.var for r in serial] == [r.var for r in pooled]
+    assert [r.portfolio_id for r in pooled] == ["p0", "p1", "p2", "p3"]
+    assert serial[0].var != serial[1].var  # Independent streams per portfolio
+
+def test_historical_simulation_matches_window_scan():
+    rng = np.random.default_rng(0)
+    history = rng.normal(0, 0.01, 400)
+    result = compute_var(make_input(history=history), [1, 7], [0.95, 0.99], min_history=250)
+    assert result.method == "historical"
+
+    for horizon in (1, 7):
+        losses = np.array([-history[i:i + horizon].sum() for i in range(len(history) - horizon + 1)])
+        assert np.allclose(historical_losses(history, horizon), losses)
+        for confidence in (0.95, 0.99):
+            ordered = np.sort(losses)
+            index = int(np.ceil(confidence * len(losses))) - 1
+            assert result.var[(horizon, confidence)] == round(ordered[index] * 1_000_000, 2)
+            assert result.expected_shortfall[(horizon, confidence)] == round(ordered[index:].mean() * 1_000_000, 2)
+
+    var, es = tail_measures(np.arange(100.0), [0.95])
+    assert var[0] == 94.0 and es[0] == np.mean(np.arange(94.0, 100.0))
+
+def test_risk_metrics_fetch_portfolio_state_once(monkeypatch):
+    calls = []
+
+    class FakeTradingEngine:
+        async def get_portfolio_performance(self, portfolio_id):
+            calls.append(portfolio_id)
+            if portfolio_id == "missing":
+                raise ValueError("Portfolio missing not found")
+            return {"total_value": 250_000.0, "current_allocation": {"USDT": 60.0, "USDC": 40.0}}
+
+    class FakeYieldAggregator:
+        async def get_all_yields(self):
+            return []
+
+    monkeypatch.setattr(risk_management_service, "get_trading_engine_service", lambda: FakeTradingEngine())
+    service = EnhancedRiskManagementService()
+    service.yield_aggregator = FakeYieldAggregator()
+    service.config["var_engine"].update(paths=5_000, seed=1)
+
+    metrics = asyncio.run(service.calculate_risk_metrics_batch(["p1", "missing"]))
+
+    assert calls == ["p1", "missing"]
+    assert metrics["missing"] == {}
+    p1 = metrics["p1"]
+    for key in ("var_1d_95", "var_1d_99", "var_7d_95", "var_7d_99", "es_1d_95", "es_1d_99", "es_7d_95", "es_7d_99"):
+        assert p1[key] > 0
+    assert p1["var_1d_95"] < p1["es_1d_95"] == p1["expected_shortfall_1d"]
+    assert p1["var_1d_95"] < p1["var_1d_99"] and p1["var_1d_95"] < p1["var_7d_95"]
+
+def test_historical_simulation_runs_from_recorded_daily_closes():
+    service = EnhancedRiskManagementService()
+    engine_config = service.config["var_engine"]
+    start = datetime(2024, 1, 1)
+    # Minute samples for the open day only set its close once the day rolls over
+    for minute in range(3):
+        service._record_daily_close("p1", start + timedelta(minutes=minute), 100.0 + minute)
+    assert "p1" not in service.daily_closes
+    service._record_daily_close("p1", start + timedelta(days=1), 99.0)
+    assert list(service.daily_closes["p1"]) == [102.0]
+    assert np.allclose(service._daily_returns([100.0, 0.0, 5.0, 6.0]), [-1.0, 0.2])
+
+    # Far more days than the 1000-record monitoring history could span
+    rng = np.random.default_rng(3)
+    for day in range(2, 400):
+        service._record_daily_close("p1", start + timedelta(days=day), 100.0 * (1 + rng.normal(0, 0.001)))
+    kept = engine_config["min_history"] + max(engine_config["horizons_days"]) + 1
+    assert len(service.daily_closes["p1"]) == kept
+
+    performance = {"total_value": 100.0, "current_allocation": {"USDT": 60.0, "USDC": 40.0}}
+    var_input = asyncio.run(service._build_var_input("p1", performance))
+    assert len(var_input.historical_returns) == kept - 1
+    result = compute_var(var_input, engine_config["horizons_days"], service.config["var_confidence_levels"],
+                         min_history=engine_config["min_history"])
+    assert result.method == "historical"
+
+    # The monitoring loop records a close per portfolio
+    asyncio.run(service._monitor_portfolio_risk("p2", {"portfolio_value": 50.0}))
+    assert service._open_day["p2"] == (datetime.utcnow().date().isoformat(), 50.0)
+
+def test_large_batches_reuse_one_worker_pool():
+    service = EnhancedRiskManagementService()
+    service.config["var_engine"].update(paths=2_000, seed=1, parallel_min_portfolios=2, max_workers=2)
+    portfolios = [make_input(f"p{i}") for i in range(3)]
+
+    async def scenario():
+        first = await service._simulate_var(portfolios)
+        pool = service._var_pool
+        assert pool is not None
+        second = await service._simulate_var(portfolios)
+        assert service._var_pool is pool
+        service.is_running = True
+        await service.stop_risk_management()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [r.var for r in first] == [r.var for r in second]
+    assert service._var_pool is None
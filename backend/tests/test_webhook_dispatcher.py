@@ -0,0 +1,175 @@
+"""
+Unit Tests for the webhook dispatcher
+Per-endpoint ordering with concurrent endpoints, retries that do not block
+other clients, circuit breakers, shared payload serialization, and replay of
+undelivered webhooks from the journal
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from services.api_gateway_service import APIGatewayService
+from services.state_journal import StateJournal
+from services.webhook_dispatcher import CircuitBreaker, WebhookDispatcher
+
+def make_webhook(webhook_id, url, secret="whsec_shared"):
+    return SimpleNamespace(webhook_id=webhook_id, url=url, secret=secret)
+
+def sign(body, secret):
+    return f"{secret}:{len(body)}"
+
+class FakeEndpoints:
+    def __init__(self, failing=(), latency=0.0):
+        self.failing = set(failing)
+        self.latency = latency
+        self.received = {}
+        self.attempts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, url, body, headers):
+        self.attempts[url] = self.attempts.get(url, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if url in self.failing:
+            raise ConnectionError("connection refused")
+        self.received.setdefault(url, []).append((json.loads(body)["data"]["n"], headers))
+        return 200
+
+async def wait_until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+def test_endpoints_deliver_in_order_and_concurrently():
+    endpoints = FakeEndpoints(latency=0.01)
+
+    async def scenario():
+        dispatcher = WebhookDispatcher(endpoints.send, sign, workers=4)
+        await dispatcher.start()
+        webhooks = [make_webhook(f"w{i}", f"https://client{i}.example/hook") for i in range(4)]
+        for n in range(10):
+            dispatcher.publish("yield_update", {"n": n}, webhooks)
+        await wait_until(lambda: dispatcher.stats["delivered"] == 40)
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    assert endpoints.max_in_flight == 4
+    for url, received in endpoints.received.items():
+        assert [n for n, _ in received] == list(range(10))
+    assert dispatcher.queue_size == 0 and not dispatcher.payloads
+
+def test_dead_endpoint_does_not_block_others_and_trips_breaker():
+    dead = "https://dead.example/hook"
+    endpoints = FakeEndpoints(failing={dead})
+
+    async def scenario():
+        dispatcher = WebhookDispatcher(endpoints.send, sign, workers=1, retry_attempts=3, retry_delay_seconds=0.05,
+                                       failure_threshold=4, reset_seconds=10.0)
+        await dispatcher.start()
+        webhooks = [make_webhook("dead", dead), make_webhook("live", "https://live.example/hook")]
+        for n in range(3):
+            dispatcher.publish("anomaly_alert", {"n": n}, webhooks)
+        # The single worker is free while the dead endpoint waits for its retries
+        await wait_until(lambda: dispatcher.stats["delivered"] == 3)
+        assert endpoints.attempts[dead] < 3
+        await wait_until(lambda: dispatcher.breakers[dead].opened_until is not None)
+        await asyncio.sleep(0.2)
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    # First delivery used all 3 attempts, the fourth failure opened the breaker and
+    # parked the endpoint until it half-opens
+    assert endpoints.attempts[dead] == 4
+    assert dispatcher.stats["failed"] == 1
+    assert dispatcher._delayed[0][0] == dispatcher.breakers[dead].opened_until
+    assert dispatcher.queue_size == 2
+    assert dispatcher.get_stats()["open_circuits"] == [dead]
+
+def test_circuit_breaker_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure(0)
+    assert breaker.allow(1)
+    breaker.record_failure(1)
+    assert not breaker.allow(30) and breaker.allow(31)
+    breaker.record_failure(31)  # Failed trial re-opens
+    assert not breaker.allow(60) and breaker.allow(61)
+    breaker.record_success()
+    assert breaker.allow(61) and breaker.failures == 0
+
+def test_payload_is_serialized_and_signed_once_per_secret():
+    signed = []
+
+    def counting_sign(body, secret):
+        signed.append(secret)
+        return sign(body, secret)
+
+    async def noop(url, body, headers):
+        return 200
+
+    dispatcher = WebhookDispatcher(noop, counting_sign)
+    webhooks = [make_webhook(f"w{i}", f"https://c{i}.example", secret="a" if i < 3 else "b") for i in range(5)]
+    assert dispatcher.publish("index_update", {"n": 1}, webhooks) == 5
+
+    deliveries = [queue[0] for queue in dispatcher._queues.values()]
+    assert sorted(signed) == ["a", "b"]
+    assert len(dispatcher.payloads) == 1 and {d.payload_id for d in deliveries} == set(dispatcher.payloads)
+    assert len({d.signature for d in deliveries}) == 2
+
+def test_undelivered_webhooks_survive_restart(tmp_path):
+    down = FakeEndpoints(failing={"https://a.example"})
+    up = FakeEndpoints()
+
+    async def first_run():
+        dispatcher = WebhookDispatcher(down.send, sign, journal=StateJournal(tmp_path, "webhooks"),
+                                       retry_delay_seconds=60.0)
+        await dispatcher.start()
+        webhooks = [make_webhook("a", "https://a.example")]
+        for n in range(3):
+            dispatcher.publish("yield_update", {"n": n}, webhooks)
+        await wait_until(lambda: down.attempts.get("https://a.example") == 1)
+        await dispatcher.stop()
+
+    async def second_run():
+        dispatcher = WebhookDispatcher(up.send, sign, journal=StateJournal(tmp_path, "webhooks"))
+        await dispatcher.start()
+        await wait_until(lambda: dispatcher.stats["delivered"] == 3)
+        await dispatcher.stop()
+        return dispatcher
+
+    asyncio.run(first_run())
+    dispatcher = asyncio.run(second_run())
+    assert dispatcher.stats["replayed"] == 3
+    assert [n for n, _ in up.received["https://a.example"]] == [0, 1, 2]
+    assert StateJournal(tmp_path, "webhooks").replay() == {"payloads": {}, "deliveries": {}}
+
+def test_gateway_trigger_webhook_uses_dispatcher():
+    service = APIGatewayService()
+    endpoints = FakeEndpoints()
+    service.webhook_dispatcher.send = endpoints.send
+    service.webhook_dispatcher.journal = None
+
+    async def scenario():
+        await service.webhook_dispatcher.start()
+        service.webhooks = {
+            "w1": SimpleNamespace(webhook_id="w1", url="https://c1.example", secret="s", events=["yield_update"],
+                                  is_active=True, last_triggered=None),
+            "w2": SimpleNamespace(webhook_id="w2", url="https://c2.example", secret="s", events=["index_update"],
+                                  is_active=True, last_triggered=None),
+        }
+        await service.trigger_webhook("yield_update", {"n": 7})
+        await wait_until(lambda: service.api_metrics["webhook_deliveries"] == 1)
+        await service.webhook_dispatcher.stop()
+
+    asyncio.run(scenario())
+    (n, headers), = endpoints.received["https://c1.example"]
+    assert n == 7 and headers["X-StableYield-Event"] == "yield_update"
+    assert service.webhooks["w1"].last_triggered is not None and service.webhooks["w2"].last_triggered is None
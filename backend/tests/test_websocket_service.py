@@ -0,0 +1,101 @@
+"""
+Unit Tests for WebSocketConnectionManager fan-out
+Per-connection queues, slow-consumer policies and failure cleanup against fake sockets
+"""
+
+import asyncio
+import json
+import pytest
+from services.websocket_service import WebSocketConnectionManager
+
+class FakeSocket:
+    """websockets-style connection; blocked sockets never finish a send"""
+
+    def __init__(self, blocked: bool = False, fail: bool = False):
+        self.blocked = blocked
+        self.fail = fail
+        self.sent = []
+        self.closed = None
+
+    async def send(self, message):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        if self.blocked:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+def payloads(messages):
+    return [json.loads(m)['data']['n'] for m in messages if json.loads(m)['type'] == 'syi_live']
+
+def run_fanout(policy, broadcasts=10, queue_size=4, fast_clients=20):
+    async def scenario():
+        manager = WebSocketConnectionManager(queue_size=queue_size, slow_consumer_policy=policy)
+        slow = FakeSocket(blocked=True)
+        fast = [FakeSocket() for _ in range(fast_clients)]
+        for socket in [slow] + fast:
+            await manager.connect(socket, 'syi_live')
+        await asyncio.sleep(0)  # Slow writer picks up its welcome message and blocks
+
+        for n in range(1, broadcasts + 1):
+            await asyncio.wait_for(manager.broadcast_to_stream('syi_live', {'n': n}), timeout=0.1)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        client = manager.clients.get(slow)
+        queued = payloads(client.queue) if client else None
+        stats = manager.get_connection_stats()
+        await manager.close_all()
+        return slow, fast, queued, stats
+
+    return asyncio.run(scenario())
+
+@pytest.mark.parametrize("policy", ["drop_oldest", "coalesce", "disconnect"])
+def test_slow_client_does_not_delay_others(policy):
+    """Fast clients receive every broadcast in order while one client never reads"""
+    _, fast, _, _ = run_fanout(policy)
+
+    for socket in fast:
+        assert json.loads(socket.sent[0])['type'] == 'welcome'
+        assert payloads(socket.sent) == list(range(1, 11))
+    # Encoded once: every client was handed the same string object
+    assert all(socket.sent[5] is fast[0].sent[5] for socket in fast)
+
+def test_drop_oldest_keeps_newest_messages():
+    _, _, queued, stats = run_fanout("drop_oldest")
+
+    assert queued == [7, 8, 9, 10]
+    assert stats['fanout']['messages_dropped'] == 6
+
+def test_coalesce_keeps_latest_snapshots():
+    _, _, queued, stats = run_fanout("coalesce")
+
+    assert queued == [9, 10]
+    assert stats['fanout']['messages_dropped'] == 8
+
+def test_disconnect_policy_closes_slow_client():
+    slow, _, queued, stats = run_fanout("disconnect")
+
+    assert queued is None
+    assert slow.closed == (1008, "Slow consumer")
+    assert stats['fanout']['slow_consumer_disconnects'] == 1
+    assert stats['streams']['syi_live'] == 20
+
+def test_failed_send_removes_connection():
+    async def scenario():
+        manager = WebSocketConnectionManager()
+        broken = FakeSocket(fail=True)
+        await manager.connect(broken, 'peg_metrics')
+        await asyncio.sleep(0.01)
+        return manager.get_connection_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats['total_connections'] == 0
+    assert stats['fanout']['send_failures'] == 1
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        WebSocketConnectionManager(slow_consumer_policy="buffer_forever")
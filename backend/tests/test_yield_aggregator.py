@@ -0,0 +1,81 @@
+"""
+Unit Tests for Yield Aggregator
+Tests for single-flight refresh and stale-while-revalidate caching
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from services.yield_aggregator import YieldAggregator, get_yield_aggregator
+
+class CountingAggregator(YieldAggregator):
+    """Aggregator whose upstream pipeline is a counted, slow stub"""
+
+    def __init__(self):
+        super().__init__()
+        self.pipeline_runs = 0
+
+    async def _refresh_yields(self):
+        self.pipeline_runs += 1
+        await asyncio.sleep(0.05)
+        snapshot = [{'stablecoin': 'USDC', 'currentYield': 4.0 + self.pipeline_runs}]
+        self.cache['all_yields'] = snapshot
+        self.cache_expiry['all_yields'] = datetime.utcnow() + self.cache_duration
+        self.metrics['refreshes'] += 1
+        return snapshot
+
+def test_concurrent_cold_start_runs_one_refresh():
+    """Concurrent callers on a cold cache share one in-flight refresh"""
+    async def scenario():
+        aggregator = CountingAggregator()
+        results = await asyncio.gather(*(aggregator.get_all_yields() for _ in range(10)))
+        return aggregator, results
+
+    aggregator, results = asyncio.run(scenario())
+
+    assert aggregator.pipeline_runs == 1
+    assert all(r == results[0] for r in results)
+    assert aggregator.metrics['coalesced_waits'] == 9
+
+def test_fresh_cache_is_served_without_refresh():
+    async def scenario():
+        aggregator = CountingAggregator()
+        await aggregator.get_all_yields()
+        await aggregator.get_all_yields()
+        return aggregator
+
+    aggregator = asyncio.run(scenario())
+
+    assert aggregator.pipeline_runs == 1
+    assert aggregator.metrics['cache_hits'] == 1
+
+def test_stale_snapshot_served_while_revalidating():
+    """Expired snapshots are returned immediately and refreshed in the background"""
+    async def scenario():
+        aggregator = CountingAggregator()
+        await aggregator.get_all_yields()
+        aggregator.cache_expiry['all_yields'] = datetime.utcnow() - timedelta(seconds=1)
+
+        stale = await aggregator.get_all_yields()
+        runs_after_stale_read = aggregator.pipeline_runs
+        await asyncio.sleep(0.1)
+        fresh = await aggregator.get_all_yields()
+        return aggregator, stale, runs_after_stale_read, fresh
+
+    aggregator, stale, runs_after_stale_read, fresh = asyncio.run(scenario())
+
+    assert stale[0]['currentYield'] == 5.0
+    assert runs_after_stale_read == 1
+    assert fresh[0]['currentYield'] == 6.0
+    assert aggregator.metrics['stale_hits'] == 1
+
+def test_cache_too_old_blocks_on_refresh():
+    async def scenario():
+        aggregator = CountingAggregator()
+        await aggregator.get_all_yields()
+        aggregator.cache_expiry['all_yields'] = datetime.utcnow() - aggregator.stale_duration - timedelta(seconds=1)
+        return await aggregator.get_all_yields()
+
+    assert asyncio.run(scenario())[0]['currentYield'] == 6.0
+
+def test_shared_aggregator_is_process_wide():
+    assert get_yield_aggregator() is get_yield_aggregator()
@@ -4,6 +4,7 @@ Tests for statistical outlier detection and APY cleaning functionality
 """
 
 import pytest
+import random
 import statistics
 from services.yield_sanitizer import YieldSanitizer, SanitizationAction, OutlierMethod
 
@@ -258,6 +259,67 @@ class TestYieldSanitizer:
         assert result.confidence_score > 0
         # Should handle gracefully with insufficient context
 
+class TestYieldSanitizerBatchKernel:
+    
+    def setup_method(self):
+        """Setup test environment"""
+        self.sanitizer = YieldSanitizer()
+    
+    def _random_yields(self, seed, size):
+        rng = random.Random(seed)
+        yields = []
+        for i in range(size):
+            apy = rng.choice([rng.uniform(2, 6), rng.uniform(0, 80), 4.0, 0.0, -1.0, 300.0])
+            yield_data = {'source': rng.choice(['aave_v3', 'curve', 'unknown']), 'apy': apy}
+            if rng.random() < 0.2:
+                yield_data = {'source': 'legacy', 'currentYield': apy}
+            if rng.random() < 0.2:
+                yield_data['apy_base'] = rng.uniform(0, 5)
+                yield_data['apy_reward'] = rng.uniform(0, 30)
+            if rng.random() < 0.1:
+                yield_data['borrow_apy'] = rng.uniform(0, 10)
+            yields.append(yield_data)
+        return yields
+    
+    def _constant_context_yields(self):
+        """Identical APYs, so the outlier's leave-one-out context has zero spread"""
+        yields = [{'source': 'aave_v3', 'apy': 4.37} for _ in range(11)]
+        yields.append({'source': 'curve', 'apy': 8.37})
+        return yields
+    
+    @pytest.mark.parametrize("method", ["MAD", "IQR", "Z_SCORE", "PERCENTILE"])
+    @pytest.mark.parametrize("size", [1, 2, 3, 4, 5, 40, 250, "constant"])
+    def test_batch_matches_single_path(self, method, size):
+        """sanitize_yield_batch equals sanitize_yield with leave-one-out context"""
+        self.sanitizer.config['outlier_detection']['method'] = method
+        yields = self._constant_context_yields() if size == "constant" else self._random_yields(size, size)
+        
+        batch_results = self.sanitizer.sanitize_yield_batch(yields)
+        
+        assert len(batch_results) == len(yields)
+        for i, result in enumerate(batch_results):
+            expected = self.sanitizer.sanitize_yield(yields[i], yields[:i] + yields[i+1:])
+            
+            assert result.original_apy == expected.original_apy
+            assert result.action_taken == expected.action_taken
+            assert result.warnings == expected.warnings
+            if method == "Z_SCORE":
+                # statistics.stdev is exact; the kernel uses shifted running sums
+                assert result.outlier_score == pytest.approx(expected.outlier_score, rel=1e-9)
+                assert result.confidence_score == pytest.approx(expected.confidence_score, rel=1e-9)
+            else:
+                assert result.outlier_score == expected.outlier_score
+                assert result.confidence_score == expected.confidence_score
+            assert result.sanitized_apy == expected.sanitized_apy
+            
+            metadata = dict(result.metadata, sanitization_timestamp=None)
+            expected_metadata = dict(expected.metadata, sanitization_timestamp=None)
+            assert metadata == pytest.approx(expected_metadata)
+    
+    def test_empty_batch(self):
+        """Empty batches return no results"""
+        assert self.sanitizer.sanitize_yield_batch([]) == []
+
 # Integration test
 def test_sanitizer_integration():
     """Test full sanitizer integration"""
@@ -4,10 +4,22 @@ Trend analysis for pegcheck historical data
 
 import asyncio
 import statistics
+import time
+from collections import deque
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
+import numpy as np
+
+from ..core.models import PegCheckPayload
+from ..storage.columnar import STATUS_CODES, HistoryArrays
+
+MIN_DATA_POINTS = 10        # Minimum points for an analysis
+WARNING_BPS = 25            # Warning threshold
+DEPEG_BPS = 50              # Depeg threshold
+GRADE_BOUNDS = [10, 25, 50, 75]
+GRADES = np.array(list("ABCDF"))
 @dataclass
 class TrendAnalysis:
     """Results of trend analysis for a symbol"""
@@ -40,139 +52,333 @@ class TrendAnalysis:
     risk_score: float        # 0-100, higher = more risky
     stability_grade: str     # "A", "B", "C", "D", "F"
 
+def _batch_stats(histories: List[HistoryArrays]) -> Dict[str, np.ndarray]:
+    """
+    Per-symbol statistics for several histories at once.
+
+    Valid (positive) prices are left-aligned into a NaN-padded
+    (symbols x points) array so every statistic is one reduction along axis 1.
+    """
+    data_points = np.array([len(prices) for _, prices, _ in histories], dtype=np.int64)
+    valid_prices = [prices[prices > 0] for _, prices, _ in histories]
+    counts = np.array([len(prices) for prices in valid_prices], dtype=np.int64)
+
+    width = max(int(counts.max(initial=0)), 1)
+    columns = np.arange(width)
+    valid = columns < counts[:, None]
+    price_grid = np.full((len(histories), width), np.nan)
+    price_grid[valid] = np.concatenate(valid_prices) if valid_prices else []
+    deviation_grid = np.abs(price_grid - 1.0) * 10000
+
+    half = counts // 2
+    first_half = columns < half[:, None]
+    second_half = valid & ~first_half
+
+    # Status codes (0/1/2) counted per row with one bincount over row-offset codes
+    rows = np.repeat(np.arange(len(histories)), data_points)
+    codes = np.concatenate([statuses for _, _, statuses in histories]) if histories else np.empty(0)
+    known = codes >= 0
+    status_counts = np.bincount(rows[known] * 3 + codes[known].astype(np.int64),
+                                minlength=3 * len(histories)).reshape(-1, 3)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        price_sum = np.where(valid, price_grid, 0.0).sum(axis=1)
+        mean = price_sum / counts
+        squares = np.where(valid, (price_grid - mean[:, None]) ** 2, 0.0).sum(axis=1)
+        volatility = np.where(counts > 1, np.sqrt(squares / np.maximum(counts - 1, 1)), 0.0)
+        deviations = np.where(valid, deviation_grid, 0.0)
+
+        return {
+            "data_points": data_points,
+            "count": counts,
+            "avg_price": mean,
+            "min_price": np.where(valid, price_grid, np.inf).min(axis=1),
+            "max_price": np.where(valid, price_grid, -np.inf).max(axis=1),
+            "price_volatility": volatility,
+            "avg_deviation_bps": deviations.sum(axis=1) / counts,
+            "max_deviation_bps": deviations.max(axis=1),
+            "deviation_episodes": (valid & (deviation_grid >= WARNING_BPS)).sum(axis=1),
+            "depeg_episodes": (valid & (deviation_grid >= DEPEG_BPS)).sum(axis=1),
+            "status_counts": status_counts,
+            "first_half_price": np.where(first_half, price_grid, 0.0).sum(axis=1) / half,
+            "second_half_price": np.where(second_half, price_grid, 0.0).sum(axis=1) / (counts - half),
+            "first_half_deviation": np.where(first_half, deviation_grid, 0.0).sum(axis=1) / half,
+            "second_half_deviation": np.where(second_half, deviation_grid, 0.0).sum(axis=1) / (counts - half),
+        }
+
+def _build_analyses(symbols: List[str], hours: int, stats: Dict[str, np.ndarray]) -> Dict[str, TrendAnalysis]:
+    """Derive trends, risk scores and grades from per-symbol statistics"""
+    data_points = stats["data_points"]
+    counts = stats["count"]
+    volatility = stats["price_volatility"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        time_in = stats["status_counts"] / np.maximum(data_points, 1)[:, None] * 100
+
+        # Price trend from the change between half-window means
+        change_pct = (stats["second_half_price"] - stats["first_half_price"]) / stats["first_half_price"] * 100
+        price_trend = np.select(
+            [counts < 5, np.abs(change_pct) < 0.1, change_pct > 0.5, change_pct < -0.5, volatility > 0.01],
+            ["stable", "stable", "upward", "downward", "volatile"],
+            default="stable"
+        )
+
+        first_dev = stats["first_half_deviation"]
+        second_dev = stats["second_half_deviation"]
+        deviation_trend = np.select(
+            [counts < 5, second_dev < first_dev * 0.8, second_dev > first_dev * 1.2],
+            ["stable", "improving", "deteriorating"],
+            default="stable"
+        )
+
+    # Risk score (0-100): deviation (0-30), depeg episodes (0-25), volatility (0-20), time out of peg (0-25)
+    risk_score = (np.minimum(stats["avg_deviation_bps"] * 2, 30)
+                  + np.minimum(stats["depeg_episodes"] * 10, 25)
+                  + np.minimum(volatility * 1000, 20)
+                  + np.minimum((100 - time_in[:, 0]) / 4, 25))
+    grades = GRADES[np.searchsorted(GRADE_BOUNDS, risk_score, side="right")]
+
+    fields = {
+        name: stats[name].tolist()
+        for name in ("avg_price", "min_price", "max_price", "price_volatility", "avg_deviation_bps",
+                     "max_deviation_bps", "deviation_episodes", "depeg_episodes")
+    }
+    time_in = time_in.tolist()
+    risk_score = risk_score.tolist()
+
+    analyses = {}
+    for i, symbol in enumerate(symbols):
+        if data_points[i] < MIN_DATA_POINTS or counts[i] == 0:
+            continue
+        analyses[symbol] = TrendAnalysis(
+            symbol=symbol,
+            analysis_period_hours=hours,
+            data_points=int(data_points[i]),
+            **{name: values[i] for name, values in fields.items()},
+            time_in_normal=time_in[i][0],
+            time_in_warning=time_in[i][1],
+            time_in_depeg=time_in[i][2],
+            price_trend=str(price_trend[i]),
+            deviation_trend=str(deviation_trend[i]),
+            risk_score=risk_score[i],
+            stability_grade=str(grades[i])
+        )
+    return analyses
+
+class RollingTrendWindow:
+    """
+    Running statistics for one symbol over a sliding time window.
+
+    Each observation updates sums, episode and status counters, monotonic
+    min/max queues and the two half-window queues in amortized O(1), so an
+    analysis does not rescan the window. Sums are kept on (price - 1.0) to
+    avoid cancellation in the variance of prices close to the peg.
+    Observations are expected in time order; a late one rebuilds the window.
+    """
+
+    def __init__(self, symbol: str, hours: int = 168):
+        self.symbol = symbol
+        self.hours = hours
+        self._points = deque()   # (seq, timestamp, price, status) for every point
+        self._seq = 0
+        self._reset()
+
+    def _reset(self):
+        self._first = deque()    # (seq, price - 1.0) of the older half of valid prices
+        self._second = deque()   # (seq, price - 1.0) of the newer half
+        self._first_sums = [0.0, 0.0]   # sum of d, sum of |d|
+        self._second_sums = [0.0, 0.0]
+        self._sum_squares = 0.0
+        self._min = deque()      # (seq, price), increasing prices
+        self._max = deque()      # (seq, price), decreasing prices
+        self._status_counts = [0, 0, 0]
+        self._deviation_episodes = 0
+        self._depeg_episodes = 0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @property
+    def latest_timestamp(self) -> Optional[int]:
+        return self._points[-1][1] if self._points else None
+
+    @staticmethod
+    def _move(item: Tuple[int, float], source_sums: List[float], target_sums: List[float]):
+        source_sums[0] -= item[1]
+        source_sums[1] -= abs(item[1])
+        target_sums[0] += item[1]
+        target_sums[1] += abs(item[1])
+
+    def _rebalance(self):
+        """Keep the older half at count // 2 valid prices"""
+        target = (len(self._first) + len(self._second)) // 2
+        while len(self._first) < target:
+            item = self._second.popleft()
+            self._move(item, self._second_sums, self._first_sums)
+            self._first.append(item)
+        while len(self._first) > target:
+            item = self._first.pop()
+            self._move(item, self._first_sums, self._second_sums)
+            self._second.appendleft(item)
+
+    def _count(self, price: float, status: int, sign: int):
+        if status >= 0:
+            self._status_counts[status] += sign
+        if price > 0:
+            deviation = abs(price - 1.0) * 10000
+            self._deviation_episodes += sign * (deviation >= WARNING_BPS)
+            self._depeg_episodes += sign * (deviation >= DEPEG_BPS)
+            self._sum_squares += sign * (price - 1.0) ** 2
+
+    def _push(self, seq: int, price: float, status: int):
+        self._count(price, status, 1)
+        if price > 0:
+            d = price - 1.0
+            self._second.append((seq, d))
+            self._second_sums[0] += d
+            self._second_sums[1] += abs(d)
+            while self._min and self._min[-1][1] >= price:
+                self._min.pop()
+            self._min.append((seq, price))
+            while self._max and self._max[-1][1] <= price:
+                self._max.pop()
+            self._max.append((seq, price))
+            self._rebalance()
+
+    def _pop_oldest(self):
+        seq, _, price, status = self._points.popleft()
+        self._count(price, status, -1)
+        if price > 0:
+            queue, sums = (self._first, self._first_sums) if self._first else (self._second, self._second_sums)
+            _, d = queue.popleft()
+            sums[0] -= d
+            sums[1] -= abs(d)
+            if self._min[0][0] == seq:
+                self._min.popleft()
+            if self._max[0][0] == seq:
+                self._max.popleft()
+            self._rebalance()
+
+    def add(self, timestamp: int, price: float, status: int):
+        """Add one observation (status code 0/1/2, -1 if unknown) and evict points outside the window"""
+        if self._points and timestamp < self._points[-1][1]:
+            points = sorted([(t, p, s) for _, t, p, s in self._points] + [(timestamp, price, status)],
+                            key=lambda point: point[0])
+            self._points.clear()
+            self._reset()
+            for point in points:
+                self.add(*point)
+            return
+
+        self._seq += 1
+        self._points.append((self._seq, timestamp, price, status))
+        self._push(self._seq, price, status)
+        self.evict_before(timestamp - self.hours * 3600)
+
+    def evict_before(self, cutoff: float) -> int:
+        removed = 0
+        while self._points and self._points[0][1] < cutoff:
+            self._pop_oldest()
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, np.ndarray]:
+        """Current statistics in the per-symbol array layout used by the batch path"""
+        first_n, second_n = len(self._first), len(self._second)
+        count = first_n + second_n
+        total_d = self._first_sums[0] + self._second_sums[0]
+        total_abs = self._first_sums[1] + self._second_sums[1]
+
+        nan = float("nan")
+        mean_d = total_d / count if count else nan
+        variance = (self._sum_squares - count * mean_d * mean_d) / (count - 1) if count > 1 else 0.0
+        min_price = self._min[0][1] if self._min else nan
+        max_price = self._max[0][1] if self._max else nan
+
+        values = {
+            "data_points": len(self._points),
+            "count": count,
+            "avg_price": 1.0 + mean_d,
+            "min_price": min_price,
+            "max_price": max_price,
+            "price_volatility": max(variance, 0.0) ** 0.5,
+            "avg_deviation_bps": total_abs / count * 10000 if count else nan,
+            "max_deviation_bps": max(abs(min_price - 1.0), abs(max_price - 1.0)) * 10000,
+            "deviation_episodes": self._deviation_episodes,
+            "depeg_episodes": self._depeg_episodes,
+            "first_half_price": 1.0 + self._first_sums[0] / first_n if first_n else nan,
+            "second_half_price": 1.0 + self._second_sums[0] / second_n if second_n else nan,
+            "first_half_deviation": self._first_sums[1] / first_n * 10000 if first_n else nan,
+            "second_half_deviation": self._second_sums[1] / second_n * 10000 if second_n else nan,
+        }
+        stats = {name: np.array([value]) for name, value in values.items()}
+        stats["status_counts"] = np.array([self._status_counts])
+        return stats
+
+    def analysis(self, now: Optional[float] = None) -> Optional[TrendAnalysis]:
+        """TrendAnalysis of the points within `hours` of `now` (default: current time)"""
+        self.evict_before((now if now is not None else time.time()) - self.hours * 3600)
+        return _build_analyses([self.symbol], self.hours, self.stats()).get(self.symbol)
+
 class TrendAnalyzer:
     """Analyzes trends in pegcheck historical data"""
     
     def __init__(self, storage_backend):
         self.storage = storage_backend
+        self.windows: Dict[Tuple[str, int], RollingTrendWindow] = {}
     
     async def analyze_symbol_trends(self, symbol: str, hours: int = 168) -> Optional[TrendAnalysis]:
         """Analyze trends for a single symbol over specified time period"""
+        analyses = await self.analyze_market_trends([symbol], hours)
+        return analyses.get(symbol)
+    
+    async def analyze_market_trends(self, symbols: List[str], hours: int = 168) -> Dict[str, TrendAnalysis]:
+        """Analyze trends for multiple symbols (incrementally tracked ones from their running windows)"""
         try:
-            # Get historical data
-            history = await self.storage.get_peg_history(symbol, hours)
-            
-            if len(history) < 10:  # Need minimum data points
-                return None
-            
-            # Extract data
-            timestamps, prices, statuses = zip(*history)
-            
-            # Calculate price statistics
-            valid_prices = [p for p in prices if p > 0]
-            if not valid_prices:
-                return None
+            if all((symbol, hours) in self.windows for symbol in symbols):
+                return self.incremental_trends(symbols, hours)
             
-            avg_price = statistics.mean(valid_prices)
-            min_price = min(valid_prices)
-            max_price = max(valid_prices)
-            price_volatility = statistics.stdev(valid_prices) if len(valid_prices) > 1 else 0
-            
-            # Calculate deviation statistics
-            deviations_bps = [abs(p - 1.0) * 10000 for p in valid_prices]
-            avg_deviation_bps = statistics.mean(deviations_bps)
-            max_deviation_bps = max(deviations_bps)
-            
-            # Count episodes
-            deviation_episodes = sum(1 for d in deviations_bps if d >= 25)  # Warning threshold
-            depeg_episodes = sum(1 for d in deviations_bps if d >= 50)     # Depeg threshold
-            
-            # Calculate time in each status
-            status_counts = {"normal": 0, "warning": 0, "depeg": 0}
-            for status in statuses:
-                if status in status_counts:
-                    status_counts[status] += 1
-            
-            total_points = len(statuses)
-            time_in_normal = (status_counts["normal"] / total_points) * 100
-            time_in_warning = (status_counts["warning"] / total_points) * 100
-            time_in_depeg = (status_counts["depeg"] / total_points) * 100
-            
-            # Determine price trend
-            if len(valid_prices) >= 5:
-                first_half_avg = statistics.mean(valid_prices[:len(valid_prices)//2])
-                second_half_avg = statistics.mean(valid_prices[len(valid_prices)//2:])
-                price_change_pct = ((second_half_avg - first_half_avg) / first_half_avg) * 100
-                
-                if abs(price_change_pct) < 0.1:
-                    price_trend = "stable"
-                elif price_change_pct > 0.5:
-                    price_trend = "upward"
-                elif price_change_pct < -0.5:
-                    price_trend = "downward"
-                else:
-                    price_trend = "volatile" if price_volatility > 0.01 else "stable"
-            else:
-                price_trend = "stable"
-            
-            # Determine deviation trend
-            if len(deviations_bps) >= 5:
-                first_half_dev = statistics.mean(deviations_bps[:len(deviations_bps)//2])
-                second_half_dev = statistics.mean(deviations_bps[len(deviations_bps)//2:])
-                
-                if second_half_dev < first_half_dev * 0.8:
-                    deviation_trend = "improving"
-                elif second_half_dev > first_half_dev * 1.2:
-                    deviation_trend = "deteriorating" 
-                else:
-                    deviation_trend = "stable"
-            else:
-                deviation_trend = "stable"
-            
-            # Calculate risk score (0-100)
-            risk_score = 0
-            risk_score += min(avg_deviation_bps * 2, 30)       # Deviation component (0-30)
-            risk_score += min(depeg_episodes * 10, 25)        # Depeg episodes (0-25)
-            risk_score += min(price_volatility * 1000, 20)    # Volatility component (0-20)
-            risk_score += min((100 - time_in_normal) / 4, 25) # Time out of peg (0-25)
-            
-            # Assign stability grade
-            if risk_score < 10:
-                stability_grade = "A"
-            elif risk_score < 25:
-                stability_grade = "B"
-            elif risk_score < 50:
-                stability_grade = "C"
-            elif risk_score < 75:
-                stability_grade = "D"
-            else:
-                stability_grade = "F"
-            
-            return TrendAnalysis(
-                symbol=symbol,
-                analysis_period_hours=hours,
-                data_points=len(history),
-                avg_price=avg_price,
-                min_price=min_price,
-                max_price=max_price,
-                price_volatility=price_volatility,
-                avg_deviation_bps=avg_deviation_bps,
-                max_deviation_bps=max_deviation_bps,
-                deviation_episodes=deviation_episodes,
-                depeg_episodes=depeg_episodes,
-                time_in_normal=time_in_normal,
-                time_in_warning=time_in_warning,
-                time_in_depeg=time_in_depeg,
-                price_trend=price_trend,
-                deviation_trend=deviation_trend,
-                risk_score=risk_score,
-                stability_grade=stability_grade
-            )
+            # One storage call for every symbol, then vectorized statistics
+            histories = await self.storage.get_peg_history_batch(symbols, hours)
+            return _build_analyses(symbols, hours, _batch_stats([histories[symbol] for symbol in symbols]))
             
         except Exception as e:
-            print(f"Error analyzing trends for {symbol}: {e}")
-            return None
+            print(f"Error analyzing trends for {symbols}: {e}")
+            return {}
     
-    async def analyze_market_trends(self, symbols: List[str], hours: int = 168) -> Dict[str, TrendAnalysis]:
-        """Analyze trends for multiple symbols"""
-        results = {}
+    async def track(self, symbols: List[str], hours: int = 168):
+        """Start incremental analysis for symbols, seeding their windows from storage in one call"""
+        untracked = [symbol for symbol in symbols if (symbol, hours) not in self.windows]
+        if not untracked:
+            return
         
+        histories = await self.storage.get_peg_history_batch(untracked, hours)
+        for symbol in untracked:
+            window = RollingTrendWindow(symbol, hours)
+            for timestamp, price, status in zip(*(column.tolist() for column in histories[symbol])):
+                window.add(timestamp, price, status)
+            self.windows[(symbol, hours)] = window
+    
+    def observe_payload(self, payload: PegCheckPayload):
+        """Feed a new peg check into the tracked windows"""
+        for report in payload.reports:
+            if report.avg_ref != report.avg_ref:  # NaN prices are not stored in history either
+                continue
+            for hours in {hours for symbol, hours in self.windows if symbol == report.symbol}:
+                self.windows[(report.symbol, hours)].add(
+                    report.timestamp, float(report.avg_ref), STATUS_CODES[report.status]
+                )
+    
+    def incremental_trends(self, symbols: List[str], hours: int = 168) -> Dict[str, TrendAnalysis]:
+        """Analyses from the running windows of tracked symbols"""
+        now = time.time()
+        analyses = {}
         for symbol in symbols:
-            analysis = await self.analyze_symbol_trends(symbol, hours)
+            window = self.windows.get((symbol, hours))
+            analysis = window.analysis(now) if window else None
             if analysis:
-                results[symbol] = analysis
-        
-        return results
+                analyses[symbol] = analysis
+        return analyses
     
     async def get_market_stability_report(self, symbols: List[str], hours: int = 168) -> Dict:
         """Generate comprehensive market stability report"""
@@ -10,8 +10,8 @@ import asyncio
 from datetime import datetime
 
 from .core.config import DEFAULT_SYMBOLS
-from .core.compute import compute_peg_analysis
-from .sources import coingecko, cryptocompare, chainlink, uniswap
+from .core.compute import compute_peg_analysis_async
+from .sources import http
 
 # Create FastAPI app
 app = FastAPI(
@@ -31,6 +31,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def close_http_session():
+    """Close the shared source HTTP session"""
+    await http.close_session()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -87,35 +92,11 @@ async def peg_check(
                 detail=f"Too many symbols. Maximum {max_symbols} allowed."
             )
         
-        # Fetch data from CeFi sources
-        cg_prices = coingecko.fetch(symbol_list)
-        cc_prices = cryptocompare.fetch(symbol_list)
-        
-        # Optional: Chainlink oracles
-        chainlink_prices = None
-        if with_oracle:
-            try:
-                chainlink_prices = chainlink.fetch(symbol_list)
-            except Exception as e:
-                print(f"Chainlink fetch error: {e}")
-                chainlink_prices = {symbol: float('nan') for symbol in symbol_list}
-        
-        # Optional: Uniswap v3 TWAP  
-        uniswap_prices = None
-        if with_dex:
-            try:
-                uniswap_prices = uniswap.fetch(symbol_list)
-            except Exception as e:
-                print(f"Uniswap fetch error: {e}")
-                uniswap_prices = {symbol: float('nan') for symbol in symbol_list}
-        
-        # Compute peg analysis
-        payload = compute_peg_analysis(
-            coingecko_prices=cg_prices,
-            cryptocompare_prices=cc_prices,
-            chainlink_prices=chainlink_prices,
-            uniswap_prices=uniswap_prices,
-            symbols=symbol_list
+        # Fetch all sources concurrently and compute peg analysis
+        payload = await compute_peg_analysis_async(
+            symbols=symbol_list,
+            with_oracle=with_oracle,
+            with_dex=with_dex
         )
         
         # Convert to API response format
@@ -153,11 +134,11 @@ async def peg_check(
         }
         
         # Add optional data if requested
-        if with_oracle and chainlink_prices:
-            response["data_sources"]["chainlink"] = chainlink_prices
+        if with_oracle and payload.chainlink:
+            response["data_sources"]["chainlink"] = payload.chainlink
         
-        if with_dex and uniswap_prices:
-            response["data_sources"]["uniswap"] = uniswap_prices
+        if with_dex and payload.uniswap:
+            response["data_sources"]["uniswap"] = payload.uniswap
         
         return response
         
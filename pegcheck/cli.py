@@ -10,8 +10,8 @@ import asyncio
 from typing import List
 
 from .core.config import DEFAULT_SYMBOLS
-from .core.compute import compute_peg_analysis
-from .sources import coingecko, cryptocompare, chainlink, uniswap
+from .core.compute import compute_peg_analysis_async
+from .sources import http
 
 def parse_symbols(symbols_str: str) -> List[str]:
     """Parse comma-separated symbols string"""
@@ -23,45 +23,25 @@ async def run_peg_check(symbols: List[str], pretty: bool = False,
     Run peg check analysis
     """
     print(f"🔍 Checking peg stability for: {', '.join(symbols)}")
-    print("📊 Fetching data from sources...")
-    
-    # Fetch data from CeFi sources
-    print("  • CoinGecko...")
-    cg_prices = coingecko.fetch(symbols)
-    
-    print("  • CryptoCompare...")  
-    cc_prices = cryptocompare.fetch(symbols)
-    
-    # Optional: Chainlink oracles
-    chainlink_prices = None
+    sources = ["CoinGecko", "CryptoCompare"]
     if with_oracle:
-        print("  • Chainlink Oracles...")
-        try:
-            chainlink_prices = chainlink.fetch(symbols)
-        except Exception as e:
-            print(f"    ⚠️  Chainlink error: {e}")
-            chainlink_prices = {symbol: float('nan') for symbol in symbols}
-    
-    # Optional: Uniswap v3 TWAP
-    uniswap_prices = None
+        sources.append("Chainlink Oracles")
     if with_dex:
-        print("  • Uniswap v3 TWAP...")
-        try:
-            uniswap_prices = uniswap.fetch(symbols)
-        except Exception as e:
-            print(f"    ⚠️  Uniswap error: {e}")
-            uniswap_prices = {symbol: float('nan') for symbol in symbols}
+        sources.append("Uniswap v3 TWAP")
+    print(f"📊 Fetching data from sources concurrently: {', '.join(sources)}...")
     
-    print("🧮 Computing peg analysis...")
+    try:
+        # Fetch all sources and run peg analysis
+        payload = await compute_peg_analysis_async(
+            symbols=symbols,
+            with_oracle=with_oracle,
+            with_dex=with_dex
+        )
+    finally:
+        await http.close_session()
     
-    # Run peg analysis
-    payload = compute_peg_analysis(
-        coingecko_prices=cg_prices,
-        cryptocompare_prices=cc_prices,
-        chainlink_prices=chainlink_prices,
-        uniswap_prices=uniswap_prices,
-        symbols=symbols
-    )
+    for error in payload.errors or []:
+        print(f"    ⚠️  {error}")
     
     # Convert to JSON-serializable format
     result = {
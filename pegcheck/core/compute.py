@@ -2,13 +2,15 @@
 Peg computation and analysis logic
 """
 
+import asyncio
 import math
 import time
 import statistics
 from typing import Dict, List, Optional, Tuple
 
 from .models import PricePoint, PegReport, PegStatus, PegCheckPayload
-from .config import DEPEG_THRESHOLD_BPS, WARNING_THRESHOLD_BPS
+from .config import DEPEG_THRESHOLD_BPS, WARNING_THRESHOLD_BPS, SOURCE_DEADLINES
+from ..sources import coingecko, cryptocompare, chainlink, uniswap
 
 def merge_cefi_refs(coingecko_prices: Dict[str, float], 
                    cryptocompare_prices: Dict[str, float]) -> Dict[str, float]:
@@ -181,4 +183,63 @@ def compute_peg_analysis(coingecko_prices: Dict[str, float],
             "depeg_threshold_bps": DEPEG_THRESHOLD_BPS,
             "warning_threshold_bps": WARNING_THRESHOLD_BPS
         }
-    )
\ No newline at end of file
+    )
+
+async def _fetch_with_deadline(source: str, fetch_coro, symbols: List[str],
+                               deadline: float, errors: List[str]) -> Dict[str, float]:
+    """Await one source, falling back to NaN prices if it fails or misses its deadline"""
+    try:
+        return await asyncio.wait_for(fetch_coro, timeout=deadline)
+    except asyncio.TimeoutError:
+        errors.append(f"{source}: no response within {deadline:g}s")
+    except Exception as e:
+        errors.append(f"{source}: {e}")
+    return {symbol: float('nan') for symbol in symbols}
+
+async def fetch_all_sources(symbols: List[str],
+                            with_oracle: bool = False,
+                            with_dex: bool = False,
+                            deadlines: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Dict[str, float]], List[str]]:
+    """
+    Fetch all requested sources concurrently, each bounded by its own deadline
+    Returns (dict[source] = prices, errors)
+    """
+    deadlines = {**SOURCE_DEADLINES, **(deadlines or {})}
+    
+    fetchers = {
+        "coingecko": coingecko.fetch_async,
+        "cryptocompare": cryptocompare.fetch_async
+    }
+    if with_oracle:
+        fetchers["chainlink"] = chainlink.fetch_async
+    if with_dex:
+        fetchers["uniswap"] = uniswap.fetch_async
+    
+    errors: List[str] = []
+    results = await asyncio.gather(*(
+        _fetch_with_deadline(source, fetch(symbols), symbols, deadlines[source], errors)
+        for source, fetch in fetchers.items()
+    ))
+    
+    return dict(zip(fetchers, results)), errors
+
+async def compute_peg_analysis_async(symbols: List[str],
+                                     with_oracle: bool = False,
+                                     with_dex: bool = False,
+                                     deadlines: Optional[Dict[str, float]] = None) -> PegCheckPayload:
+    """
+    Fetch all sources concurrently and run the peg analysis
+    Total latency is bounded by the slowest source deadline, not the sum of all sources
+    """
+    prices, errors = await fetch_all_sources(symbols, with_oracle, with_dex, deadlines)
+    
+    payload = compute_peg_analysis(
+        coingecko_prices=prices["coingecko"],
+        cryptocompare_prices=prices["cryptocompare"],
+        chainlink_prices=prices.get("chainlink"),
+        uniswap_prices=prices.get("uniswap"),
+        symbols=symbols
+    )
+    payload.errors = errors or None
+    
+    return payload
@@ -20,6 +20,11 @@ CRYPTOCOMPARE_BASE_URL = "https://min-api.cryptocompare.com"
 CRYPTOCOMPARE_API_KEY = os.getenv("CRYPTOCOMPARE_API_KEY", "")
 ETH_RPC_URL = os.getenv("ETH_RPC_URL", "")
 
+# On-chain reads are batched into one round trip: "jsonrpc" sends a JSON-RPC
+# batch array, "multicall" aggregates the calls through Multicall3
+ETH_RPC_BATCH_MODE = os.getenv("ETH_RPC_BATCH_MODE", "jsonrpc")
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
 # Chainlink feed addresses (Ethereum mainnet)
 CHAINLINK_FEEDS = {
     "USDT": "0x3E7d1eAB13ad0104d2750B8863b489D65364e32D",  # USDT/USD
@@ -68,5 +73,18 @@ REQUEST_TIMEOUT = 10
 MAX_RETRIES = 3
 RETRY_DELAY = 1.0
 
+# Shared HTTP connection pool
+MAX_CONNECTIONS_PER_HOST = 10
+DNS_CACHE_TTL = 300  # seconds
+
+# Per-source deadlines (seconds) for the concurrent fetch driver; a source
+# that misses its deadline contributes NaN prices instead of delaying the check
+SOURCE_DEADLINES = {
+    "coingecko": 8.0,
+    "cryptocompare": 8.0,
+    "chainlink": 12.0,
+    "uniswap": 12.0
+}
+
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
\ No newline at end of file
@@ -26,11 +26,11 @@ async def run_example():
     
     # Fetch from CoinGecko
     print("  • CoinGecko...")
-    cg_prices = coingecko.fetch(symbols)
+    cg_prices = await coingecko.fetch_async(symbols)
     
     # Fetch from CryptoCompare
     print("  • CryptoCompare...")
-    cc_prices = cryptocompare.fetch(symbols)
+    cc_prices = await cryptocompare.fetch_async(symbols)
     
     print("\n📈 Source Data:")
     print("Symbol | CoinGecko  | CryptoCompare")
@@ -9,8 +9,8 @@ from typing import Optional, List
 import json
 
 from ..core.config import DEFAULT_SYMBOLS
-from ..core.compute import compute_peg_analysis
-from ..sources import coingecko, cryptocompare, chainlink, uniswap
+from ..core.compute import compute_peg_analysis_async, fetch_all_sources
+from ..sources import chainlink, uniswap
 from ..analytics.trend_analyzer import TrendAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -115,37 +115,21 @@ class PegCheckScheduler:
         try:
             logger.info("Running scheduled peg check")
             
-            # Fetch data from all sources
-            cg_prices = coingecko.fetch(DEFAULT_SYMBOLS)
-            cc_prices = cryptocompare.fetch(DEFAULT_SYMBOLS)
-            
-            chainlink_prices = None
-            if self.enable_oracle:
-                try:
-                    chainlink_prices = chainlink.fetch(DEFAULT_SYMBOLS)
-                except Exception as e:
-                    logger.warning(f"Chainlink fetch failed: {e}")
-            
-            uniswap_prices = None
-            if self.enable_dex:
-                try:
-                    uniswap_prices = uniswap.fetch(DEFAULT_SYMBOLS)
-                except Exception as e:
-                    logger.warning(f"Uniswap fetch failed: {e}")
-            
-            # Compute peg analysis
-            payload = compute_peg_analysis(
-                coingecko_prices=cg_prices,
-                cryptocompare_prices=cc_prices,
-                chainlink_prices=chainlink_prices,
-                uniswap_prices=uniswap_prices,
-                symbols=DEFAULT_SYMBOLS
+            # Fetch all sources concurrently and compute peg analysis
+            payload = await compute_peg_analysis_async(
+                symbols=DEFAULT_SYMBOLS,
+                with_oracle=self.enable_oracle,
+                with_dex=self.enable_dex
             )
             
+            for error in payload.errors or []:
+                logger.warning(f"Source fetch failed: {error}")
+            
             # Store result
             success = await self.storage.store_peg_check(payload)
             
             if success:
+                self.trend_analyzer.observe_payload(payload)
                 depegs = payload.total_depegs
                 max_deviation = payload.max_deviation_bps
                 logger.info(f"Peg check completed: {depegs} depegs detected, max deviation: {max_deviation:.1f} bps")
@@ -185,6 +169,8 @@ class PegCheckScheduler:
             
             # Analyze trends for major stablecoins
             major_symbols = ["USDT", "USDC", "DAI", "FRAX", "BUSD"]
+            # Seeded from storage once; later peg checks update the windows incrementally
+            await self.trend_analyzer.track(major_symbols, hours=168)
             report = await self.trend_analyzer.get_market_stability_report(major_symbols, hours=168)
             
             # Log key findings
@@ -218,28 +204,24 @@ class PegCheckScheduler:
             # Check data source health
             sources_health = {}
             
-            try:
-                test_result = coingecko.fetch(["USDT"])
-                sources_health["coingecko"] = "healthy" if test_result.get("USDT", 0) > 0 else "degraded"
-            except Exception as e:
-                sources_health["coingecko"] = f"error: {str(e)}"
-            
-            try:
-                test_result = cryptocompare.fetch(["USDT"])
-                sources_health["cryptocompare"] = "healthy" if test_result.get("USDT", 0) > 0 else "degraded"
-            except Exception as e:
-                sources_health["cryptocompare"] = f"error: {str(e)}"
+            # Probe the CeFi sources concurrently
+            test_prices, errors = await fetch_all_sources(["USDT"])
+            for source, test_result in test_prices.items():
+                sources_health[source] = "healthy" if test_result.get("USDT", 0) > 0 else "degraded"
+            for error in errors:
+                source, _, message = error.partition(": ")
+                sources_health[source] = f"error: {message}"
             
             if self.enable_oracle:
                 try:
-                    chainlink_health = chainlink.health_check()
+                    chainlink_health = await chainlink.health_check_async()
                     sources_health["chainlink"] = chainlink_health["status"]
                 except Exception as e:
                     sources_health["chainlink"] = f"error: {str(e)}"
             
             if self.enable_dex:
                 try:
-                    uniswap_health = uniswap.health_check()
+                    uniswap_health = await uniswap.health_check_async()
                     sources_health["uniswap"] = uniswap_health["status"]
                 except Exception as e:
                     sources_health["uniswap"] = f"error: {str(e)}"
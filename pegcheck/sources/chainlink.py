@@ -3,16 +3,19 @@ Chainlink Price Feeds integration for stablecoin price data
 """
 
 import time
-import requests
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal, getcontext
 
 from ..core.models import PricePoint
 from ..core.config import CHAINLINK_FEEDS, ETH_RPC_URL, REQUEST_TIMEOUT
+from . import http, rpc
 
 # Set decimal precision for accurate price calculations
 getcontext().prec = 18
 
+# Feed decimals never change, so they are cached for the life of the process
+_decimals_cache: Dict[str, int] = {}
+
 # Chainlink AggregatorV3Interface ABI (minimal)
 AGGREGATOR_ABI = [
     {
@@ -37,36 +40,6 @@ AGGREGATOR_ABI = [
     }
 ]
 
-def _make_eth_rpc_call(method: str, params: List) -> Optional[Dict]:
-    """Make an Ethereum RPC call"""
-    if not ETH_RPC_URL:
-        print("ETH_RPC_URL not configured, cannot fetch Chainlink data")
-        return None
-        
-    try:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params,
-            "id": 1
-        }
-        
-        response = requests.post(ETH_RPC_URL, json=payload, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "result" in data:
-            return data["result"]
-        elif "error" in data:
-            print(f"RPC error: {data['error']}")
-            return None
-            
-    except Exception as e:
-        print(f"RPC call error: {e}")
-        return None
-    
-    return None
-
 def _encode_function_call(function_name: str) -> str:
     """Encode function call for eth_call"""
     # Simple function signature hashing (first 4 bytes of keccak256)
@@ -95,71 +68,82 @@ def _decode_int256(hex_data: str) -> int:
     
     return value
 
-def _fetch_price_feed_data(feed_address: str) -> Optional[Tuple[float, int]]:
-    """Fetch latest price data from a Chainlink price feed"""
-    try:
-        # Get decimals first
-        decimals_call_data = _encode_function_call("decimals()")
-        decimals_result = _make_eth_rpc_call("eth_call", [
-            {"to": feed_address, "data": decimals_call_data},
-            "latest"
-        ])
-        
-        if not decimals_result:
-            return None
-            
-        decimals = _decode_uint256(decimals_result)
-        
-        # Get latest round data
-        latest_round_call_data = _encode_function_call("latestRoundData()")
-        result = _make_eth_rpc_call("eth_call", [
-            {"to": feed_address, "data": latest_round_call_data},
-            "latest"
-        ])
-        
-        if not result or result == "0x":
-            return None
-        
-        # Decode the result (5 return values, each 32 bytes)
-        if len(result) < 322:  # 2 + 5*64 = 322 characters minimum
-            return None
-            
-        # Extract the answer (second return value, bytes 32-63)
-        answer_hex = result[66:130]  # Skip 0x and first 64 chars
-        answer = _decode_int256("0x" + answer_hex)
-        
-        # Extract updated timestamp (fourth return value, bytes 96-127)
-        timestamp_hex = result[194:258]
-        timestamp = _decode_uint256("0x" + timestamp_hex)
-        
-        if answer <= 0:
-            return None
-            
-        # Convert to float with proper decimal places
-        price = float(answer) / (10 ** decimals)
-        
-        return price, timestamp
+def _decode_round_data(result: Optional[str], decimals: int) -> Optional[Tuple[float, int]]:
+    """Decode latestRoundData() into (price, updated_at)"""
+    if not result or result == "0x":
+        return None
+    
+    # Decode the result (5 return values, each 32 bytes)
+    if len(result) < 322:  # 2 + 5*64 = 322 characters minimum
+        return None
         
-    except Exception as e:
-        print(f"Error fetching Chainlink price feed {feed_address}: {e}")
+    # Extract the answer (second return value, bytes 32-63)
+    answer_hex = result[66:130]  # Skip 0x and first 64 chars
+    answer = _decode_int256("0x" + answer_hex)
+    
+    # Extract updated timestamp (fourth return value, bytes 96-127)
+    timestamp_hex = result[194:258]
+    timestamp = _decode_uint256("0x" + timestamp_hex)
+    
+    if answer <= 0:
         return None
+        
+    # Convert to float with proper decimal places
+    price = float(answer) / (10 ** decimals)
+    
+    return price, timestamp
 
-def fetch(symbols: List[str]) -> Dict[str, float]:
+async def _fetch_price_feeds(feed_addresses: List[str]) -> Dict[str, Optional[Tuple[float, int]]]:
+    """
+    Fetch latest price data from several Chainlink price feeds in one RPC round trip
+    decimals() is immutable, so it is only requested the first time a feed is seen
+    """
+    latest_round_call_data = _encode_function_call("latestRoundData()")
+    decimals_call_data = _encode_function_call("decimals()")
+    
+    missing_decimals = [address for address in feed_addresses if address not in _decimals_cache]
+    calls = [(address, latest_round_call_data) for address in feed_addresses]
+    calls += [(address, decimals_call_data) for address in missing_decimals]
+    
+    results = await rpc.batch_eth_call(calls)
+    
+    for address, decimals_result in zip(missing_decimals, results[len(feed_addresses):]):
+        if decimals_result and decimals_result != "0x":
+            _decimals_cache[address] = _decode_uint256(decimals_result)
+    
+    out = {}
+    for address, result in zip(feed_addresses, results):
+        try:
+            decimals = _decimals_cache.get(address)
+            out[address] = _decode_round_data(result, decimals) if decimals is not None else None
+        except Exception as e:
+            print(f"Error fetching Chainlink price feed {address}: {e}")
+            out[address] = None
+    
+    return out
+
+async def _fetch_price_feed_data(feed_address: str) -> Optional[Tuple[float, int]]:
+    """Fetch latest price data from a Chainlink price feed"""
+    return (await _fetch_price_feeds([feed_address]))[feed_address]
+
+async def fetch_async(symbols: List[str]) -> Dict[str, float]:
     """
     Fetch spot prices in USD for a list of symbols from Chainlink price feeds
+    All feeds are read in a single batched RPC round trip
     Returns dict[symbol] = price
     """
     out: Dict[str, float] = {}
     
+    feed_symbols = [symbol for symbol in symbols if symbol.upper() in CHAINLINK_FEEDS]
+    feed_data = await _fetch_price_feeds([CHAINLINK_FEEDS[symbol.upper()] for symbol in feed_symbols])
+    feed_results = {symbol: feed_data[CHAINLINK_FEEDS[symbol.upper()]] for symbol in feed_symbols}
+    
     for symbol in symbols:
-        symbol_upper = symbol.upper()
-        
-        if symbol_upper not in CHAINLINK_FEEDS:
+        if symbol not in feed_results:
             out[symbol] = float('nan')
             continue
             
-        feed_address = CHAINLINK_FEEDS[symbol_upper]
-        result = _fetch_price_feed_data(feed_address)
+        result = feed_results[symbol]
         
         if result:
             price, timestamp = result
@@ -175,20 +159,22 @@ def fetch(symbols: List[str]) -> Dict[str, float]:
     
     return out
 
-def get_feed_info(symbols: List[str]) -> Dict[str, Dict]:
+def fetch(symbols: List[str]) -> Dict[str, float]:
+    """Blocking wrapper around fetch_async for the CLI and scripts"""
+    return http.run_sync(fetch_async(symbols))
+
+async def get_feed_info_async(symbols: List[str]) -> Dict[str, Dict]:
     """
     Get detailed information about Chainlink price feeds
     """
     out = {}
     
-    for symbol in symbols:
-        symbol_upper = symbol.upper()
-        
-        if symbol_upper not in CHAINLINK_FEEDS:
-            continue
-            
-        feed_address = CHAINLINK_FEEDS[symbol_upper]
-        result = _fetch_price_feed_data(feed_address)
+    feed_symbols = [symbol for symbol in symbols if symbol.upper() in CHAINLINK_FEEDS]
+    feed_data = await _fetch_price_feeds([CHAINLINK_FEEDS[symbol.upper()] for symbol in feed_symbols])
+    
+    for symbol in feed_symbols:
+        feed_address = CHAINLINK_FEEDS[symbol.upper()]
+        result = feed_data[feed_address]
         
         if result:
             price, timestamp = result
@@ -202,6 +188,10 @@ def get_feed_info(symbols: List[str]) -> Dict[str, Dict]:
     
     return out
 
+def get_feed_info(symbols: List[str]) -> Dict[str, Dict]:
+    """Blocking wrapper around get_feed_info_async"""
+    return http.run_sync(get_feed_info_async(symbols))
+
 def fetch_historical(symbol: str, blocks_back: int = 100) -> List[Tuple[int, float]]:
     """
     Fetch historical price data from Chainlink (simplified version)
@@ -223,7 +213,7 @@ def fetch_historical(symbol: str, blocks_back: int = 100) -> List[Tuple[int, flo
     
     return []
 
-def health_check() -> Dict[str, any]:
+async def health_check_async() -> Dict[str, any]:
     """
     Check the health of the Chainlink data source
     """
@@ -243,7 +233,7 @@ def health_check() -> Dict[str, any]:
     
     # Test with a simple symbol
     try:
-        test_result = fetch(["USDT"])
+        test_result = await fetch_async(["USDT"])
         if "USDT" in test_result and not str(test_result["USDT"]).lower() == 'nan':
             health_info["status"] = "healthy"
             health_info["test_price"] = test_result["USDT"]
@@ -254,4 +244,8 @@ def health_check() -> Dict[str, any]:
         health_info["status"] = "error"
         health_info["error"] = str(e)
     
-    return health_info
\ No newline at end of file
+    return health_info
+
+def health_check() -> Dict[str, any]:
+    """Blocking wrapper around health_check_async"""
+    return http.run_sync(health_check_async())
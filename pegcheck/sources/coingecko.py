@@ -8,18 +8,18 @@ from typing import Dict, List, Optional, Tuple
 
 from ..core.models import PricePoint
 from ..core.config import COINGECKO_BASE_URL, COINGECKO_IDS, REQUEST_TIMEOUT
+from . import http
 
 def _get_coingecko_id(symbol: str) -> Optional[str]:
     """Get CoinGecko ID for a symbol"""
     return COINGECKO_IDS.get(symbol.upper())
 
-def fetch(symbols: List[str]) -> Dict[str, float]:
+async def fetch_async(symbols: List[str]) -> Dict[str, float]:
     """
     Fetch spot prices in USD for a list of symbols from CoinGecko
     Returns dict[symbol] = price
     """
     out: Dict[str, float] = {}
-    ts = int(time.time())
     
     # Map symbols to CoinGecko IDs
     symbol_to_id = {}
@@ -44,9 +44,7 @@ def fetch(symbols: List[str]) -> Dict[str, float]:
             'vs_currencies': 'usd'
         }
         
-        response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
+        data = await http.get_json(url, params=params)
         
         # Parse response and map back to symbols
         for gecko_id, symbol in symbol_to_id.items():
@@ -68,6 +66,10 @@ def fetch(symbols: List[str]) -> Dict[str, float]:
     
     return out
 
+def fetch(symbols: List[str]) -> Dict[str, float]:
+    """Blocking wrapper around fetch_async for the CLI and scripts"""
+    return http.run_sync(fetch_async(symbols))
+
 def fetch_historical(symbol: str, days: int = 30) -> List[Tuple[int, float]]:
     """
     Fetch historical price data for a symbol
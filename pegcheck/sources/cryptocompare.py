@@ -2,12 +2,14 @@
 CryptoCompare API integration for stablecoin price data
 """
 
+import asyncio
 import time
 import requests
 from typing import Dict, List, Optional, Tuple
 
 from ..core.models import PricePoint
 from ..core.config import CRYPTOCOMPARE_BASE_URL, CRYPTOCOMPARE_API_KEY, REQUEST_TIMEOUT
+from . import http
 
 def _headers() -> Dict[str, str]:
     """Get headers for CryptoCompare API requests"""
@@ -16,35 +18,33 @@ def _headers() -> Dict[str, str]:
         headers["authorization"] = f"Apikey {CRYPTOCOMPARE_API_KEY}"
     return headers
 
-def fetch(symbols: List[str]) -> Dict[str, float]:
+async def _fetch_symbol(symbol: str) -> float:
+    """Fetch the USD spot price of a single symbol"""
+    try:
+        url = f"{CRYPTOCOMPARE_BASE_URL}/data/price"
+        params = {"fsym": symbol, "tsyms": "USD"}
+        data = await http.get_json(url, params=params, headers=_headers())
+        
+        if "USD" in data:
+            return float(data["USD"])
+        return float("nan")
+            
+    except Exception as e:
+        print(f"CryptoCompare error for {symbol}: {e}")
+        return float("nan")
+
+async def fetch_async(symbols: List[str]) -> Dict[str, float]:
     """
     Fetch spot prices in USD for a list of symbols from CryptoCompare
+    The per-symbol requests run concurrently on the shared session
     Returns dict[symbol] = price
     """
-    out: Dict[str, float] = {}
-    ts = int(time.time())
-    
-    for symbol in symbols:
-        try:
-            url = f"{CRYPTOCOMPARE_BASE_URL}/data/price"
-            params = {"fsym": symbol, "tsyms": "USD"}
-            headers = _headers()
-            
-            response = requests.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "USD" in data:
-                price = float(data["USD"])
-                out[symbol] = price
-            else:
-                out[symbol] = float("nan")
-                
-        except Exception as e:
-            print(f"CryptoCompare error for {symbol}: {e}")
-            out[symbol] = float("nan")
-    
-    return out
+    prices = await asyncio.gather(*(_fetch_symbol(symbol) for symbol in symbols))
+    return dict(zip(symbols, prices))
+
+def fetch(symbols: List[str]) -> Dict[str, float]:
+    """Blocking wrapper around fetch_async for the CLI and scripts"""
+    return http.run_sync(fetch_async(symbols))
 
 def histoday(symbol: str, limit: int = 200, to_ts: Optional[int] = None) -> List[Tuple[int, float]]:
     """
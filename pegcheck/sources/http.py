@@ -0,0 +1,66 @@
+"""
+Shared async HTTP client for pegcheck data sources
+"""
+
+import asyncio
+from typing import Any, Awaitable, Dict, Optional
+
+import aiohttp
+
+from ..core.config import REQUEST_TIMEOUT, MAX_CONNECTIONS_PER_HOST, DNS_CACHE_TTL
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get the keep-alive session for the running event loop, creating it on first use"""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+
+    # Sessions are bound to the loop that created them (the sync wrappers run their own loop)
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+        _session_loop = loop
+
+    return _session
+
+async def close_session():
+    """Close the shared session and its pooled connections"""
+    global _session, _session_loop
+    if _session is not None and not _session.closed and _session_loop is asyncio.get_running_loop():
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+async def get_json(url: str,
+                   params: Optional[Dict[str, Any]] = None,
+                   headers: Optional[Dict[str, str]] = None,
+                   timeout: float = REQUEST_TIMEOUT) -> Any:
+    """GET a JSON document, raising for non-2xx statuses"""
+    session = await get_session()
+    async with session.get(url, params=params, headers=headers,
+                           timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+async def post_json(url: str, payload: Any, timeout: float = REQUEST_TIMEOUT) -> Any:
+    """POST a JSON payload and return the decoded JSON response"""
+    session = await get_session()
+    async with session.post(url, json=payload,
+                            timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+def run_sync(coro: Awaitable) -> Any:
+    """Run a source coroutine to completion from synchronous code (CLI, scripts)"""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await close_session()
+
+    return asyncio.run(runner())
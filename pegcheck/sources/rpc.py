@@ -0,0 +1,131 @@
+"""
+Batched Ethereum JSON-RPC reads for on-chain pegcheck sources
+"""
+
+from typing import List, Optional, Tuple
+
+from ..core.config import ETH_RPC_URL, ETH_RPC_BATCH_MODE, MULTICALL3_ADDRESS
+from . import http
+
+# Multicall3 aggregate3((address target, bool allowFailure, bytes callData)[])
+AGGREGATE3_SELECTOR = "82ad56cb"
+
+def _word(value: int) -> str:
+    """Encode an unsigned integer as one 32-byte ABI word (hex, no prefix)"""
+    return f"{value:064x}"
+
+def _pad_bytes(data: bytes) -> str:
+    """Hex-encode bytes right-padded to a multiple of 32"""
+    padding = (-len(data)) % 32
+    return (data + b"\x00" * padding).hex()
+
+def encode_aggregate3(calls: List[Tuple[str, str]]) -> str:
+    """ABI-encode an aggregate3 call with allowFailure set for every (target, calldata) pair"""
+    encoded_calls = []
+    for target, call_data in calls:
+        data = bytes.fromhex(call_data[2:] if call_data.startswith("0x") else call_data)
+        encoded_calls.append(
+            _word(int(target, 16)) +   # target
+            _word(1) +                 # allowFailure
+            _word(0x60) +              # offset of callData within the tuple
+            _word(len(data)) +
+            _pad_bytes(data)
+        )
+
+    # Dynamic tuples: offsets are relative to the start of the offsets table
+    offsets = []
+    position = 32 * len(calls)
+    for encoded in encoded_calls:
+        offsets.append(_word(position))
+        position += len(encoded) // 2
+
+    return "0x" + AGGREGATE3_SELECTOR + _word(0x20) + _word(len(calls)) + "".join(offsets) + "".join(encoded_calls)
+
+def decode_aggregate3(result: str) -> List[Optional[str]]:
+    """Decode aggregate3 (bool success, bytes returnData)[] into hex results, None for failed calls"""
+    data = bytes.fromhex(result[2:] if result.startswith("0x") else result)
+
+    def read_word(offset: int) -> int:
+        return int.from_bytes(data[offset:offset + 32], "big")
+
+    array_start = read_word(0)
+    count = read_word(array_start)
+    table_start = array_start + 32
+
+    out: List[Optional[str]] = []
+    for i in range(count):
+        tuple_start = table_start + read_word(table_start + 32 * i)
+        success = read_word(tuple_start) != 0
+        bytes_start = tuple_start + read_word(tuple_start + 32)
+        length = read_word(bytes_start)
+        return_data = data[bytes_start + 32:bytes_start + 32 + length]
+        out.append("0x" + return_data.hex() if success else None)
+
+    return out
+
+async def _jsonrpc_batch(calls: List[Tuple[str, str]], block: str) -> List[Optional[str]]:
+    """Send every eth_call in one JSON-RPC batch array"""
+    payload = [
+        {
+            "jsonrpc": "2.0",
+            "method": "eth_call",
+            "params": [{"to": target, "data": call_data}, block],
+            "id": i
+        }
+        for i, (target, call_data) in enumerate(calls)
+    ]
+
+    data = await http.post_json(ETH_RPC_URL, payload)
+
+    # A node that rejects the whole batch answers with a single error object
+    if not isinstance(data, list):
+        print(f"RPC batch error: {data.get('error') if isinstance(data, dict) else data}")
+        return [None] * len(calls)
+
+    # Batch responses may arrive in any order
+    results: List[Optional[str]] = [None] * len(calls)
+    for response in data:
+        response_id = response.get("id")
+        if isinstance(response_id, int) and 0 <= response_id < len(calls):
+            if "result" in response:
+                results[response_id] = response["result"]
+            elif "error" in response:
+                print(f"RPC error: {response['error']}")
+
+    return results
+
+async def _multicall(calls: List[Tuple[str, str]], block: str) -> List[Optional[str]]:
+    """Aggregate every call into a single Multicall3 eth_call"""
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "eth_call",
+        "params": [{"to": MULTICALL3_ADDRESS, "data": encode_aggregate3(calls)}, block],
+        "id": 1
+    }
+
+    data = await http.post_json(ETH_RPC_URL, payload)
+
+    if "result" in data:
+        return decode_aggregate3(data["result"])
+    print(f"RPC error: {data.get('error')}")
+    return [None] * len(calls)
+
+async def batch_eth_call(calls: List[Tuple[str, str]], block: str = "latest") -> List[Optional[str]]:
+    """
+    Execute (target, calldata) eth_calls in one round trip
+    Returns the hex result of each call in order, None where a call failed
+    """
+    if not calls:
+        return []
+
+    if not ETH_RPC_URL:
+        print("ETH_RPC_URL not configured, cannot make RPC calls")
+        return [None] * len(calls)
+
+    try:
+        if ETH_RPC_BATCH_MODE == "multicall":
+            return await _multicall(calls, block)
+        return await _jsonrpc_batch(calls, block)
+    except Exception as e:
+        print(f"RPC call error: {e}")
+        return [None] * len(calls)
@@ -2,13 +2,14 @@
 Uniswap V3 TWAP integration for stablecoin price data
 """
 
+import asyncio
 import time
-import requests
 import math
 from typing import Dict, List, Optional, Tuple
 
 from ..core.models import PricePoint
 from ..core.config import UNISWAP_POOLS, ETH_RPC_URL, REQUEST_TIMEOUT
+from . import http, rpc
 
 # Uniswap V3 Pool ABI (minimal for TWAP)
 POOL_ABI = [
@@ -47,36 +48,6 @@ TOKEN_DECIMALS = {
     "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2": 18  # WETH
 }
 
-def _make_eth_rpc_call(method: str, params: List) -> Optional[Dict]:
-    """Make an Ethereum RPC call"""
-    if not ETH_RPC_URL:
-        print("ETH_RPC_URL not configured, cannot fetch Uniswap data")
-        return None
-        
-    try:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params,
-            "id": 1
-        }
-        
-        response = requests.post(ETH_RPC_URL, json=payload, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "result" in data:
-            return data["result"]
-        elif "error" in data:
-            print(f"RPC error: {data['error']}")
-            return None
-            
-    except Exception as e:
-        print(f"RPC call error: {e}")
-        return None
-    
-    return None
-
 def _encode_function_call(function_name: str, params: List = None) -> str:
     """Encode function call for eth_call (simplified)"""
     if function_name == "slot0()":
@@ -117,48 +88,56 @@ def _tick_to_price(tick: int, token0_decimals: int = 18, token1_decimals: int =
     except (OverflowError, ValueError):
         return float('nan')
 
-def _get_current_price(pool_address: str, token0: str, token1: str) -> Optional[float]:
-    """Get current spot price from Uniswap V3 pool"""
-    try:
-        slot0_call_data = _encode_function_call("slot0()")
-        result = _make_eth_rpc_call("eth_call", [
-            {"to": pool_address, "data": slot0_call_data},
-            "latest"
-        ])
-        
-        if not result or result == "0x":
-            return None
-        
-        # Decode slot0 result
-        # sqrtPriceX96 is first return value (bytes 0-31)
-        # tick is second return value (bytes 32-63)
-        if len(result) < 130:  # Need at least 2*32 bytes
-            return None
-            
-        tick_hex = result[66:130]  # Skip 0x and first 64 chars, get next 64
-        tick = _decode_int256("0x" + tick_hex)
-        
-        # Get token decimals
-        token0_decimals = TOKEN_DECIMALS.get(token0, 18)
-        token1_decimals = TOKEN_DECIMALS.get(token1, 18)
-        
-        price = _tick_to_price(tick, token0_decimals, token1_decimals)
-        return price
-        
-    except Exception as e:
-        print(f"Error getting Uniswap price from pool {pool_address}: {e}")
+def _decode_slot0_price(result: Optional[str], token0: str, token1: str) -> Optional[float]:
+    """Decode the spot price from a slot0() result"""
+    if not result or result == "0x":
+        return None
+    
+    # Decode slot0 result
+    # sqrtPriceX96 is first return value (bytes 0-31)
+    # tick is second return value (bytes 32-63)
+    if len(result) < 130:  # Need at least 2*32 bytes
         return None
+        
+    tick_hex = result[66:130]  # Skip 0x and first 64 chars, get next 64
+    tick = _decode_int256("0x" + tick_hex)
+    
+    # Get token decimals
+    token0_decimals = TOKEN_DECIMALS.get(token0, 18)
+    token1_decimals = TOKEN_DECIMALS.get(token1, 18)
+    
+    return _tick_to_price(tick, token0_decimals, token1_decimals)
+
+async def _get_current_prices(pools: List[Dict]) -> List[Optional[float]]:
+    """Get current spot prices from several Uniswap V3 pools in one RPC round trip"""
+    slot0_call_data = _encode_function_call("slot0()")
+    results = await rpc.batch_eth_call([(pool["address"], slot0_call_data) for pool in pools])
+    
+    prices = []
+    for pool, result in zip(pools, results):
+        try:
+            prices.append(_decode_slot0_price(result, pool["token0"], pool["token1"]))
+        except Exception as e:
+            print(f"Error getting Uniswap price from pool {pool['address']}: {e}")
+            prices.append(None)
+    
+    return prices
 
-def _get_twap_price(pool_address: str, token0: str, token1: str, period_seconds: int = 3600) -> Optional[float]:
+async def _get_current_price(pool_address: str, token0: str, token1: str) -> Optional[float]:
+    """Get current spot price from Uniswap V3 pool"""
+    prices = await _get_current_prices([{"address": pool_address, "token0": token0, "token1": token1}])
+    return prices[0]
+
+async def _get_twap_prices(pools: List[Dict], period_seconds: int = 3600) -> List[Optional[float]]:
+    """Get Time-Weighted Average Prices from several Uniswap V3 pools"""
+    # For simplified implementation, we'll just return current price
+    # Full TWAP implementation would require observe() function with proper ABI encoding
+    return await _get_current_prices(pools)
+
+async def _get_twap_price(pool_address: str, token0: str, token1: str, period_seconds: int = 3600) -> Optional[float]:
     """Get Time-Weighted Average Price from Uniswap V3 pool"""
-    try:
-        # For simplified implementation, we'll just return current price
-        # Full TWAP implementation would require observe() function with proper ABI encoding
-        return _get_current_price(pool_address, token0, token1)
-        
-    except Exception as e:
-        print(f"Error getting Uniswap TWAP from pool {pool_address}: {e}")
-        return None
+    prices = await _get_twap_prices([{"address": pool_address, "token0": token0, "token1": token1}], period_seconds)
+    return prices[0]
 
 def _convert_to_usd(symbol: str, eth_price: float, stablecoin_eth_price: float) -> float:
     """Convert stablecoin/ETH price to USD price"""
@@ -173,9 +152,10 @@ def _convert_to_usd(symbol: str, eth_price: float, stablecoin_eth_price: float)
     except (ZeroDivisionError, ValueError):
         return float('nan')
 
-def fetch(symbols: List[str], eth_usd_price: Optional[float] = None) -> Dict[str, float]:
+async def fetch_async(symbols: List[str], eth_usd_price: Optional[float] = None) -> Dict[str, float]:
     """
     Fetch spot prices in USD for stablecoins from Uniswap V3 pools
+    All pools are read in a single batched RPC round trip
     Returns dict[symbol] = price
     
     Note: Requires ETH/USD price for conversion since pools are typically vs ETH
@@ -186,20 +166,18 @@ def fetch(symbols: List[str], eth_usd_price: Optional[float] = None) -> Dict[str
     if eth_usd_price is None:
         eth_usd_price = 3000.0  # Fallback ETH price for demo
     
+    pool_symbols = [symbol for symbol in symbols if symbol.upper() in UNISWAP_POOLS]
+    
+    # Get TWAP prices (stablecoin/ETH)
+    twap_prices = await _get_twap_prices([UNISWAP_POOLS[symbol.upper()] for symbol in pool_symbols])
+    pool_prices = dict(zip(pool_symbols, twap_prices))
+    
     for symbol in symbols:
-        symbol_upper = symbol.upper()
-        
-        if symbol_upper not in UNISWAP_POOLS:
+        if symbol not in pool_prices:
             out[symbol] = float('nan')
             continue
             
-        pool_config = UNISWAP_POOLS[symbol_upper]
-        pool_address = pool_config["address"]
-        token0 = pool_config["token0"]
-        token1 = pool_config["token1"]
-        
-        # Get TWAP price (stablecoin/ETH)
-        stablecoin_eth_price = _get_twap_price(pool_address, token0, token1)
+        stablecoin_eth_price = pool_prices[symbol]
         
         if stablecoin_eth_price is not None and stablecoin_eth_price > 0:
             # Convert to USD price
@@ -210,26 +188,28 @@ def fetch(symbols: List[str], eth_usd_price: Optional[float] = None) -> Dict[str
     
     return out
 
-def get_pool_info(symbols: List[str]) -> Dict[str, Dict]:
+def fetch(symbols: List[str], eth_usd_price: Optional[float] = None) -> Dict[str, float]:
+    """Blocking wrapper around fetch_async for the CLI and scripts"""
+    return http.run_sync(fetch_async(symbols, eth_usd_price))
+
+async def get_pool_info_async(symbols: List[str]) -> Dict[str, Dict]:
     """
     Get detailed information about Uniswap V3 pools
     """
     out = {}
     
-    for symbol in symbols:
-        symbol_upper = symbol.upper()
-        
-        if symbol_upper not in UNISWAP_POOLS:
-            continue
-            
-        pool_config = UNISWAP_POOLS[symbol_upper]
+    pool_symbols = [symbol for symbol in symbols if symbol.upper() in UNISWAP_POOLS]
+    pools = [UNISWAP_POOLS[symbol.upper()] for symbol in pool_symbols]
+    current_prices, twap_prices = await asyncio.gather(
+        _get_current_prices(pools),
+        _get_twap_prices(pools)
+    )
+    
+    for symbol, pool_config, current_price, twap_price in zip(pool_symbols, pools, current_prices, twap_prices):
         pool_address = pool_config["address"]
         token0 = pool_config["token0"]
         token1 = pool_config["token1"]
         
-        current_price = _get_current_price(pool_address, token0, token1)
-        twap_price = _get_twap_price(pool_address, token0, token1)
-        
         out[symbol] = {
             "pool_address": pool_address,
             "token0": token0,
@@ -242,6 +222,10 @@ def get_pool_info(symbols: List[str]) -> Dict[str, Dict]:
     
     return out
 
+def get_pool_info(symbols: List[str]) -> Dict[str, Dict]:
+    """Blocking wrapper around get_pool_info_async"""
+    return http.run_sync(get_pool_info_async(symbols))
+
 def fetch_historical(symbol: str, hours_back: int = 24) -> List[Tuple[int, float]]:
     """
     Fetch historical TWAP data (simplified version)
@@ -262,7 +246,7 @@ def fetch_historical(symbol: str, hours_back: int = 24) -> List[Tuple[int, float
     
     return []
 
-def health_check() -> Dict[str, any]:
+async def health_check_async() -> Dict[str, any]:
     """
     Check the health of the Uniswap V3 data source
     """
@@ -282,7 +266,7 @@ def health_check() -> Dict[str, any]:
     
     # Test with a simple symbol
     try:
-        test_result = fetch(["USDT"])
+        test_result = await fetch_async(["USDT"])
         if "USDT" in test_result and not str(test_result["USDT"]).lower() == 'nan':
             health_info["status"] = "healthy"
             health_info["test_price"] = test_result["USDT"]
@@ -295,6 +279,10 @@ def health_check() -> Dict[str, any]:
     
     return health_info
 
+def health_check() -> Dict[str, any]:
+    """Blocking wrapper around health_check_async"""
+    return http.run_sync(health_check_async())
+
 def get_supported_pairs() -> List[str]:
     """Get list of supported stablecoin pairs"""
     return list(UNISWAP_POOLS.keys())
@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+from .columnar import HistoryArrays, history_to_arrays
 from ..core.models import PegCheckPayload, PegReport
 
 class BaseStorage(ABC):
@@ -16,11 +17,28 @@ class BaseStorage(ABC):
         """Store a complete peg check payload"""
         pass
     
+    async def store_peg_checks(self, payloads: List[PegCheckPayload]) -> bool:
+        """Store several peg check payloads; backends with a bulk path override this"""
+        results = [await self.store_peg_check(payload) for payload in payloads]
+        return all(results)
+    
+    async def flush(self) -> bool:
+        """Write any buffered peg checks (no-op for unbuffered backends)"""
+        return True
+    
     @abstractmethod
     async def get_peg_history(self, symbol: str, hours: int = 24) -> List[Tuple[datetime, float, str]]:
         """Get peg history for a symbol (timestamp, price, status)"""
         pass
     
+    async def get_peg_history_arrays(self, symbol: str, hours: int = 24) -> HistoryArrays:
+        """Get peg history as time-ordered (epoch timestamps, prices, status codes) arrays"""
+        return history_to_arrays(await self.get_peg_history(symbol, hours))
+    
+    async def get_peg_history_batch(self, symbols: List[str], hours: int = 24) -> Dict[str, HistoryArrays]:
+        """Get history arrays for several symbols; backends that can answer in one query override this"""
+        return {symbol: await self.get_peg_history_arrays(symbol, hours) for symbol in symbols}
+    
     @abstractmethod
     async def get_latest_peg_check(self, symbols: Optional[List[str]] = None) -> Optional[PegCheckPayload]:
         """Get the latest peg check data"""
@@ -0,0 +1,211 @@
+"""
+Columnar ring buffers for in-memory peg history queries
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..core.models import PegCheckPayload, PegStatus
+
+# Status codes stored in the int8 status column (-1: no report for the point)
+STATUS_CODES = {PegStatus.NORMAL: 0, PegStatus.WARNING: 1, PegStatus.DEPEG: 2}
+STATUS_NAMES = [status.value for status in STATUS_CODES]
+STATUS_MISSING = -1
+
+# Bit of each source in the sources_seen / sources_ok masks
+SOURCE_BITS = {"coingecko": 1, "cryptocompare": 2, "chainlink": 4, "uniswap": 8}
+
+# timestamp int64 + price float64 + status int8 + sources_seen uint8 + sources_ok uint8
+BYTES_PER_POINT = 8 + 8 + 1 + 1 + 1
+
+HistoryArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+def _is_valid_price(price) -> bool:
+    return isinstance(price, (int, float)) and not math.isnan(price) and price > 0
+
+class SymbolSeries:
+    """
+    Time-ordered columns of one symbol's peg history, bounded to `capacity` points.
+
+    Columns are preallocated at 2 x capacity. Points are appended at the end;
+    when the end is reached the newest `capacity` points are moved back to the
+    front, so the live window is always one contiguous slice and appends are
+    amortized O(1). Allocated memory is fixed at 2 x capacity x BYTES_PER_POINT
+    (38 bytes per retained point).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        size = 2 * capacity
+        self._timestamps = np.zeros(size, dtype=np.int64)
+        self._prices = np.full(size, np.nan)
+        self._statuses = np.full(size, STATUS_MISSING, dtype=np.int8)
+        self._sources_seen = np.zeros(size, dtype=np.uint8)
+        self._sources_ok = np.zeros(size, dtype=np.uint8)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def _columns(self) -> List[np.ndarray]:
+        return [self._timestamps, self._prices, self._statuses, self._sources_seen, self._sources_ok]
+
+    def _compact(self):
+        """Move the live window to the front of the columns"""
+        count = len(self)
+        for column in self._columns():
+            column[:count] = column[self._start:self._end]
+        self._start, self._end = 0, count
+
+    def append(self, timestamp: int, price: float, status: int, sources_seen: int, sources_ok: int):
+        """Add a point, evicting the oldest once capacity is reached"""
+        if self._end == len(self._timestamps):
+            self._compact()
+
+        position = self._end
+        if position > self._start and timestamp < self._timestamps[position - 1]:
+            # Late point: shift newer points right to keep the columns time-ordered
+            position = self._start + int(np.searchsorted(self.timestamps, timestamp, side="right"))
+            for column in self._columns():
+                column[position + 1:self._end + 1] = column[position:self._end]
+
+        self._timestamps[position] = timestamp
+        self._prices[position] = price
+        self._statuses[position] = status
+        self._sources_seen[position] = sources_seen
+        self._sources_ok[position] = sources_ok
+        self._end += 1
+
+        if len(self) > self.capacity:
+            self._start += 1
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[self._start:self._end]
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._prices[self._start:self._end]
+
+    @property
+    def statuses(self) -> np.ndarray:
+        return self._statuses[self._start:self._end]
+
+    @property
+    def sources_seen(self) -> np.ndarray:
+        return self._sources_seen[self._start:self._end]
+
+    @property
+    def sources_ok(self) -> np.ndarray:
+        return self._sources_ok[self._start:self._end]
+
+    def first_index_since(self, since: float) -> int:
+        """Index of the first live point at or after `since` (binary search)"""
+        return int(np.searchsorted(self.timestamps, since, side="left"))
+
+    def trim_before(self, cutoff: float) -> int:
+        """Drop points older than `cutoff`, returning how many were removed"""
+        removed = self.first_index_since(cutoff)
+        self._start += removed
+        return removed
+
+    @property
+    def allocated_bytes(self) -> int:
+        return sum(column.nbytes for column in self._columns())
+
+class PegHistoryIndex:
+    """Per-symbol SymbolSeries, updated from each stored PegCheckPayload"""
+
+    def __init__(self, capacity_per_symbol: int):
+        self.capacity_per_symbol = capacity_per_symbol
+        self.series: Dict[str, SymbolSeries] = {}
+
+    def add_payload(self, payload: PegCheckPayload):
+        """Append one point per symbol seen in the payload's reports or source prices"""
+        reports = {report.symbol: report for report in payload.reports}
+        source_prices = {source: getattr(payload, source) or {} for source in SOURCE_BITS}
+
+        symbols = dict.fromkeys(reports)
+        for prices in source_prices.values():
+            symbols.update(dict.fromkeys(prices))
+
+        for symbol in symbols:
+            sources_seen = 0
+            sources_ok = 0
+            for source, bit in SOURCE_BITS.items():
+                if symbol in source_prices[source]:
+                    sources_seen |= bit
+                    if _is_valid_price(source_prices[source][symbol]):
+                        sources_ok |= bit
+
+            report = reports.get(symbol)
+            series = self.series.get(symbol)
+            if series is None:
+                series = self.series[symbol] = SymbolSeries(self.capacity_per_symbol)
+
+            series.append(
+                report.timestamp if report else payload.as_of,
+                float(report.avg_ref) if report else float("nan"),
+                STATUS_CODES[report.status] if report else STATUS_MISSING,
+                sources_seen,
+                sources_ok
+            )
+
+    def history(self, symbol: str, since: float) -> HistoryArrays:
+        """(timestamps, prices, status codes) of points at or after `since` with a valid price"""
+        series = self.series.get(symbol)
+        if series is None:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int8)
+
+        start = series.first_index_since(since)
+        timestamps = series.timestamps[start:]
+        prices = series.prices[start:]
+        statuses = series.statuses[start:]
+
+        # Boolean indexing copies, so callers never see later appends or compaction
+        valid = ~np.isnan(prices)
+        return timestamps[valid], prices[valid], statuses[valid]
+
+    def source_reliability(self, source: str, since: float) -> Dict[str, Dict[str, int]]:
+        """Per-symbol counts of points where `source` reported and where it had a valid price"""
+        bit = SOURCE_BITS.get(source)
+        if bit is None:
+            return {}
+
+        counts = {}
+        for symbol, series in self.series.items():
+            start = series.first_index_since(since)
+            total = int(np.count_nonzero(series.sources_seen[start:] & bit))
+            if total:
+                counts[symbol] = {
+                    "total": total,
+                    "success": int(np.count_nonzero(series.sources_ok[start:] & bit))
+                }
+        return counts
+
+    def trim_before(self, cutoff: float) -> int:
+        return sum(series.trim_before(cutoff) for series in self.series.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "symbols": len(self.series),
+            "points": sum(len(series) for series in self.series.values()),
+            "capacity_per_symbol": self.capacity_per_symbol,
+            "bytes_per_point": BYTES_PER_POINT,
+            "allocated_bytes": sum(series.allocated_bytes for series in self.series.values())
+        }
+
+def history_to_arrays(history: List[Tuple]) -> HistoryArrays:
+    """Convert get_peg_history tuples (datetime, price, status) into history arrays"""
+    if not history:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int8)
+
+    status_codes = {name: code for code, name in enumerate(STATUS_NAMES)}
+    timestamps = np.fromiter((int(ts.timestamp()) for ts, _, _ in history), dtype=np.int64, count=len(history))
+    prices = np.fromiter((price for _, price, _ in history), dtype=float, count=len(history))
+    statuses = np.fromiter((status_codes.get(status, STATUS_MISSING) for _, _, status in history),
+                           dtype=np.int8, count=len(history))
+    return timestamps, prices, statuses
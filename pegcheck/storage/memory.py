@@ -9,6 +9,7 @@ from collections import deque, defaultdict
 import time
 
 from .base import BaseStorage
+from .columnar import PegHistoryIndex, HistoryArrays, STATUS_NAMES
 from ..core.models import PegCheckPayload, PegReport
 
 class MemoryStorage(BaseStorage):
@@ -18,6 +19,10 @@ class MemoryStorage(BaseStorage):
         self.max_records = max_records
         self.peg_checks = deque(maxlen=max_records)  # Store PegCheckPayload objects
         self.source_metrics = defaultdict(list)  # source -> list of metrics
+        
+        # Per-symbol columnar history for time-range queries (one point per check,
+        # bounded to max_records points per symbol)
+        self.history_index = PegHistoryIndex(capacity_per_symbol=max_records)
         self._initialized = False
     
     async def initialize(self):
@@ -36,6 +41,7 @@ class MemoryStorage(BaseStorage):
                 'payload': payload
             }
             self.peg_checks.append(payload_with_meta)
+            self.history_index.add_payload(payload)
             return True
             
         except Exception as e:
@@ -44,28 +50,27 @@ class MemoryStorage(BaseStorage):
     
     async def get_peg_history(self, symbol: str, hours: int = 24) -> List[Tuple[datetime, float, str]]:
         """Get peg history for a symbol"""
+        timestamps, prices, statuses = await self.get_peg_history_arrays(symbol, hours)
+        
+        return [
+            (datetime.fromtimestamp(timestamp), price, STATUS_NAMES[status])
+            for timestamp, price, status in zip(timestamps.tolist(), prices.tolist(), statuses.tolist())
+        ]
+    
+    async def get_peg_history_arrays(self, symbol: str, hours: int = 24) -> HistoryArrays:
+        """Get peg history for a symbol as time-ordered (timestamps, prices, status codes) arrays"""
         if not self._initialized:
             await self.initialize()
         
-        history = []
-        since_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        for record in self.peg_checks:
-            if record['timestamp'] < since_time:
-                continue
-                
-            payload = record['payload']
-            for report in payload.reports:
-                if report.symbol == symbol and not str(report.avg_ref).lower() == 'nan':
-                    history.append((
-                        datetime.fromtimestamp(report.timestamp),
-                        float(report.avg_ref),
-                        report.status.value
-                    ))
+        return self.history_index.history(symbol, time.time() - hours * 3600)
+    
+    async def get_peg_history_batch(self, symbols: List[str], hours: int = 24) -> Dict[str, HistoryArrays]:
+        """Get history arrays for several symbols over the same window"""
+        if not self._initialized:
+            await self.initialize()
         
-        # Sort by timestamp
-        history.sort(key=lambda x: x[0])
-        return history
+        since = time.time() - hours * 3600
+        return {symbol: self.history_index.history(symbol, since) for symbol in symbols}
     
     async def get_latest_peg_check(self, symbols: Optional[List[str]] = None) -> Optional[PegCheckPayload]:
         """Get the latest peg check data"""
@@ -105,31 +110,7 @@ class MemoryStorage(BaseStorage):
             await self.initialize()
         
         # For memory storage, we'll calculate based on stored peg checks
-        since_time = datetime.utcnow() - timedelta(hours=hours)
-        reliability = defaultdict(lambda: {'total': 0, 'success': 0})
-        
-        for record in self.peg_checks:
-            if record['timestamp'] < since_time:
-                continue
-                
-            payload = record['payload']
-            
-            # Check which symbols had data from this source
-            source_data = None
-            if source == 'coingecko':
-                source_data = payload.coingecko
-            elif source == 'cryptocompare':
-                source_data = payload.cryptocompare
-            elif source == 'chainlink' and payload.chainlink:
-                source_data = payload.chainlink
-            elif source == 'uniswap' and payload.uniswap:
-                source_data = payload.uniswap
-            
-            if source_data:
-                for symbol, price in source_data.items():
-                    reliability[symbol]['total'] += 1
-                    if not str(price).lower() == 'nan' and price > 0:
-                        reliability[symbol]['success'] += 1
+        reliability = self.history_index.source_reliability(source, time.time() - hours * 3600)
         
         # Calculate success rates
         result = {}
@@ -157,6 +138,7 @@ class MemoryStorage(BaseStorage):
             [record for record in self.peg_checks if record['timestamp'] >= cutoff_time],
             maxlen=self.max_records
         )
+        self.history_index.trim_before(time.time() - days_to_keep * 86400)
         
         deleted_count = original_count - len(self.peg_checks)
         return deleted_count
@@ -174,6 +156,7 @@ class MemoryStorage(BaseStorage):
                 "peg_checks": len(self.peg_checks),
                 "max_records": self.max_records
             },
+            "history_index": self.history_index.stats(),
             "memory_usage": "limited_by_max_records",
             "note": "In-memory storage for development/testing only"
         }